@@ -1,5 +1,5 @@
 #!/bin/bash
-# HOOK_VERSION=v4.0.1
+# HOOK_VERSION=v4.1.0
 LOG="$HOME/.enki/hook-errors.log"
 mkdir -p "$(dirname "$LOG")" 2>/dev/null || true
 if ! (echo "" >> "$LOG") 2>/dev/null; then
@@ -16,29 +16,12 @@ echo "$(date -Iseconds) [enki-post-tool-use] tool=$TOOL_NAME" >> "$LOG" 2>/dev/n
 RESULT=$(echo "$INPUT" | /home/partha/.enki-venv/bin/python -m enki.gates.uru --hook post-tool-use 2>>"$LOG" || true)
 
 # ── Sentrux drift scoring ───────────────────────────────────────────────
+# Scored inside the uru call above (same uru.db transaction); see .drift.
 SESSION_ID=$(echo "$INPUT" | jq -r '.session_id // empty')
 PROJECT=$(echo "$INPUT" | jq -r '.project // empty')
-if [[ -n "$SESSION_ID" ]]; then
-    DRIFT_RESULT=$(echo "$INPUT" | /home/partha/.enki-venv/bin/python -c "
-import json, sys
-sys.path.insert(0, '/home/partha/Desktop/Enki/src')
-try:
-    data = json.load(sys.stdin)
-    from enki.gates.sentrux import score_tool_call
-    result = score_tool_call(
-        session_id=data.get('session_id', ''),
-        tool_name=data.get('tool_name', ''),
-        tool_input=data.get('tool_input', {}),
-        tool_output=data.get('tool_response', {}),
-        project=data.get('project'),
-    )
-    print(json.dumps(result))
-except Exception:
-    print(json.dumps({'action': 'none', 'message': None}))
-" 2>>"$LOG" || echo '{"action":"none","message":null}')
-
-    DRIFT_ACTION=$(echo "$DRIFT_RESULT" | jq -r '.action // "none"' 2>>"$LOG" || echo "none")
-    DRIFT_MESSAGE=$(echo "$DRIFT_RESULT" | jq -r '.message // ""' 2>>"$LOG" || echo "")
+if [[ -n "$SESSION_ID" && -n "$RESULT" ]]; then
+    DRIFT_ACTION=$(echo "$RESULT" | jq -r '.drift.action // "none"' 2>>"$LOG" || echo "none")
+    DRIFT_MESSAGE=$(echo "$RESULT" | jq -r '.drift.message // ""' 2>>"$LOG" || echo "")
     if [[ "$DRIFT_ACTION" == "escalate" && -n "$DRIFT_MESSAGE" ]]; then
         ENKI_DRIFT_MESSAGE="$DRIFT_MESSAGE" /home/partha/.enki-venv/bin/python -c "
 import os, sys
@@ -46,6 +29,7 @@ sys.path.insert(0, '/home/partha/Desktop/Enki/src')
 from enki.gates.sentrux import send_telegram_escalation
 send_telegram_escalation(os.environ.get('ENKI_DRIFT_MESSAGE', ''))
 " 2>>"$LOG" &
+        DRIFT_RESULT=$(echo "$RESULT" | jq -c '.drift' 2>>"$LOG" || echo "{}")
         echo "$(date -Iseconds) [sentrux] ESCALATION session=$SESSION_ID project=$PROJECT result=$DRIFT_RESULT" >> "$LOG" 2>/dev/null || true
     fi
 fi
@@ -0,0 +1,775 @@
+"""bench.py — Hook latency benchmarks driven by recorded tool-call traces.
+
+Replays a JSONL trace of hook payloads (PreToolUse / PostToolUse /
+UserPromptSubmit) against a throwaway ENKI_ROOT with seeded databases:
+
+- in-process: each Python gate layer is timed directly in a worker process
+- scripts: each deployed hook script is run as Claude Code would run it
+
+Results are summarized per hook and per gate layer (p50/p95/p99 latency,
+throughput) and can be written as JSON for release-to-release comparison.
+
+The graph benchmark times the code-graph parse pass over a real checkout
+at several worker counts and reports files/sec, then runs a complete
+scan per worker count in a fresh process and reports its max RSS.
+
+Usage:
+    enki bench hooks
+    enki bench hooks --trace trace.jsonl --json results.json
+    enki bench hooks --baseline previous.json --max-regression 25
+    enki bench graph ~/src/monorepo --workers 1,4,8
+    enki bench blast --files 50000
+"""
+
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from enki import __version__
+
+BENCH_PROJECT = "bench"
+BENCH_SESSION_ID = "bench-session"
+
+HOOK_SCRIPTS = {
+    "PreToolUse": "enki-pre-tool-use.sh",
+    "PostToolUse": "enki-post-tool-use.sh",
+    "UserPromptSubmit": "enki-user-prompt.sh",
+}
+
+RESULTS_SCHEMA_VERSION = 1
+
+
+# ── Traces ──
+
+
+def load_trace(path: str | Path) -> list[dict]:
+    """Read a JSONL trace. Blank lines and non-hook records are skipped."""
+    events = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        event = json.loads(line)
+        if event.get("hook_event_name") in HOOK_SCRIPTS:
+            events.append(event)
+    return events
+
+
+def synthetic_trace(count: int = 200, seed: int = 0) -> list[dict]:
+    """Generate `count` hook payloads mixing prompts and tool calls.
+
+    A tool call is a PreToolUse/PostToolUse pair; when only one slot is
+    left the trace ends on a prompt instead, so exactly `count` events
+    are returned.
+    """
+    rng = random.Random(seed)
+    heredoc = "cat > src/generated.py <<'EOF'\n" + "x = 1  # filler\n" * 200 + "EOF"
+    tools = [
+        ("Read", lambda i: {"file_path": f"src/module_{i % 40}.py"}),
+        ("Edit", lambda i: {
+            "file_path": f"src/module_{i % 40}.py",
+            "old_string": "return None",
+            "new_string": "return value\n" * (1 + i % 5),
+        }),
+        ("Write", lambda i: {
+            "file_path": f"tests/test_module_{i % 40}.py",
+            "content": "def test_value():\n    assert compute() == 3\n" * (1 + i % 20),
+        }),
+        ("Bash", lambda i: {"command": "python -m pytest -q tests/"}),
+        ("Bash", lambda i: {"command": f"git diff --stat && grep -rn TODO src/ | head -{i % 9 + 1}"}),
+        ("Bash", lambda i: {"command": heredoc}),
+        ("Bash", lambda i: {"command": "sed -i 's/foo/bar/' src/a.py && cp src/a.py src/b.py"}),
+        ("Grep", lambda i: {"pattern": "def main", "path": "src"}),
+        ("mcp__enki__enki_phase", lambda i: {"action": "status"}),
+        ("mcp__enki__enki_recall", lambda i: {"query": "retry strategy for flaky tests"}),
+    ]
+    prompts = [
+        "Let's continue with the next task.",
+        "The tests failed with a TypeError in parse_config, can you look?",
+        "We decided to go with SQLite instead of Postgres for the cache.",
+    ]
+
+    events = []
+    i = -1
+    while len(events) < count:
+        i += 1
+        base = {
+            "session_id": BENCH_SESSION_ID,
+            "project": BENCH_PROJECT,
+            "cwd": "",
+        }
+        if i % 10 == 0 or count - len(events) == 1:
+            events.append({
+                **base,
+                "hook_event_name": "UserPromptSubmit",
+                "prompt": rng.choice(prompts),
+            })
+            continue
+        tool_name, make_input = rng.choice(tools)
+        tool_input = make_input(i)
+        events.append({
+            **base,
+            "hook_event_name": "PreToolUse",
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+        })
+        events.append({
+            **base,
+            "hook_event_name": "PostToolUse",
+            "tool_name": tool_name,
+            "tool_input": tool_input,
+            "tool_response": {"success": True},
+            "assistant_response": rng.choice(prompts),
+        })
+    return events
+
+
+# ── Synthetic ENKI_ROOT ──
+
+
+def prepare_root(base: Path) -> dict:
+    """Lay out a fake $HOME with .enki/ and a registered project directory."""
+    home = base / "home"
+    enki_root = home / ".enki"
+    project_dir = home / "work" / BENCH_PROJECT
+    (project_dir / "src").mkdir(parents=True, exist_ok=True)
+    (project_dir / "tests").mkdir(parents=True, exist_ok=True)
+    enki_root.mkdir(parents=True, exist_ok=True)
+    return {"home": home, "enki_root": enki_root, "project_dir": project_dir}
+
+
+def seed_databases(project_dir: Path, log_rows: int = 500) -> None:
+    """Initialize DBs under the current ENKI_ROOT with a mid-sprint project.
+
+    Must run in a process whose ENKI_ROOT/HOME already point at the
+    synthetic root (see _bench_env).
+    """
+    import uuid
+
+    from enki.db import ENKI_ROOT, em_db, init_all, uru_db, wisdom_db
+    from enki.project_state import write_project_state
+
+    init_all()
+    (ENKI_ROOT / "SESSION_ID").write_text(BENCH_SESSION_ID)
+
+    with wisdom_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO projects (name, path) VALUES (?, ?)",
+            (BENCH_PROJECT, str(project_dir)),
+        )
+
+    write_project_state(BENCH_PROJECT, "goal", "Benchmark hook latency")
+    write_project_state(BENCH_PROJECT, "tier", "standard")
+    write_project_state(BENCH_PROJECT, "phase", "implement")
+
+    with em_db(BENCH_PROJECT) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO hitl_approvals (id, project, stage, note) "
+            "VALUES (?, ?, 'spec', 'bench')",
+            (str(uuid.uuid4()), BENCH_PROJECT),
+        )
+
+    with uru_db() as conn:
+        conn.executemany(
+            "INSERT INTO enforcement_log (id, session_id, hook, layer, tool_name, action) "
+            "VALUES (?, ?, 'post-tool-use', 'nudge', 'Read', 'allow')",
+            [(str(uuid.uuid4()), BENCH_SESSION_ID) for _ in range(log_rows)],
+        )
+
+
+def _src_dir() -> Path:
+    return Path(__file__).resolve().parent.parent
+
+
+def _bench_env(paths: dict) -> dict:
+    env = dict(os.environ)
+    env["HOME"] = str(paths["home"])
+    env["ENKI_ROOT"] = str(paths["enki_root"])
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(_src_dir()), env.get("PYTHONPATH", "")) if p
+    )
+    return env
+
+
+def stage_hook_scripts(source_dir: Path, target_dir: Path) -> dict[str, Path]:
+    """Copy hook scripts, pointing their interpreter and sys.path at this install."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    staged = {}
+    for event, name in HOOK_SCRIPTS.items():
+        src = source_dir / name
+        if not src.exists():
+            continue
+        text = src.read_text(encoding="utf-8")
+        text = re.sub(r"/\S*?/bin/python3?(?=[\s\"])", lambda _: sys.executable, text)
+        text = re.sub(
+            r"sys\.path\.insert\(0, '[^']*'\)",
+            lambda _: f"sys.path.insert(0, {str(_src_dir())!r})",
+            text,
+        )
+        dst = target_dir / name
+        dst.write_text(text, encoding="utf-8")
+        dst.chmod(0o755)
+        staged[event] = dst
+    return staged
+
+
+# ── In-process gate timing ──
+
+
+def _gate_layers(event: dict) -> list[tuple[str, object]]:
+    """(layer name, zero-arg callable) pairs exercised by one hook event."""
+    from enki.gates.layer0 import analyze_command
+    from enki.gates.sentrux import score_tool_call
+    from enki.gates.uru import (
+        check_post_tool_use,
+        check_pre_tool_use,
+        inspect_reasoning,
+        inspect_tool_input,
+    )
+
+    hook = event.get("hook_event_name")
+    tool_name = event.get("tool_name", "")
+    tool_input = event.get("tool_input") or {}
+
+    if hook == "PreToolUse":
+        layers = [("layer0.inspect", lambda: inspect_tool_input(tool_name, tool_input))]
+        if tool_name == "Bash":
+            command = tool_input.get("command", "")
+            layers.append(("layer0.5.targets", lambda: analyze_command(command)))
+        layers.append((
+            "uru.pre_tool_use",
+            lambda: check_pre_tool_use(tool_name, tool_input, hook_context=event),
+        ))
+        return layers
+    if hook == "PostToolUse":
+        return [
+            ("uru.post_tool_use", lambda: check_post_tool_use(
+                tool_name, tool_input, event.get("assistant_response", ""), hook_context=event,
+            )),
+            ("sentrux.score", lambda: score_tool_call(
+                session_id=event.get("session_id", ""),
+                tool_name=tool_name,
+                tool_input=tool_input,
+                tool_output=event.get("tool_response", {}),
+                project=event.get("project"),
+            )),
+        ]
+    if hook == "UserPromptSubmit":
+        return [("reasoning.inspect", lambda: inspect_reasoning(event.get("prompt", "")))]
+    return []
+
+
+def time_gate_layers(events: list[dict], warmup: int = 5) -> dict[str, list[float]]:
+    """Time every gate layer for every event. Returns layer -> samples (ms)."""
+    samples: dict[str, list[float]] = {}
+    for i, event in enumerate(events):
+        for layer, fn in _gate_layers(event):
+            start = time.perf_counter_ns()
+            fn()
+            elapsed = (time.perf_counter_ns() - start) / 1e6
+            if i >= warmup:
+                samples.setdefault(layer, []).append(elapsed)
+    return samples
+
+
+def time_hook_scripts(
+    events: list[dict], scripts: dict[str, Path], env: dict, cwd: Path, warmup: int = 2,
+) -> dict[str, list[float]]:
+    """Run each event through its hook script. Returns script -> samples (ms)."""
+    samples: dict[str, list[float]] = {}
+    seen: dict[str, int] = {}
+    for event in events:
+        script = scripts.get(event.get("hook_event_name"))
+        if not script:
+            continue
+        payload = json.dumps({**event, "cwd": event.get("cwd") or str(cwd)})
+        start = time.perf_counter_ns()
+        subprocess.run(
+            ["bash", str(script)],
+            input=payload,
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=str(cwd),
+            timeout=60,
+        )
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        seen[script.name] = seen.get(script.name, 0) + 1
+        if seen[script.name] > warmup:
+            samples.setdefault(script.name, []).append(elapsed)
+    return samples
+
+
+# ── Statistics ──
+
+
+def _percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples: dict[str, list[float]]) -> dict[str, dict]:
+    """Latency percentiles (ms) and throughput (calls/s) per key."""
+    summary = {}
+    for key, values in sorted(samples.items()):
+        ordered = sorted(values)
+        total_ms = sum(ordered)
+        summary[key] = {
+            "count": len(ordered),
+            "mean_ms": round(total_ms / len(ordered), 3) if ordered else 0.0,
+            "p50_ms": round(_percentile(ordered, 50), 3),
+            "p95_ms": round(_percentile(ordered, 95), 3),
+            "p99_ms": round(_percentile(ordered, 99), 3),
+            "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+            "throughput_per_s": round(len(ordered) / (total_ms / 1000.0), 1) if total_ms else 0.0,
+        }
+    return summary
+
+
+def compare_results(baseline: dict, current: dict, max_regression_pct: float) -> list[str]:
+    """List p95 regressions beyond max_regression_pct between two result files."""
+    regressions = []
+    for section in ("gate_layers", "hook_scripts"):
+        before = baseline.get(section) or {}
+        after = current.get(section) or {}
+        for key, stats in after.items():
+            old = before.get(key)
+            if not old or not old.get("p95_ms"):
+                continue
+            delta = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100.0
+            if delta > max_regression_pct:
+                regressions.append(
+                    f"{section}/{key}: p95 {old['p95_ms']:.2f}ms -> "
+                    f"{stats['p95_ms']:.2f}ms (+{delta:.0f}%)"
+                )
+    return regressions
+
+
+# ── Orchestration ──
+
+
+def run_hooks_benchmark(
+    events: list[dict],
+    hooks_dir: Path | None = None,
+    in_process: bool = True,
+    scripts: bool = True,
+    warmup: int = 5,
+    keep_root: Path | None = None,
+) -> dict:
+    """Benchmark gate layers and hook scripts against a synthetic ENKI_ROOT."""
+    tmp = None
+    base = keep_root
+    if base is None:
+        tmp = tempfile.TemporaryDirectory(prefix="enki-bench-")
+        base = Path(tmp.name)
+    try:
+        paths = prepare_root(base)
+        env = _bench_env(paths)
+        trace_path = base / "trace.jsonl"
+        trace_path.write_text(
+            "\n".join(json.dumps(e) for e in events) + "\n", encoding="utf-8",
+        )
+
+        # Seeding and in-process timing run in a worker so the gate modules
+        # import with ENKI_ROOT/HOME already pointing at the synthetic root.
+        cmd = [
+            sys.executable, "-m", "enki.bench", "--worker",
+            "--trace", str(trace_path),
+            "--project-dir", str(paths["project_dir"]),
+            "--warmup", str(warmup),
+        ]
+        if not in_process:
+            cmd.append("--seed-only")
+        proc = subprocess.run(
+            cmd, capture_output=True, text=True, env=env, cwd=str(paths["project_dir"]),
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark worker failed: {proc.stderr.strip()[-2000:]}")
+        layer_samples = json.loads(proc.stdout or "{}")
+
+        script_samples: dict[str, list[float]] = {}
+        skipped = None
+        if scripts:
+            source = hooks_dir or (_src_dir().parent / "scripts" / "hooks")
+            if not shutil.which("bash") or not shutil.which("jq"):
+                skipped = "bash and jq are required to run hook scripts"
+            elif not source.is_dir():
+                skipped = f"hook scripts not found in {source}"
+            else:
+                staged = stage_hook_scripts(source, paths["enki_root"] / "bench-hooks")
+                script_samples = time_hook_scripts(
+                    events, staged, env, paths["project_dir"], warmup=min(warmup, 2),
+                )
+
+        return {
+            "schema_version": RESULTS_SCHEMA_VERSION,
+            "enki_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "trace_events": len(events),
+            "gate_layers": summarize(layer_samples),
+            "hook_scripts": summarize(script_samples),
+            "hook_scripts_skipped": skipped,
+        }
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+def format_results(results: dict) -> str:
+    """Render benchmark results as aligned text tables."""
+    lines = [
+        f"Enki {results['enki_version']} hook benchmark "
+        f"({results['trace_events']} trace events, Python {results['python']})",
+    ]
+    for section, title in (("gate_layers", "Gate layers (in-process)"),
+                           ("hook_scripts", "Hook scripts")):
+        stats = results.get(section) or {}
+        lines.append("")
+        lines.append(title)
+        if not stats:
+            reason = results.get("hook_scripts_skipped") if section == "hook_scripts" else None
+            lines.append(f"  (skipped{': ' + reason if reason else ''})")
+            continue
+        lines.append(
+            f"  {'name':<26} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>9}"
+        )
+        for name, s in stats.items():
+            lines.append(
+                f"  {name:<26} {s['count']:>5} {s['p50_ms']:>7.2f}ms "
+                f"{s['p95_ms']:>7.2f}ms {s['p99_ms']:>7.2f}ms {s['throughput_per_s']:>9.1f}"
+            )
+    return "\n".join(lines)
+
+
+# ── Graph scan ──
+
+
+def run_graph_benchmark(
+    project_path: str | Path,
+    worker_counts: tuple[int, ...] = (1, 4, 8),
+    chunk_size: int | None = None,
+    repeat: int = 1,
+    full_scan: bool = True,
+) -> dict:
+    """Time the graph parse pass at each worker count (best of `repeat`).
+
+    Every run's output is hashed and compared with the first run, so a
+    parallel speedup that changes results shows up as identical=False.
+    With full_scan, each worker count also runs a complete scan (see
+    run_scan_benchmark) for phase timings and peak memory.
+    """
+    from enki.graph.scanner import discover_files, parse_files, scan_settings
+
+    _, chunk_size = scan_settings(1, chunk_size)
+    files = discover_files(str(project_path))
+    runs = {}
+    reference = None
+    for workers in worker_counts:
+        best = None
+        for _ in range(max(1, repeat)):
+            # Results are hashed as they stream in rather than collected,
+            # so the benchmark itself does not hold the whole parse.
+            hasher = hashlib.sha256()
+            symbols = imports = 0
+            start = time.perf_counter()
+            for result in parse_files(files, workers, chunk_size):
+                hasher.update(json.dumps(result, sort_keys=True).encode("utf-8"))
+                symbols += len(result["symbols"])
+                imports += len(result["imports"])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        digest = hasher.hexdigest()
+        reference = reference or digest
+        runs[str(workers)] = {
+            "workers": workers,
+            "seconds": round(best, 3),
+            "files_per_s": round(len(files) / best, 1) if best else 0.0,
+            "symbols": symbols,
+            "imports": imports,
+            "identical": digest == reference,
+        }
+
+    scans = {}
+    if full_scan:
+        for workers in worker_counts:
+            scans[str(workers)] = run_scan_benchmark(project_path, workers, chunk_size)
+
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "enki_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "project_path": str(project_path),
+        "files": len(files),
+        "chunk_size": chunk_size,
+        "graph_scan": runs,
+        "full_scan": scans,
+    }
+
+
+def run_scan_benchmark(
+    project_path: str | Path, workers: int, chunk_size: int | None = None,
+) -> dict:
+    """One full scan in a fresh process against a throwaway ENKI_ROOT.
+
+    ru_maxrss is a high-water mark for the life of a process, so each
+    scan gets its own: max_rss_mb is the scanning process's peak and
+    worker_max_rss_mb the largest parse worker's (None where the
+    resource module is unavailable).
+    """
+    with tempfile.TemporaryDirectory(prefix="enki-bench-scan-") as tmp:
+        env = _bench_env(prepare_root(Path(tmp)))
+        cmd = [
+            sys.executable, "-m", "enki.bench", "--scan-worker",
+            "--path", str(Path(project_path).resolve()),
+            "--workers", str(workers),
+        ]
+        if chunk_size is not None:
+            cmd += ["--chunk-size", str(chunk_size)]
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Scan benchmark failed: {proc.stderr.strip()[-2000:]}")
+    return json.loads(proc.stdout)
+
+
+def _max_rss_mb(children: bool = False) -> float | None:
+    """Peak RSS of this process (or its largest reaped child), in MiB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # Kilobytes on Linux, bytes on macOS.
+    return round(usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _scan_worker_main(argv: list[str]) -> None:
+    """Run one full scan and print its stats and peak memory as JSON."""
+    import argparse
+
+    from enki.graph.scanner import run_full_scan
+
+    parser = argparse.ArgumentParser(prog="enki.bench")
+    parser.add_argument("--scan-worker", action="store_true", required=True)
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--workers", type=int, required=True)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = run_full_scan(BENCH_PROJECT, args.path, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "workers": args.workers,
+        "seconds": round(elapsed, 3),
+        "files": stats["files_scanned"],
+        "symbols": stats["symbols_extracted"],
+        "edges": stats["edges_found"],
+        "errors": len(stats["errors"]),
+        "timings": {k: round(v, 3) for k, v in stats["timings"].items()},
+        "max_rss_mb": _max_rss_mb(),
+        "worker_max_rss_mb": _max_rss_mb(children=True) if args.workers > 1 else None,
+    }))
+
+
+def format_graph_results(results: dict) -> str:
+    """Render graph benchmark results as an aligned text table."""
+    lines = [
+        f"Enki {results['enki_version']} graph parse benchmark "
+        f"({results['files']} files, chunk {results['chunk_size']}, "
+        f"{results['cpu_count']} CPUs, Python {results['python']})",
+        "",
+        f"  {'workers':>7} {'seconds':>9} {'files/s':>9} {'symbols':>9} {'imports':>9}  identical",
+    ]
+    for run in results["graph_scan"].values():
+        lines.append(
+            f"  {run['workers']:>7} {run['seconds']:>9.2f} {run['files_per_s']:>9.1f} "
+            f"{run['symbols']:>9} {run['imports']:>9}  {'yes' if run['identical'] else 'NO'}"
+        )
+    scans = results.get("full_scan") or {}
+    if scans:
+        def mb(value):
+            return "n/a" if value is None else f"{value:.1f}"
+
+        lines += [
+            "",
+            "  Full scan (parse, link, index, blast radius; one process per run)",
+            f"  {'workers':>7} {'seconds':>9} {'max RSS MB':>11} {'worker MB':>10} {'edges':>9}",
+        ]
+        for scan in scans.values():
+            lines.append(
+                f"  {scan['workers']:>7} {scan['seconds']:>9.2f} {mb(scan['max_rss_mb']):>11} "
+                f"{mb(scan['worker_max_rss_mb']):>10} {scan['edges']:>9}"
+            )
+    return "\n".join(lines)
+
+
+# ── Blast radius ──
+
+
+def synthetic_import_graph(
+    files: int, imports_per_file: int = 6, cycle_fraction: float = 0.01, seed: int = 0,
+) -> list[tuple[str, str]]:
+    """Random layered import graph: mostly downward imports plus a few cycles."""
+    rng = random.Random(seed)
+    names = [f"pkg{i // 100}/mod{i}.ts" for i in range(files)]
+    edges = set()
+    for i in range(1, files):
+        for _ in range(rng.randint(0, imports_per_file * 2)):
+            # Skew towards low indices so a few files are imported widely.
+            j = int(i * rng.random() ** 2)
+            edges.add((names[i], names[j]))
+        if rng.random() < cycle_fraction:
+            j = min(files - 1, i + rng.randint(1, 50))
+            edges.add((names[i], names[j]))
+    return sorted(edges)
+
+
+def run_blast_benchmark(
+    files: int = 50000,
+    imports_per_file: int = 6,
+    exports_per_file: int = 4,
+    seed: int = 0,
+    verify_sample: int = 200,
+) -> dict:
+    """Time full and single-file incremental blast radius on a synthetic graph.
+
+    A sample of files is checked against a plain per-file DFS.
+    """
+    import sqlite3
+
+    from enki.graph.blast import importer_map
+    from enki.graph.scanner import compute_blast_radius
+    from enki.graph.schema import create_graph_tables
+
+    edges = synthetic_import_graph(files, imports_per_file, seed=seed)
+    names = sorted({f"pkg{i // 100}/mod{i}.ts" for i in range(files)})
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    create_graph_tables(conn)
+    conn.executemany(
+        "INSERT INTO files (path, language) VALUES (?, 'typescript')", [(n,) for n in names]
+    )
+    conn.executemany(
+        "INSERT INTO symbols (id, file_path, name, kind, is_exported) VALUES (?, ?, ?, 'function', 1)",
+        [(f"{n}::f{k}::{k}", n, f"f{k}") for n in names for k in range(exports_per_file)],
+    )
+    conn.executemany(
+        "INSERT INTO edges (id, from_id, to_id, edge_type) VALUES (?, ?, ?, 'imports')",
+        [(f"{a}::imports::{b}", a, b) for a, b in edges],
+    )
+    conn.commit()
+
+    start = time.perf_counter()
+    compute_blast_radius("bench", conn)
+    full_s = time.perf_counter() - start
+
+    # One mid-graph file edited: same imports, then one import added.
+    rng = random.Random(seed)
+    changed = names[rng.randrange(files)]
+    start = time.perf_counter()
+    compute_blast_radius("bench", conn, {changed})
+    incremental_s = time.perf_counter() - start
+
+    target = names[rng.randrange(files)]
+    edges.append((changed, target))
+    conn.execute(
+        "INSERT OR IGNORE INTO edges (id, from_id, to_id, edge_type) VALUES (?, ?, ?, 'imports')",
+        (f"{changed}::imports::{target}", changed, target),
+    )
+    start = time.perf_counter()
+    compute_blast_radius("bench", conn, {changed}, {target})
+    incremental_edge_s = time.perf_counter() - start
+
+    importers = importer_map(edges)
+    stored = {
+        r["file_path"]: r["transitive_importers"]
+        for r in conn.execute("SELECT file_path, transitive_importers FROM blast_radius")
+    }
+    identical = True
+    for name in rng.sample(names, min(verify_sample, len(names))):
+        visited: set[str] = set()
+        queue = list(importers.get(name, ()))
+        while queue:
+            current = queue.pop()
+            if current not in visited:
+                visited.add(current)
+                queue.extend(importers.get(current, set()) - visited)
+        identical &= stored.get(name) == len(visited)
+    conn.close()
+
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "enki_version": __version__,
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+        "edges": len(edges),
+        "symbols": files * exports_per_file,
+        "full_s": round(full_s, 3),
+        "incremental_s": round(incremental_s, 3),
+        "incremental_edge_s": round(incremental_edge_s, 3),
+        "verified_files": min(verify_sample, len(names)),
+        "identical": identical,
+    }
+
+
+def format_blast_results(results: dict) -> str:
+    return "\n".join([
+        f"Enki {results['enki_version']} blast radius benchmark "
+        f"(Python {results['python']})",
+        f"  files {results['files']}, edges {results['edges']}, symbols {results['symbols']}",
+        f"  full recompute:         {results['full_s']:.3f}s",
+        f"  one file, same imports: {results['incremental_s']:.3f}s",
+        f"  one file, new import:   {results['incremental_edge_s']:.3f}s",
+        f"  matches per-file DFS:   {'yes' if results['identical'] else 'NO'} "
+        f"({results['verified_files']} files checked)",
+    ])
+
+
+def _worker_main(argv: list[str]) -> None:
+    """Seed the synthetic root and time gate layers (runs inside bench env)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="enki.bench")
+    parser.add_argument("--worker", action="store_true", required=True)
+    parser.add_argument("--trace", required=True)
+    parser.add_argument("--project-dir", required=True)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    seed_databases(Path(args.project_dir))
+    if args.seed_only:
+        print("{}")
+        return
+    events = [
+        {**e, "cwd": e.get("cwd") or args.project_dir} for e in load_trace(args.trace)
+    ]
+    print(json.dumps(time_gate_layers(events, warmup=args.warmup)))
+
+
+if __name__ == "__main__":
+    if "--scan-worker" in sys.argv[1:]:
+        _scan_worker_main(sys.argv[1:])
+    else:
+        _worker_main(sys.argv[1:])
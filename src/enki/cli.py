@@ -11,6 +11,11 @@ Usage:
     python -m enki.cli status --project myproject
     python -m enki.cli migrate
     python -m enki.cli init
+    python -m enki.cli hooks verify --all
+    python -m enki.cli bench hooks --json results.json
+    python -m enki.cli bench graph ~/src/app --workers 1,4,8
+    python -m enki.cli graph watch --project myproject
+    python -m enki.cli stats tools --hours 24
 """
 
 import argparse
@@ -92,6 +97,50 @@ def cmd_hooks_deploy(args):
         print(f"No expected hooks found in source directory: {source_dir}")
 
 
+def cmd_hooks_verify(args):
+    """Verify deployed hooks match source hooks by content hash."""
+    import json
+    from pathlib import Path
+
+    from enki.hook_versioning import verify_hook_hashes
+
+    source_dir = args.source_dir or str(
+        Path(__file__).resolve().parent.parent.parent / "scripts" / "hooks"
+    )
+    hook_dirs = [args.target_dir]
+    if args.all:
+        from enki.db import wisdom_db
+
+        try:
+            with wisdom_db() as conn:
+                rows = conn.execute(
+                    "SELECT path FROM projects WHERE path IS NOT NULL AND TRIM(path) != ''"
+                ).fetchall()
+        except Exception:
+            rows = []
+        for row in rows:
+            project_hooks = Path(row["path"]).expanduser() / ".claude" / "hooks"
+            if project_hooks.is_dir() and str(project_hooks) not in hook_dirs:
+                hook_dirs.append(str(project_hooks))
+
+    results = verify_hook_hashes(hook_dirs, source_dir, max_workers=args.workers)
+    if not results:
+        print(f"No expected hooks found in source directory: {source_dir}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps([r.__dict__ for r in results], indent=2))
+    else:
+        for r in results:
+            print(f"{'OK  ' if r.ok else 'FAIL'} {r.hooks_dir}")
+            for hook in r.missing:
+                print(f"  missing:  {hook}")
+            for hook in r.modified:
+                print(f"  modified: {hook}")
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
 def cmd_session_end(args):
     """Finalize current session: memory, enforcement, three-loop pipeline, archive."""
     from datetime import datetime
@@ -554,6 +603,160 @@ def cmd_review(args):
     print(package.get("markdown", ""))
 
 
+def cmd_stats_tools(args):
+    """Show per-tool MCP latency, CPU, DB time and payload sizes."""
+    import json
+
+    from enki.telemetry import format_tool_stats, tool_stats, write_prometheus_textfile
+
+    stats = tool_stats(since_hours=args.hours, project=args.project)
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(format_tool_stats(stats, args.hours))
+    if args.prometheus:
+        path = write_prometheus_textfile(args.prometheus)
+        print(f"Wrote Prometheus metrics to {path}", file=sys.stderr)
+
+
+def cmd_bench_blast(args):
+    """Time blast-radius computation on a synthetic import graph."""
+    import json
+    from pathlib import Path
+
+    from enki.bench import format_blast_results, run_blast_benchmark
+
+    results = run_blast_benchmark(
+        files=args.files, imports_per_file=args.imports, seed=args.seed,
+    )
+    print(format_blast_results(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    if not results["identical"]:
+        sys.exit(2)
+
+
+def cmd_graph_watch(args):
+    """Keep a project's graph.db current as files change (foreground)."""
+    import os
+
+    from enki.config import get_config
+    from enki.graph.watcher import GraphWatcher
+    from enki.project_state import normalize_project_name
+
+    project = normalize_project_name(args.project)
+    project_path = args.path
+    if not project_path:
+        from enki.db import wisdom_db
+
+        with wisdom_db() as conn:
+            row = conn.execute(
+                "SELECT path FROM projects WHERE name = ? LIMIT 1", (project,)
+            ).fetchone()
+        project_path = (row["path"] or "").strip() if row else ""
+    if not project_path or not os.path.isdir(project_path):
+        print(f"No project path for '{project}'. Pass --path or register the project.")
+        sys.exit(1)
+
+    cfg = get_config().get("graph", {})
+
+    def report(stats):
+        changed = {
+            k: v for k, v in stats.items()
+            if k not in ("errors", "files_unchanged") and v
+        }
+        print(f"graph updated: {changed or 'no changes'}", flush=True)
+        for err in stats.get("errors", [])[:5]:
+            print(f"  error: {err}", flush=True)
+
+    watcher = GraphWatcher(
+        project=project,
+        project_path=project_path,
+        debounce_s=args.debounce if args.debounce is not None else float(cfg.get("watch_debounce_s", 0.5)),
+        max_delay_s=float(cfg.get("watch_max_delay_s", 5.0)),
+        poll=args.poll or bool(cfg.get("watch_poll", False)),
+        on_update=report,
+    )
+    # Catch up first (full scan if graph.db has never been built).
+    watcher.update_now()
+    print(f"Watching {project_path} for {project} (Ctrl-C to stop)", flush=True)
+    watcher.run_forever()
+    print(f"Stopped after {watcher.updates} update(s) using {watcher.backend}.")
+
+
+def cmd_bench_hooks(args):
+    """Replay a hook trace against a synthetic ENKI_ROOT and report latency."""
+    import json
+    from pathlib import Path
+
+    from enki.bench import (
+        compare_results,
+        format_results,
+        load_trace,
+        run_hooks_benchmark,
+        synthetic_trace,
+    )
+
+    if args.trace:
+        events = load_trace(args.trace)
+    else:
+        events = synthetic_trace(count=args.events, seed=args.seed)
+    if not events:
+        print("Trace contains no PreToolUse/PostToolUse/UserPromptSubmit events.")
+        sys.exit(1)
+
+    results = run_hooks_benchmark(
+        events,
+        hooks_dir=Path(args.hooks_dir) if args.hooks_dir else None,
+        in_process=not args.no_in_process,
+        scripts=not args.no_scripts,
+        warmup=args.warmup,
+    )
+    print(format_results(results))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_results(baseline, results, args.max_regression)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(2)
+        print(f"\nNo p95 regressions over {args.max_regression:.0f}% vs {args.baseline}")
+
+
+def cmd_bench_graph(args):
+    """Time the code-graph parse pass and a full scan at several worker counts."""
+    import json
+    from pathlib import Path
+
+    from enki.bench import format_graph_results, run_graph_benchmark
+
+    try:
+        worker_counts = tuple(int(w) for w in args.workers.split(",") if w.strip())
+    except ValueError:
+        print(f"Invalid --workers: {args.workers} (expected e.g. 1,4,8)")
+        sys.exit(1)
+
+    results = run_graph_benchmark(
+        args.path, worker_counts=worker_counts,
+        chunk_size=args.chunk_size, repeat=args.repeat,
+        full_scan=not args.no_full_scan,
+    )
+    print(format_graph_results(results))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    if not all(run["identical"] for run in results["graph_scan"].values()):
+        sys.exit(2)
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="enki",
@@ -628,6 +831,29 @@ def main():
     )
     hooks_deploy.set_defaults(func=cmd_hooks_deploy)
 
+    hooks_verify = hooks_sub.add_parser(
+        "verify", help="Verify deployed hooks match source by content hash"
+    )
+    hooks_verify.add_argument(
+        "--source-dir",
+        default=None,
+        help="Source hooks directory (default: repo scripts/hooks)",
+    )
+    hooks_verify.add_argument(
+        "--target-dir",
+        default=str((ENKI_ROOT.parent / ".claude" / "hooks").expanduser()),
+        help="Global hooks directory (default: ~/.claude/hooks)",
+    )
+    hooks_verify.add_argument(
+        "--all", action="store_true",
+        help="Also verify .claude/hooks in every registered project",
+    )
+    hooks_verify.add_argument(
+        "--workers", type=int, default=8, help="Parallel hash workers (default: 8)",
+    )
+    hooks_verify.add_argument("--json", action="store_true", help="Output as JSON")
+    hooks_verify.set_defaults(func=cmd_hooks_verify)
+
     # session (parent with subcommands)
     session_parser = subparsers.add_parser(
         "session", help="Session lifecycle commands"
@@ -803,6 +1029,129 @@ def main():
     )
     review_parser.set_defaults(func=cmd_review)
 
+    # bench (parent with subcommands)
+    bench_parser = subparsers.add_parser(
+        "bench", help="Performance benchmarks"
+    )
+    bench_sub = bench_parser.add_subparsers(dest="bench_command")
+
+    bench_hooks = bench_sub.add_parser(
+        "hooks", help="Replay a tool-call trace against hooks and gate layers"
+    )
+    bench_hooks.add_argument(
+        "--trace", help="JSONL trace of hook payloads (default: synthetic trace)"
+    )
+    bench_hooks.add_argument(
+        "--events", type=int, default=200,
+        help="Hook events in the synthetic trace when --trace is not given; "
+        "a tool call is two events, Pre and Post (default: 200)",
+    )
+    bench_hooks.add_argument(
+        "--seed", type=int, default=0, help="Synthetic trace seed (default: 0)"
+    )
+    bench_hooks.add_argument(
+        "--warmup", type=int, default=5,
+        help="Events excluded from timing while caches warm (default: 5)",
+    )
+    bench_hooks.add_argument(
+        "--hooks-dir", default=None,
+        help="Hook scripts to benchmark (default: repo scripts/hooks)",
+    )
+    bench_hooks.add_argument(
+        "--no-scripts", action="store_true", help="Skip hook script runs"
+    )
+    bench_hooks.add_argument(
+        "--no-in-process", action="store_true", help="Skip in-process gate timing"
+    )
+    bench_hooks.add_argument("--json", help="Write machine-readable results here")
+    bench_hooks.add_argument(
+        "--baseline", help="Previous --json results to check for regressions"
+    )
+    bench_hooks.add_argument(
+        "--max-regression", type=float, default=25.0,
+        help="Allowed p95 increase in percent vs --baseline (default: 25)",
+    )
+    bench_hooks.set_defaults(func=cmd_bench_hooks)
+
+    bench_graph = bench_sub.add_parser(
+        "graph", help="Measure graph parse throughput and full-scan peak memory"
+    )
+    bench_graph.add_argument(
+        "path", nargs="?", default=".", help="Checkout to scan (default: .)"
+    )
+    bench_graph.add_argument(
+        "--workers", default="1,4,8",
+        help="Comma-separated worker counts (default: 1,4,8)",
+    )
+    bench_graph.add_argument(
+        "--chunk-size", type=int, default=None,
+        help="Files per worker task (default: [graph] scan_chunk_size)",
+    )
+    bench_graph.add_argument(
+        "--repeat", type=int, default=1, help="Runs per worker count; best is kept"
+    )
+    bench_graph.add_argument(
+        "--no-full-scan", action="store_true",
+        help="Skip the full-scan run (timings and max RSS) per worker count",
+    )
+    bench_graph.add_argument("--json", help="Write machine-readable results here")
+    bench_graph.set_defaults(func=cmd_bench_graph)
+
+    bench_blast = bench_sub.add_parser(
+        "blast", help="Time blast-radius computation on a synthetic import graph"
+    )
+    bench_blast.add_argument(
+        "--files", type=int, default=50000, help="Files in the graph (default: 50000)"
+    )
+    bench_blast.add_argument(
+        "--imports", type=int, default=6, help="Mean imports per file (default: 6)"
+    )
+    bench_blast.add_argument("--seed", type=int, default=0, help="Graph seed (default: 0)")
+    bench_blast.add_argument("--json", help="Write machine-readable results here")
+    bench_blast.set_defaults(func=cmd_bench_blast)
+
+    # graph (parent with subcommands)
+    graph_parser = subparsers.add_parser(
+        "graph", help="Codebase knowledge graph"
+    )
+    graph_sub = graph_parser.add_subparsers(dest="graph_command")
+
+    graph_watch = graph_sub.add_parser(
+        "watch", help="Update graph.db incrementally as files change"
+    )
+    graph_watch.add_argument("--project", "-p", required=True, help="Project ID")
+    graph_watch.add_argument(
+        "--path", help="Project directory (default: registered project path)"
+    )
+    graph_watch.add_argument(
+        "--poll", action="store_true", help="Poll instead of using inotify"
+    )
+    graph_watch.add_argument(
+        "--debounce", type=float, default=None,
+        help="Seconds of quiet before updating (default: [graph] watch_debounce_s)",
+    )
+    graph_watch.set_defaults(func=cmd_graph_watch)
+
+    # stats (parent with subcommands)
+    stats_parser = subparsers.add_parser(
+        "stats", help="Runtime telemetry"
+    )
+    stats_sub = stats_parser.add_subparsers(dest="stats_command")
+
+    stats_tools = stats_sub.add_parser(
+        "tools", help="Per-tool MCP latency and payload telemetry"
+    )
+    stats_tools.add_argument(
+        "--hours", type=int, default=24, help="Window in hours (default: 24)"
+    )
+    stats_tools.add_argument("--project", help="Only calls for this project")
+    stats_tools.add_argument("--json", action="store_true", help="Output as JSON")
+    stats_tools.add_argument(
+        "--prometheus", metavar="PATH",
+        help="Also write a Prometheus textfile (node_exporter textfile collector)",
+    )
+    stats_tools.set_defaults(func=cmd_stats_tools)
+
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
@@ -820,6 +1169,12 @@ def main():
             hooks_parser.print_help()
         elif args.command == "batch":
             batch_parser.print_help()
+        elif args.command == "bench":
+            bench_parser.print_help()
+        elif args.command == "graph":
+            graph_parser.print_help()
+        elif args.command == "stats":
+            stats_parser.print_help()
         sys.exit(1)
 
     args.func(args)
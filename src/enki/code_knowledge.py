@@ -2,8 +2,11 @@
 
 Manages `code_knowledge` category notes with file tracking:
 - SHA-256 hash of file content for change detection
-- Staleness detection: compare stored hash vs current file
+- Staleness detection: compare stored hash vs current file, hashing each
+  file once per run and skipping files whose stat is unchanged
 - Session-end code scan: git diff against primary branch → extract knowledge
+- Extraction cached per file by content hash; the local model runs on a
+  bounded thread pool with a time budget
 
 Key rules:
 - Staleness stays on code note only — linked notes NOT flagged
@@ -12,13 +15,22 @@ Key rules:
 """
 
 import hashlib
+import json
 import logging
+import os
+import queue
+import sqlite3
+import stat
 import subprocess
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from enki.graph.languages import detect_language
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,13 +46,24 @@ def compute_file_hash(file_path: str) -> Optional[str]:
         return None
 
 
-def check_staleness(project: str = None) -> list[dict]:
+def check_staleness(
+    project: str = None, mark: bool = False, cache_hashes: bool = False,
+) -> list[dict]:
     """Check all code_knowledge notes for staleness.
 
-    Compares stored file_hash against current file content.
+    Compares stored file_hash against current file content. Each
+    referenced file is hashed at most once per run, and not at all when
+    its stat matches file_hash_cache or the project's graph.db.
+
+    Without mark or cache_hashes nothing is written to wisdom.db, so a
+    check does not invalidate cached MCP results that depend on it.
 
     Args:
         project: Optional project filter.
+        mark: Write the results back: notes that went stale or missing
+            lose last_verified (see mark_stale), and stale notes whose
+            file matches again get it back. Implies cache_hashes.
+        cache_hashes: Store newly computed hashes in file_hash_cache.
 
     Returns:
         List of stale notes: [{note_id, file_ref, stored_hash, current_hash, status}]
@@ -51,7 +74,7 @@ def check_staleness(project: str = None) -> list[dict]:
     conn = get_wisdom_db()
     try:
         query = (
-            "SELECT id, file_ref, file_hash FROM notes "
+            "SELECT id, file_ref, file_hash, project, last_verified FROM notes "
             "WHERE category = 'code_knowledge' AND file_ref IS NOT NULL"
         )
         params = []
@@ -60,33 +83,151 @@ def check_staleness(project: str = None) -> list[dict]:
             params.append(project)
 
         rows = conn.execute(query, params).fetchall()
+        hashes = current_file_hashes(
+            conn,
+            {row["file_ref"] for row in rows},
+            {row["project"] for row in rows if row["project"]},
+            write_cache=mark or cache_hashes,
+        )
+
+        results = []
+        flips = []
+        now = datetime.now(timezone.utc).isoformat()
+        for row in rows:
+            stored_hash = row["file_hash"]
+            current_hash = hashes.get(row["file_ref"])
+
+            if current_hash is None:
+                status = "missing"
+            elif current_hash != stored_hash:
+                status = "stale"
+            else:
+                status = "current"
+
+            if (status == "current") != (row["last_verified"] is not None):
+                flips.append((now if status == "current" else None, row["id"]))
+
+            results.append({
+                "note_id": row["id"],
+                "file_ref": row["file_ref"],
+                "stored_hash": stored_hash,
+                "current_hash": current_hash,
+                "status": status,
+            })
+
+        if mark and flips:
+            conn.executemany("UPDATE notes SET last_verified = ? WHERE id = ?", flips)
+            conn.commit()
     finally:
         conn.close()
 
-    results = []
-    for row in rows:
-        note_id = row["id"]
-        file_ref = row["file_ref"]
-        stored_hash = row["file_hash"]
+    return results
 
-        current_hash = compute_file_hash(file_ref)
 
-        if current_hash is None:
-            status = "missing"
-        elif current_hash != stored_hash:
-            status = "stale"
-        else:
-            status = "current"
-
-        results.append({
-            "note_id": note_id,
-            "file_ref": file_ref,
-            "stored_hash": stored_hash,
-            "current_hash": current_hash,
-            "status": status,
-        })
+def current_file_hashes(
+    conn: sqlite3.Connection,
+    paths: set[str],
+    projects: set[str] = frozenset(),
+    write_cache: bool = False,
+) -> dict[str, Optional[str]]:
+    """sha256 per path (None if unreadable), hashing only what changed.
+
+    A path whose (size, mtime_ns, inode) matches file_hash_cache reuses
+    the cached hash. Otherwise the graph.db of one of `projects` is
+    consulted, matching on (size, mtime_ns) the way the incremental
+    scan does, before the file is read. With write_cache, new hashes
+    are committed to file_hash_cache unless the mtime is too recent to
+    trust.
+    """
+    from enki.graph.scanner import RACY_WINDOW_NS
 
-    return results
+    stats = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            stats[path] = st
+
+    hashes: dict[str, Optional[str]] = dict.fromkeys(paths)
+    misses = set(stats)
+    for path, size, mtime_ns, inode, file_hash in _select_in(
+        conn,
+        "SELECT path, size, mtime_ns, inode, file_hash FROM file_hash_cache WHERE path IN ({})",
+        sorted(stats),
+    ):
+        st = stats[path]
+        if (size, mtime_ns, inode) == (st.st_size, st.st_mtime_ns, st.st_ino):
+            hashes[path] = file_hash
+            misses.discard(path)
+
+    learned = {}
+    for path, file_hash in _graph_file_hashes(conn, projects, stats, misses).items():
+        hashes[path] = learned[path] = file_hash
+    for path in sorted(misses - set(learned)):
+        hashes[path] = learned[path] = compute_file_hash(path)
+
+    if not write_cache:
+        return hashes
+    cutoff = time.time_ns() - RACY_WINDOW_NS
+    rows = [
+        (path, stats[path].st_size, stats[path].st_mtime_ns, stats[path].st_ino, file_hash)
+        for path, file_hash in learned.items()
+        if file_hash is not None and stats[path].st_mtime_ns < cutoff
+    ]
+    if rows:
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_hash_cache "
+            "(path, size, mtime_ns, inode, file_hash) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+    return hashes
+
+
+def _select_in(conn: sqlite3.Connection, query: str, keys: list, chunk: int = 500) -> list:
+    rows = []
+    for i in range(0, len(keys), chunk):
+        part = keys[i:i + chunk]
+        rows.extend(conn.execute(query.format(",".join("?" for _ in part)), part).fetchall())
+    return rows
+
+
+def _graph_file_hashes(
+    conn: sqlite3.Connection, projects: set[str], stats: dict, misses: set[str],
+) -> dict[str, str]:
+    """Hashes the graph scanner already recorded for files in `misses`."""
+    if not misses or not projects:
+        return {}
+    from enki.db import graph_db, graph_db_path
+
+    found: dict[str, str] = {}
+    for name, root in _select_in(
+        conn,
+        "SELECT name, path FROM projects WHERE path IS NOT NULL AND name IN ({})",
+        sorted(projects),
+    ):
+        try:
+            under = {}
+            for path in misses - set(found):
+                rel = os.path.relpath(path, root)
+                if not rel.startswith(os.pardir):
+                    under[rel] = path
+            if not under or not graph_db_path(name).exists():
+                continue
+            with graph_db(name) as graph:
+                for rel, size, mtime_ns, content_hash in _select_in(
+                    graph,
+                    "SELECT path, size_bytes, mtime_ns, content_hash FROM files WHERE path IN ({})",
+                    sorted(under),
+                ):
+                    st = stats[under[rel]]
+                    if content_hash and (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+                        found[under[rel]] = content_hash
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug("Graph hashes unavailable for %s: %s", name, e)
+    return found
 
 
 def mark_stale(note_ids: list[str]) -> int:
@@ -201,20 +342,38 @@ CODE_EXTENSIONS = {
 }
 
 
+# Local-model pass: requests run on this many threads, and the whole pass
+# gets this many seconds. Files the model has not answered for by then
+# keep their structural facts and are retried at the next session end.
+LLM_WORKERS = 4
+LLM_BUDGET_S = 20.0
+
+# Caps on how much structure one fact lists.
+MAX_FACT_SYMBOLS = 20
+MAX_FACT_IMPORTS = 15
+
+
 def scan_changed_files(
     project_path: str,
     project_name: str,
     primary_branch: str = "main",
+    llm_budget_s: float = LLM_BUDGET_S,
+    llm_workers: int = LLM_WORKERS,
 ) -> list[dict]:
     """Scan files changed since primary branch and extract code knowledge.
 
-    This runs at session-end. Uses the local model if available,
-    falls back to heuristic extraction.
+    This runs at session-end. Structural facts come from the graph
+    scanner's tree-sitter walk (plus Python module docstrings); the
+    local model, if available, adds its own items on a bounded thread
+    pool within llm_budget_s. Both are cached per file by content hash,
+    so unchanged files cost one read and one hash.
 
     Args:
         project_path: Path to the git repository.
         project_name: Project name for note storage.
         primary_branch: Branch to diff against.
+        llm_budget_s: Wall-clock cap on the local-model pass.
+        llm_workers: Concurrent local-model requests.
 
     Returns:
         List of extracted code knowledge items ready for storage.
@@ -223,27 +382,55 @@ def scan_changed_files(
     if not changed:
         return []
 
-    items = []
+    files = []
     for file_path in changed:
-        ext = Path(file_path).suffix
-        if ext not in CODE_EXTENSIONS:
+        if Path(file_path).suffix not in CODE_EXTENSIONS:
             continue
-
         full_path = str(Path(project_path) / file_path)
         try:
-            content = Path(full_path).read_text(errors="replace")
+            source = Path(full_path).read_bytes()
         except (OSError, IOError):
             continue
-
+        content = source.decode(errors="replace")
         if len(content) < 50:  # Skip trivially small files
             continue
+        files.append({
+            "path": file_path,
+            "full_path": full_path,
+            "source": source,
+            "content": content,
+            "file_hash": hashlib.sha256(source).hexdigest(),
+        })
+    if not files:
+        return []
 
-        file_hash = compute_file_hash(full_path)
-        extracted = _extract_from_file(content, file_path)
+    cached = _load_cached(project_name, files)
+    fresh: set[str] = set()
+    for f in files:
+        hit = cached.get(f["path"])
+        if hit is None or hit["file_hash"] != f["file_hash"]:
+            cached[f["path"]] = {
+                "file_hash": f["file_hash"],
+                "facts": _structural_extract(f),
+                "llm_items": None,
+            }
+            fresh.add(f["path"])
+
+    pending = [f for f in files if cached[f["path"]]["llm_items"] is None]
+    if pending and _local_model_available():
+        answered = _llm_pass(pending, llm_workers, llm_budget_s)
+        for path, llm_items in answered.items():
+            cached[path]["llm_items"] = llm_items
+            fresh.add(path)
+    _store_cached(project_name, files, fresh, cached)
 
-        for item in extracted:
-            item["file_ref"] = full_path
-            item["file_hash"] = file_hash
+    items = []
+    for f in files:
+        entry = cached[f["path"]]
+        for item in [*entry["facts"], *(entry["llm_items"] or [])]:
+            item = dict(item)
+            item["file_ref"] = f["full_path"]
+            item["file_hash"] = f["file_hash"]
             item["project"] = project_name
             item["category"] = "code_knowledge"
             items.append(item)
@@ -251,21 +438,161 @@ def scan_changed_files(
     return items
 
 
-def _extract_from_file(content: str, file_path: str) -> list[dict]:
-    """Extract code knowledge from a file.
+def _load_cached(project: str, files: list[dict]) -> dict[str, dict]:
+    """Cached extraction per path for this project (any content hash)."""
+    from enki.db import get_wisdom_db
 
-    Tries local model first, falls back to heuristic extraction.
-    """
-    # Try local model
+    conn = get_wisdom_db()
+    try:
+        rows = []
+        paths = [f["path"] for f in files]
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows.extend(conn.execute(
+                "SELECT file_path, file_hash, facts, llm_items FROM code_extraction_cache "
+                f"WHERE project = ? AND file_path IN ({placeholders})",
+                [project, *chunk],
+            ).fetchall())
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+    return {
+        row["file_path"]: {
+            "file_hash": row["file_hash"],
+            "facts": json.loads(row["facts"]),
+            "llm_items": json.loads(row["llm_items"]) if row["llm_items"] is not None else None,
+        }
+        for row in rows
+    }
+
+
+def _store_cached(
+    project: str, files: list[dict], fresh: set[str], cached: dict[str, dict],
+) -> None:
+    """Write the entries extracted or answered in this scan, one transaction."""
+    if not fresh:
+        return
+    from enki.db import get_wisdom_db
+
+    now = datetime.now(timezone.utc).isoformat()
+    conn = get_wisdom_db()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO code_extraction_cache "
+            "(project, file_path, file_hash, facts, llm_items, extracted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    project, f["path"], f["file_hash"],
+                    json.dumps(cached[f["path"]]["facts"]),
+                    None if cached[f["path"]]["llm_items"] is None
+                    else json.dumps(cached[f["path"]]["llm_items"]),
+                    now,
+                )
+                for f in files if f["path"] in fresh
+            ],
+        )
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        logger.warning("Code extraction cache not written: %s", e)
+    finally:
+        conn.close()
+
+
+def _structural_extract(file: dict) -> list[dict]:
+    """Facts from the graph scanner's tree-sitter walk, plus module docstrings."""
+    items = _heuristic_extract(file["content"], file["path"])
+
+    language = detect_language(file["path"])
+    if not language:
+        return items
+    from enki.graph.scanner import extract_source
+
+    symbols, imports = extract_source(file["source"], file["path"], language)
+    if not symbols:
+        return items
+
+    # Exported symbols first; the sort is stable, so each group keeps file order.
+    symbols = sorted(symbols, key=lambda s: not s["is_exported"])
+    described = [
+        f"{s['kind']} {s['name']} (line {s['line_start'] + 1}"
+        + (f", complexity {s['complexity']})" if s["complexity"] > 1 else ")")
+        for s in symbols[:MAX_FACT_SYMBOLS]
+    ]
+    if len(symbols) > MAX_FACT_SYMBOLS:
+        described.append(f"{len(symbols) - MAX_FACT_SYMBOLS} more")
+    content = f"{file['path']} defines {', '.join(described)}"
+    targets = list(dict.fromkeys(i["to_id"] for i in imports))
+    if targets:
+        content += f"; imports {', '.join(targets[:MAX_FACT_IMPORTS])}"
+        if len(targets) > MAX_FACT_IMPORTS:
+            content += f" and {len(targets) - MAX_FACT_IMPORTS} more"
+    names = list(dict.fromkeys(s["name"] for s in symbols))
+    items.append({
+        "content": content + ".",
+        "keywords": ",".join(names[:MAX_FACT_SYMBOLS]),
+        "summary": f"Structure of {file['path']}",
+    })
+    return items
+
+
+def _local_model_available() -> bool:
     try:
-        from enki.local_model import extract_code_knowledge, is_available
-        if is_available():
-            return extract_code_knowledge(content, file_path)
-    except (ImportError, Exception):
-        pass
-
-    # Heuristic fallback
-    return _heuristic_extract(content, file_path)
+        from enki.local_model import is_available
+        return is_available()
+    except Exception:
+        return False
+
+
+def _llm_pass(files: list[dict], workers: int, budget_s: float) -> dict[str, list[dict]]:
+    """Local-model items per path, for the files answered within budget_s.
+
+    Workers are daemon threads so a request still in flight at the
+    deadline never holds up the caller, or interpreter exit.
+    """
+    from enki.local_model import extract_code_knowledge
+
+    jobs: queue.SimpleQueue = queue.SimpleQueue()
+    for f in files:
+        jobs.put(f)
+    results: queue.SimpleQueue = queue.SimpleQueue()
+    expired = threading.Event()
+
+    def work() -> None:
+        while not expired.is_set():
+            try:
+                f = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                items = extract_code_knowledge(f["content"], f["path"])
+            except Exception as e:
+                logger.debug("Local model extraction failed for %s: %s", f["path"], e)
+                items = None
+            results.put((f["path"], items))
+
+    for i in range(max(1, min(workers, len(files)))):
+        threading.Thread(target=work, name=f"enki-code-knowledge-{i}", daemon=True).start()
+
+    deadline = time.monotonic() + budget_s
+    answered: dict[str, list[dict]] = {}
+    for _ in files:
+        try:
+            path, items = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        if items is not None:
+            answered[path] = items
+    expired.set()
+    if len(answered) < len(files):
+        logger.info(
+            "Local model answered %d of %d files within %.0fs; the rest retry next session",
+            len(answered), len(files), budget_s,
+        )
+    return answered
 
 
 def _heuristic_extract(content: str, file_path: str) -> list[dict]:
@@ -35,6 +35,27 @@ _DEFAULTS = {
     "gemini": {
         "review_cadence": "quarterly",
     },
+    "graph": {
+        "scan_workers": 0,  # 0 = min(8, cpu count)
+        "scan_chunk_size": 64,
+        "watch_during_implement": False,
+        "watch_debounce_s": 0.5,
+        "watch_max_delay_s": 5.0,
+        "watch_poll": False,  # force polling instead of inotify
+    },
+    "mcp": {
+        "workers": 8,
+        "heavy_workers": 2,
+        "warm_embedding_model": True,
+        "result_cache_entries": 256,
+        "response_budget_bytes": 65536,
+        "prometheus_textfile": "",
+        "timeouts": {
+            "read": 30,
+            "write": 120,
+            "heavy": 900,
+        },
+    },
 }
 
 
@@ -7,6 +7,8 @@ No module bypasses this.
 
 import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -26,6 +28,51 @@ def _db_path(name: str) -> Path:
     return new_path
 
 
+# ── Query timing ──
+# Telemetry opts a thread in with start_db_timer(); connections opened
+# through this module then add their execute/commit time to that thread's
+# total. Threads that never opt in pay one attribute lookup per statement.
+
+_db_timer = threading.local()
+
+
+def start_db_timer() -> None:
+    _db_timer.ms = 0.0
+
+
+def stop_db_timer() -> float:
+    """Milliseconds spent in SQLite on this thread since start_db_timer()."""
+    ms = getattr(_db_timer, "ms", None)
+    _db_timer.ms = None
+    return ms or 0.0
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3.Connection that reports statement time to the thread's DB timer."""
+
+    def _timed(self, method, *args):
+        if getattr(_db_timer, "ms", None) is None:
+            return method(self, *args)
+        started = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            if _db_timer.ms is not None:
+                _db_timer.ms += (time.perf_counter() - started) * 1000
+
+    def execute(self, *args):
+        return self._timed(sqlite3.Connection.execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(sqlite3.Connection.executemany, *args)
+
+    def executescript(self, *args):
+        return self._timed(sqlite3.Connection.executescript, *args)
+
+    def commit(self):
+        return self._timed(sqlite3.Connection.commit)
+
+
 def _configure(conn: sqlite3.Connection) -> None:
     """Apply mandatory SQLite configuration."""
     conn.execute("PRAGMA journal_mode=WAL")
@@ -42,7 +89,7 @@ def connect(db_path: str | Path):
         with connect(ENKI_ROOT / "wisdom.db") as conn:
             conn.execute(...)
     """
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), factory=TimedConnection)
     _configure(conn)
     try:
         yield conn
@@ -64,12 +111,42 @@ def abzu_db():
     return connect(_db_path("abzu.db"))
 
 
+_uru_initialized: set[str] = set()
+
+
 def uru_db():
-    """Connection to uru.db (enforcement logs). Auto-initializes uru schema."""
+    """Connection to uru.db (enforcement logs). Auto-initializes uru schema.
+
+    Schema creation runs once per path per process, so a hook that touches
+    uru.db several times opens a single extra connection, not one per call.
+    """
     path = _db_path("uru.db")
-    from enki.gates.schemas import create_tables as create_uru
-    with connect(path) as conn:
-        create_uru(conn)
+    key = str(path)
+    if key not in _uru_initialized or not path.exists():
+        from enki.gates.schemas import create_tables as create_uru
+        with connect(path) as conn:
+            create_uru(conn)
+        _uru_initialized.add(key)
+    return connect(path)
+
+
+_metrics_initialized: set[str] = set()
+
+
+def metrics_db():
+    """Connection to metrics.db (MCP tool telemetry). Auto-initializes schema.
+
+    Kept out of uru.db so telemetry writes never contend with the hooks or
+    invalidate cached reads of enforcement state.
+    """
+    path = _db_path("metrics.db")
+    key = str(path)
+    if key not in _metrics_initialized or not path.exists():
+        from enki.telemetry import create_tables as create_metrics
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with connect(path) as conn:
+            create_metrics(conn)
+        _metrics_initialized.add(key)
     return connect(path)
 
 
@@ -99,14 +176,15 @@ def em_db(project: str):
 
 
 @contextmanager
-def graph_db(project: str):
-    """Per-project codebase knowledge graph database."""
-    from enki.project_state import normalize_project_name
+def graph_db(project: str, graph: str | None = None):
+    """Per-project codebase knowledge graph database.
 
-    project = normalize_project_name(project)
-    db_path = ENKI_ROOT / "projects" / project / "graph.db"
+    `graph` names one of the project's secondary graphs (a sprint base
+    or a task overlay, see enki.graph.overlay) instead of graph.db.
+    """
+    db_path = graph_db_path(project, graph)
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), factory=TimedConnection)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
@@ -116,10 +194,12 @@ def graph_db(project: str):
         conn.close()
 
 
-def graph_db_path(project: str) -> Path:
+def graph_db_path(project: str, graph: str | None = None) -> Path:
     from enki.project_state import normalize_project_name
 
     project = normalize_project_name(project)
+    if graph is not None:
+        return ENKI_ROOT / "projects" / project / "graphs" / f"{graph}.db"
     return ENKI_ROOT / "projects" / project / "graph.db"
 
 
@@ -130,7 +210,7 @@ def get_wisdom_db() -> sqlite3.Connection:
     """
     path = _db_path("wisdom.db")
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
+    conn = sqlite3.connect(str(path), factory=TimedConnection)
     _configure(conn)
     return conn
 
@@ -142,7 +222,7 @@ def get_abzu_db() -> sqlite3.Connection:
     """
     path = _db_path("abzu.db")
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
+    conn = sqlite3.connect(str(path), factory=TimedConnection)
     _configure(conn)
     return conn
 
@@ -11,7 +11,8 @@ where the target is notes.md, not enforcement.py.
 """
 
 import re
-import shlex
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
 ENKI_ROOT = Path.home() / ".enki"
@@ -152,127 +153,542 @@ def is_exempt(filepath: str, tool_name: str | None = None) -> bool:
     return False
 
 
-def extract_write_targets(command: str) -> list[str]:
-    """Extract file paths being written to from a bash command.
+# ── Bash command analysis ──
+#
+# One pass over the command builds simple commands (words + redirections).
+# Quoting, escapes, $(...), `...` and <(...) are understood. Heredoc bodies
+# and here-strings are data, except for the $(...) and `...` an unquoted
+# heredoc expands; scripts handed to a shell (bash -c, eval, or a heredoc
+# or here-string on a shell's stdin) are scanned as commands, and a python
+# reading its script from stdin cannot be analyzed at all. Analysis is
+# bounded by size, time and nesting budgets and fails closed when any of
+# them is exceeded.
+
+MAX_ANALYZED_COMMAND_CHARS = 512 * 1024
+ANALYSIS_TIME_BUDGET_S = 0.25
+MAX_SUBSTITUTION_DEPTH = 16
+
+PYTHON_WRITE_TARGET = "__PYTHON_WRITE__"
+UNANALYZABLE_TARGET = "__UNANALYZABLE__"
+
+COMMAND_WRAPPERS = {"sudo", "env", "command", "nohup", "time"}
+SHELL_COMMANDS = {"bash", "sh", "zsh", "dash", "ksh"}
+EVAL_COMMANDS = {"eval"}  # run their joined arguments as a script
+WRITE_COMMANDS = {"cp", "mv", "rm", "sed", "tee"}
+_SUBCOMMAND_TERMINATORS = {";", "+"}
+
+_PLAIN_RUN = re.compile(r"[^\s'\"\\;&|<>()`$#]+")
+_DQ_RUN = re.compile(r'[^"\\$`]+')
+_PYTHON_OPEN_WRITE = re.compile(r"open\(.*['\"]w")
+
+
+@dataclass
+class CommandAnalysis:
+    write_targets: list[str] = field(default_factory=list)
+    db_targets: list[str] = field(default_factory=list)
+    complete: bool = True
+    reason: str | None = None
+
+
+@dataclass
+class _SimpleCommand:
+    words: list[str] = field(default_factory=list)
+    write_redirects: list[str] = field(default_factory=list)
+    stdin_texts: list[str] = field(default_factory=list)  # heredoc bodies, here-strings
+    depth: int = 0
+
+
+class _Unanalyzable(Exception):
+    pass
+
+
+class _BudgetExceeded(_Unanalyzable):
+    pass
+
+
+class _ShellScanner:
+    """Single-pass shell tokenizer producing simple commands."""
+
+    def __init__(self, text: str, deadline: float):
+        self.text = text
+        self.deadline = deadline
+        self.commands: list[_SimpleCommand] = []
+        self._ticks = 0
+
+    def _tick(self) -> None:
+        self._ticks += 1
+        if not self._ticks & 0xFF and time.monotonic() > self.deadline:
+            raise _BudgetExceeded("time budget exceeded")
+
+    def scan(self, pos: int = 0, depth: int = 0, closer: str | None = None) -> int:
+        """Scan from pos to end of text, or past `closer` for $( and <(.
+
+        Returns the index just after the scanned region.
+        """
+        if depth > MAX_SUBSTITUTION_DEPTH:
+            raise _BudgetExceeded("command nesting too deep")
+        text = self.text
+        n = len(text)
+        cmd = _SimpleCommand()
+        word: list[str] | None = None
+        pending: str | None = None  # redirect kind awaiting its operand
+        quoted = False  # the current word contains quoting
+        heredocs: list[tuple[str, bool, bool, _SimpleCommand]] = []
+        parens = 0
+
+        def finish_word() -> None:
+            nonlocal word, pending, quoted
+            if word is None:
+                return
+            value = "".join(word)
+            word = None
+            was_quoted, quoted = quoted, False
+            if pending is None:
+                cmd.words.append(value)
+                return
+            kind, pending = pending, None
+            if kind == "write":
+                cmd.write_redirects.append(value)
+            elif kind == "dup" and not (value.isdigit() or value == "-"):
+                cmd.write_redirects.append(value)
+            elif kind == "herestring":
+                cmd.stdin_texts.append(value)
+            elif kind in ("heredoc", "heredoc-strip"):
+                heredocs.append((value, kind == "heredoc-strip", was_quoted, cmd))
+
+        def finish_command() -> None:
+            nonlocal cmd
+            finish_word()
+            if cmd.words or cmd.write_redirects or cmd.stdin_texts:
+                cmd.depth = depth
+                self.commands.append(cmd)
+            cmd = _SimpleCommand()
+
+        def start_redirect(kind: str) -> None:
+            nonlocal word, pending
+            # A bare number glued to the operator is a file descriptor (2>).
+            if word is not None and "".join(word).isdigit():
+                word = None
+            finish_word()
+            pending = kind
+
+        i = pos
+        while i < n:
+            self._tick()
+            m = _PLAIN_RUN.match(text, i)
+            if m:
+                if word is None:
+                    word = []
+                word.append(m.group())
+                i = m.end()
+                continue
 
-    Returns list of file paths that are write targets.
-    Returns empty list if no write targets detected (read-only command).
+            c = text[i]
+            if c in " \t\r":
+                finish_word()
+                i += 1
+            elif c == "\n":
+                finish_command()
+                i = self._read_heredocs(i + 1, heredocs, depth)
+                heredocs = []
+            elif c == "#":
+                if word is None:
+                    end = text.find("\n", i)
+                    i = n if end < 0 else end
+                else:
+                    word.append(c)
+                    i += 1
+            elif c == "'":
+                end = text.find("'", i + 1)
+                end = n if end < 0 else end
+                word = (word or []) + [text[i + 1:end]]
+                quoted = True
+                i = end + 1
+            elif c == '"':
+                if word is None:
+                    word = []
+                quoted = True
+                i = self._double_quoted(i + 1, depth, word)
+            elif c == "\\":
+                if i + 1 < n and text[i + 1] != "\n":
+                    word = (word or []) + [text[i + 1]]
+                    quoted = True
+                i += 2
+            elif c == "`":
+                end = self._backtick(i + 1, depth)
+                word = (word or []) + [text[i:end]]
+                i = end
+            elif c == "$":
+                end = self._dollar(i, depth)
+                word = (word or []) + [text[i:end]]
+                i = end
+            elif c == "(":
+                finish_command()
+                parens += 1
+                i += 1
+            elif c == ")":
+                if parens == 0 and closer == ")":
+                    finish_command()
+                    return i + 1
+                finish_command()
+                parens = max(0, parens - 1)
+                i += 1
+            elif c == ";":
+                finish_command()
+                i += 1
+            elif c == "|":
+                finish_command()
+                i += 2 if text.startswith(("||", "|&"), i) else 1
+            elif c == "&":
+                if text.startswith("&>", i):
+                    start_redirect("write")
+                    i += 3 if text.startswith("&>>", i) else 2
+                else:
+                    finish_command()
+                    i += 2 if text.startswith("&&", i) else 1
+            elif c == ">":
+                if text.startswith(">(", i):
+                    end = self.scan(i + 2, depth + 1, ")")
+                    word = (word or []) + [text[i:end]]
+                    i = end
+                elif text.startswith(">&", i):
+                    start_redirect("dup")
+                    i += 2
+                else:
+                    start_redirect("write")
+                    i += 2 if text.startswith((">>", ">|"), i) else 1
+            else:  # "<"
+                if text.startswith("<(", i):
+                    end = self.scan(i + 2, depth + 1, ")")
+                    word = (word or []) + [text[i:end]]
+                    i = end
+                elif text.startswith("<<<", i):
+                    start_redirect("herestring")
+                    i += 3
+                elif text.startswith("<<-", i):
+                    start_redirect("heredoc-strip")
+                    i += 3
+                elif text.startswith("<<", i):
+                    start_redirect("heredoc")
+                    i += 2
+                elif text.startswith("<>", i):
+                    start_redirect("write")
+                    i += 2
+                elif text.startswith("<&", i):
+                    start_redirect("dup")
+                    i += 2
+                else:
+                    start_redirect("read")
+                    i += 1
+
+        finish_command()
+        return n
+
+    def _read_heredocs(
+        self, i: int, heredocs: list[tuple[str, bool, bool, _SimpleCommand]], depth: int,
+    ) -> int:
+        """Read heredoc bodies line by line and hand each to its command.
+
+        The body of an unquoted heredoc is expanded by the shell, so its
+        $(...) and `...` are scanned here; the body itself is stdin data
+        for scan_inline_scripts to judge.
+        """
+        text = self.text
+        n = len(text)
+        for delimiter, strip_tabs, quoted, cmd in heredocs:
+            start = i
+            body_end = n
+            while i < n:
+                self._tick()
+                end = text.find("\n", i)
+                end = n if end < 0 else end
+                line = text[i:end]
+                if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                    body_end = i
+                    i = end + 1
+                    break
+                i = end + 1
+            body = text[start:body_end]
+            cmd.stdin_texts.append(body)
+            if not quoted:
+                self._scan_expansions(body, depth)
+        return min(i, n)
+
+    def _scan_expansions(self, body: str, depth: int) -> None:
+        """Scan only the command substitutions inside unquoted heredoc text."""
+        inner = _ShellScanner(body, self.deadline)
+        inner._ticks = self._ticks
+        i = 0
+        while i < len(body):
+            inner._tick()
+            c = body[i]
+            if c == "\\":
+                i += 2
+            elif c == "$":
+                i = inner._dollar(i, depth)
+            elif c == "`":
+                i = inner._backtick(i + 1, depth)
+            else:
+                i += 1
+        self._ticks = inner._ticks
+        self.commands.extend(inner.commands)
+
+    def scan_inline_scripts(self) -> None:
+        """Scan scripts handed to a shell as commands, including nested ones.
+
+        Covers `bash -c '...'`, `eval '...'` and heredocs or here-strings
+        on a shell's stdin. A python reading its script from stdin raises _Unanalyzable.
+        """
+        i = 0
+        while i < len(self.commands):
+            cmd = self.commands[i]
+            i += 1
+            for script in _inline_scripts(cmd):
+                if cmd.depth >= MAX_SUBSTITUTION_DEPTH:
+                    raise _BudgetExceeded("command nesting too deep")
+                inner = _ShellScanner(script, self.deadline)
+                inner._ticks = self._ticks
+                inner.scan(0, cmd.depth + 1)
+                self._ticks = inner._ticks
+                self.commands.extend(inner.commands)
+
+    def _double_quoted(self, i: int, depth: int, word: list[str]) -> int:
+        text = self.text
+        n = len(text)
+        while i < n:
+            self._tick()
+            m = _DQ_RUN.match(text, i)
+            if m:
+                word.append(m.group())
+                i = m.end()
+                continue
+            c = text[i]
+            if c == '"':
+                return i + 1
+            if c == "\\":
+                if i + 1 < n and text[i + 1] in '"\\$`':
+                    word.append(text[i + 1])
+                elif i + 1 < n and text[i + 1] != "\n":
+                    word.append(text[i:i + 2])
+                i += 2
+            elif c == "`":
+                end = self._backtick(i + 1, depth)
+                word.append(text[i:end])
+                i = end
+            else:  # "$"
+                end = self._dollar(i, depth)
+                word.append(text[i:end])
+                i = end
+        return n
+
+    def _dollar(self, i: int, depth: int) -> int:
+        """Handle $ at i: $(cmd) is scanned, $((expr)) skipped. Returns end."""
+        text = self.text
+        if text.startswith("$((", i):
+            level = 0
+            j = i + 1
+            while j < len(text):
+                if text[j] == "(":
+                    level += 1
+                elif text[j] == ")":
+                    level -= 1
+                    if level == 0:
+                        return j + 1
+                j += 1
+            return len(text)
+        if text.startswith("$(", i):
+            return self.scan(i + 2, depth + 1, ")")
+        return i + 1
+
+    def _backtick(self, i: int, depth: int) -> int:
+        """Scan `...` starting after the opening backtick. Returns end."""
+        text = self.text
+        j = i
+        while True:
+            j = text.find("`", j)
+            if j < 0:
+                j = len(text)
+                break
+            if text[j - 1] != "\\":
+                break
+            j += 1
+        inner = _ShellScanner(text[i:j].replace("\\`", "`"), self.deadline)
+        inner._ticks = self._ticks
+        inner.scan(0, depth + 1)
+        self.commands.extend(inner.commands)
+        return j + 1
+
+
+def _command_token_index(words: list[str]) -> int | None:
+    """Index of the executed command, skipping wrappers and VAR=value prefixes."""
+    idx = 0
+    while idx < len(words):
+        token = words[idx]
+        if token in COMMAND_WRAPPERS:
+            idx += 1
+            continue
+        # shell-style env var assignment prefix
+        if "=" in token and not token.startswith(("/", "./", "../")):
+            idx += 1
+            continue
+        return idx
+    return None
 
-    IMPORTANT: Only extracts TARGETS, not mentions.
-    'echo "enforcement.py" > notes.md' returns ['notes.md']
-    'sed -i s/x/y/ enforcement.py' returns ['enforcement.py']
-    'cat enforcement.py' returns [] (read-only)
-    """
-    targets = []
 
-    # Split on semicolons and pipes (rough segmentation)
-    segments = re.split(r"[;|]", command)
+def _basename(word: str) -> str:
+    return word.rstrip("/").rsplit("/", 1)[-1]
 
-    for segment in segments:
-        segment = segment.strip()
-        if not segment:
-            continue
 
-        # Redirect operators: > >>
-        redirect_match = re.findall(r">{1,2}\s*(\S+)", segment)
-        targets.extend(redirect_match)
-
-        # tee: target is the argument
-        tee_match = re.search(r"\btee\s+(?:-a\s+)?(\S+)", segment)
-        if tee_match:
-            targets.append(tee_match.group(1))
-
-        # sed -i: target is the LAST argument
-        if re.search(r"\bsed\s+.*-i", segment):
-            try:
-                parts = shlex.split(segment)
-                if parts:
-                    targets.append(parts[-1])
-            except ValueError:
-                pass
-
-        # cp, mv: target is the LAST argument
-        if re.search(r"\b(cp|mv)\s+", segment):
-            try:
-                parts = shlex.split(segment)
-                if len(parts) >= 3:
-                    targets.append(parts[-1])
-            except ValueError:
-                pass
-
-        # rm: target is all arguments after flags
-        if re.search(r"\brm\s+", segment):
-            try:
-                parts = shlex.split(segment)
-                for part in parts[1:]:
-                    if not part.startswith("-"):
-                        targets.append(part)
-            except ValueError:
-                pass
-
-        # python -c with open(..., 'w'): block as suspicious
-        if re.search(r"python.*-c", segment):
-            if re.search(r"open\(.*['\"]w", segment):
-                targets.append("__PYTHON_WRITE__")
-
-    return targets
+def _inline_scripts(cmd: _SimpleCommand) -> list[str]:
+    """Scripts a shell in this command will run: its -c string or its
+    stdin, or the joined arguments of eval.
 
+    Like WRITE_COMMANDS, a shell is found anywhere in the words, so sudo,
+    env and xargs in front of it do not hide it.
+    """
+    words = cmd.words
+    scripts: list[str] = []
+    for j, word in enumerate(words):
+        name = _basename(word)
+        if name in EVAL_COMMANDS:
+            if j + 1 < len(words):
+                scripts.append(" ".join(words[j + 1:]))
+        elif name in SHELL_COMMANDS:
+            k = j + 1
+            inline = False
+            while k < len(words) and words[k].startswith("-") and words[k] not in ("-", "--"):
+                if not words[k].startswith("--") and "c" in words[k][1:]:
+                    inline = True
+                k += 1
+            if inline:
+                if k < len(words):
+                    scripts.append(words[k])
+            else:
+                scripts.extend(cmd.stdin_texts)
+        elif name.startswith("python") and cmd.stdin_texts:
+            options = []
+            k = j + 1
+            while k < len(words) and words[k].startswith("-") and words[k] != "-":
+                options.append(words[k])
+                k += 1
+            if not {"-c", "-m"} & set(options) and (k == len(words) or words[k] == "-"):
+                raise _Unanalyzable("python reads its script from stdin")
+    return scripts
+
+
+def _collect_targets(cmd: _SimpleCommand, result: CommandAnalysis) -> None:
+    words = cmd.words
+    result.write_targets.extend(cmd.write_redirects)
+    result.db_targets.extend(t for t in cmd.write_redirects if t.endswith(".db"))
+
+    # sqlite3 binary: sqlite3 path/to/file.db "..."
+    cmd_idx = _command_token_index(words)
+    if cmd_idx is not None and _basename(words[cmd_idx]) == "sqlite3":
+        args = [w for w in words[cmd_idx + 1:] if not w.startswith("-")]
+        if args and args[0].endswith(".db"):
+            result.db_targets.append(args[0])
+
+    # Write commands anywhere in the command (covers sudo, xargs, git rm,
+    # find -exec ...). Arguments run to the next terminator or write command.
+    names = [_basename(w) for w in words]
+    for j, name in enumerate(names):
+        if name not in WRITE_COMMANDS:
+            continue
+        end = j + 1
+        while end < len(words) and words[end] not in _SUBCOMMAND_TERMINATORS \
+                and names[end] not in WRITE_COMMANDS:
+            end += 1
+        args = words[j + 1:end]
+        operands = [a for a in args if not a.startswith("-")]
+
+        if name == "sed":
+            in_place = any(
+                a.startswith(("-i", "--in-place"))
+                or (a.startswith("-") and not a.startswith("--") and "i" in a[1:])
+                for a in args
+            )
+            if in_place and args:
+                result.write_targets.append(args[-1])
+        elif name in ("cp", "mv"):
+            if len(args) >= 2:
+                result.write_targets.append(args[-1])
+            result.db_targets.extend(a for a in operands if a.endswith(".db"))
+        elif name == "rm":
+            result.write_targets.extend(operands)
+            result.db_targets.extend(a for a in operands if a.endswith(".db"))
+        elif name == "tee":
+            result.write_targets.extend(operands)
+
+    # python -c with open(..., 'w'): block as suspicious
+    for j, name in enumerate(names):
+        if not name.startswith("python"):
+            continue
+        for k in range(j + 1, len(words) - 1):
+            if words[k] == "-c":
+                if _PYTHON_OPEN_WRITE.search(words[k + 1]):
+                    result.write_targets.append(PYTHON_WRITE_TARGET)
+                break
 
-def extract_db_targets(command: str) -> list[str]:
-    """Extract database files being targeted by bash commands.
 
-    For Layer 0.5 — catches sqlite3 binary invocation only.
-    Returns list of .db file paths being targeted.
+def analyze_command(command: str) -> CommandAnalysis:
+    """Extract write targets and DB targets from a bash command in one pass.
+
+    Fails closed: if the command exceeds the size, time or nesting budget,
+    the result is marked incomplete and callers must treat it as blocked.
     """
-    targets = []
+    result = CommandAnalysis()
+    if len(command) > MAX_ANALYZED_COMMAND_CHARS:
+        result.complete = False
+        result.reason = (
+            f"command is {len(command)} chars "
+            f"(limit {MAX_ANALYZED_COMMAND_CHARS}) and cannot be analyzed"
+        )
+        return result
+
+    deadline = time.monotonic() + ANALYSIS_TIME_BUDGET_S
+    scanner = _ShellScanner(command, deadline)
+    try:
+        scanner.scan()
+        scanner.scan_inline_scripts()
+    except (_Unanalyzable, RecursionError) as e:
+        result.complete = False
+        result.reason = f"command analysis aborted: {e or 'nesting too deep'}"
 
-    wrappers = {"sudo", "env", "command", "nohup", "time"}
+    for n, cmd in enumerate(scanner.commands):
+        if not n & 0x3F and time.monotonic() > deadline:
+            result.complete = False
+            result.reason = "command analysis aborted: time budget exceeded"
+            break
+        _collect_targets(cmd, result)
+    return result
 
-    def _command_token_index(parts: list[str]) -> int | None:
-        idx = 0
-        while idx < len(parts):
-            token = parts[idx]
-            if token in wrappers:
-                idx += 1
-                continue
-            # shell-style env var assignment prefix
-            if "=" in token and not token.startswith(("/", "./", "../")):
-                idx += 1
-                continue
-            return idx
-        return None
 
-    # Split rough command chains and inspect executed command token.
-    for segment in re.split(r"[;|&]+", command):
-        segment = segment.strip()
-        if not segment:
-            continue
-        try:
-            parts = shlex.split(segment)
-        except ValueError:
-            continue
-        if not parts:
-            continue
-
-        cmd_idx = _command_token_index(parts)
-        if cmd_idx is None:
-            continue
+def extract_write_targets(command: str) -> list[str]:
+    """Extract file paths being written to from a bash command.
 
-        cmd = Path(parts[cmd_idx]).name
-        if cmd != "sqlite3":
-            continue
+    Returns list of file paths that are write targets.
+    Returns empty list if no write targets detected (read-only command).
+    Returns [UNANALYZABLE_TARGET] among the targets if analysis was cut short.
 
-        # sqlite3 binary: sqlite3 path/to/file.db "..."
-        if cmd_idx + 1 < len(parts):
-            candidate = parts[cmd_idx + 1]
-            if candidate.endswith(".db"):
-                targets.append(candidate)
+    IMPORTANT: Only extracts TARGETS, not mentions.
+    'echo "enforcement.py" > notes.md' returns ['notes.md']
+    'sed -i s/x/y/ enforcement.py' returns ['enforcement.py']
+    'cat enforcement.py' returns [] (read-only)
+    """
+    analysis = analyze_command(command)
+    if not analysis.complete:
+        return analysis.write_targets + [UNANALYZABLE_TARGET]
+    return analysis.write_targets
 
-    # File operations targeting .db files
-    redirect_db = re.findall(r">{1,2}\s*(\S+\.db)", command)
-    targets.extend(redirect_db)
 
-    cp_mv_rm_db = re.findall(r"\b(?:cp|mv|rm)\s+.*?(\S+\.db)", command)
-    targets.extend(cp_mv_rm_db)
+def extract_db_targets(command: str) -> list[str]:
+    """Extract database files being targeted by bash commands.
 
-    return [t for t in targets if t.endswith(".db")]
+    For Layer 0.5 — catches sqlite3 binary invocation and file operations
+    (redirects, cp/mv/rm) on .db files. Returns list of .db file paths.
+    Returns [UNANALYZABLE_TARGET] among the targets if analysis was cut short.
+    """
+    analysis = analyze_command(command)
+    if not analysis.complete:
+        return analysis.db_targets + [UNANALYZABLE_TARGET]
+    return analysis.db_targets
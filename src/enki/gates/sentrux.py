@@ -2,12 +2,15 @@
 
 Runs in PostToolUse hook. Scores each tool call against drift patterns.
 Cumulative score tracked per session in uru.db.
+Patterns are compiled once per drift-patterns.json mtime into one matcher.
 Nudges at NUDGE_THRESHOLD, escalates at ESCALATE_THRESHOLD.
 """
 
 import hashlib
 import json
 import os
+import re
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -108,197 +111,304 @@ def _load_patterns() -> dict:
     return DEFAULT_DRIFT_PATTERNS.copy()
 
 
+class _DriftMatcher:
+    """Drift patterns compiled into a single multi-signal regex.
+
+    The regex is a zero-width lookahead over every signal (longest first), so
+    one C-level pass reports the longest signal starting at each offset.
+    Shorter signals hidden inside a longer match are recovered through a
+    precomputed substring closure, which keeps results identical to testing
+    each signal with ``in``.
+    """
+
+    def __init__(self, patterns: dict):
+        self.patterns = [
+            (name, pattern) for name, pattern in patterns.items()
+            if isinstance(pattern, dict)
+        ]
+        owners: dict[str, set[int]] = {}
+        for idx, (_, pattern) in enumerate(self.patterns):
+            match_type = pattern.get("match_type", "tool_input_contains")
+            if match_type not in ("tool_input_contains", "file_content_contains"):
+                continue
+            for sig in pattern.get("signals") or []:
+                if isinstance(sig, str) and sig:
+                    owners.setdefault(sig, set()).add(idx)
+
+        ordered = sorted(owners, key=len, reverse=True)
+        self._owners = {
+            sig: frozenset().union(*(owners[other] for other in ordered if other in sig))
+            for sig in ordered
+        }
+        self._regex = (
+            re.compile("(?=(" + "|".join(re.escape(sig) for sig in ordered) + "))")
+            if ordered else None
+        )
+
+    def matching_patterns(self, text: str) -> set[int]:
+        """Return indices of patterns with at least one signal in text."""
+        found: set[int] = set()
+        if not self._regex or not text:
+            return found
+        seen: set[str] = set()
+        for match in self._regex.finditer(text):
+            sig = match.group(1)
+            if sig not in seen:
+                seen.add(sig)
+                found.update(self._owners[sig])
+        return found
+
+    def first_match(self, tool_name: str, tool_input: dict, tool_input_str: str) -> int | None:
+        """Index of the first pattern (in file order) matched by this call."""
+        input_hits = None
+        file_candidates = []
+        best = None
+        file_path = str(tool_input.get("file_path") or tool_input.get("path") or "").lower()
+
+        for idx, (_, pattern) in enumerate(self.patterns):
+            pattern_tool = pattern.get("tool_name")
+            if pattern_tool and pattern_tool != tool_name:
+                continue
+            match_type = pattern.get("match_type", "tool_input_contains")
+            if match_type == "tool_input_contains":
+                if input_hits is None:
+                    input_hits = self.matching_patterns(tool_input_str)
+                if idx in input_hits:
+                    best = idx
+                    break
+            elif match_type == "file_content_contains":
+                file_pattern = (pattern.get("file_pattern") or "").lower()
+                if file_pattern and file_pattern in file_path:
+                    file_candidates.append(idx)
+
+        # Content can be large; only scan it when a file pattern applies.
+        # Every candidate precedes `best`, so the first content hit wins.
+        if file_candidates:
+            content = tool_input.get("content") or tool_input.get("new_string") or ""
+            content_hits = self.matching_patterns(content if isinstance(content, str) else "")
+            for idx in file_candidates:
+                if idx in content_hits:
+                    return idx
+        return best
+
+
+_matcher_cache: tuple[tuple | None, _DriftMatcher] | None = None
+
+
+def _pattern_file_key() -> tuple | None:
+    try:
+        st = DRIFT_PATTERNS_PATH.stat()
+        return (str(DRIFT_PATTERNS_PATH), st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _get_matcher() -> _DriftMatcher:
+    """Compiled drift matcher, rebuilt only when the patterns file changes."""
+    global _matcher_cache
+    key = _pattern_file_key()
+    if key is None:
+        _ensure_drift_patterns()
+        key = _pattern_file_key()
+    if _matcher_cache is not None and _matcher_cache[0] == key:
+        return _matcher_cache[1]
+    matcher = _DriftMatcher(_load_patterns())
+    _matcher_cache = (key, matcher)
+    return matcher
+
+
+def _summarize_input(tool_input: dict) -> str:
+    """First 500 chars of the JSON-encoded tool input.
+
+    Top-level strings are clipped before encoding so multi-kilobyte file
+    contents are never serialized just to be thrown away. Clipping at 500
+    characters cannot change the first 500 characters of the output.
+    """
+    if isinstance(tool_input, dict):
+        tool_input = {
+            k: v[:500] if isinstance(v, str) else v for k, v in tool_input.items()
+        }
+    return json.dumps(tool_input)[:500]
+
+
 def score_tool_call(
     session_id: str,
     tool_name: str,
     tool_input: dict,
     tool_output: dict,
     project: str | None = None,
+    conn: sqlite3.Connection | None = None,
 ) -> dict:
-    """Score a tool call for drift contribution."""
+    """Score a tool call for drift contribution.
+
+    Pass conn to fold the drift writes into the caller's uru.db transaction
+    (see uru.check_post_tool_use); otherwise a connection is opened here.
+    """
     _ = tool_output
-    patterns = _load_patterns()
-    tool_input_str = json.dumps(tool_input)[:500]
+    matcher = _get_matcher()
+    tool_input_str = _summarize_input(tool_input)
 
     contribution = 0.0
     pattern_matched = None
 
-    for pattern_name, pattern in patterns.items():
-        match_type = pattern.get("match_type", "tool_input_contains")
-        signals = pattern.get("signals", [])
-        pattern_tool = pattern.get("tool_name")
-
-        if pattern_tool and pattern_tool != tool_name:
-            continue
-
-        if match_type == "tool_input_contains":
-            if any(sig in tool_input_str for sig in signals):
-                contribution = max(contribution, float(pattern.get("weight", 1.0)))
-                pattern_matched = pattern_name
-                break
-
-        elif match_type == "file_content_contains":
-            file_path = (tool_input.get("file_path") or tool_input.get("path", "")).lower()
-            file_pattern = (pattern.get("file_pattern") or "").lower()
-            content = tool_input.get("content") or tool_input.get("new_string", "")
-            if file_pattern and file_pattern in file_path and any(sig in content for sig in signals):
-                contribution = max(contribution, float(pattern.get("weight", 1.0)))
-                pattern_matched = pattern_name
-                break
-
-    cumulative = _update_drift(
+    idx = matcher.first_match(tool_name, tool_input or {}, tool_input_str)
+    if idx is not None:
+        pattern_matched, pattern = matcher.patterns[idx]
+        contribution = float(pattern.get("weight", 1.0))
+
+    try:
+        if conn is not None:
+            cumulative, action, message = _apply_drift(
+                conn, session_id, tool_name, tool_input_str,
+                contribution, pattern_matched, project,
+            )
+        else:
+            from enki.db import uru_db
+            with uru_db() as own:
+                cumulative, action, message = _apply_drift(
+                    own, session_id, tool_name, tool_input_str,
+                    contribution, pattern_matched, project,
+                )
+    except Exception:
+        cumulative, action, message = 0.0, "none", None
+
+    return {
+        "drift_contribution": contribution,
+        "cumulative_drift": cumulative,
+        "pattern_matched": pattern_matched,
+        "action": action,
+        "message": message,
+    }
+
+
+def _apply_drift(
+    conn: sqlite3.Connection,
+    session_id: str,
+    tool_name: str,
+    tool_input_summary: str,
+    contribution: float,
+    pattern_matched: str | None,
+    project: str | None,
+) -> tuple[float, str, str | None]:
+    """Record drift and decide on nudge/escalation. Returns (cumulative, action, message)."""
+    cumulative, nudge_count = _update_drift(
+        conn,
         session_id=session_id,
         tool_name=tool_name,
-        tool_input_summary=tool_input_str,
+        tool_input_summary=tool_input_summary,
         contribution=contribution,
         pattern_matched=pattern_matched,
         project=project,
     )
 
-    action = "none"
-    message = None
-
     if cumulative >= ESCALATE_THRESHOLD:
-        action = "escalate"
         message = (
             f"Enki drift escalation: session {session_id[:8]} cumulative drift score "
             f"{cumulative:.1f} (threshold {ESCALATE_THRESHOLD}). "
             f"Last pattern: {pattern_matched or 'none'}."
         )
-        _record_escalation(session_id, cumulative, project)
-    elif cumulative >= NUDGE_THRESHOLD:
-        try:
-            from enki.db import uru_db
-            with uru_db() as conn:
-                row = conn.execute(
-                    "SELECT nudge_count FROM session_drift WHERE session_id = ?",
-                    (session_id,),
-                ).fetchone()
-            nudge_count = int(row["nudge_count"] if row else 0)
-        except Exception:
-            nudge_count = 0
-
-        if nudge_count == 0:
-            action = "nudge"
-            message = (
-                f"Drift score {cumulative:.1f} approaching threshold. "
-                f"Pattern: {pattern_matched or 'accumulation'}."
-            )
-            _record_nudge(session_id)
-
-    return {
-        "drift_contribution": contribution,
-        "cumulative_drift": cumulative,
-        "pattern_matched": pattern_matched,
-        "action": action,
-        "message": message,
-    }
+        _record_escalation(conn, session_id, cumulative, project)
+        return cumulative, "escalate", message
+    if cumulative >= NUDGE_THRESHOLD and nudge_count == 0:
+        message = (
+            f"Drift score {cumulative:.1f} approaching threshold. "
+            f"Pattern: {pattern_matched or 'accumulation'}."
+        )
+        _record_nudge(conn, session_id)
+        return cumulative, "nudge", message
+    return cumulative, "none", None
 
 
 def _update_drift(
+    conn: sqlite3.Connection,
     session_id: str,
     tool_name: str,
     tool_input_summary: str,
     contribution: float,
     pattern_matched: str | None,
     project: str | None,
-) -> float:
-    """Update session_drift and record drift event."""
-    event_id = hashlib.md5(f"{session_id}:{tool_name}:{_now()}".encode()).hexdigest()
-    try:
-        from enki.db import uru_db
-        with uru_db() as conn:
-            row = conn.execute(
-                "SELECT cumulative_score FROM session_drift WHERE session_id = ?",
-                (session_id,),
-            ).fetchone()
-            current = float(row["cumulative_score"] if row else 0.0)
-            new_cumulative = current + float(contribution)
-
-            conn.execute(
-                "INSERT INTO session_drift (session_id, cumulative_score, last_updated, project) "
-                "VALUES (?, ?, ?, ?) "
-                "ON CONFLICT(session_id) DO UPDATE SET "
-                "cumulative_score = excluded.cumulative_score, "
-                "last_updated = excluded.last_updated, "
-                "project = excluded.project",
-                (session_id, new_cumulative, _now(), project or ""),
-            )
-
-            if contribution > 0:
-                conn.execute(
-                    "INSERT INTO drift_events "
-                    "(id, session_id, timestamp, tool_name, tool_input_summary, "
-                    "drift_contribution, cumulative_drift, pattern_matched) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        event_id,
-                        session_id,
-                        _now(),
-                        tool_name,
-                        tool_input_summary[:200],
-                        float(contribution),
-                        new_cumulative,
-                        pattern_matched,
-                    ),
-                )
-            conn.commit()
-            return new_cumulative
-    except Exception:
-        return 0.0
+) -> tuple[float, int]:
+    """Accumulate session drift and record the drift event.
+
+    A single upsert with RETURNING replaces the read-modify-write, and hands
+    back the nudge count so no second query is needed.
+    Returns (cumulative_score, nudge_count).
+    """
+    now = _now()
+    row = conn.execute(
+        "INSERT INTO session_drift (session_id, cumulative_score, last_updated, project) "
+        "VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(session_id) DO UPDATE SET "
+        "cumulative_score = COALESCE(session_drift.cumulative_score, 0) "
+        "+ excluded.cumulative_score, "
+        "last_updated = excluded.last_updated, "
+        "project = excluded.project "
+        "RETURNING cumulative_score, nudge_count",
+        (session_id, float(contribution), now, project or ""),
+    ).fetchone()
+    new_cumulative = float(row["cumulative_score"] or 0.0)
+    nudge_count = int(row["nudge_count"] or 0)
+
+    if contribution > 0:
+        conn.execute(
+            "INSERT INTO drift_events "
+            "(id, session_id, timestamp, tool_name, tool_input_summary, "
+            "drift_contribution, cumulative_drift, pattern_matched) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                hashlib.md5(f"{session_id}:{tool_name}:{now}".encode()).hexdigest(),
+                session_id,
+                now,
+                tool_name,
+                tool_input_summary[:200],
+                float(contribution),
+                new_cumulative,
+                pattern_matched,
+            ),
+        )
+    return new_cumulative, nudge_count
 
 
-def _record_escalation(session_id: str, cumulative: float, project: str | None) -> None:
+def _record_escalation(
+    conn: sqlite3.Connection, session_id: str, cumulative: float, project: str | None,
+) -> None:
     """Mark escalation and add escalation event."""
-    _ = cumulative
-    try:
-        from enki.db import uru_db
-        with uru_db() as conn:
-            conn.execute(
-                "UPDATE session_drift SET escalated = 1 WHERE session_id = ?",
-                (session_id,),
-            )
-            conn.execute(
-                "INSERT INTO drift_events (id, session_id, timestamp, event_type, details, pattern_matched, tool_name, cumulative_drift) "
-                "VALUES (?, ?, ?, 'escalated', ?, ?, ?, ?)",
-                (
-                    hashlib.md5(f"escalated:{session_id}:{_now()}".encode()).hexdigest(),
-                    session_id,
-                    _now(),
-                    json.dumps({"project": project or ""}),
-                    "escalate_threshold",
-                    "sentrux",
-                    cumulative,
-                ),
-            )
-            conn.commit()
-    except Exception:
-        pass
+    conn.execute(
+        "UPDATE session_drift SET escalated = 1 WHERE session_id = ?",
+        (session_id,),
+    )
+    conn.execute(
+        "INSERT INTO drift_events (id, session_id, timestamp, event_type, details, pattern_matched, tool_name, cumulative_drift) "
+        "VALUES (?, ?, ?, 'escalated', ?, ?, ?, ?)",
+        (
+            hashlib.md5(f"escalated:{session_id}:{_now()}".encode()).hexdigest(),
+            session_id,
+            _now(),
+            json.dumps({"project": project or ""}),
+            "escalate_threshold",
+            "sentrux",
+            cumulative,
+        ),
+    )
 
 
-def _record_nudge(session_id: str) -> None:
+def _record_nudge(conn: sqlite3.Connection, session_id: str) -> None:
     """Increment nudge counter and record nudge event."""
-    try:
-        from enki.db import uru_db
-        with uru_db() as conn:
-            conn.execute(
-                "UPDATE session_drift SET nudge_count = nudge_count + 1 WHERE session_id = ?",
-                (session_id,),
-            )
-            conn.execute(
-                "INSERT INTO drift_events (id, session_id, timestamp, event_type, pattern_matched, tool_name) "
-                "VALUES (?, ?, ?, 'nudge_fired', ?, ?)",
-                (
-                    hashlib.md5(f"nudge:{session_id}:{_now()}".encode()).hexdigest(),
-                    session_id,
-                    _now(),
-                    "nudge_threshold",
-                    "sentrux",
-                ),
-            )
-            conn.commit()
-    except Exception:
-        pass
+    conn.execute(
+        "UPDATE session_drift SET nudge_count = nudge_count + 1 WHERE session_id = ?",
+        (session_id,),
+    )
+    conn.execute(
+        "INSERT INTO drift_events (id, session_id, timestamp, event_type, pattern_matched, tool_name) "
+        "VALUES (?, ?, ?, 'nudge_fired', ?, ?)",
+        (
+            hashlib.md5(f"nudge:{session_id}:{_now()}".encode()).hexdigest(),
+            session_id,
+            _now(),
+            "nudge_threshold",
+            "sentrux",
+        ),
+    )
 
 
 def send_telegram_escalation(message: str) -> None:
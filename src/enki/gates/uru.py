@@ -15,8 +15,10 @@ Nudge 3: Unread kickoff mail
 import json
 import os
 import re
+import sqlite3
 import sys
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -30,8 +32,8 @@ from enki.project_state import (
     write_project_state,
 )
 from enki.gates.layer0 import (
-    extract_db_targets,
-    extract_write_targets,
+    PYTHON_WRITE_TARGET,
+    analyze_command,
     is_exempt,
     is_layer0_protected,
 )
@@ -207,10 +209,23 @@ def check_pre_tool_use(
         elif tool_name == "Bash":
             command = tool_input.get("command", "")
 
+            analysis = analyze_command(command)
+            if not analysis.complete:
+                _log_enforcement(
+                    "pre-tool-use", "layer0.5", tool_name,
+                    None, "block", analysis.reason
+                )
+                return {
+                    "decision": "block",
+                    "reason": (
+                        f"Layer 0.5: Bash {analysis.reason}. "
+                        "Split it up or write files with the Write tool."
+                    ),
+                }
+
             # Layer 0.5: DB protection
-            db_targets = extract_db_targets(command)
             enki_root_str = str(ENKI_ROOT.resolve())
-            for db in db_targets:
+            for db in analysis.db_targets:
                 db_resolved = str(Path(db).resolve())
                 if db_resolved.startswith(enki_root_str):
                     _log_enforcement(
@@ -222,7 +237,7 @@ def check_pre_tool_use(
                         "reason": "Layer 0.5: Direct DB manipulation. Use Enki tools.",
                     }
 
-            targets = extract_write_targets(command)
+            targets = analysis.write_targets
         else:
             targets = []
 
@@ -230,7 +245,7 @@ def check_pre_tool_use(
             return {"decision": "allow"}
 
         for target in targets:
-            if target == "__PYTHON_WRITE__":
+            if target == PYTHON_WRITE_TARGET:
                 _log_enforcement(
                     "pre-tool-use", "layer0.5", tool_name,
                     target, "block", "Unverifiable Python write"
@@ -300,58 +315,88 @@ def check_post_tool_use(
     assistant_response: str = "",
     hook_context: dict | None = None,
 ) -> dict:
-    """Post-tool-use checks. Non-blocking. Returns nudge messages."""
+    """Post-tool-use checks. Non-blocking. Returns nudge messages.
+
+    All uru.db bookkeeping for the event (agent status, nudge state,
+    enforcement log, Sentrux drift) shares one connection and commits once.
+    em.db reads happen up front, outside that transaction. When the hook
+    payload carries a session_id, the drift result is returned under "drift".
+    """
     try:
         hook_context = hook_context or {}
         nudges = []
+        drift = None
         session_id = _get_session_id()
 
+        agent_update = None
         if tool_name == "Task":
             role = _extract_task_role(tool_input, hook_context)
             if role:
                 status = "failed" if _task_call_failed(hook_context, assistant_response) else "completed"
-                _set_agent_status(role, status)
+                agent_update = (role, status)
+        gid = _goal_id() if agent_update else None
+        unread = _get_unread_kickoff_mails() if tool_name in ("Write", "Edit", "Bash") else []
 
-        # Nudge 1: Unrecorded decision
-        if assistant_response and _contains_decision_language(assistant_response):
-            if not _recent_enki_remember(session_id, within_turns=2):
-                if _should_fire_nudge("unrecorded_decision", session_id):
+        with uru_db() as conn:
+            if agent_update and gid:
+                _upsert_agent_status(conn, gid, *agent_update)
+
+            # Nudge 1: Unrecorded decision
+            if assistant_response and _contains_decision_language(assistant_response):
+                if not _recent_enki_remember(session_id, within_turns=2, conn=conn):
+                    if _should_fire_nudge("unrecorded_decision", session_id, conn=conn):
+                        nudges.append(
+                            "Good decision. Worth recording — consider enki_remember."
+                        )
+                        _record_nudge_fired("unrecorded_decision", session_id, conn=conn)
+
+            # Nudge 2: Long session without summary
+            tool_count = _get_tool_count(session_id, conn=conn)
+            if tool_count > 30:
+                if _should_fire_nudge("long_session", session_id, conn=conn):
                     nudges.append(
-                        "Good decision. Worth recording — consider enki_remember."
+                        f"Productive session — {tool_count} actions since last checkpoint. "
+                        "Good time to capture state."
                     )
-                    _record_nudge_fired("unrecorded_decision", session_id)
-
-        # Nudge 2: Long session without summary
-        tool_count = _get_tool_count(session_id)
-        if tool_count > 30:
-            if _should_fire_nudge("long_session", session_id):
-                nudges.append(
-                    f"Productive session — {tool_count} actions since last checkpoint. "
-                    "Good time to capture state."
-                )
-                _record_nudge_fired("long_session", session_id)
+                    _record_nudge_fired("long_session", session_id, conn=conn)
 
-        # Nudge 3: Unread kickoff mail
-        if tool_name in ("Write", "Edit", "Bash"):
-            unread = _get_unread_kickoff_mails()
+            # Nudge 3: Unread kickoff mail
             if unread:
                 project = unread[0]
-                if _should_fire_nudge("unread_kickoff", session_id):
+                if _should_fire_nudge("unread_kickoff", session_id, conn=conn):
                     nudges.append(
                         f"Kickoff mail pending for {project}. "
                         "Spawn EM to begin execution."
                     )
-                    _record_nudge_fired("unread_kickoff", session_id)
+                    _record_nudge_fired("unread_kickoff", session_id, conn=conn)
 
-        # Log tool call
-        _log_enforcement(
-            "post-tool-use", "nudge", tool_name,
-            None, "allow", "; ".join(nudges) if nudges else None
-        )
+            # Log tool call
+            _log_enforcement(
+                "post-tool-use", "nudge", tool_name,
+                None, "allow", "; ".join(nudges) if nudges else None,
+                conn=conn,
+            )
 
+            # Sentrux drift scoring for the hook's session
+            drift_session = hook_context.get("session_id")
+            if isinstance(drift_session, str) and drift_session:
+                from enki.gates.sentrux import score_tool_call
+
+                drift = score_tool_call(
+                    session_id=drift_session,
+                    tool_name=tool_name,
+                    tool_input=tool_input or {},
+                    tool_output=hook_context.get("tool_response") or {},
+                    project=hook_context.get("project"),
+                    conn=conn,
+                )
+
+        result = {"decision": "allow"}
         if nudges:
-            return {"decision": "allow", "nudges": nudges}
-        return {"decision": "allow"}
+            result["nudges"] = nudges
+        if drift is not None:
+            result["drift"] = drift
+        return result
     except Exception:
         return {
             "decision": "allow",
@@ -670,17 +715,23 @@ def _set_agent_status(agent_role: str, status: str) -> None:
         return
     try:
         with uru_db() as conn:
-            conn.execute(
-                "INSERT INTO agent_status (goal_id, agent_role, status, updated_at) "
-                "VALUES (?, ?, ?, datetime('now')) "
-                "ON CONFLICT(goal_id, agent_role) DO UPDATE SET "
-                "status = excluded.status, updated_at = datetime('now')",
-                (gid, agent_role, status),
-            )
+            _upsert_agent_status(conn, gid, agent_role, status)
     except Exception as e:
         raise RuntimeError("Failed to write agent status") from e
 
 
+def _upsert_agent_status(
+    conn: sqlite3.Connection, goal_id: str, agent_role: str, status: str,
+) -> None:
+    conn.execute(
+        "INSERT INTO agent_status (goal_id, agent_role, status, updated_at) "
+        "VALUES (?, ?, ?, datetime('now')) "
+        "ON CONFLICT(goal_id, agent_role) DO UPDATE SET "
+        "status = excluded.status, updated_at = datetime('now')",
+        (goal_id, agent_role, status),
+    )
+
+
 def _task_call_failed(hook_context: dict, assistant_response: str) -> bool:
     """Best-effort error detection for Task completion status."""
     for key in ("error", "tool_error", "exception"):
@@ -807,6 +858,16 @@ def _is_subagent_context(tool_input: dict, hook_context: dict) -> bool:
     return False
 
 
+@contextmanager
+def _uru_conn(conn: sqlite3.Connection | None):
+    """Reuse the caller's uru.db connection, or open a short-lived one."""
+    if conn is not None:
+        yield conn
+        return
+    with uru_db() as own:
+        yield own
+
+
 def _get_session_id() -> str:
     """Read current session ID from marker file."""
     session_path = ENKI_ROOT / "SESSION_ID"
@@ -900,10 +961,12 @@ def _contains_decision_language(text: str) -> bool:
     return any(pattern.search(text) for pattern in DECISION_PATTERNS)
 
 
-def _recent_enki_remember(session_id: str, within_turns: int = 2) -> bool:
+def _recent_enki_remember(
+    session_id: str, within_turns: int = 2, conn: sqlite3.Connection | None = None,
+) -> bool:
     """Check if enki_remember was called recently in this session."""
     try:
-        with uru_db() as conn:
+        with _uru_conn(conn) as conn:
             row = conn.execute(
                 "SELECT COUNT(*) as cnt FROM enforcement_log "
                 "WHERE session_id = ? AND tool_name = 'enki_remember' "
@@ -915,10 +978,12 @@ def _recent_enki_remember(session_id: str, within_turns: int = 2) -> bool:
         raise RuntimeError("Failed to check recent enki_remember") from e
 
 
-def _should_fire_nudge(nudge_type: str, session_id: str) -> bool:
+def _should_fire_nudge(
+    nudge_type: str, session_id: str, conn: sqlite3.Connection | None = None,
+) -> bool:
     """Check if a nudge should fire (graduated: less frequent over time)."""
     try:
-        with uru_db() as conn:
+        with _uru_conn(conn) as conn:
             row = conn.execute(
                 "SELECT fire_count, last_fired FROM nudge_state "
                 "WHERE nudge_type = ? AND session_id = ?",
@@ -934,10 +999,12 @@ def _should_fire_nudge(nudge_type: str, session_id: str) -> bool:
         raise RuntimeError("Failed to evaluate nudge firing") from e
 
 
-def _record_nudge_fired(nudge_type: str, session_id: str) -> None:
+def _record_nudge_fired(
+    nudge_type: str, session_id: str, conn: sqlite3.Connection | None = None,
+) -> None:
     """Record that a nudge was fired."""
     try:
-        with uru_db() as conn:
+        with _uru_conn(conn) as conn:
             conn.execute(
                 "INSERT INTO nudge_state (nudge_type, session_id, last_fired, fire_count) "
                 "VALUES (?, ?, datetime('now'), 1) "
@@ -949,10 +1016,10 @@ def _record_nudge_fired(nudge_type: str, session_id: str) -> None:
         raise RuntimeError("Failed to record nudge") from e
 
 
-def _get_tool_count(session_id: str) -> int:
+def _get_tool_count(session_id: str, conn: sqlite3.Connection | None = None) -> int:
     """Get number of tool calls logged in this session."""
     try:
-        with uru_db() as conn:
+        with _uru_conn(conn) as conn:
             row = conn.execute(
                 "SELECT COUNT(*) as cnt FROM enforcement_log "
                 "WHERE session_id = ?",
@@ -998,11 +1065,12 @@ def _log_enforcement(
     target: str | None,
     action: str,
     reason: str | None,
+    conn: sqlite3.Connection | None = None,
 ) -> None:
     """Write enforcement log entry to uru.db."""
     session_id = _get_session_id()
     try:
-        with uru_db() as conn:
+        with _uru_conn(conn) as conn:
             conn.execute(
                 "INSERT INTO enforcement_log "
                 "(id, session_id, hook, layer, tool_name, target, action, reason) "
@@ -1055,7 +1123,9 @@ def main():
         session_id = hook_input.get("session_id", str(uuid.uuid4()))
         init_session(session_id)
         result = {"decision": "allow"}
-        version_result = check_hook_versions()
+        version_result = check_hook_versions(
+            manifest_path=ENKI_ROOT / "cache" / "hook-manifest.json"
+        )
         if not version_result.all_current:
             warning = format_hook_warning(version_result)
             _log_enforcement(
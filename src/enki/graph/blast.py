@@ -0,0 +1,292 @@
+"""blast.py — Transitive importer counts over the file import graph.
+
+A file's transitive importer count depends only on the file, not on
+which of its symbols is asked about, so it is computed once per file.
+Paths are interned to integer ids and the importer graph is held as
+compressed sparse rows in two flat arrays (ImporterGraph), not a dict
+of string sets. It is condensed into strongly connected components
+(import cycles) with an iterative Tarjan pass; components come out in
+reverse topological order, so each component's reachable set is the
+union of its successors' sets, already computed.
+
+Reachable sets are Python ints used as bitsets, one bit per file,
+numbered in component emission order. They are built one block of
+BLOCK_BITS files at a time: a component's set only holds bits below its
+own position, so components emitted before a block contribute nothing
+to it and are skipped, and no live set is ever wider than the block.
+Memory stays bounded by the block size instead of growing with the
+square of the file count. A set is dropped as soon as every component
+that needs it has been processed.
+
+For a handful of files (an incremental update) loading the whole graph
+costs more than it saves, so the same counts are also available as
+recursive CTEs that walk only the part of the graph involved.
+"""
+
+import json
+import sqlite3
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# Files per bitset block: at most BLOCK_BITS / 8 bytes per live set.
+BLOCK_BITS = 1 << 14
+
+
+def importer_map(edges: Iterable[tuple[str, str]]) -> dict[str, set[str]]:
+    """{imported file: {files importing it}} from (from_id, to_id) import edges."""
+    importers: dict[str, set[str]] = {}
+    for from_id, to_id in edges:
+        importers.setdefault(to_id, set()).add(from_id)
+    return importers
+
+
+@dataclass(slots=True)
+class ImporterGraph:
+    """Importer edges over integer file ids, as compressed sparse rows.
+
+    The importers of file v are sources[offsets[v]:offsets[v + 1]],
+    distinct and ascending; paths[v] is its path and ids the reverse map.
+    """
+
+    paths: list[str]
+    ids: dict[str, int]
+    offsets: array
+    sources: array
+
+    def direct(self, v: int) -> int:
+        return self.offsets[v + 1] - self.offsets[v]
+
+
+def importer_graph(edges: Iterable[tuple[str, str]]) -> ImporterGraph:
+    """ImporterGraph from (from_id, to_id) import edges; duplicates collapse."""
+    ids: dict[str, int] = {}
+    paths: list[str] = []
+    from_ids, to_ids = array("i"), array("i")
+    # Bound methods: this loop runs once per import edge.
+    lookup, add_path = ids.get, paths.append
+    add_from, add_to = from_ids.append, to_ids.append
+    for from_id, to_id in edges:
+        u = lookup(from_id)
+        if u is None:
+            u = ids[from_id] = len(paths)
+            add_path(from_id)
+        v = lookup(to_id)
+        if v is None:
+            v = ids[to_id] = len(paths)
+            add_path(to_id)
+        add_from(u)
+        add_to(v)
+
+    # Counting sort by imported file, then dedupe each row.
+    n = len(paths)
+    starts = array("i", bytes(4 * (n + 1)))
+    for v in to_ids:
+        starts[v + 1] += 1
+    for v in range(n):
+        starts[v + 1] += starts[v]
+    fill = starts[:-1]
+    grouped = array("i", bytes(4 * len(from_ids)))
+    for u, v in zip(from_ids, to_ids):
+        grouped[fill[v]] = u
+        fill[v] += 1
+    del from_ids, to_ids, fill
+
+    offsets = array("i", bytes(4 * (n + 1)))
+    sources = array("i")
+    for v in range(n):
+        sources.extend(sorted(set(grouped[starts[v]:starts[v + 1]])))
+        offsets[v + 1] = len(sources)
+    return ImporterGraph(paths, ids, offsets, sources)
+
+
+def transitive_importer_counts(
+    importers: dict[str, set[str]],
+    files: Iterable[str] | None = None,
+) -> dict[str, int]:
+    """Number of distinct files that reach each file through importer edges.
+
+    Matches a per-file DFS over `importers`: a file counts itself only
+    when it sits on an import cycle. With `files`, only the part of the
+    graph reachable from them is condensed.
+    """
+    graph = importer_graph(
+        (src, dst) for dst, srcs in importers.items() for src in srcs
+    )
+    if files is None:
+        return graph_importer_counts(graph)
+    files = list(files)
+    counts = graph_importer_counts(graph, files)
+    for path in files:
+        counts.setdefault(path, 0)
+    return counts
+
+
+def graph_importer_counts(
+    graph: ImporterGraph,
+    files: Iterable[str] | None = None,
+    block_bits: int = BLOCK_BITS,
+) -> dict[str, int]:
+    """transitive_importer_counts over an ImporterGraph.
+
+    Counts every file in the graph, or with `files` every file those
+    reach through importer edges (files absent from the graph have no
+    importers and are left out).
+    """
+    if files is None:
+        roots = range(len(graph.paths))
+    else:
+        roots = [graph.ids[f] for f in files if f in graph.ids]
+    offsets, sources = graph.offsets, graph.sources
+    comp_of, members, comp_start = _tarjan(offsets, sources, roots)
+    n_comps = len(comp_start) - 1
+
+    # Successor components of each component (deduplicated), and how many
+    # components read each one's set before it can be released.
+    succ_start = array("i", bytes(4 * (n_comps + 1)))
+    succ = array("i")
+    waiting = array("i", bytes(4 * n_comps))
+    cyclic = bytearray(n_comps)
+    seen = array("i", [-1]) * n_comps
+    for c in range(n_comps):
+        for v in members[comp_start[c]:comp_start[c + 1]]:
+            for w in sources[offsets[v]:offsets[v + 1]]:
+                d = comp_of[w]
+                if d == c:
+                    cyclic[c] = 1
+                elif seen[d] != c:
+                    seen[d] = c
+                    succ.append(d)
+                    waiting[d] += 1
+        succ_start[c + 1] = len(succ)
+    del seen
+
+    # Component c owns bits comp_start[c]..comp_start[c + 1] and only
+    # reaches lower ones, so block [lo, hi) starts at the component
+    # holding bit lo.
+    totals = array("q", bytes(8 * n_comps))
+    first = 0
+    for lo in range(0, len(members), block_bits):
+        hi = lo + block_bits
+        while comp_start[first + 1] <= lo:
+            first += 1
+        left = waiting[:]
+        closed: dict[int, int] = {}  # component -> its set within the block
+        for c in range(first, n_comps):
+            reach = 0
+            for d in succ[succ_start[c]:succ_start[c + 1]]:
+                if d >= first:
+                    block = closed.get(d)
+                    if block:
+                        reach |= block
+                    left[d] -= 1
+                    if left[d] == 0:
+                        closed.pop(d, None)
+            a, b = max(comp_start[c], lo), min(comp_start[c + 1], hi)
+            mask = ((1 << (b - a)) - 1) << (a - lo) if a < b else 0
+            total = (reach | mask).bit_count() if cyclic[c] else reach.bit_count()
+            totals[c] += total
+            if left[c] and (reach or mask):
+                closed[c] = reach | mask
+
+    return {graph.paths[v]: totals[comp_of[v]] for v in members}
+
+
+def _tarjan(
+    offsets: array, succ: array, roots: Iterable[int],
+) -> tuple[array, array, array]:
+    """Iterative Tarjan SCC over CSR successors, visiting what roots reach.
+
+    Returns (component of each node, members in emission order, start
+    of each component in members). Components are emitted sinks first;
+    unvisited nodes keep component -1.
+    """
+    n = len(offsets) - 1
+    index = array("i", [-1]) * n
+    low = array("i", bytes(4 * n))
+    on_stack = bytearray(n)
+    comp_of = array("i", [-1]) * n
+    members = array("i")
+    comp_start = array("i", [0])
+    stack = array("i")
+    counter = 0
+
+    for root in roots:
+        if index[root] != -1:
+            continue
+        work = [(root, offsets[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while work:
+            v, i = work[-1]
+            if i < offsets[v + 1]:
+                work[-1] = (v, i + 1)
+                w = succ[i]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append((w, offsets[w]))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                component = len(comp_start) - 1
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    comp_of[w] = component
+                    members.append(w)
+                    if w == v:
+                        break
+                comp_start.append(len(members))
+    return comp_of, members, comp_start
+
+
+# ── SQL walks (small incremental updates) ──
+
+_TRANSITIVE_IMPORTERS_SQL = """
+WITH RECURSIVE reach(file) AS (
+    SELECT from_id FROM edges WHERE to_id = ? AND edge_type = 'imports'
+    UNION
+    SELECT e.from_id FROM edges e JOIN reach r ON e.to_id = r.file
+    WHERE e.edge_type = 'imports'
+)
+SELECT COUNT(*) FROM reach
+"""
+
+_TRANSITIVE_IMPORTS_SQL = """
+WITH RECURSIVE down(file) AS (
+    SELECT value FROM json_each(?)
+    UNION
+    SELECT e.to_id FROM edges e JOIN down d ON e.from_id = d.file
+    WHERE e.edge_type = 'imports'
+)
+SELECT file FROM down
+"""
+
+
+def importer_counts_sql(conn: sqlite3.Connection, file_path: str) -> tuple[int, int]:
+    """(direct, transitive) importer counts for one file, walked in SQLite."""
+    direct = conn.execute(
+        "SELECT COUNT(DISTINCT from_id) FROM edges WHERE to_id = ? AND edge_type = 'imports'",
+        (file_path,),
+    ).fetchone()[0]
+    transitive = conn.execute(_TRANSITIVE_IMPORTERS_SQL, (file_path,)).fetchone()[0]
+    return direct, transitive
+
+
+def imported_closure_sql(conn: sqlite3.Connection, roots: Iterable[str]) -> set[str]:
+    """Roots plus every file they transitively import, walked in SQLite."""
+    roots = list(roots)
+    if not roots:
+        return set()
+    return {row[0] for row in conn.execute(_TRANSITIVE_IMPORTS_SQL, (json.dumps(roots),))}
@@ -0,0 +1,220 @@
+"""discovery.py — List a project's files once, honouring .gitignore.
+
+In a git work tree the file list comes from
+`git ls-files -z --cached --others --exclude-standard`: tracked files
+plus untracked ones git would not ignore, without walking ignored
+directories at all. Elsewhere (or when git is missing or fails) a
+scandir walker applies the same rules from every .gitignore and
+.git/info/exclude it meets. Either way SKIP_DIRS is pruned as well, so
+a vendored node_modules that nobody ignored stays out.
+
+Entries are streamed with their stat data. A caller that needs the
+list twice in one run (graph scan, codebase profile) materializes it
+once with `discover` and hands the list to both.
+"""
+
+import os
+import re
+import stat
+import subprocess
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from enki.graph.languages import SKIP_DIRS
+
+GIT_TIMEOUT_S = 60
+_SEP = os.sep
+
+
+class FileEntry(NamedTuple):
+    """One discovered file. A tuple: tens of thousands are built per scan."""
+
+    path: str          # relative to the project root, os.sep-separated
+    full_path: str
+    size_bytes: int
+    mtime_ns: int
+
+
+def discover(root: str, skip_dirs: Iterable[str] = SKIP_DIRS) -> list[FileEntry]:
+    """Every non-ignored regular file under root, as one reusable list."""
+    return list(iter_files(root, skip_dirs))
+
+
+def iter_files(root: str, skip_dirs: Iterable[str] = SKIP_DIRS) -> Iterator[FileEntry]:
+    """Stream non-ignored regular files under root with stat data."""
+    skip = frozenset(skip_dirs)
+    paths = _git_paths(root)
+    if paths is None:
+        yield from _walk(root, skip)
+        return
+    prefix = os.path.join(root, "")
+    # git lists files grouped by directory; decide each directory once.
+    dir_ok: dict[str, bool] = {"": True}
+    for rel in paths:
+        parent = rel.rpartition("/")[0]
+        ok = dir_ok.get(parent)
+        if ok is None:
+            ok = dir_ok[parent] = not any(part in skip for part in parent.split("/"))
+        if not ok:
+            continue
+        if _SEP != "/":
+            rel = rel.replace("/", _SEP)
+        full_path = prefix + rel
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            continue  # deleted but still in the index, or a dangling link
+        if stat.S_ISREG(st.st_mode):  # submodule gitlinks list as directories
+            yield FileEntry(rel, full_path, st.st_size, st.st_mtime_ns)
+
+
+# ── git ──
+
+
+def _git_paths(root: str) -> list[str] | None:
+    """Non-ignored paths relative to root, or None outside a git work tree."""
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            capture_output=True,
+            timeout=GIT_TIMEOUT_S,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        # Nothing listed: an empty repo, or root sits in a directory the
+        # enclosing repo ignores. The walker handles both.
+        return None
+    # Unmerged paths are listed once per stage.
+    paths = dict.fromkeys(os.fsdecode(result.stdout).split("\0"))
+    paths.pop("", None)
+    return list(paths)
+
+
+# ── .gitignore fallback ──
+
+
+@dataclass(frozen=True, slots=True)
+class _Rule:
+    base: str           # directory holding the ignore file, "" for root
+    pattern: re.Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate(glob: str) -> str:
+    """Regex for one gitignore glob (without anchoring or trailing /)."""
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[" and "]" in glob[i + 2:]:
+            end = glob.index("]", i + 2)
+            body = glob[i + 1:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _parse_rule(line: str, base: str) -> _Rule | None:
+    line = line.rstrip("\n")
+    if not line.endswith("\\ "):
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        line = line[1:]  # \# and \! are literal
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    if "/" in line:
+        # Anchored to the ignore file's directory.
+        regex = _translate(line.lstrip("/"))
+    else:
+        regex = "(?:.*/)?" + _translate(line)
+    return _Rule(base, re.compile(regex + r"\Z"), negate, dir_only)
+
+
+def _read_rules(path: str, base: str) -> list[_Rule]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    return [rule for rule in (_parse_rule(line, base) for line in lines) if rule]
+
+
+def _ignored(rules: list[_Rule], rel: str, is_dir: bool) -> bool:
+    """Last matching rule wins, as in git."""
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.base:
+            if not rel.startswith(rule.base + "/"):
+                continue
+            sub = rel[len(rule.base) + 1:]
+        else:
+            sub = rel
+        if rule.pattern.match(sub):
+            return not rule.negate
+    return False
+
+
+def _walk(root: str, skip: frozenset[str]) -> Iterator[FileEntry]:
+    """Depth-first scandir walk that never enters ignored directories."""
+    rules = _read_rules(os.path.join(root, ".git", "info", "exclude"), "")
+    rules += _read_rules(os.path.join(root, ".gitignore"), "")
+    pending = [("", rules)]
+    while pending:
+        rel_dir, rules = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip and not _ignored(rules, rel, True):
+                        subdirs.append(
+                            (rel, rules + _read_rules(os.path.join(entry.path, ".gitignore"), rel))
+                        )
+                    continue
+                if rules and _ignored(rules, rel, False):
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                if _SEP != "/":
+                    rel = rel.replace("/", _SEP)
+                yield FileEntry(rel, entry.path, st.st_size, st.st_mtime_ns)
+        pending.extend(reversed(subdirs))
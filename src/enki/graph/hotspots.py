@@ -0,0 +1,204 @@
+"""hotspots.py — Per-file churn x complexity, materialized at scan time.
+
+A hotspot is a file that is both complicated and frequently changed.
+Both halves are kept in graph.db so readers never aggregate symbols or
+run git themselves:
+
+- git_churn caches commit and line counts per path from `git log
+  --numstat`. scan_state['churn_head'] records the commit the counts
+  run up to; the next scan folds in only the commits after it, and
+  starts over when history was rewritten underneath it.
+- hotspots holds one row per file: churn, summed and peak symbol
+  complexity, and risk_score. The files table's git_change_frequency
+  and complexity_score columns mirror it.
+
+risk_score multiplies two saturating factors, x / (x + half), each 0.5
+when x reaches its HOTSPOT_*_HALF constant. Every row depends only on
+its own file, so incremental scans and task overlays rewrite just the
+rows they touched.
+"""
+
+import os
+import sqlite3
+import subprocess
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from enki.graph.discovery import GIT_TIMEOUT_S
+
+# Churn (commits) and summed complexity at which each factor is 0.5.
+HOTSPOT_CHURN_HALF = 10
+HOTSPOT_COMPLEXITY_HALF = 50
+
+# Risk worth calling out to an agent: both factors around their halves.
+HOTSPOT_NOTABLE_RISK = 0.25
+
+
+def risk_score(churn: int, complexity: int) -> float:
+    """Combined hotspot risk in [0, 1)."""
+    return (
+        churn / (churn + HOTSPOT_CHURN_HALF)
+        * complexity / (complexity + HOTSPOT_COMPLEXITY_HALF)
+    )
+
+
+# ── Churn ──
+
+
+def _git(project_path: str, *args: str) -> bytes | None:
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=project_path, capture_output=True, timeout=GIT_TIMEOUT_S,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def read_churn(project_path: str, revisions: str) -> dict[str, list[int]] | None:
+    """{path: [commits, lines_added, lines_deleted]} over revisions, in one git log.
+
+    Paths are relative to project_path (which may be a subdirectory of
+    the repository). Merge commits and binary line counts are skipped;
+    a rename counts as a delete plus an add. None if git fails.
+    """
+    out = _git(
+        project_path, "log", "--numstat", "--no-renames", "--relative", "-z",
+        "--format=%x01%H", revisions,
+    )
+    if out is None:
+        return None
+    churn: dict[str, list[int]] = {}
+    for record in os.fsdecode(out).split("\0"):
+        record = record.lstrip("\n")
+        if not record or record.startswith("\x01"):
+            continue
+        added, deleted, path = record.split("\t", 2)
+        if os.sep != "/":
+            path = path.replace("/", os.sep)
+        counts = churn.setdefault(path, [0, 0, 0])
+        counts[0] += 1
+        if added != "-":
+            counts[1] += int(added)
+            counts[2] += int(deleted)
+    return churn
+
+
+def update_churn(conn: sqlite3.Connection, project_path: str) -> set[str] | None:
+    """Fold commits since scan_state['churn_head'] into git_churn.
+
+    Returns the paths whose counts changed, or None when the cache was
+    rebuilt from scratch (first scan, rewritten history, not a repo).
+    """
+    head = _git(project_path, "rev-parse", "--verify", "-q", "HEAD")
+    head = head.decode().strip() if head else None
+    row = conn.execute("SELECT value FROM scan_state WHERE key='churn_head'").fetchone()
+    cached = row[0] if row else None
+    if head == cached:
+        return set()
+
+    churn = None
+    if head is not None and cached is not None and _git(
+        project_path, "merge-base", "--is-ancestor", cached, head,
+    ) is not None:
+        churn = read_churn(project_path, f"{cached}..{head}")
+    rebuilt = churn is None
+    if rebuilt:
+        conn.execute("DELETE FROM git_churn")
+        churn = read_churn(project_path, head) if head is not None else None
+    conn.executemany(
+        "INSERT INTO git_churn (path, commits, lines_added, lines_deleted) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(path) DO UPDATE SET commits=commits+excluded.commits, "
+        "lines_added=lines_added+excluded.lines_added, "
+        "lines_deleted=lines_deleted+excluded.lines_deleted",
+        [(path, *counts) for path, counts in (churn or {}).items()],
+    )
+    if head is None:
+        conn.execute("DELETE FROM scan_state WHERE key='churn_head'")
+    else:
+        conn.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('churn_head', ?)", (head,),
+        )
+    return None if rebuilt else set(churn or ())
+
+
+# ── Materialization ──
+
+
+_HOTSPOT_SELECT = (
+    "SELECT f.path, COALESCE(c.commits, 0), "
+    "COALESCE(c.lines_added, 0) + COALESCE(c.lines_deleted, 0), "
+    "COALESCE(s.total, 0), COALESCE(s.peak, 0) "
+    "FROM files f "
+    "LEFT JOIN git_churn c ON c.path = f.path "
+    "LEFT JOIN (SELECT file_path, SUM(complexity) AS total, MAX(complexity) AS peak "
+    "FROM symbols {where_symbols} GROUP BY file_path) s ON s.file_path = f.path "
+    "{where_files}"
+)
+_INSERT_HOTSPOT = (
+    "INSERT OR REPLACE INTO hotspots "
+    "(path, churn, lines_changed, complexity, max_complexity, risk_score, computed_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _hotspot_rows(rows: Iterable, now: str) -> list[tuple]:
+    return [
+        (path, churn, lines, total, peak, risk_score(churn, total), now)
+        for path, churn, lines, total, peak in rows
+    ]
+
+
+def materialize_hotspots(
+    conn: sqlite3.Connection,
+    project_path: str | None,
+    paths: Iterable[str] | None = None,
+    commit: bool = True,
+) -> int:
+    """Rebuild hotspot rows for every file, or for `paths` plus whatever churn moved.
+
+    With project_path, git_churn is brought up to date first; None
+    uses the cached churn as is. Returns the number of rows written.
+    """
+    churned = update_churn(conn, project_path) if project_path else set()
+    now = datetime.now(timezone.utc).isoformat()
+    if paths is None or churned is None:
+        conn.execute("DELETE FROM hotspots")
+        rows = _hotspot_rows(
+            conn.execute(_HOTSPOT_SELECT.format(where_symbols="", where_files="")), now,
+        )
+    else:
+        targets = sorted(set(paths) | churned)
+        conn.executemany("DELETE FROM hotspots WHERE path=?", [(p,) for p in targets])
+        select = _HOTSPOT_SELECT.format(
+            where_symbols="WHERE file_path=?", where_files="WHERE f.path=?",
+        )
+        rows = []
+        for path in targets:
+            rows.extend(_hotspot_rows(conn.execute(select, (path, path)), now))
+    conn.executemany(_INSERT_HOTSPOT, rows)
+    conn.executemany(
+        "UPDATE files SET git_change_frequency=?, complexity_score=? WHERE path=?",
+        [(row[1], row[3], row[0]) for row in rows],
+    )
+    if commit:
+        conn.commit()
+    return len(rows)
+
+
+# ── Readers ──
+
+
+def file_hotspots(conn: sqlite3.Connection, paths: Iterable[str]) -> dict[str, dict]:
+    """Hotspot rows for paths that have one. Empty for graphs scanned
+    before the table existed."""
+    try:
+        return {
+            r["path"]: dict(r) for path in paths for r in conn.execute(
+                "SELECT path, churn, lines_changed, complexity, max_complexity, risk_score "
+                "FROM hotspots WHERE path=?",
+                (path,),
+            )
+        }
+    except sqlite3.OperationalError:
+        return {}
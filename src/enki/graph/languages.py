@@ -1,5 +1,6 @@
 """Language detection and tree-sitter parser mapping."""
 
+import os
 from pathlib import Path
 
 # Extension to language name mapping
@@ -35,8 +36,16 @@ SUPPORTED_LANGUAGES = {
 }
 
 
+# Directories never scanned into the graph
+SKIP_DIRS = frozenset({
+    "node_modules", ".git", "__pycache__", ".venv", "venv",
+    "dist", "build", ".next", ".cache", "coverage",
+    ".worktrees", ".enki",
+})
+
+
 def detect_language(file_path: str) -> str | None:
-    ext = Path(file_path).suffix.lower()
+    ext = os.path.splitext(file_path)[1].lower()
     lang = EXT_TO_LANGUAGE.get(ext)
     if lang and lang in SUPPORTED_LANGUAGES:
         return lang
@@ -46,14 +55,8 @@ def detect_language(file_path: str) -> str | None:
 def is_source_file(file_path: str) -> bool:
     """True if this file should be included in the graph."""
     path = Path(file_path)
-    # Skip common non-source directories
-    skip_dirs = {
-        "node_modules", ".git", "__pycache__", ".venv", "venv",
-        "dist", "build", ".next", ".cache", "coverage",
-        ".worktrees", ".enki",
-    }
     for part in path.parts:
-        if part in skip_dirs:
+        if part in SKIP_DIRS:
             return False
     return detect_language(file_path) is not None
 
@@ -0,0 +1,600 @@
+"""overlay.py — Task worktree graphs: a shared base plus a per-task delta.
+
+Every task in a wave works in its own git worktree forked from the
+sprint branch. Scanning each worktree into a graph of its own repeats
+the whole project per task, so instead:
+
+- graphs/base-<commit>.db is the full graph of one fork-point commit,
+  built once from a detached checkout (seeded from graph.db, so only
+  files that differ are re-parsed) and shared by every task forked
+  there.
+- graphs/overlay-<task_id>.db holds only the worktree's delta: files
+  changed since the fork point (parsed), import/call/duplicate edges
+  and blast radius rows for them, for unchanged files whose imports
+  must be relinked because of them (overlay_relinked), and for files
+  whose importer sets moved; hotspot rows for the changed files.
+
+`overlay_db` opens the overlay with the base attached and TEMP views
+named after the graph tables in front of both: overlay rows, plus base
+rows the overlay does not shadow. Queries written against graph.db run
+on it unchanged. Base blast scores are renormalized in the view when
+the worktree added or deleted files.
+
+Changed files come from git (`git diff <fork point>` plus untracked
+files), so an overlay refresh stats the worktree through git and
+re-parses only files whose size or mtime moved since the last refresh.
+Derived rows are recomputed on every refresh that sees a change; their
+cost follows the size of the change, not of the project.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from enki.db import graph_db, graph_db_path
+from enki.graph.discovery import GIT_TIMEOUT_S
+from enki.graph.hotspots import materialize_hotspots
+from enki.graph.languages import SKIP_DIRS, detect_language
+from enki.graph.resolve import ModuleIndex
+from enki.graph.scanner import (
+    _UPSERT_FILE,
+    _file_row,
+    _link_calls,
+    _link_duplicates,
+    _link_imports,
+    _now,
+    _store_parse_result,
+    compute_blast_radius,
+    parse_files,
+    run_full_scan,
+    run_incremental_update,
+    scan_lock,
+    scan_settings,
+)
+from enki.graph.schema import create_graph_tables
+
+OVERLAY_TABLES = """
+CREATE TABLE IF NOT EXISTS overlay_files (
+    path TEXT PRIMARY KEY,
+    status TEXT NOT NULL        -- added|modified|deleted, relative to the base
+);
+
+-- Unchanged files whose import and call edges the overlay re-derives,
+-- because a file they import changed or now resolves differently.
+CREATE TABLE IF NOT EXISTS overlay_relinked (
+    path TEXT PRIMARY KEY
+);
+"""
+
+# Graph tables the merged views cover; reachability caches and
+# scan_state stay per-graph.
+MERGED_TABLES = (
+    "files", "symbols", "raw_imports", "raw_calls", "edges", "blast_radius", "hotspots",
+)
+
+# The file a node id belongs to: symbol ids are "{path}::{name}::{line}".
+_OWNER = "CASE WHEN instr({0}, '::') > 0 THEN substr({0}, 1, instr({0}, '::') - 1) ELSE {0} END"
+_SHADOWED = "(SELECT path FROM main.overlay_files)"
+_RELINKED = "(SELECT path FROM main.overlay_relinked)"
+
+# Base rows the overlay does not replace, per table.
+_BASE_FILTERS = {
+    "files": f"path NOT IN {_SHADOWED}",
+    "symbols": f"file_path NOT IN {_SHADOWED}",
+    "raw_imports": f"file_path NOT IN {_SHADOWED}",
+    "raw_calls": f"file_path NOT IN {_SHADOWED}",
+    "edges": (
+        f"{_OWNER.format('from_id')} NOT IN {_SHADOWED} "
+        f"AND {_OWNER.format('to_id')} NOT IN {_SHADOWED} "
+        f"AND NOT (edge_type IN ('imports', 'calls') "
+        f"AND {_OWNER.format('from_id')} IN {_RELINKED})"
+    ),
+    "blast_radius": (
+        f"file_path NOT IN {_SHADOWED} "
+        "AND file_path NOT IN (SELECT file_path FROM main.blast_radius)"
+    ),
+    "hotspots": f"path NOT IN {_SHADOWED}",
+}
+
+# Base blast scores renormalized by the merged file count, as
+# scanner._blast_row computes them.
+_BASE_BLAST_SCORE = (
+    "min(1.0, transitive_importers / max("
+    "(SELECT CAST(value AS INTEGER) FROM main.scan_state WHERE key='total_files') * 0.1, 1.0))"
+)
+_RISK = (
+    "CASE WHEN {0} >= 0.8 THEN 'critical' WHEN {0} >= 0.5 THEN 'high' "
+    "WHEN {0} >= 0.2 THEN 'medium' ELSE 'low' END"
+)
+
+
+def base_graph(commit: str) -> str:
+    """Graph name (see enki.db.graph_db) of a fork-point commit's base."""
+    return f"base-{commit}"
+
+
+def overlay_graph(task_id: str) -> str:
+    """Graph name of a task's overlay."""
+    return f"overlay-{task_id}"
+
+
+# ── git ──
+
+
+def _git(cwd: str, *args: str) -> bytes | None:
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, timeout=GIT_TIMEOUT_S,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def fork_point(worktree_path: str, sprint_branch: str | None = None) -> str | None:
+    """Commit the worktree's branch forked from sprint_branch (or HEAD)."""
+    out = None
+    if sprint_branch:
+        out = _git(worktree_path, "merge-base", "HEAD", sprint_branch)
+    if not out:
+        out = _git(worktree_path, "rev-parse", "HEAD")
+    return out.decode().strip() if out else None
+
+
+def _split_z(out: bytes | None) -> list[str]:
+    paths = os.fsdecode(out or b"").split("\0")
+    return [p.replace("/", os.sep) if os.sep != "/" else p for p in paths if p]
+
+
+def worktree_changes(worktree_path: str, commit: str) -> dict[str, os.stat_result | None]:
+    """Paths differing from commit in the worktree, with their stat (None if gone).
+
+    Tracked changes (staged or not) plus untracked files git would not
+    ignore; directories the scanner skips are left out.
+    """
+    paths = _split_z(_git(worktree_path, "diff", "--name-only", "--no-renames", "-z", commit))
+    paths += _split_z(_git(worktree_path, "ls-files", "-z", "--others", "--exclude-standard"))
+    changes: dict[str, os.stat_result | None] = {}
+    for path in paths:
+        if any(part in SKIP_DIRS for part in path.split(os.sep)[:-1]):
+            continue
+        try:
+            changes[path] = os.stat(os.path.join(worktree_path, path))
+        except OSError:
+            changes[path] = None
+    return changes
+
+
+# ── Base graphs ──
+
+
+def ensure_base(
+    project: str,
+    repo_path: str,
+    commit: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+) -> dict | None:
+    """Build the base graph for commit unless it exists. Returns scan stats.
+
+    The commit is checked out detached into a scratch directory next to
+    the graph. With a graph.db to start from, the base is a copy of it
+    brought to the commit by an incremental update; otherwise a full
+    scan.
+    """
+    name = base_graph(commit)
+    with scan_lock(project, name):
+        path = graph_db_path(project, name)
+        if path.exists():
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        scratch = tempfile.mkdtemp(prefix=".checkout-", dir=path.parent)
+        checkout = os.path.join(scratch, "tree")
+        try:
+            if _git(repo_path, "worktree", "add", "--detach", checkout, commit) is None:
+                raise RuntimeError(f"cannot check out {commit} to build its base graph")
+            main = graph_db_path(project)
+            if main.exists():
+                with graph_db(project) as src, graph_db(project, name) as dest:
+                    src.backup(dest)
+                stats = run_incremental_update(
+                    project, checkout, workers, chunk_size, graph=name,
+                )
+            else:
+                stats = run_full_scan(project, checkout, workers, chunk_size, graph=name)
+            with graph_db(project, name) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('base_commit', ?)",
+                    (commit,),
+                )
+                conn.commit()
+            return stats
+        except BaseException:
+            _unlink_db(path)
+            raise
+        finally:
+            _git(repo_path, "worktree", "remove", "--force", checkout)
+            _git(repo_path, "worktree", "prune")
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _unlink_db(path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.unlink(f"{path}{suffix}")
+        except FileNotFoundError:
+            pass
+
+
+# ── Merged views ──
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> str:
+    return ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})"))
+
+
+def _create_views(conn: sqlite3.Connection, tables: tuple[str, ...] = MERGED_TABLES) -> None:
+    """Shadow `tables` with merged TEMP views; other tables stay the overlay's own."""
+    for table in tables:
+        cols = _columns(conn, table)
+        if table == "blast_radius":
+            base_cols = cols.replace("blast_score", f"{_BASE_BLAST_SCORE} AS blast_score")
+            base_cols = base_cols.replace(
+                "risk_level", f"{_RISK.format(_BASE_BLAST_SCORE)} AS risk_level",
+            )
+        else:
+            base_cols = cols
+        conn.execute(
+            f"CREATE TEMP VIEW {table} AS "
+            f"SELECT {cols} FROM main.{table} "
+            f"UNION ALL SELECT {base_cols} FROM base.{table} WHERE {_BASE_FILTERS[table]}"
+        )
+
+
+def _drop_views(conn: sqlite3.Connection, tables: tuple[str, ...] = MERGED_TABLES) -> None:
+    for table in tables:
+        conn.execute(f"DROP VIEW IF EXISTS temp.{table}")
+
+
+def _attach_base(conn: sqlite3.Connection, project: str, commit: str) -> None:
+    path = graph_db_path(project, base_graph(commit))
+    if not path.exists():
+        raise FileNotFoundError(f"base graph for {commit} is missing")
+    conn.execute("ATTACH DATABASE ? AS base", (str(path),))
+
+
+@contextmanager
+def overlay_db(project: str, task_id: str) -> Iterator[sqlite3.Connection]:
+    """The merged graph of a task's worktree, queried like graph.db.
+
+    Reads see base plus overlay; reachability caches written through it
+    land in the overlay. Call refresh_overlay first to pick up edits.
+    """
+    with graph_db(project, overlay_graph(task_id)) as conn:
+        row = conn.execute("SELECT value FROM scan_state WHERE key='base_commit'").fetchone()
+        _attach_base(conn, project, row["value"])
+        _create_views(conn)
+        yield conn
+
+
+# ── Overlay refresh ──
+
+
+def _signature(commit: str, changes: dict[str, os.stat_result | None]) -> str:
+    digest = hashlib.sha256(commit.encode())
+    for path in sorted(changes):
+        st = changes[path]
+        stamp = f"{st.st_size}:{st.st_mtime_ns}" if st else "-"
+        digest.update(f"\0{path}\0{stamp}".encode())
+    return digest.hexdigest()
+
+
+def _forget(conn: sqlite3.Connection, path: str) -> None:
+    """Drop a file's parsed rows from the overlay."""
+    conn.execute("DELETE FROM main.symbols WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM main.raw_imports WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM main.raw_calls WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM main.files WHERE path=?", (path,))
+
+
+def _import_targets(conn: sqlite3.Connection, schema: str, path: str) -> set[str]:
+    return {r[0] for r in conn.execute(
+        f"SELECT to_id FROM {schema}.edges WHERE from_id=? AND edge_type='imports'", (path,),
+    )}
+
+
+def _resolution_changes(conn: sqlite3.Connection, index: ModuleIndex) -> set[str]:
+    """Unchanged base files whose imports resolve differently under index."""
+    before: dict[str, set[str]] = {}
+    for row in conn.execute("SELECT from_id, to_id FROM base.edges WHERE edge_type='imports'"):
+        before.setdefault(row[0], set()).add(row[1])
+    after: dict[str, set[str]] = {}
+    for row in conn.execute(
+        f"SELECT file_path, raw FROM base.raw_imports WHERE file_path NOT IN {_SHADOWED}"
+    ):
+        after.setdefault(row[0], set()).update(index.resolve(row[1], row[0]))
+    return {f for f in before.keys() | after.keys() if before.get(f, set()) != after.get(f, set())}
+
+
+def refresh_overlay(
+    project: str,
+    task_id: str,
+    worktree_path: str,
+    sprint_branch: str | None = None,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+) -> dict:
+    """Bring a task's overlay up to date with its worktree. Returns stats.
+
+    The fork point is recomputed each time; if it moved (the task
+    merged the sprint branch in) the overlay starts over on the new
+    base. A refresh that finds the same changed files with the same
+    stat as last time does nothing.
+    """
+    name = overlay_graph(task_id)
+    with scan_lock(project, name):
+        return _refresh_overlay(
+            project, name, worktree_path, sprint_branch, *scan_settings(workers, chunk_size),
+        )
+
+
+def _refresh_overlay(
+    project: str,
+    name: str,
+    worktree_path: str,
+    sprint_branch: str | None,
+    workers: int,
+    chunk_size: int,
+) -> dict:
+    stats = {
+        "base_commit": None,
+        "unchanged": False,
+        "files_changed": 0,
+        "files_deleted": 0,
+        "files_parsed": 0,
+        "files_relinked": 0,
+        "edges_found": 0,
+        "calls_found": 0,
+        "duplicates_found": 0,
+        "blast_radius_computed": 0,
+        "hotspots_computed": 0,
+        "errors": [],
+    }
+    commit = fork_point(worktree_path, sprint_branch)
+    if commit is None:
+        stats["errors"].append(f"{worktree_path}: not a git worktree")
+        return stats
+    stats["base_commit"] = commit
+
+    path = graph_db_path(project, name)
+    with graph_db(project, name) as conn:
+        create_graph_tables(conn)
+        conn.executescript(OVERLAY_TABLES)
+        state = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM scan_state")}
+    if state.get("base_commit", commit) != commit:
+        _unlink_db(path)
+        state = {}
+    with graph_db(project, name) as conn:
+        # Recorded before the base exists, so prune_bases keeps it.
+        create_graph_tables(conn)
+        conn.executescript(OVERLAY_TABLES)
+        conn.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('base_commit', ?)", (commit,),
+        )
+        conn.commit()
+
+    ensure_base(project, worktree_path, commit, workers, chunk_size)
+    changes = worktree_changes(worktree_path, commit)
+    signature = _signature(commit, changes)
+
+    with graph_db(project, name) as conn:
+        _attach_base(conn, project, commit)
+        if state.get("signature") == signature:
+            stats["unchanged"] = True
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM overlay_files GROUP BY status"
+            ):
+                stats["files_deleted" if status == "deleted" else "files_changed"] += count
+            stats["files_relinked"] = conn.execute(
+                "SELECT COUNT(*) FROM overlay_relinked"
+            ).fetchone()[0]
+            return stats
+
+        def in_base(rel: str) -> bool:
+            return conn.execute(
+                "SELECT 1 FROM base.files WHERE path=?", (rel,)
+            ).fetchone() is not None
+
+        present: dict[str, dict] = {}
+        deleted: list[str] = []
+        for rel, st in changes.items():
+            language = detect_language(rel)
+            if not language:
+                continue
+            if st is None:
+                if in_base(rel):
+                    deleted.append(rel)
+                continue
+            present[rel] = {
+                "path": rel,
+                "full_path": os.path.join(worktree_path, rel),
+                "language": language,
+                "size_bytes": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+        stats["files_changed"] = len(present)
+        stats["files_deleted"] = len(deleted)
+
+        # Pass 1-2: parse what moved since the last refresh.
+        known = {
+            r["path"]: (r["size_bytes"], r["mtime_ns"])
+            for r in conn.execute("SELECT path, size_bytes, mtime_ns FROM main.files")
+        }
+        for rel in known.keys() - present.keys():
+            _forget(conn, rel)
+        to_parse = [
+            f for rel, f in present.items() if known.get(rel) != (f["size_bytes"], f["mtime_ns"])
+        ]
+        rows = [_file_row(f) for f in to_parse]
+        # A racy mtime is left unrecorded (see scanner._file_row); so is
+        # the signature, so the next refresh looks again.
+        racy = any(row[4] is None for row in rows)
+        conn.executemany(_UPSERT_FILE, rows)
+        try:
+            for result in parse_files(to_parse, workers, chunk_size):
+                try:
+                    _store_parse_result(conn, result)
+                    stats["files_parsed"] += 1
+                except Exception as e:
+                    stats["errors"].append(f"{result['path']}: {e}")
+        except Exception as e:
+            stats["errors"].append(f"parse pool: {e}")
+
+        conn.execute("DELETE FROM overlay_files")
+        conn.executemany(
+            "INSERT INTO overlay_files (path, status) VALUES (?, ?)",
+            [(rel, "modified" if in_base(rel) else "added") for rel in present]
+            + [(rel, "deleted") for rel in deleted],
+        )
+        for table in (
+            "edges", "blast_radius", "hotspots", "git_churn", "overlay_relinked",
+            "reachability", "reachability_walks",
+        ):
+            conn.execute(f"DELETE FROM main.{table}")
+        conn.commit()
+
+        # Pass 3: link changed files, and unchanged importers of them.
+        changed = present.keys() | set(deleted)
+        relinked: set[str] = set()
+        for rel in changed:
+            relinked.update(r[0] for r in conn.execute(
+                "SELECT from_id FROM base.edges WHERE to_id=? AND edge_type='imports'", (rel,),
+            ))
+        link_views = ("files", "symbols", "raw_imports", "raw_calls")
+        _create_views(conn, link_views)
+        try:
+            index = ModuleIndex.build(
+                (r[0] for r in conn.execute("SELECT path FROM files")), worktree_path,
+            )
+            base_index = conn.execute(
+                "SELECT value FROM base.scan_state WHERE key='module_index'"
+            ).fetchone()
+            added = any(not in_base(rel) for rel in present)
+            if added or deleted or base_index is None or base_index[0] != index.fingerprint:
+                # Resolvable targets or a tsconfig/go.mod changed.
+                relinked |= _resolution_changes(conn, index)
+            relinked -= changed
+            conn.executemany(
+                "INSERT INTO overlay_relinked (path) VALUES (?)", [(rel,) for rel in relinked],
+            )
+            stats["files_relinked"] = len(relinked)
+            link = sorted(present.keys() | relinked)
+            stats["edges_found"] = _link_imports(conn, index, link)
+            stats["calls_found"] = _link_calls(conn, link)
+            stats["duplicates_found"] = _link_duplicates(conn, sorted(present))
+        except Exception as e:
+            stats["errors"].append(f"link: {e}")
+        conn.commit()
+        _drop_views(conn, link_views)
+
+        # Pass 4: blast radius of files whose importer sets moved.
+        moved: set[str] = set()
+        for rel in changed | relinked:
+            moved |= _import_targets(conn, "base", rel) ^ _import_targets(conn, "main", rel)
+        blast_views = ("files", "symbols", "edges")
+        _create_views(conn, blast_views)
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('total_files', ?)",
+                (str(total),),
+            )
+            compute_blast_radius(project, conn, set(present), moved)
+            stats["blast_radius_computed"] = conn.execute(
+                "SELECT COUNT(*) FROM main.blast_radius"
+            ).fetchone()[0]
+        except Exception as e:
+            stats["errors"].append(f"blast radius: {e}")
+        _drop_views(conn, blast_views)
+
+        # Hotspots of changed files, with the base's churn: the task's
+        # own commits are too few to move it.
+        try:
+            conn.executemany(
+                "INSERT INTO main.git_churn (path, commits, lines_added, lines_deleted) "
+                "SELECT path, commits, lines_added, lines_deleted FROM base.git_churn WHERE path=?",
+                [(rel,) for rel in present],
+            )
+            stats["hotspots_computed"] = materialize_hotspots(conn, None, sorted(present))
+        except Exception as e:
+            stats["errors"].append(f"hotspots: {e}")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('last_overlay_update', ?)",
+            (_now(),),
+        )
+        if not racy and not stats["errors"]:
+            conn.execute(
+                "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('signature', ?)",
+                (signature,),
+            )
+        conn.commit()
+    return stats
+
+
+@contextmanager
+def task_graph(
+    project: str,
+    task_id: str,
+    worktree_path: str,
+    sprint_branch: str | None = None,
+) -> Iterator[sqlite3.Connection]:
+    """refresh_overlay, then overlay_db. Raises RuntimeError if the refresh cannot run."""
+    stats = refresh_overlay(project, task_id, worktree_path, sprint_branch)
+    if stats["base_commit"] is None:
+        raise RuntimeError("; ".join(stats["errors"]))
+    with overlay_db(project, task_id) as conn:
+        yield conn
+
+
+# ── Cleanup ──
+
+
+def drop_overlay(project: str, task_id: str) -> dict:
+    """Delete a task's overlay, then any base no overlay still uses."""
+    name = overlay_graph(task_id)
+    with scan_lock(project, name):
+        existed = graph_db_path(project, name).exists()
+        _unlink_db(graph_db_path(project, name))
+    return {"overlay_removed": existed, "bases_removed": prune_bases(project)}
+
+
+def prune_bases(project: str) -> list[str]:
+    """Delete base graphs no overlay refers to. Returns their commits."""
+    graphs = graph_db_path(project, base_graph("")).parent
+    if not graphs.is_dir():
+        return []
+    in_use = set()
+    for path in graphs.glob("overlay-*.db"):
+        try:
+            with graph_db(project, path.stem) as conn:
+                row = conn.execute(
+                    "SELECT value FROM scan_state WHERE key='base_commit'"
+                ).fetchone()
+        except sqlite3.Error:
+            continue
+        if row:
+            in_use.add(row["value"])
+    removed = []
+    for path in sorted(graphs.glob("base-*.db")):
+        commit = path.stem.removeprefix("base-")
+        if commit not in in_use:
+            with scan_lock(project, path.stem):
+                _unlink_db(path)
+            removed.append(commit)
+    return removed
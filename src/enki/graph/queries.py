@@ -0,0 +1,428 @@
+"""queries.py — Graph queries answered from graph.db indexes.
+
+`callers` walks `calls` edges backwards, one indexed query per level up
+to a depth limit; `duplicates` reads fingerprint buckets from the
+partial index on symbols(fingerprint). `transitive_files` and
+`import_path` walk `imports` edges the same way. List queries return
+one keyset page at a time.
+"""
+
+import json
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+MAX_CALLER_DEPTH = 10
+MAX_GROUP_MEMBERS = 50
+
+
+def target_symbols(conn: sqlite3.Connection, target: str) -> list[str]:
+    """Symbol ids named by a query target.
+
+    Accepts a symbol id, "path::name", a file path (all its symbols) or
+    a bare symbol name (every symbol with that name).
+    """
+    if conn.execute("SELECT 1 FROM symbols WHERE id=?", (target,)).fetchone():
+        return [target]
+    if "::" in target:
+        file_path, name = target.split("::", 1)
+        rows = conn.execute(
+            "SELECT id FROM symbols WHERE file_path=? AND name=? ORDER BY id", (file_path, name),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT id FROM symbols WHERE file_path=? ORDER BY id", (target,),
+        ).fetchall()
+        if not rows:
+            rows = conn.execute(
+                "SELECT id FROM symbols WHERE name=? ORDER BY id", (target,),
+            ).fetchall()
+    return [r["id"] for r in rows]
+
+
+# One breadth-first level: callers of the frontier not seen before.
+_CALLER_LEVEL_SQL = """
+SELECT DISTINCT e.from_id FROM edges e
+WHERE e.to_id IN (SELECT value FROM json_each(:frontier)) AND e.edge_type = 'calls'
+"""
+
+
+# Frontier nodes per level query, so a capped walk can stop mid-level.
+_FRONTIER_CHUNK = 256
+
+
+def _step(conn: sqlite3.Connection, sql: str, frontier: list[str]):
+    """Rows of `sql` for a frontier, queried a chunk at a time."""
+    for start in range(0, len(frontier), _FRONTIER_CHUNK):
+        yield from conn.execute(
+            sql, {"frontier": json.dumps(frontier[start:start + _FRONTIER_CHUNK])},
+        )
+
+
+def _walk_levels(
+    conn: sqlite3.Connection,
+    level_sql: str,
+    roots: list[str],
+    depth: int,
+    max_nodes: int | None = None,
+) -> tuple[dict[str, int], bool]:
+    """({node: shortest distance}, truncated) for a breadth-first walk.
+
+    One indexed query per level with a visited set. A recursive CTE
+    carrying the depth cannot drop nodes it has already reached, so on
+    dense graphs it revisits each node once per level and grows with
+    depth x nodes. Nodes are found in distance order, so stopping at
+    max_nodes keeps the nearest ones.
+    """
+    seen: dict[str, int] = {}
+    frontier = list(roots)
+    for level in range(1, depth + 1):
+        if not frontier:
+            break
+        found = []
+        for row in _step(conn, level_sql, frontier):
+            if row[0] in seen:
+                continue
+            if max_nodes is not None and len(seen) >= max_nodes:
+                return seen, True
+            seen[row[0]] = level
+            found.append(row[0])
+        frontier = found
+    return seen, False
+
+
+def caller_depths(conn: sqlite3.Connection, symbol_ids: list[str], depth: int = 1) -> dict[str, int]:
+    """{caller: shortest call distance} up to `depth` calls away."""
+    depth = max(1, min(int(depth), MAX_CALLER_DEPTH))
+    return _walk_levels(conn, _CALLER_LEVEL_SQL, symbol_ids, depth)[0]
+
+
+def callers(
+    conn: sqlite3.Connection,
+    symbol_ids: list[str],
+    depth: int = 1,
+    after: tuple[int, str] | None = None,
+    limit: int = 10,
+) -> list[dict]:
+    """Callers of symbol_ids up to `depth` calls away, nearest first.
+
+    Each caller appears once, at its shortest distance. A caller is a
+    symbol id, or a file path for calls made at module level.
+    """
+    ordered = sorted((d, c) for c, d in caller_depths(conn, symbol_ids, depth).items())
+    if after:
+        ordered = [key for key in ordered if key > tuple(after)]
+    rows = []
+    for level, caller in ordered[:limit]:
+        symbol = conn.execute(
+            "SELECT file_path, name, line_start FROM symbols WHERE id=?", (caller,),
+        ).fetchone()
+        rows.append({
+            "id": caller,
+            "depth": level,
+            "file_path": symbol["file_path"] if symbol else caller,
+            "name": symbol["name"] if symbol else None,
+            "line_start": symbol["line_start"] if symbol else None,
+        })
+    return rows
+
+
+def duplicates(
+    conn: sqlite3.Connection,
+    symbol_ids: list[str] | None = None,
+    after: str | None = None,
+    limit: int = 10,
+) -> list[dict]:
+    """Groups of functions with identical normalized ASTs, by fingerprint.
+
+    With symbol_ids, only groups containing one of them; otherwise every
+    group in the project.
+    """
+    if symbol_ids is None:
+        fingerprints = conn.execute(
+            "SELECT fingerprint FROM symbols "
+            "WHERE fingerprint IS NOT NULL AND fingerprint > ? "
+            "GROUP BY fingerprint HAVING COUNT(*) > 1 "
+            "ORDER BY fingerprint LIMIT ?",
+            (after or "", limit),
+        ).fetchall()
+    else:
+        fingerprints = conn.execute(
+            "SELECT DISTINCT s.fingerprint FROM symbols s "
+            "WHERE s.id IN (SELECT value FROM json_each(?)) "
+            "AND s.fingerprint IS NOT NULL AND s.fingerprint > ? "
+            "AND EXISTS (SELECT 1 FROM symbols d "
+            "WHERE d.fingerprint = s.fingerprint AND d.id != s.id) "
+            "ORDER BY s.fingerprint LIMIT ?",
+            (json.dumps(symbol_ids), after or "", limit),
+        ).fetchall()
+
+    groups = []
+    for row in fingerprints:
+        fingerprint = row["fingerprint"]
+        count = conn.execute(
+            "SELECT COUNT(*) FROM symbols WHERE fingerprint=?", (fingerprint,),
+        ).fetchone()[0]
+        members = conn.execute(
+            "SELECT id, file_path, name, line_start FROM symbols "
+            "WHERE fingerprint=? ORDER BY id LIMIT ?",
+            (fingerprint, MAX_GROUP_MEMBERS),
+        ).fetchall()
+        groups.append({
+            "fingerprint": fingerprint,
+            "count": count,
+            "symbols": [dict(m) for m in members],
+        })
+    return groups
+
+
+# ── File reachability ──
+
+MAX_REACH_DEPTH = 50
+# Fan-out limit: a walk keeps at most this many files, nearest first.
+MAX_REACHABLE = 10000
+# Walks reaching at least this many files (hub modules) are cached in
+# `reachability`; smaller ones are cheaper to redo than to store.
+REACH_CACHE_MIN = 500
+MAX_CACHED_WALKS = 64
+
+_REACH_LEVEL_SQL = {
+    "importers": """
+SELECT DISTINCT e.from_id FROM edges e
+WHERE e.to_id IN (SELECT value FROM json_each(:frontier)) AND e.edge_type = 'imports'
+""",
+    "imports": """
+SELECT DISTINCT e.to_id FROM edges e
+WHERE e.from_id IN (SELECT value FROM json_each(:frontier)) AND e.edge_type = 'imports'
+""",
+}
+
+# (known, new) pairs one import edge away, for path searches.
+_PATH_STEP_SQL = {
+    "imports": """
+SELECT from_id, to_id FROM edges
+WHERE from_id IN (SELECT value FROM json_each(:frontier)) AND edge_type = 'imports'
+ORDER BY to_id, from_id
+""",
+    "importers": """
+SELECT to_id, from_id FROM edges
+WHERE to_id IN (SELECT value FROM json_each(:frontier)) AND edge_type = 'imports'
+ORDER BY from_id, to_id
+""",
+}
+
+
+def reach_depth(depth: int | None) -> int:
+    return MAX_REACH_DEPTH if depth is None else max(1, min(int(depth), MAX_REACH_DEPTH))
+
+
+def transitive_files(
+    conn: sqlite3.Connection,
+    file_path: str,
+    direction: str,
+    depth: int | None = None,
+    after: tuple[int, str] | None = None,
+    limit: int = 10,
+) -> dict:
+    """Files reaching file_path ("importers") or reached from it ("imports").
+
+    Pages of {"path", "depth"} ordered nearest first, plus the total
+    found and whether MAX_REACHABLE cut the walk short. A file on an
+    import cycle through file_path lists itself.
+    """
+    key = (file_path, direction, reach_depth(depth))
+    # graph.db files built before the cache tables existed get none
+    # until their next scan.
+    cacheable = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='reachability_walks'"
+    ).fetchone() is not None
+    walk = cacheable and conn.execute(
+        "SELECT total, truncated FROM reachability_walks "
+        "WHERE source=? AND direction=? AND max_depth=?",
+        key,
+    ).fetchone()
+    if walk:
+        query = (
+            "SELECT member, depth FROM reachability "
+            "WHERE source=? AND direction=? AND max_depth=?"
+        )
+        params: list = list(key)
+        if after:
+            query += " AND (depth > ? OR (depth = ? AND member > ?))"
+            params.extend([after[0], after[0], after[1]])
+        rows = conn.execute(query + " ORDER BY depth, member LIMIT ?", (*params, limit))
+        return {
+            "files": [{"path": r["member"], "depth": r["depth"]} for r in rows],
+            "total": walk["total"],
+            "truncated": bool(walk["truncated"]),
+            "cached": True,
+        }
+
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    depths, truncated = _walk_levels(
+        conn, _REACH_LEVEL_SQL[direction], [file_path], key[2], MAX_REACHABLE,
+    )
+    ordered = sorted((d, f) for f, d in depths.items())
+    if cacheable and len(ordered) >= REACH_CACHE_MIN:
+        _store_walk(conn, key, ordered, truncated, version)
+    if after:
+        ordered = [k for k in ordered if k > tuple(after)]
+    return {
+        "files": [{"path": f, "depth": d} for d, f in ordered[:limit]],
+        "total": len(depths),
+        "truncated": truncated,
+        "cached": False,
+    }
+
+
+def _store_walk(
+    conn: sqlite3.Connection,
+    key: tuple[str, str, int],
+    ordered: list[tuple[int, str]],
+    truncated: bool,
+    version: int,
+) -> None:
+    """Cache a walk unless the graph changed while it ran.
+
+    data_version moves when another connection commits, so a scan that
+    landed mid-walk (and invalidated before this row existed) is seen
+    here and the possibly stale walk is dropped. A busy graph.db just
+    leaves the walk uncached rather than making the reader wait.
+    """
+    if conn.in_transaction:
+        return
+    timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError:
+        return
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(timeout)}")
+    try:
+        if conn.execute("PRAGMA data_version").fetchone()[0] != version:
+            conn.rollback()
+            return
+        _drop_walk(conn, key)
+        conn.executemany(
+            "INSERT INTO reachability (source, direction, max_depth, depth, member) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(*key, d, f) for d, f in ordered],
+        )
+        conn.execute(
+            "INSERT INTO reachability_walks "
+            "(source, direction, max_depth, total, truncated, computed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, len(ordered), int(truncated), datetime.now(timezone.utc).isoformat()),
+        )
+        evicted = conn.execute(
+            "SELECT source, direction, max_depth FROM reachability_walks "
+            "ORDER BY rowid DESC LIMIT -1 OFFSET ?",
+            (MAX_CACHED_WALKS,),
+        ).fetchall()
+        for old in evicted:
+            _drop_walk(conn, tuple(old))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+
+
+def _drop_walk(conn: sqlite3.Connection, key: tuple) -> None:
+    conn.execute(
+        "DELETE FROM reachability WHERE source=? AND direction=? AND max_depth=?", key,
+    )
+    conn.execute(
+        "DELETE FROM reachability_walks WHERE source=? AND direction=? AND max_depth=?", key,
+    )
+
+
+def invalidate_reachability(conn: sqlite3.Connection, edges: Iterable[tuple[str, str]]) -> int:
+    """Drop cached walks that an added or removed import edge can change.
+
+    Importers of X change only through an edge into X or into a file
+    already importing it; imports of X only through an edge out of X or
+    out of a file it already imports. So an edge (a, b) stales importer
+    walks that start at or contain b, and import walks that start at or
+    contain a. Returns the number of walks dropped.
+    """
+    edges = list(edges)
+    if not edges or conn.execute("SELECT 1 FROM reachability_walks LIMIT 1").fetchone() is None:
+        return 0
+    stale: set[tuple] = set()
+    for direction, files in (
+        ("importers", {b for _, b in edges}),
+        ("imports", {a for a, _ in edges}),
+    ):
+        files_json = json.dumps(sorted(files))
+        stale.update(
+            (r["source"], direction, r["max_depth"]) for r in conn.execute(
+                "SELECT DISTINCT source, max_depth FROM reachability "
+                "WHERE direction = ? AND member IN (SELECT value FROM json_each(?))",
+                (direction, files_json),
+            )
+        )
+        stale.update(
+            (r["source"], direction, r["max_depth"]) for r in conn.execute(
+                "SELECT source, max_depth FROM reachability_walks "
+                "WHERE direction = ? AND source IN (SELECT value FROM json_each(?))",
+                (direction, files_json),
+            )
+        )
+    for key in stale:
+        _drop_walk(conn, key)
+    return len(stale)
+
+
+def import_path(
+    conn: sqlite3.Connection,
+    source: str,
+    target: str,
+    depth: int | None = None,
+) -> tuple[list[str] | None, bool]:
+    """(shortest chain of imports from source to target, truncated).
+
+    Searched from both ends a level at a time, always growing the
+    smaller frontier, so a path through a hub module does not pull in
+    everything the hub reaches. The chain is at most `depth` imports
+    long; None with truncated set means the search passed
+    MAX_REACHABLE files before finding one or ruling it out.
+    """
+    if source == target:
+        return [source], False
+    # node -> neighbour one step nearer its own end (None at the ends)
+    forward: dict[str, str | None] = {source: None}
+    backward: dict[str, str | None] = {target: None}
+    fronts = {"imports": [source], "importers": [target]}
+    for _ in range(reach_depth(depth)):
+        direction = "imports" if len(fronts["imports"]) <= len(fronts["importers"]) else "importers"
+        grown, other = (forward, backward) if direction == "imports" else (backward, forward)
+        found = []
+        for known, new in _step(conn, _PATH_STEP_SQL[direction], fronts[direction]):
+            if new in grown:
+                continue
+            if len(forward) + len(backward) >= MAX_REACHABLE:
+                return None, True
+            grown[new] = known
+            found.append(new)
+        # Meeting nodes sit at different distances from the other end.
+        chains = [_join_path(f, forward, backward) for f in found if f in other]
+        if chains:
+            return min(chains, key=lambda c: (len(c), c)), False
+        if not found:
+            return None, False
+        fronts[direction] = found
+    return None, False
+
+
+def _join_path(meet: str, forward: dict, backward: dict) -> list[str]:
+    head = []
+    node = meet
+    while node is not None:
+        head.append(node)
+        node = forward[node]
+    tail = []
+    node = backward[meet]
+    while node is not None:
+        tail.append(node)
+        node = backward[node]
+    return head[::-1] + tail
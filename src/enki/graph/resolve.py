@@ -0,0 +1,275 @@
+"""resolve.py — Per-scan module index for turning raw imports into files.
+
+Built once per link pass from the scanned file set, so resolving an
+import is a dictionary lookup rather than a probe per extension:
+
+- relative JS/TS specifiers ("./util", "../lib/index.js") via an
+  extensionless path map
+- tsconfig.json / jsconfig.json `paths` aliases and `baseUrl`, using
+  the config nearest to the importing file
+- Python dotted modules ("enki.db") relative to the package root each
+  file sits under, plus relative imports ("..graph.scanner")
+- Go import paths under a `go.mod` module prefix; a Go import names a
+  package, so it resolves to every non-test file in that directory
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+# Probe order for extensionless JS/TS specifiers; earlier wins.
+_JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs")
+_JS_INDEX_FILES = ("index.ts", "index.tsx", "index.js", "index.jsx", "index.mjs")
+_TS_CONFIG_NAMES = ("tsconfig.json", "jsconfig.json")
+
+# JSON with comments and trailing commas, as tsconfig allows.
+_JSONC_TOKEN = re.compile(
+    r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.DOTALL,
+)
+
+
+def _load_jsonc(text: str) -> dict:
+    cleaned = _JSONC_TOKEN.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "", text)
+    data = json.loads(cleaned)
+    return data if isinstance(data, dict) else {}
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+@dataclass
+class _TsConfig:
+    base_url: str | None  # project-relative, None when unset
+    paths_base: str
+    patterns: list[tuple[str, str, list[str]]]  # (prefix, suffix, targets), longest prefix first
+
+
+@dataclass
+class ModuleIndex:
+    """Lookup tables for one scan's file set."""
+
+    project_path: str
+    js_paths: dict[str, str] = field(default_factory=dict)
+    py_paths: dict[str, str] = field(default_factory=dict)
+    py_modules: dict[str, list[str]] = field(default_factory=dict)
+    ts_configs: dict[str, _TsConfig] = field(default_factory=dict)
+    go_modules: list[tuple[str, str]] = field(default_factory=list)  # (module path, root dir)
+    go_packages: dict[str, list[str]] = field(default_factory=dict)
+    fingerprint: str = ""  # changes when any tsconfig or go.mod does
+
+    @classmethod
+    def build(cls, all_files: Iterable[str], project_path: str) -> "ModuleIndex":
+        index = cls(project_path=project_path)
+        js_rank: dict[str, tuple[int, str]] = {}
+        dirs: set[str] = set()
+        py_files = set()
+
+        for path in all_files:
+            if os.sep != "/":
+                path = path.replace(os.sep, "/")
+            # Plain string ops: this runs once per file on every link pass.
+            directory, _, name = path.rpartition("/")
+            dirs.add(directory)
+            dot = name.rfind(".")
+            ext = name[dot:] if dot > 0 else ""
+            stem = path[:len(path) - len(ext)]
+            if ext in _JS_EXTENSIONS:
+                index._rank_js(js_rank, path, path, -1)
+                index._rank_js(js_rank, stem, path, _JS_EXTENSIONS.index(ext))
+                if name in _JS_INDEX_FILES:
+                    rank = len(_JS_EXTENSIONS) + _JS_INDEX_FILES.index(name)
+                    index._rank_js(js_rank, directory, path, rank)
+            elif ext == ".py":
+                py_files.add(path)
+            elif ext == ".go" and not name.endswith("_test.go"):
+                index.go_packages.setdefault(directory, []).append(path)
+
+        for path in py_files:
+            index._add_python(path, py_files)
+        for files in index.go_packages.values():
+            files.sort()
+        for candidates in index.py_modules.values():
+            candidates.sort()
+
+        # Every ancestor of a scanned directory may hold a config.
+        ancestors = set()
+        for directory in dirs:
+            while directory not in ancestors:
+                ancestors.add(directory)
+                if not directory:
+                    break
+                directory = posixpath.dirname(directory)
+
+        digest = hashlib.sha256()
+        for directory in sorted(ancestors):
+            for config_name in _TS_CONFIG_NAMES:
+                rel = posixpath.join(directory, config_name)
+                text = _read(os.path.join(project_path, rel))
+                if text is not None:
+                    digest.update(rel.encode() + b"\0" + text.encode())
+                    config = index._load_ts_config(directory, rel)
+                    if config is not None:
+                        index.ts_configs.setdefault(directory, config)
+            rel = posixpath.join(directory, "go.mod")
+            text = _read(os.path.join(project_path, rel))
+            if text is not None:
+                digest.update(rel.encode() + b"\0" + text.encode())
+                match = re.search(r"^\s*module\s+(\S+)", text, re.MULTILINE)
+                if match:
+                    index.go_modules.append((match.group(1).strip('"'), directory))
+        # Longest module path first, so nested modules win.
+        index.go_modules.sort(key=lambda m: len(m[0]), reverse=True)
+        index.fingerprint = digest.hexdigest()
+        return index
+
+    # ── Building ──
+
+    def _rank_js(self, ranks: dict[str, tuple[int, str]], key: str, path: str, rank: int) -> None:
+        best = ranks.get(key)
+        if best is None or (rank, path) < best:
+            ranks[key] = (rank, path)
+            self.js_paths[key] = path
+
+    def _add_python(self, path: str, py_files: set[str]) -> None:
+        stem = path[:-3]
+        parts = stem.split("/")
+        if parts[-1] == "__init__":
+            parts.pop()
+            self.py_paths[posixpath.dirname(path)] = path
+        else:
+            self.py_paths.setdefault(stem, path)
+        # The package root is the first ancestor without an __init__.py.
+        root = len(parts) - 1
+        while root > 0 and "/".join(parts[:root]) + "/__init__.py" in py_files:
+            root -= 1
+        names = {".".join(parts[root:]), ".".join(parts)}
+        for name in names:
+            if name:
+                self.py_modules.setdefault(name, []).append(path)
+
+    def _load_ts_config(self, directory: str, rel: str, depth: int = 0) -> _TsConfig | None:
+        try:
+            data = _load_jsonc(_read(os.path.join(self.project_path, rel)) or "{}")
+        except ValueError:
+            return None
+        options = dict(data.get("compilerOptions") or {})
+        parent = data.get("extends")
+        if isinstance(parent, str) and parent.startswith(".") and depth < 5:
+            parent_rel = posixpath.normpath(posixpath.join(directory, parent))
+            if not parent_rel.endswith(".json"):
+                parent_rel += ".json"
+            inherited = self._load_ts_config(posixpath.dirname(parent_rel), parent_rel, depth + 1)
+            if inherited is not None:
+                if "baseUrl" not in options and inherited.base_url is not None:
+                    options["baseUrl"] = posixpath.relpath(inherited.base_url or ".", directory or ".")
+                if "paths" not in options and inherited.patterns:
+                    return _TsConfig(
+                        base_url=self._config_dir(directory, options.get("baseUrl")),
+                        paths_base=inherited.paths_base,
+                        patterns=inherited.patterns,
+                    )
+
+        base_url = self._config_dir(directory, options.get("baseUrl"))
+        patterns = []
+        for pattern, targets in (options.get("paths") or {}).items():
+            if not isinstance(targets, list):
+                continue
+            prefix, star, suffix = pattern.partition("*")
+            patterns.append((prefix, suffix if star else None, [t for t in targets if isinstance(t, str)]))
+        patterns.sort(key=lambda p: len(p[0]), reverse=True)
+        return _TsConfig(
+            base_url=base_url,
+            paths_base=base_url if base_url is not None else directory,
+            patterns=patterns,
+        )
+
+    @staticmethod
+    def _config_dir(directory: str, value) -> str | None:
+        if not isinstance(value, str):
+            return None
+        joined = posixpath.normpath(posixpath.join(directory, value))
+        return "" if joined == "." else joined
+
+    # ── Lookup ──
+
+    def resolve(self, raw: str, from_file: str) -> list[str]:
+        """Files an import statement in from_file refers to ([] if external)."""
+        from_file = from_file.replace(os.sep, "/")
+        ext = posixpath.splitext(from_file)[1]
+        if ext == ".py":
+            found = self._resolve_python(raw, from_file)
+        elif ext == ".go":
+            return self._resolve_go(raw)
+        elif raw.startswith("."):
+            found = self._js_path(posixpath.join(posixpath.dirname(from_file), raw))
+        else:
+            found = self._resolve_ts_alias(raw, from_file)
+        return [found] if found and found != from_file else []
+
+    def _js_path(self, candidate: str) -> str | None:
+        candidate = posixpath.normpath(candidate)
+        return self.js_paths.get("" if candidate == "." else candidate)
+
+    def _resolve_python(self, raw: str, from_file: str) -> str | None:
+        if not raw.startswith("."):
+            candidates = self.py_modules.get(raw)
+            if not candidates:
+                return None
+            if len(candidates) == 1:
+                return candidates[0]
+            # Same module name in several roots: prefer the importer's tree.
+            return max(candidates, key=lambda c: len(posixpath.commonprefix([c, from_file])))
+        rest = raw.lstrip(".")
+        directory = posixpath.dirname(from_file)
+        for _ in range(len(raw) - len(rest) - 1):
+            if not directory:
+                return None
+            directory = posixpath.dirname(directory)
+        target = posixpath.join(directory, rest.replace(".", "/")) if rest else directory
+        return self.py_paths.get(target)
+
+    def _resolve_ts_alias(self, raw: str, from_file: str) -> str | None:
+        config = self._nearest_ts_config(posixpath.dirname(from_file))
+        if config is None:
+            return None
+        for prefix, suffix, targets in config.patterns:
+            if suffix is None:
+                if raw != prefix:
+                    continue
+                captured = ""
+            elif raw.startswith(prefix) and raw.endswith(suffix) and len(raw) >= len(prefix) + len(suffix):
+                captured = raw[len(prefix):len(raw) - len(suffix)]
+            else:
+                continue
+            for target in targets:
+                found = self._js_path(posixpath.join(config.paths_base, target.replace("*", captured)))
+                if found:
+                    return found
+            return None
+        if config.base_url is not None:
+            return self._js_path(posixpath.join(config.base_url, raw))
+        return None
+
+    def _nearest_ts_config(self, directory: str) -> _TsConfig | None:
+        while True:
+            config = self.ts_configs.get(directory)
+            if config is not None or not directory:
+                return config
+            directory = posixpath.dirname(directory)
+
+    def _resolve_go(self, raw: str) -> list[str]:
+        for module, root in self.go_modules:
+            if raw == module:
+                return self.go_packages.get(root, [])
+            if raw.startswith(module + "/"):
+                return self.go_packages.get(posixpath.join(root, raw[len(module) + 1:]), [])
+        return []
@@ -1,13 +1,31 @@
 """4-pass codebase scanner: discovery -> parse -> link -> enrich."""
 
 import hashlib
+import multiprocessing
 import os
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-
-from enki.db import graph_db
-from enki.graph.languages import detect_language, is_source_file
-from enki.graph.schema import create_graph_tables
+from itertools import chain, islice
+
+from enki.db import graph_db, graph_db_path
+from enki.graph.blast import (
+    graph_importer_counts,
+    imported_closure_sql,
+    importer_counts_sql,
+    importer_graph,
+)
+from enki.graph.discovery import FileEntry, iter_files
+from enki.graph.hotspots import materialize_hotspots
+from enki.graph.languages import detect_language
+from enki.graph.queries import invalidate_reachability
+from enki.graph.resolve import ModuleIndex
+from enki.graph.schema import bump_generation, create_graph_indexes, create_graph_tables
 
 
 def _now() -> str:
@@ -16,120 +34,274 @@ def _now() -> str:
 
 # -- Pass 1: Discovery -------------------------------------------------------
 
-def discover_files(project_path: str) -> list[dict]:
-    """Walk project directory and collect all source files."""
-    files = []
-    for root, dirs, filenames in os.walk(project_path):
-        dirs[:] = [
-            d for d in dirs
-            if d not in {
-                "node_modules", ".git", "__pycache__", ".venv", "venv",
-                "dist", "build", ".next", ".cache", "coverage",
-                ".worktrees", ".enki",
+def discover_files(
+    project_path: str,
+    entries: Iterable[FileEntry] | None = None,
+) -> list[dict]:
+    """Source files to scan, from a .gitignore-aware discovery pass.
+
+    `entries` reuses a discovery.discover() result already made for
+    this run instead of listing the project again.
+    """
+    return list(iter_source_files(project_path, entries))
+
+
+def iter_source_files(
+    project_path: str,
+    entries: Iterable[FileEntry] | None = None,
+) -> Iterator[dict]:
+    """Stream discover_files() one file at a time."""
+    if entries is None:
+        entries = iter_files(project_path)
+    for entry in entries:
+        language = detect_language(entry.path)
+        if language:
+            yield {
+                "path": entry.path,
+                "full_path": entry.full_path,
+                "language": language,
+                "size_bytes": entry.size_bytes,
+                "mtime_ns": entry.mtime_ns,
             }
-        ]
-        for filename in filenames:
-            full_path = os.path.join(root, filename)
-            rel_path = os.path.relpath(full_path, project_path)
-            if not is_source_file(rel_path):
-                continue
-            try:
-                stat = os.stat(full_path)
-                files.append({
-                    "path": rel_path,
-                    "full_path": full_path,
-                    "language": detect_language(rel_path),
-                    "size_bytes": stat.st_size,
-                    "last_modified": datetime.fromtimestamp(
-                        stat.st_mtime, tz=timezone.utc
-                    ).isoformat(),
-                })
-            except OSError:
-                continue
-    return files
 
 
 # -- Pass 2: Parse -----------------------------------------------------------
 
-def parse_file(file_info: dict) -> list[dict]:
-    """Extract symbols from a source file using tree-sitter."""
-    symbols = []
+SYMBOL_NODE_TYPES: dict[str, set[str]] = {
+    "typescript": {
+        "function_declaration", "method_definition", "arrow_function",
+        "class_declaration", "interface_declaration", "type_alias_declaration",
+        "export_statement", "variable_declarator",
+    },
+    "python": {
+        "function_definition", "async_function_definition",
+        "class_definition", "decorated_definition",
+    },
+    "javascript": {
+        "function_declaration", "method_definition", "arrow_function",
+        "class_declaration", "variable_declarator",
+    },
+    "go": {
+        "function_declaration", "method_declaration",
+        "type_declaration", "interface_type",
+    },
+    "rust": {
+        "function_item", "impl_item", "struct_item",
+        "trait_item", "enum_item", "type_item",
+    },
+    "java": {
+        "method_declaration", "class_declaration",
+        "interface_declaration", "constructor_declaration",
+    },
+}
+
+IMPORT_NODE_TYPES: dict[str, set[str]] = {
+    "typescript": {"import_statement", "import_declaration"},
+    "python": {"import_statement", "import_from_statement"},
+    "javascript": {"import_statement", "import_declaration"},
+    "go": {"import_declaration", "import_spec"},
+    "rust": {"use_declaration"},
+    "java": {"import_declaration"},
+}
+
+DECISION_NODE_TYPES = {
+    "if_statement", "elif_clause", "else_clause",
+    "for_statement", "while_statement", "do_statement",
+    "switch_statement", "case_clause",
+    "ternary_expression", "conditional_expression",
+    "catch_clause", "try_statement",
+    "&&", "||", "and", "or",
+}
+
+CALL_NODE_TYPES: dict[str, set[str]] = {
+    "typescript": {"call_expression", "new_expression"},
+    "python": {"call"},
+    "javascript": {"call_expression", "new_expression"},
+    "go": {"call_expression"},
+    "rust": {"call_expression"},
+    "java": {"method_invocation", "object_creation_expression"},
+}
+
+# Callee node -> (receiver field, name field) for qualified calls.
+_CALLEE_FIELDS = {
+    "attribute": ("object", "attribute"),
+    "member_expression": ("object", "property"),
+    "selector_expression": ("operand", "field"),
+    "field_expression": ("value", "field"),
+    "scoped_identifier": ("path", "name"),
+}
+_NAME_TYPES = {
+    "identifier", "type_identifier", "property_identifier",
+    "field_identifier", "package_identifier",
+}
+_RECEIVER_TYPES = _NAME_TYPES | {"self", "this", "super"}
+
+# Symbols fingerprinted for duplicate detection, and the smallest body
+# (in AST nodes) worth reporting; below it every getter looks alike.
+FINGERPRINT_KINDS = {"function", "method", "constructor"}
+MIN_FINGERPRINT_NODES = 50
+_FINGERPRINT_SKIP_TYPES = {"comment", "line_comment", "block_comment"}
+
+_IMPORT_TARGET_TYPES = {
+    "string", "dotted_name", "scoped_identifier",
+    "interpreted_string_literal",  # Go
+}
+
+# Parsers are cached per thread: the MCP server can run scans from more
+# than one worker thread, and a tree-sitter Parser is not thread-safe.
+_parsers = threading.local()
+
+
+def get_parser(language: str):
+    """Cached tree-sitter parser for a language (one per thread)."""
+    cache = getattr(_parsers, "by_language", None)
+    if cache is None:
+        cache = _parsers.by_language = {}
+    parser = cache.get(language)
+    if parser is None:
+        from tree_sitter_languages import get_parser as _new_parser
+
+        parser = cache[language] = _new_parser(language)
+    return parser
+
+
+def extract_file(file_info: dict) -> tuple[list[dict], list[dict]]:
+    """Read, parse and walk a file once; return (symbols, raw import edges).
+
+    Import edges are unresolved: to_id is the raw import string.
+    """
     language = file_info.get("language")
     if not language:
-        return symbols
+        return [], []
 
     try:
-        from tree_sitter_languages import get_parser
-
-        parser = get_parser(language)
         with open(file_info["full_path"], "rb") as f:
             source = f.read()
+    except OSError:
+        return [], []
+    return extract_source(source, file_info["path"], language)
 
-        tree = parser.parse(source)
-        symbols = _extract_symbols(
-            tree.root_node, source, file_info["path"], language
-        )
+
+def extract_source(source: bytes, file_path: str, language: str) -> tuple[list[dict], list[dict]]:
+    """Parse already-read file bytes; see extract_file."""
+    return _extract(source, file_path, language)[:2]
+
+
+def _extract(source: bytes, file_path: str, language: str) -> tuple[list[dict], list[dict], list[dict]]:
+    try:
+        tree = get_parser(language).parse(source)
+        return _walk_tree(tree.root_node, source, file_path, language)
     except Exception:
-        pass
-
-    return symbols
-
-
-def _extract_symbols(node, source: bytes, file_path: str, language: str) -> list[dict]:
-    """Walk AST and extract named symbols."""
-    symbols = []
-
-    extractable = {
-        "typescript": {
-            "function_declaration", "method_definition", "arrow_function",
-            "class_declaration", "interface_declaration", "type_alias_declaration",
-            "export_statement", "variable_declarator",
-        },
-        "python": {
-            "function_definition", "async_function_definition",
-            "class_definition", "decorated_definition",
-        },
-        "javascript": {
-            "function_declaration", "method_definition", "arrow_function",
-            "class_declaration", "variable_declarator",
-        },
-        "go": {
-            "function_declaration", "method_declaration",
-            "type_declaration", "interface_type",
-        },
-        "rust": {
-            "function_item", "impl_item", "struct_item",
-            "trait_item", "enum_item", "type_item",
-        },
-        "java": {
-            "method_declaration", "class_declaration",
-            "interface_declaration", "constructor_declaration",
-        },
-    }
+        return [], [], []
 
-    target_types = extractable.get(language, set())
 
-    def walk(n):
-        if n.type in target_types:
+def parse_file(file_info: dict) -> list[dict]:
+    """Extract symbols from a source file using tree-sitter."""
+    return extract_file(file_info)[0]
+
+
+def _walk_tree(
+    root, source: bytes, file_path: str, language: str,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """Single walk emitting symbols, import edges and call sites.
+
+    Complexity is the decision-node count of a symbol's subtree, so it is
+    accumulated bottom-up; symbols are appended pre-order to keep the
+    order the separate symbol walk produced. Node types are recorded
+    pre-order as well, so a function's normalized AST (names and
+    literals reduced to their node type) is a slice of that list.
+    """
+    symbols: list[dict] = []
+    edges: list[dict] = []
+    calls: dict[tuple, dict] = {}
+    node_types: list[str] = []
+    symbol_types = SYMBOL_NODE_TYPES.get(language, set())
+    import_types = IMPORT_NODE_TYPES.get(language, set())
+    call_types = CALL_NODE_TYPES.get(language, set())
+
+    record = node_types.append
+
+    def walk(n, caller: str) -> int:
+        node_type = n.type  # a property that allocates; read it once
+        if node_type not in _FINGERPRINT_SKIP_TYPES:
+            record(node_type)
+        symbol = None
+        if node_type in symbol_types:
             name = _extract_name(n, source)
             if name:
-                symbol_id = f"{file_path}::{name}::{n.start_point[0]}"
-                symbols.append({
-                    "id": symbol_id,
+                symbol = {
+                    "id": f"{file_path}::{name}::{n.start_point[0]}",
                     "file_path": file_path,
                     "name": name,
-                    "kind": _classify_kind(n.type, language),
+                    "kind": _classify_kind(node_type, language),
                     "line_start": n.start_point[0],
                     "line_end": n.end_point[0],
                     "signature": _extract_signature(n, source),
-                    "complexity": _compute_complexity(n),
-                    "is_exported": _is_exported(n, source, language),
-                })
+                    "complexity": 1,
+                    "is_exported": _is_exported(n, source, language, name),
+                    "fingerprint": None,
+                }
+                symbols.append(symbol)
+                caller = symbol["id"]
+                first_node = len(node_types) - 1
+        if node_type in import_types:
+            _append_import_edges(n, source, file_path, edges)
+        elif node_type in call_types:
+            callee, qualifier = _call_target(n, source)
+            # One row per distinct call from a caller; first line wins.
+            if callee and (caller, callee, qualifier) not in calls:
+                calls[(caller, callee, qualifier)] = {
+                    "caller_id": caller,
+                    "callee": callee,
+                    "qualifier": qualifier,
+                    "line_number": n.start_point[0],
+                }
+
+        decisions = 1 if node_type in DECISION_NODE_TYPES else 0
         for child in n.children:
-            walk(child)
-
-    walk(node)
-    return symbols
+            decisions += walk(child, caller)
+        if symbol is not None:
+            symbol["complexity"] = 1 + decisions
+            if (
+                symbol["kind"] in FINGERPRINT_KINDS
+                and len(node_types) - first_node >= MIN_FINGERPRINT_NODES
+            ):
+                symbol["fingerprint"] = hashlib.sha1(
+                    "\n".join(node_types[first_node:]).encode()
+                ).hexdigest()
+        return decisions
+
+    walk(root, file_path)
+    return symbols, edges, list(calls.values())
+
+
+def _call_target(node, source: bytes) -> tuple[str | None, str | None]:
+    """(called name, plain receiver name or None) for a call node."""
+    if node.type == "method_invocation":
+        name = node.child_by_field_name("name")
+        receiver = node.child_by_field_name("object")
+    else:
+        callee = (
+            node.child_by_field_name("function")
+            or node.child_by_field_name("constructor")
+            or node.child_by_field_name("type")
+        )
+        if callee is None:
+            return None, None
+        if callee.type in _NAME_TYPES:
+            return _node_text(callee, source), None
+        fields = _CALLEE_FIELDS.get(callee.type)
+        if fields is None:
+            return None, None
+        receiver = callee.child_by_field_name(fields[0])
+        name = callee.child_by_field_name(fields[1])
+    if name is None or name.type not in _NAME_TYPES:
+        return None, None
+    qualifier = None
+    if receiver is not None:
+        # Chained or computed receivers cannot be resolved by name.
+        qualifier = _node_text(receiver, source) if receiver.type in _RECEIVER_TYPES else "?"
+    return _node_text(name, source), qualifier
 
 
 def _extract_name(node, source: bytes) -> str | None:
@@ -176,36 +348,14 @@ def _extract_signature(node, source: bytes) -> str:
     return sig.split("\n")[0].strip()[:200]
 
 
-def _compute_complexity(node) -> int:
-    """Approximate cyclomatic complexity by counting decision nodes."""
-    decision_types = {
-        "if_statement", "elif_clause", "else_clause",
-        "for_statement", "while_statement", "do_statement",
-        "switch_statement", "case_clause",
-        "ternary_expression", "conditional_expression",
-        "catch_clause", "try_statement",
-        "&&", "||", "and", "or",
-    }
-    count = 1
-
-    def walk(n):
-        nonlocal count
-        if n.type in decision_types:
-            count += 1
-        for child in n.children:
-            walk(child)
-
-    walk(node)
-    return count
-
-
-def _is_exported(node, source: bytes, language: str) -> int:
+def _is_exported(node, source: bytes, language: str, name: str | None = None) -> int:
     """Check if symbol is exported/public."""
     if language in ("typescript", "javascript"):
         sig = source[node.start_byte:min(node.start_byte + 20, node.end_byte)]
         return 1 if b"export" in sig else 0
     if language == "python":
-        name = _extract_name(node, source) or ""
+        if name is None:
+            name = _extract_name(node, source) or ""
         return 0 if name.startswith("_") else 1
     if language in ("java", "kotlin"):
         sig = source[node.start_byte:min(node.start_byte + 30, node.end_byte)]
@@ -217,352 +367,1085 @@ def _is_exported(node, source: bytes, language: str) -> int:
 
 def extract_imports(file_info: dict) -> list[dict]:
     """Extract import/require statements from a file."""
-    imports = []
-    language = file_info.get("language")
-    if not language:
-        return imports
+    return extract_file(file_info)[1]
+
+
+def _append_import_edges(node, source: bytes, file_path: str, edges: list[dict]) -> None:
+    """Emit an edge per import target directly under an import node.
+
+    Names pulled from a Python module are qualified with it
+    ("from pkg import util" -> "pkg", "pkg.util") so a submodule import
+    can resolve to its own file; aliased imports use the real name.
+    """
+    module = None
+    for child in node.children:
+        if child.type == "aliased_import":
+            child = child.child_by_field_name("name") or child.children[0]
+        if child.type == "relative_import":
+            raw = _node_text(child, source)
+        elif child.type in _IMPORT_TARGET_TYPES:
+            raw = _node_text(child, source).strip("\"'`")
+        else:
+            continue
+        if node.type == "import_from_statement":
+            if module is None:
+                module = raw
+            else:
+                raw = module + ("" if module.endswith(".") else ".") + raw
+        edge_id = hashlib.md5(
+            f"{file_path}::imports::{raw}".encode()
+        ).hexdigest()
+        edges.append({
+            "id": edge_id,
+            "from_id": file_path,
+            "to_id": raw,
+            "edge_type": "imports",
+            "line_number": node.start_point[0],
+        })
+
+
+def _node_text(node, source: bytes) -> str:
+    return source[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+
+
+def resolve_import_path(import_raw: str, from_file: str, all_files: set[str], project_path: str) -> str | None:
+    """Resolve a raw import string to a project-relative file path.
+
+    Builds a ModuleIndex per call; to resolve many imports, build one
+    with ModuleIndex.build and call its resolve().
+    """
+    found = ModuleIndex.build(all_files, project_path).resolve(import_raw, from_file)
+    return found[0] if found else None
+
 
+# -- Parallel parse ----------------------------------------------------------
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Chunks queued per worker: enough to keep every worker busy while the
+# writer drains results, few enough that a huge scan holds only a
+# bounded window of files and parse results in memory.
+_CHUNKS_PER_WORKER = 2
+
+
+def scan_settings(workers: int | None = None, chunk_size: int | None = None) -> tuple[int, int]:
+    """Resolve worker count and chunk size from arguments or [graph] config."""
+    from enki.config import get_config
+
+    cfg = get_config().get("graph", {})
+    if workers is None:
+        workers = int(cfg.get("scan_workers", 0))
+    if workers <= 0:
+        workers = min(8, os.cpu_count() or 1)
+    if chunk_size is None:
+        chunk_size = int(cfg.get("scan_chunk_size", DEFAULT_CHUNK_SIZE))
+    return workers, max(1, chunk_size)
+
+
+def hash_file(full_path: str) -> str | None:
+    """sha256 of a file's bytes, or None if it cannot be read."""
     try:
-        from tree_sitter_languages import get_parser
+        with open(full_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
 
-        parser = get_parser(language)
+
+def _scan_file(file_info: dict) -> dict:
+    """Parse one file: content hash, symbols, unresolved imports and calls."""
+    result = {
+        "path": file_info["path"], "content_hash": None,
+        "symbols": [], "imports": [], "calls": [],
+    }
+    try:
         with open(file_info["full_path"], "rb") as f:
             source = f.read()
-        tree = parser.parse(source)
-        imports = _extract_import_edges(
-            tree.root_node, source, file_info["path"], language
+    except OSError:
+        return result
+    result["content_hash"] = hashlib.sha256(source).hexdigest()
+    if file_info.get("language"):
+        result["symbols"], result["imports"], result["calls"] = _extract(
+            source, file_info["path"], file_info["language"]
         )
-    except Exception:
-        pass
+    return result
 
-    return imports
 
+def _scan_chunk(chunk: list[dict]) -> list[dict]:
+    """Worker entry point: scan a batch of files in one round trip."""
+    return [_scan_file(file_info) for file_info in chunk]
 
-def _extract_import_edges(node, source: bytes, file_path: str, language: str) -> list[dict]:
-    """Extract import edges from AST."""
-    edges = []
-    import_types = {
-        "typescript": {"import_statement", "import_declaration"},
-        "python": {"import_statement", "import_from_statement"},
-        "javascript": {"import_statement", "import_declaration"},
-        "go": {"import_declaration", "import_spec"},
-        "rust": {"use_declaration"},
-        "java": {"import_declaration"},
-    }
-    target_types = import_types.get(language, set())
-
-    def walk(n):
-        if n.type in target_types:
-            for child in n.children:
-                if child.type in {"string", "dotted_name", "scoped_identifier"}:
-                    raw = source[child.start_byte:child.end_byte].decode(
-                        "utf-8", errors="replace"
-                    ).strip("\"'")
-                    edge_id = hashlib.md5(
-                        f"{file_path}::imports::{raw}".encode()
-                    ).hexdigest()
-                    edges.append({
-                        "id": edge_id,
-                        "from_id": file_path,
-                        "to_id": raw,
-                        "edge_type": "imports",
-                        "line_number": n.start_point[0],
-                    })
-        for child in n.children:
-            walk(child)
 
-    walk(node)
-    return edges
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
 
 
-def resolve_import_path(import_raw: str, from_file: str, all_files: set[str], project_path: str) -> str | None:
-    """Resolve a raw import string to a project-relative file path."""
-    _ = project_path
-    if not import_raw.startswith("."):
-        return None
+def parse_files(
+    files: Iterable[dict], workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """Yield per-file scan results in input order.
 
-    from_dir = os.path.dirname(from_file)
-    candidate = os.path.normpath(os.path.join(from_dir, import_raw))
+    With workers > 1 the files are parsed in a process pool (tree-sitter
+    holds the GIL), chunk_size files per task. Results come back in the
+    same order as the serial scan so the caller's writes are identical.
+    Spawned rather than forked: the MCP server calls this from worker
+    threads, and forking a threaded process is unsafe.
 
-    for ext in [".ts", ".tsx", ".js", ".jsx", ".py", ".go", ".rs"]:
-        candidate_with_ext = candidate + ext
-        if candidate_with_ext in all_files:
-            return candidate_with_ext
+    `files` may be a generator. It is read only as far as the chunks in
+    flight (_CHUNKS_PER_WORKER per worker), so memory stays flat however
+    many files a scan covers.
+    """
+    if workers <= 1:
+        for file_info in files:
+            yield _scan_file(file_info)
+        return
 
-    for index in ["index.ts", "index.js", "__init__.py", "mod.rs"]:
-        candidate_index = os.path.join(candidate, index)
-        if candidate_index in all_files:
-            return candidate_index
+    chunks = _chunks(files, chunk_size)
+    head = list(islice(chunks, 2))
+    if len(head) < 2:
+        for chunk in head:
+            yield from _scan_chunk(chunk)
+        return
 
-    return None
+    window = workers * _CHUNKS_PER_WORKER
+    pending: deque = deque()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for chunk in chain(head, chunks):
+            pending.append(pool.submit(_scan_chunk, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 # -- Pass 4: Enrich ----------------------------------------------------------
 
-def compute_blast_radius(project: str, conn: sqlite3.Connection) -> None:
-    """Compute blast radius for all exported symbols."""
+def _blast_row(symbol_id: str, file_path: str, direct: int, transitive: int,
+               total_files: int, now: str) -> tuple:
+    blast_score = min(1.0, transitive / max(total_files * 0.1, 1))
+    risk_level = (
+        "critical" if blast_score >= 0.8 else
+        "high" if blast_score >= 0.5 else
+        "medium" if blast_score >= 0.2 else
+        "low"
+    )
+    return (symbol_id, file_path, direct, transitive, blast_score, risk_level, now)
+
+
+# Incremental updates touching at most this many files count importers
+# with per-file SQL walks instead of loading the whole graph.
+_SQL_BLAST_LIMIT = 64
+
+
+def compute_blast_radius(
+    project: str,
+    conn: sqlite3.Connection,
+    files: set[str] | None = None,
+    edge_targets: set[str] | None = None,
+) -> None:
+    """Compute blast radius for exported symbols.
+
+    Transitive importer counts are computed once per file (see
+    enki.graph.blast). With no arguments every row is rebuilt. Otherwise
+    only `files` (whose symbols changed) and `edge_targets` (targets of
+    added or removed import edges) plus everything those targets
+    transitively import are recomputed; no other file's importer set can
+    have changed. Callers must do a full pass when the file count
+    changed, since every score is normalized by it.
+    """
     _ = project
-    edges = conn.execute(
-        "SELECT from_id, to_id, edge_type FROM edges WHERE edge_type='imports'"
-    ).fetchall()
-
-    importers: dict[str, set[str]] = {}
-    for edge in edges:
-        to_file = edge["to_id"]
-        from_file = edge["from_id"]
-        if to_file not in importers:
-            importers[to_file] = set()
-        importers[to_file].add(from_file)
-
     total_files = conn.execute("SELECT COUNT(*) as c FROM files").fetchone()["c"]
     if total_files == 0:
         return
 
-    symbols = conn.execute(
-        "SELECT id, file_path FROM symbols WHERE is_exported=1"
-    ).fetchall()
-
-    for symbol in symbols:
-        file_path = symbol["file_path"]
-        direct = len(importers.get(file_path, set()))
-
-        visited: set[str] = set()
-        queue = list(importers.get(file_path, set()))
-        while queue:
-            current = queue.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            queue.extend(importers.get(current, set()) - visited)
-        transitive = len(visited)
-
-        blast_score = min(1.0, transitive / max(total_files * 0.1, 1))
-        risk_level = (
-            "critical" if blast_score >= 0.8 else
-            "high" if blast_score >= 0.5 else
-            "medium" if blast_score >= 0.2 else
-            "low"
+    full = files is None and edge_targets is None
+    if full:
+        symbol_files = None
+    else:
+        affected = set(files or ()) | imported_closure_sql(conn, edge_targets or ())
+        symbols = []
+        for file_path in affected:
+            symbols.extend(conn.execute(
+                "SELECT id, file_path FROM symbols WHERE file_path=? AND is_exported=1",
+                (file_path,),
+            ).fetchall())
+        symbol_files = {s["file_path"] for s in symbols}
+
+    if symbol_files is not None and len(symbol_files) <= _SQL_BLAST_LIMIT:
+        counts = {f: importer_counts_sql(conn, f) for f in symbol_files}
+    else:
+        # Paths interned to ints in two flat arrays (see enki.graph.blast).
+        graph = importer_graph(
+            (e["from_id"], e["to_id"]) for e in conn.execute(
+                "SELECT from_id, to_id FROM edges WHERE edge_type='imports'"
+            )
+        )
+        transitive = graph_importer_counts(graph, symbol_files)
+        counts = {
+            path: (graph.direct(graph.ids[path]), total) for path, total in transitive.items()
+        }
+
+    now = _now()
+    insert = (
+        "INSERT OR REPLACE INTO blast_radius "
+        "(symbol_id, file_path, direct_importers, transitive_importers, "
+        "blast_score, risk_level, last_computed) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+    if full:
+        conn.execute("DELETE FROM blast_radius")
+        # Streamed: one row per exported symbol, written in batches.
+        rows = []
+        for s in conn.execute("SELECT id, file_path FROM symbols WHERE is_exported=1"):
+            rows.append(
+                _blast_row(s[0], s[1], *counts.get(s[1], (0, 0)), total_files, now)
+            )
+            if len(rows) >= _BULK_BATCH_ROWS:
+                conn.executemany(insert, rows)
+                rows = []
+        conn.executemany(insert, rows)
+    else:
+        conn.executemany(
+            "DELETE FROM blast_radius WHERE file_path=?", [(f,) for f in affected]
+        )
+        conn.executemany(insert, [
+            _blast_row(s["id"], s["file_path"], *counts.get(s["file_path"], (0, 0)),
+                       total_files, now)
+            for s in symbols
+        ])
+    conn.commit()
+
+
+# -- Scan locks --------------------------------------------------------------
+
+# Full and incremental scans of one graph never interleave (MCP tool
+# calls, the file watcher). Re-entrant: an incremental scan with no
+# baseline falls through to a full scan.
+_scan_locks: dict[tuple[str, str | None], threading.RLock] = {}
+_scan_locks_guard = threading.Lock()
+
+
+def scan_lock(project: str, graph: str | None = None) -> threading.RLock:
+    with _scan_locks_guard:
+        return _scan_locks.setdefault((project, graph), threading.RLock())
+
+
+# -- Writers -----------------------------------------------------------------
+
+_UPSERT_FILE = (
+    "INSERT INTO files (path, language, size_bytes, last_modified, mtime_ns, last_scanned) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(path) DO UPDATE SET language=excluded.language, "
+    "size_bytes=excluded.size_bytes, last_modified=excluded.last_modified, "
+    "mtime_ns=excluded.mtime_ns, last_scanned=excluded.last_scanned"
+)
+
+
+# A file modified within this window of the scan may change again within
+# the same mtime tick; leave its mtime unrecorded so the next incremental
+# scan re-hashes it instead of trusting the stat.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def _file_row(file_info: dict) -> tuple:
+    mtime_ns = file_info.get("mtime_ns")
+    if mtime_ns is not None and time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+        mtime_ns = None
+    last_modified = None
+    if file_info.get("mtime_ns") is not None:
+        last_modified = datetime.fromtimestamp(
+            file_info["mtime_ns"] / 1e9, tz=timezone.utc
+        ).isoformat()
+    return (
+        file_info["path"], file_info["language"], file_info["size_bytes"],
+        last_modified, mtime_ns, _now(),
+    )
+
+
+_INSERT_SYMBOL = (
+    "INSERT OR REPLACE INTO symbols "
+    "(id, file_path, name, kind, line_start, line_end, "
+    "signature, complexity, is_exported, fingerprint) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_RAW_IMPORT = (
+    "INSERT OR REPLACE INTO raw_imports (edge_id, file_path, raw, line_number) "
+    "VALUES (?, ?, ?, ?)"
+)
+_INSERT_RAW_CALL = (
+    "INSERT INTO raw_calls (file_path, caller_id, callee, qualifier, line_number) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def _result_rows(result: dict) -> tuple[list[tuple], list[tuple], list[tuple]]:
+    """(symbol, raw import, raw call) rows for one parse result."""
+    path = result["path"]
+    symbols = [
+        (
+            sym["id"], sym["file_path"], sym["name"], sym["kind"],
+            sym["line_start"], sym["line_end"], sym["signature"],
+            sym["complexity"], sym["is_exported"], sym.get("fingerprint"),
+        )
+        for sym in result["symbols"]
+    ]
+    imports = [(imp["id"], path, imp["to_id"], imp["line_number"]) for imp in result["imports"]]
+    calls = [
+        (path, call["caller_id"], call["callee"], call["qualifier"], call["line_number"])
+        for call in result.get("calls", ())
+    ]
+    return symbols, imports, calls
+
+
+def _store_parse_result(conn: sqlite3.Connection, result: dict) -> None:
+    """Write one file's symbols, raw imports and calls, replacing what it had."""
+    path = result["path"]
+    conn.execute("DELETE FROM symbols WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM raw_imports WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM raw_calls WHERE file_path=?", (path,))
+    symbols, imports, calls = _result_rows(result)
+    conn.executemany(_INSERT_SYMBOL, symbols)
+    conn.executemany(_INSERT_RAW_IMPORT, imports)
+    conn.executemany(_INSERT_RAW_CALL, calls)
+    conn.execute(
+        "UPDATE files SET symbol_count=?, content_hash=? WHERE path=?",
+        (len(result["symbols"]), result["content_hash"], path),
+    )
+
+
+_REPLACE_EDGE = (
+    "INSERT OR REPLACE INTO edges "
+    "(id, from_id, to_id, edge_type, line_number) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_INSERT_EDGE = (
+    "INSERT OR IGNORE INTO edges "
+    "(id, from_id, to_id, edge_type, line_number) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def _rows_for_paths(conn: sqlite3.Connection, sql: str, paths: Iterable[str]) -> Iterator:
+    for path in paths:
+        yield from conn.execute(sql, (path,)).fetchall()
+
+
+def _link_imports(
+    conn: sqlite3.Connection,
+    index: ModuleIndex,
+    paths: list[str] | None = None,
+) -> int:
+    """Resolve stored raw imports into edges (all files, or just `paths`).
+
+    Rows are streamed and edges inserted in batches, so a full link of a
+    large graph never holds every import at once.
+    """
+    if paths is None:
+        rows = conn.execute("SELECT edge_id, file_path, raw, line_number FROM raw_imports")
+    else:
+        rows = _rows_for_paths(
+            conn,
+            "SELECT edge_id, file_path, raw, line_number FROM raw_imports WHERE file_path=?",
+            paths,
         )
 
+    found = 0
+    edges = []
+    for row in rows:
+        resolved = index.resolve(row["raw"], row["file_path"])
+        if len(resolved) == 1:
+            edges.append((row["edge_id"], row["file_path"], resolved[0], "imports", row["line_number"]))
+        else:
+            # A Go package import: one edge per file in the package.
+            for target in resolved:
+                edge_id = hashlib.md5(f"{row['edge_id']}::{target}".encode()).hexdigest()
+                edges.append((edge_id, row["file_path"], target, "imports", row["line_number"]))
+        if len(edges) >= _BULK_BATCH_ROWS:
+            found += len(edges)
+            conn.executemany(_REPLACE_EDGE, edges)
+            edges = []
+    found += len(edges)
+    conn.executemany(_REPLACE_EDGE, edges)
+    conn.execute(
+        "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('module_index', ?)",
+        (index.fingerprint,),
+    )
+    return found
+
+
+# Symbol kinds a call can land on, and receivers that mean "this file".
+_CALLABLE_KINDS = ("function", "method", "class", "constructor", "const")
+_SELF_RECEIVERS = {"self", "this", "cls", "super"}
+
+
+def _delete_call_edges(conn: sqlite3.Connection, path: str, incoming: bool = False) -> None:
+    """Drop call edges from a file's symbols (and into them, if incoming).
+
+    Symbol ids are "{path}::...", so a file's symbols are a key range
+    on the (from_id, ...) and (to_id, ...) edge indexes.
+    """
+    lo, hi = path + "::", path + ":;"
+    conn.execute("DELETE FROM edges WHERE from_id=? AND edge_type='calls'", (path,))
+    conn.execute(
+        "DELETE FROM edges WHERE from_id>=? AND from_id<? AND edge_type='calls'", (lo, hi)
+    )
+    if incoming:
         conn.execute(
-            "INSERT OR REPLACE INTO blast_radius "
-            "(symbol_id, file_path, direct_importers, transitive_importers, "
-            "blast_score, risk_level, last_computed) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (
-                symbol["id"], file_path, direct, transitive,
-                blast_score, risk_level, _now(),
-            ),
+            "DELETE FROM edges WHERE to_id>=? AND to_id<? AND edge_type='calls'", (lo, hi)
         )
 
-    conn.commit()
+
+def _link_calls(conn: sqlite3.Connection, paths: list[str] | None = None) -> int:
+    """Resolve stored call sites into symbol-level `calls` edges.
+
+    A call resolves to a uniquely named callable in the caller's own file
+    (unqualified or self/this calls) or, failing that, in a file the
+    caller imports; ambiguous and unresolvable names produce no edge.
+
+    Call sites are streamed file by file and edges inserted in batches;
+    only the callable-name tables stay loaded for the whole pass.
+    """
+    callables: dict[str, dict[str, list[str]]] = {}
+    imports: dict[str, list[str]] = {}
+    kinds = ",".join("?" * len(_CALLABLE_KINDS))
+    if paths is None:
+        conn.execute("DELETE FROM edges WHERE edge_type='calls'")
+        rows = conn.execute(
+            "SELECT file_path, caller_id, callee, qualifier, line_number FROM raw_calls"
+        )
+        for sym in conn.execute(
+            f"SELECT id, file_path, name FROM symbols WHERE kind IN ({kinds}) ORDER BY id",
+            _CALLABLE_KINDS,
+        ):
+            callables.setdefault(sym["file_path"], {}).setdefault(sym["name"], []).append(sym["id"])
+        for edge in conn.execute(
+            "SELECT from_id, to_id FROM edges WHERE edge_type='imports' ORDER BY from_id, to_id"
+        ):
+            imports.setdefault(edge["from_id"], []).append(edge["to_id"])
+        loaded = None
+    else:
+        for path in paths:
+            _delete_call_edges(conn, path)
+        rows = _rows_for_paths(
+            conn,
+            "SELECT file_path, caller_id, callee, qualifier, line_number "
+            "FROM raw_calls WHERE file_path=?",
+            paths,
+        )
+        loaded = set()
+
+    def names_in(file_path: str) -> dict[str, list[str]]:
+        if loaded is not None and file_path not in loaded:
+            loaded.add(file_path)
+            for sym in conn.execute(
+                f"SELECT id, name FROM symbols WHERE file_path=? AND kind IN ({kinds}) ORDER BY id",
+                (file_path, *_CALLABLE_KINDS),
+            ):
+                callables.setdefault(file_path, {}).setdefault(sym["name"], []).append(sym["id"])
+        return callables.get(file_path, {})
+
+    # Call sites arrive grouped by file, so only the current file's
+    # merged import names are kept.
+    via_imports: dict[str, dict[str, list[str]]] = {}
+
+    def imported_names(file_path: str) -> dict[str, list[str]]:
+        """Callables of every file file_path imports, merged by name."""
+        merged = via_imports.get(file_path)
+        if merged is None:
+            via_imports.clear()
+            if loaded is not None and file_path not in imports:
+                imports[file_path] = [r["to_id"] for r in conn.execute(
+                    "SELECT to_id FROM edges WHERE from_id=? AND edge_type='imports' ORDER BY to_id",
+                    (file_path,),
+                )]
+            merged = via_imports[file_path] = {}
+            for target in imports.get(file_path, ()):
+                for name, ids in names_in(target).items():
+                    merged.setdefault(name, []).extend(ids)
+        return merged
+
+    # The first call site of a caller/callee pair wins, as the edge id
+    # only covers the pair; earlier batches are already in the table.
+    before = conn.total_changes
+    edges: dict[str, tuple] = {}
+    for row in rows:
+        qualifier = row["qualifier"]
+        if qualifier == "?":
+            continue
+        file_path = row["file_path"]
+        candidates: list[str] = []
+        if qualifier is None or qualifier in _SELF_RECEIVERS:
+            candidates = names_in(file_path).get(row["callee"], [])
+        if not candidates and qualifier not in _SELF_RECEIVERS:
+            candidates = imported_names(file_path).get(row["callee"], [])
+        if len(candidates) != 1:
+            continue
+        edge_id = hashlib.md5(f"{row['caller_id']}::calls::{candidates[0]}".encode()).hexdigest()
+        edges.setdefault(
+            edge_id, (edge_id, row["caller_id"], candidates[0], "calls", row["line_number"]),
+        )
+        if len(edges) >= _BULK_BATCH_ROWS:
+            conn.executemany(_INSERT_EDGE, edges.values())
+            edges = {}
+    conn.executemany(_INSERT_EDGE, edges.values())
+    return conn.total_changes - before
+
+
+def _import_map(conn: sqlite3.Connection) -> dict[str, set[str]]:
+    imports: dict[str, set[str]] = {}
+    for edge in conn.execute("SELECT from_id, to_id FROM edges WHERE edge_type='imports'"):
+        imports.setdefault(edge["from_id"], set()).add(edge["to_id"])
+    return imports
+
+
+# Fingerprint buckets larger than this are generated or boilerplate code;
+# pairing every member with every other would swamp the edge table.
+_MAX_DUPLICATE_BUCKET = 50
+
+
+def _link_duplicates(conn: sqlite3.Connection, paths: list[str] | None = None) -> int:
+    """File-level `duplicates` edges between files sharing a function fingerprint.
+
+    weight is the number of distinct duplicated functions the two files
+    share. With `paths`, only pairs involving those files are rebuilt.
+    """
+    buckets: dict[str, set[str]] = {}
+    if paths is None:
+        conn.execute("DELETE FROM edges WHERE edge_type='duplicates'")
+        for row in conn.execute(
+            "SELECT fingerprint, file_path FROM symbols WHERE fingerprint IS NOT NULL"
+        ):
+            buckets.setdefault(row["fingerprint"], set()).add(row["file_path"])
+    else:
+        fingerprints = set()
+        for path in paths:
+            conn.execute(
+                "DELETE FROM edges WHERE edge_type='duplicates' AND (from_id=? OR to_id=?)",
+                (path, path),
+            )
+            fingerprints.update(r["fingerprint"] for r in conn.execute(
+                "SELECT fingerprint FROM symbols WHERE file_path=? AND fingerprint IS NOT NULL",
+                (path,),
+            ))
+        for fingerprint in fingerprints:
+            buckets[fingerprint] = {r["file_path"] for r in conn.execute(
+                "SELECT file_path FROM symbols WHERE fingerprint=? LIMIT ?",
+                (fingerprint, _MAX_DUPLICATE_BUCKET + 1),
+            )}
+
+    only = set(paths) if paths is not None else None
+    shared: dict[tuple[str, str], int] = {}
+    for files in buckets.values():
+        if len(files) < 2 or len(files) > _MAX_DUPLICATE_BUCKET:
+            continue
+        for a in files:
+            for b in files:
+                if a != b and (only is None or a in only or b in only):
+                    shared[(a, b)] = shared.get((a, b), 0) + 1
+    conn.executemany(
+        "INSERT OR REPLACE INTO edges (id, from_id, to_id, edge_type, weight) "
+        "VALUES (?, ?, ?, 'duplicates', ?)",
+        [
+            (hashlib.md5(f"{a}::duplicates::{b}".encode()).hexdigest(), a, b, weight)
+            for (a, b), weight in sorted(shared.items())
+        ],
+    )
+    return len(shared)
+
+
+# -- Bulk rebuild ------------------------------------------------------------
+
+_INSERT_FILE = (
+    "INSERT OR REPLACE INTO files "
+    "(path, language, size_bytes, last_modified, mtime_ns, last_scanned, "
+    "symbol_count, content_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Rows buffered across files before one executemany per table.
+_BULK_BATCH_ROWS = 20_000
+
+
+class _BulkWriter:
+    """Buffer parse results into batched executemany inserts.
+
+    Only used on a fresh build database, so there is nothing to delete
+    first; `seconds` accumulates time spent writing.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_rows: int = _BULK_BATCH_ROWS):
+        self.conn = conn
+        self.batch_rows = batch_rows
+        self.seconds = 0.0
+        self._files: list[tuple] = []
+        self._symbols: list[tuple] = []
+        self._imports: list[tuple] = []
+        self._calls: list[tuple] = []
+
+    def add(self, file_info: dict, result: dict) -> None:
+        symbols, imports, calls = _result_rows(result)
+        self._files.append(
+            _file_row(file_info) + (len(result["symbols"]), result["content_hash"])
+        )
+        self._symbols.extend(symbols)
+        self._imports.extend(imports)
+        self._calls.extend(calls)
+        pending = len(self._files) + len(self._symbols) + len(self._imports) + len(self._calls)
+        if pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        started = time.perf_counter()
+        # Files before symbols, matching the per-file writer's row order.
+        self.conn.executemany(_INSERT_FILE, self._files)
+        self.conn.executemany(_INSERT_SYMBOL, self._symbols)
+        self.conn.executemany(_INSERT_RAW_IMPORT, self._imports)
+        self.conn.executemany(_INSERT_RAW_CALL, self._calls)
+        self._files, self._symbols, self._imports, self._calls = [], [], [], []
+        self.seconds += time.perf_counter() - started
+
+
+def _open_build_db(path: str) -> sqlite3.Connection:
+    """Scratch database for a full rebuild: no journal, no fsync, no indexes.
+
+    Nothing reads it until it is published, and a crash just leaves a
+    temp file to delete, so durability settings are off for the load.
+    """
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    create_graph_tables(conn, indexes=False)
+    return conn
+
+
+def _publish_build(project: str, build: sqlite3.Connection, graph: str | None = None) -> None:
+    """Replace graph.db with a finished build in one transaction.
+
+    Uses SQLite's online backup rather than renaming the file over
+    graph.db: readers hold WAL connections, and a renamed database
+    would be paired with the old -wal/-shm files. The backup copies
+    every page in a single step under a write lock, so readers see the
+    previous graph or the new one, never a partial load.
+    """
+    with graph_db(project, graph) as conn:
+        # scan_state keys the build did not write survive a rebuild.
+        create_graph_tables(conn)
+        kept = conn.execute("SELECT key, value FROM scan_state").fetchall()
+        build.executemany(
+            "INSERT OR IGNORE INTO scan_state (key, value) VALUES (?, ?)",
+            [tuple(r) for r in kept],
+        )
+        build.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES (?, ?)",
+            ("last_full_scan", _now()),
+        )
+        bump_generation(build)
+        build.commit()
+        build.backup(conn)
 
 
 # -- Full scan orchestrator --------------------------------------------------
 
-def run_full_scan(project: str, project_path: str) -> dict:
-    """Run all 4 passes and populate graph.db for a project."""
+def run_full_scan(
+    project: str,
+    project_path: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    entries: Iterable[FileEntry] | None = None,
+    graph: str | None = None,
+) -> dict:
+    """Run all 4 passes and populate graph.db for a project.
+
+    Parsing fans out across `workers` processes; this process is the
+    only writer. The graph is built in a scratch database with indexes
+    created after the load, then published over graph.db atomically;
+    stats["timings"] breaks the run down by phase. workers/chunk_size
+    default to the [graph] config; `entries` is a discovery result to
+    reuse (see discover_files). `graph` targets a secondary graph (see
+    enki.db.graph_db) instead of graph.db.
+    """
+    with scan_lock(project, graph):
+        return _run_full_scan(
+            project, project_path, *scan_settings(workers, chunk_size), entries, graph,
+        )
+
+
+def _run_full_scan(
+    project: str,
+    project_path: str,
+    workers: int,
+    chunk_size: int,
+    entries: Iterable[FileEntry] | None = None,
+    graph: str | None = None,
+) -> dict:
     stats = {
         "files_scanned": 0,
         "symbols_extracted": 0,
         "edges_found": 0,
+        "calls_found": 0,
+        "duplicates_found": 0,
         "blast_radius_computed": 0,
+        "hotspots_computed": 0,
+        "workers": workers,
         "errors": [],
+        "timings": {},
     }
+    timings = stats["timings"]
 
-    with graph_db(project) as conn:
-        create_graph_tables(conn)
-        conn.execute("DELETE FROM edges")
-        conn.execute("DELETE FROM symbols")
-        conn.execute("DELETE FROM files")
-        conn.execute("DELETE FROM blast_radius")
-        conn.commit()
-
-        files = discover_files(project_path)
-        stats["files_scanned"] = len(files)
-        all_file_paths = {f["path"] for f in files}
+    dest = graph_db_path(project, graph)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, build_path = tempfile.mkstemp(prefix=".graph-build-", suffix=".db", dir=dest.parent)
+    os.close(fd)
+    build = _open_build_db(build_path)
+    try:
+        # Discovery, parsing and loading are one stream: files are listed
+        # as the pool asks for them and written in batches as results
+        # return, so only the chunks in flight are ever held in memory.
+        # `in_flight` pairs each result with the file_info it came from.
+        in_flight: deque[dict] = deque()
+        timings["discover_s"] = 0.0
+
+        def feed() -> Iterator[dict]:
+            source = iter_source_files(project_path, entries)
+            while True:
+                started = time.perf_counter()
+                file_info = next(source, None)
+                timings["discover_s"] += time.perf_counter() - started
+                if file_info is None:
+                    return
+                in_flight.append(file_info)
+                yield file_info
+
+        started = time.perf_counter()
+        writer = _BulkWriter(build)
+        try:
+            for result in parse_files(feed(), workers, chunk_size):
+                file_info = in_flight.popleft()
+                stats["files_scanned"] += 1
+                try:
+                    writer.add(file_info, result)
+                    stats["symbols_extracted"] += len(result["symbols"])
+                except Exception as e:
+                    stats["errors"].append(f"{result['path']}: {e}")
+        except Exception as e:
+            stats["errors"].append(f"parse pool: {e}")
+        writer.flush()
+        build.commit()
+        timings["parse_s"] = (
+            time.perf_counter() - started - writer.seconds - timings["discover_s"]
+        )
+        timings["load_s"] = writer.seconds
 
-        for file_info in files:
-            conn.execute(
-                "INSERT OR REPLACE INTO files "
-                "(path, language, size_bytes, last_modified, last_scanned) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (
-                    file_info["path"], file_info["language"],
-                    file_info["size_bytes"], file_info["last_modified"], _now(),
-                ),
+        started = time.perf_counter()
+        try:
+            index = ModuleIndex.build(
+                (row[0] for row in build.execute("SELECT path FROM files")), project_path,
             )
-        conn.commit()
-
-        for file_info in files:
-            try:
-                symbols = parse_file(file_info)
-                stats["symbols_extracted"] += len(symbols)
-                for sym in symbols:
-                    conn.execute(
-                        "INSERT OR REPLACE INTO symbols "
-                        "(id, file_path, name, kind, line_start, line_end, "
-                        "signature, complexity, is_exported) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            sym["id"], sym["file_path"], sym["name"], sym["kind"],
-                            sym["line_start"], sym["line_end"], sym["signature"],
-                            sym["complexity"], sym["is_exported"],
-                        ),
-                    )
-                conn.execute(
-                    "UPDATE files SET symbol_count=? WHERE path=?",
-                    (len(symbols), file_info["path"]),
-                )
-            except Exception as e:
-                stats["errors"].append(f"{file_info['path']}: {e}")
-        conn.commit()
+            stats["edges_found"] = _link_imports(build, index)
+            stats["calls_found"] = _link_calls(build)
+            stats["duplicates_found"] = _link_duplicates(build)
+        except Exception as e:
+            stats["errors"].append(f"link: {e}")
+        build.commit()
+        timings["link_s"] = time.perf_counter() - started
 
-        for file_info in files:
-            try:
-                raw_imports = extract_imports(file_info)
-                for imp in raw_imports:
-                    resolved = resolve_import_path(
-                        imp["to_id"], imp["from_id"], all_file_paths, project_path
-                    )
-                    if resolved:
-                        imp["to_id"] = resolved
-                        conn.execute(
-                            "INSERT OR REPLACE INTO edges "
-                            "(id, from_id, to_id, edge_type, line_number) "
-                            "VALUES (?, ?, ?, ?, ?)",
-                            (
-                                imp["id"], imp["from_id"], imp["to_id"],
-                                imp["edge_type"], imp["line_number"],
-                            ),
-                        )
-                        stats["edges_found"] += 1
-            except Exception as e:
-                stats["errors"].append(f"link {file_info['path']}: {e}")
-        conn.commit()
+        started = time.perf_counter()
+        create_graph_indexes(build)
+        build.commit()
+        timings["index_s"] = time.perf_counter() - started
 
+        started = time.perf_counter()
         try:
-            compute_blast_radius(project, conn)
-            stats["blast_radius_computed"] = conn.execute(
+            compute_blast_radius(project, build)
+            stats["blast_radius_computed"] = build.execute(
                 "SELECT COUNT(*) as c FROM blast_radius"
             ).fetchone()["c"]
         except Exception as e:
             stats["errors"].append(f"blast radius: {e}")
+        timings["blast_s"] = time.perf_counter() - started
 
-        conn.execute(
-            "INSERT OR REPLACE INTO scan_state (key, value) VALUES (?, ?)",
-            ("last_full_scan", _now()),
+        started = time.perf_counter()
+        try:
+            _carry_churn(project, graph, build)
+            stats["hotspots_computed"] = materialize_hotspots(build, project_path)
+        except Exception as e:
+            stats["errors"].append(f"hotspots: {e}")
+        timings["hotspot_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _publish_build(project, build, graph)
+        timings["publish_s"] = time.perf_counter() - started
+        timings["write_s"] = sum(
+            timings[k]
+            for k in ("load_s", "link_s", "index_s", "blast_s", "hotspot_s", "publish_s")
         )
-        conn.commit()
+    finally:
+        build.close()
+        for leftover in (build_path, build_path + "-journal"):
+            try:
+                os.unlink(leftover)
+            except FileNotFoundError:
+                pass
 
     return stats
 
 
+def _carry_churn(project: str, graph: str | None, build: sqlite3.Connection) -> None:
+    """Seed a build with the published graph's churn cache, so git log
+    only reads commits made since the last scan."""
+    if not graph_db_path(project, graph).exists():
+        return
+    with graph_db(project, graph) as conn:
+        try:
+            rows = conn.execute(
+                "SELECT path, commits, lines_added, lines_deleted FROM git_churn"
+            ).fetchall()
+            head = conn.execute("SELECT value FROM scan_state WHERE key='churn_head'").fetchone()
+        except sqlite3.OperationalError:
+            return  # published before the churn cache existed
+    build.executemany(
+        "INSERT INTO git_churn (path, commits, lines_added, lines_deleted) VALUES (?, ?, ?, ?)",
+        [tuple(r) for r in rows],
+    )
+    if head:
+        build.execute(
+            "INSERT OR REPLACE INTO scan_state (key, value) VALUES ('churn_head', ?)", (head[0],),
+        )
+
+
 # -- Incremental update ------------------------------------------------------
 
-def run_incremental_update(project: str, project_path: str) -> dict:
-    """Update graph for files changed since last scan."""
-    stats = {"files_updated": 0, "errors": []}
+def _remove_file(conn: sqlite3.Connection, path: str) -> None:
+    conn.execute("DELETE FROM blast_radius WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM symbols WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM raw_imports WHERE file_path=?", (path,))
+    conn.execute("DELETE FROM raw_calls WHERE file_path=?", (path,))
+    _delete_call_edges(conn, path, incoming=True)
+    conn.execute("DELETE FROM edges WHERE from_id=? OR to_id=?", (path, path))
+    conn.execute("DELETE FROM files WHERE path=?", (path,))
+
+
+def run_incremental_update(
+    project: str,
+    project_path: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    entries: Iterable[FileEntry] | None = None,
+    graph: str | None = None,
+) -> dict:
+    """Update the graph for files that changed since the last scan.
+
+    Change detection is by content, not git: every file is stat'ed, and
+    only files whose (mtime, size) moved are hashed; only files whose
+    hash changed are re-parsed. Works for untracked files, non-git
+    directories and worktrees. When files appear or disappear, stored
+    raw imports are re-resolved so edges into them are added or dropped
+    without re-parsing the importers. Files that become .gitignored
+    drop out like deleted ones.
+    """
+    with scan_lock(project, graph):
+        return _run_incremental_update(
+            project, project_path, workers, chunk_size, entries, graph,
+        )
+
 
-    with graph_db(project) as conn:
+def _run_incremental_update(
+    project: str,
+    project_path: str,
+    workers: int | None,
+    chunk_size: int | None,
+    entries: Iterable[FileEntry] | None = None,
+    graph: str | None = None,
+) -> dict:
+    stats = {
+        "files_updated": 0,
+        "files_added": 0,
+        "files_deleted": 0,
+        "files_renamed": 0,
+        "files_unchanged": 0,
+        "edges_found": 0,
+        "calls_found": 0,
+        "duplicates_found": 0,
+        "hotspots_computed": 0,
+        "errors": [],
+    }
+
+    with graph_db(project, graph) as conn:
         create_graph_tables(conn)
         last_scan_row = conn.execute(
             "SELECT value FROM scan_state WHERE key='last_full_scan'"
         ).fetchone()
-        if not last_scan_row:
-            return run_full_scan(project, project_path)
-        last_scan = last_scan_row["value"]
-
-    try:
-        import subprocess
-
-        result = subprocess.run(
-            ["git", "diff", "--name-only", "--diff-filter=ACMRT", f"--since={last_scan}"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        changed_files = [
-            f.strip()
-            for f in result.stdout.splitlines()
-            if f.strip() and is_source_file(f.strip())
-        ]
-    except Exception:
-        return stats
-
-    if not changed_files:
-        return stats
-
-    with graph_db(project) as conn:
-        all_files = {r["path"] for r in conn.execute("SELECT path FROM files").fetchall()}
-
-        for rel_path in changed_files:
-            full_path = os.path.join(project_path, rel_path)
-            if not os.path.exists(full_path):
-                conn.execute("DELETE FROM files WHERE path=?", (rel_path,))
-                conn.execute("DELETE FROM symbols WHERE file_path=?", (rel_path,))
-                conn.execute("DELETE FROM edges WHERE from_id=? OR to_id=?", (rel_path, rel_path))
-                continue
-
-            lang = detect_language(rel_path)
-            if not lang:
-                continue
-
-            file_info = {
-                "path": rel_path,
-                "full_path": full_path,
-                "language": lang,
-                "size_bytes": os.path.getsize(full_path),
+        if last_scan_row:
+            known = {
+                r["path"]: r for r in conn.execute(
+                    "SELECT path, size_bytes, mtime_ns, content_hash FROM files"
+                )
             }
+    if not last_scan_row:
+        return run_full_scan(project, project_path, workers, chunk_size, entries, graph)
+
+    files = discover_files(project_path, entries)
+    current = {f["path"]: f for f in files}
+    stat_changed = [
+        f for f in files
+        if f["path"] not in known
+        or (known[f["path"]]["size_bytes"], known[f["path"]]["mtime_ns"])
+        != (f["size_bytes"], f["mtime_ns"])
+    ]
+    deleted = [path for path in known if path not in current]
+    if not stat_changed and not deleted:
+        stats["files_unchanged"] = len(files)
+        # New commits can still move churn.
+        with graph_db(project, graph) as conn:
+            try:
+                written = materialize_hotspots(conn, project_path, (), commit=False)
+                stats["hotspots_computed"] = written
+                if written:
+                    bump_generation(conn)
+                conn.commit()
+            except Exception as e:
+                stats["errors"].append(f"hotspots: {e}")
+        return stats
 
-            conn.execute("DELETE FROM symbols WHERE file_path=?", (rel_path,))
-            conn.execute("DELETE FROM edges WHERE from_id=?", (rel_path,))
-
-            symbols = parse_file(file_info)
-            for sym in symbols:
-                conn.execute(
-                    "INSERT OR REPLACE INTO symbols "
-                    "(id, file_path, name, kind, line_start, line_end, "
-                    "signature, complexity, is_exported) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        sym["id"], sym["file_path"], sym["name"], sym["kind"],
-                        sym["line_start"], sym["line_end"], sym["signature"],
-                        sym["complexity"], sym["is_exported"],
-                    ),
+    # Stat moved but bytes did not (touch, checkout): refresh stat only.
+    to_parse, touched = [], []
+    for f in stat_changed:
+        old = known.get(f["path"])
+        if old and old["content_hash"] and hash_file(f["full_path"]) == old["content_hash"]:
+            touched.append(f)
+        else:
+            to_parse.append(f)
+    added = [f for f in to_parse if f["path"] not in known]
+    deleted_hashes = {known[path]["content_hash"] for path in deleted}
+    deleted_hashes.discard(None)
+    if deleted_hashes:
+        stats["files_renamed"] = sum(
+            1 for f in added if hash_file(f["full_path"]) in deleted_hashes
+        )
+    stats["files_unchanged"] = len(files) - len(to_parse)
+    stats["files_added"] = len(added)
+    stats["files_deleted"] = len(deleted)
+    stats["files_updated"] = len(to_parse) - len(added)
+
+    workers, chunk_size = scan_settings(workers, chunk_size)
+    with graph_db(project, graph) as conn:
+        # The update commits in stages: bump once up front so results
+        # cached before it are dropped, and again with the last commit.
+        bump_generation(conn)
+        conn.commit()
+        # Import edges added or removed, for blast radius and cached walks.
+        changed_edges: set[tuple[str, str]] = set()
+        for path in deleted:
+            changed_edges.update(
+                (r["from_id"], r["to_id"]) for r in conn.execute(
+                    "SELECT from_id, to_id FROM edges "
+                    "WHERE (from_id=? OR to_id=?) AND edge_type='imports'",
+                    (path, path),
                 )
+            )
+            _remove_file(conn, path)
+        conn.executemany(_UPSERT_FILE, [_file_row(f) for f in touched + to_parse])
 
-            raw_imports = extract_imports(file_info)
-            for imp in raw_imports:
-                resolved = resolve_import_path(
-                    imp["to_id"], imp["from_id"], all_files, project_path
-                )
-                if resolved:
-                    imp["to_id"] = resolved
+        parsed = []
+        # Import targets each re-parsed file had before, to find the
+        # edges that actually changed.
+        old_targets: dict[str, set[str]] = {}
+        try:
+            for result in parse_files(to_parse, workers, chunk_size):
+                try:
+                    old_targets[result["path"]] = {r["to_id"] for r in conn.execute(
+                        "SELECT to_id FROM edges WHERE from_id=? AND edge_type='imports'",
+                        (result["path"],),
+                    )}
+                    conn.execute("DELETE FROM blast_radius WHERE file_path=?", (result["path"],))
                     conn.execute(
-                        "INSERT OR REPLACE INTO edges "
-                        "(id, from_id, to_id, edge_type, line_number) "
-                        "VALUES (?, ?, ?, ?, ?)",
-                        (
-                            imp["id"], imp["from_id"], imp["to_id"],
-                            imp["edge_type"], imp["line_number"],
-                        ),
+                        "DELETE FROM edges WHERE from_id=? AND edge_type='imports'", (result["path"],)
                     )
+                    # Symbol ids carry line numbers; calls into the old ones are stale.
+                    _delete_call_edges(conn, result["path"], incoming=True)
+                    _store_parse_result(conn, result)
+                    parsed.append(result["path"])
+                except Exception as e:
+                    stats["errors"].append(f"{result['path']}: {e}")
+        except Exception as e:
+            stats["errors"].append(f"parse pool: {e}")
 
-            conn.execute(
-                "UPDATE files SET symbol_count=?, last_scanned=? WHERE path=?",
-                (len(symbols), _now(), rel_path),
-            )
-            stats["files_updated"] += 1
-
+        relink_all = bool(added or deleted)
+        try:
+            index = ModuleIndex.build(set(current), project_path)
+            stored = conn.execute(
+                "SELECT value FROM scan_state WHERE key='module_index'"
+            ).fetchone()
+            # The set of resolvable targets or a tsconfig/go.mod changed;
+            # any importer may now resolve differently.
+            relink_all = relink_all or stored is None or stored["value"] != index.fingerprint
+            callers = set(parsed)
+            # Importers of a deleted file lost those edges before
+            # _import_map below can see them; their calls must move too.
+            gone = set(deleted)
+            callers.update(f for f, t in changed_edges if t in gone and f not in gone)
+            if relink_all:
+                before = _import_map(conn)
+                # Re-parsed files' edges were dropped above.
+                before.update(old_targets)
+                conn.execute("DELETE FROM edges WHERE edge_type='imports'")
+                stats["edges_found"] = _link_imports(conn, index)
+                after = _import_map(conn)
+                # Calls only resolve through imports, so only files whose
+                # import targets moved can resolve differently.
+                for f in before.keys() | after.keys():
+                    moved = before.get(f, set()) ^ after.get(f, set())
+                    if moved:
+                        callers.add(f)
+                        changed_edges.update((f, t) for t in moved)
+            else:
+                stats["edges_found"] = _link_imports(conn, index, parsed)
+                for path in parsed:
+                    new = {r["to_id"] for r in conn.execute(
+                        "SELECT to_id FROM edges WHERE from_id=? AND edge_type='imports'",
+                        (path,),
+                    )}
+                    changed_edges.update((path, t) for t in new ^ old_targets.get(path, set()))
+            # Calls into a re-parsed file come from it or its importers.
+            for path in parsed:
+                callers.update(r["from_id"] for r in conn.execute(
+                    "SELECT from_id FROM edges WHERE to_id=? AND edge_type='imports'", (path,)
+                ))
+            stats["calls_found"] = _link_calls(conn, sorted(callers))
+            # Pairs involving deleted files went with their edges.
+            stats["duplicates_found"] = _link_duplicates(conn, parsed)
+            invalidate_reachability(conn, changed_edges)
+        except Exception as e:
+            stats["errors"].append(f"link: {e}")
         conn.commit()
-        compute_blast_radius(project, conn)
+
+        if to_parse or deleted:
+            try:
+                if relink_all:
+                    # A changed file count renormalizes every score, and
+                    # a full relink may have moved any edge.
+                    compute_blast_radius(project, conn)
+                else:
+                    edge_targets = {t for _, t in changed_edges}
+                    compute_blast_radius(project, conn, set(parsed), edge_targets)
+            except Exception as e:
+                stats["errors"].append(f"blast radius: {e}")
+        try:
+            stats["hotspots_computed"] = materialize_hotspots(
+                conn, project_path, [*parsed, *deleted],
+            )
+        except Exception as e:
+            stats["errors"].append(f"hotspots: {e}")
         conn.execute(
             "INSERT OR REPLACE INTO scan_state (key, value) VALUES (?, ?)",
-            ("last_full_scan", _now()),
+            ("last_incremental_scan", _now()),
         )
+        bump_generation(conn)
         conn.commit()
 
     return stats
-
@@ -1,6 +1,6 @@
 """graph.db schema — codebase knowledge graph per project."""
 
-GRAPH_SCHEMA = """
+GRAPH_TABLES = """
 CREATE TABLE IF NOT EXISTS files (
     path TEXT PRIMARY KEY,
     language TEXT NOT NULL,
@@ -9,7 +9,9 @@ CREATE TABLE IF NOT EXISTS files (
     symbol_count INTEGER DEFAULT 0,
     complexity_score REAL DEFAULT 0,
     last_scanned TEXT,
-    git_change_frequency INTEGER DEFAULT 0  -- commits touching this file
+    git_change_frequency INTEGER DEFAULT 0,  -- commits touching this file
+    content_hash TEXT,          -- sha256 of file bytes at last parse
+    mtime_ns INTEGER            -- stat mtime at last parse; with size_bytes, skips unchanged files
 );
 
 CREATE TABLE IF NOT EXISTS symbols (
@@ -22,6 +24,7 @@ CREATE TABLE IF NOT EXISTS symbols (
     signature TEXT,             -- function signature or type definition
     complexity INTEGER DEFAULT 0,
     is_exported INTEGER DEFAULT 0,
+    fingerprint TEXT,           -- hash of the normalized AST (functions/methods); equal = duplicate
     FOREIGN KEY (file_path) REFERENCES files(path)
 );
 
@@ -34,6 +37,25 @@ CREATE TABLE IF NOT EXISTS edges (
     line_number INTEGER         -- where in from_id the edge occurs
 );
 
+-- Every import statement as written, resolved or not, so edges can be
+-- relinked when files appear or disappear without re-parsing importers.
+CREATE TABLE IF NOT EXISTS raw_imports (
+    edge_id TEXT PRIMARY KEY,   -- same id the resolved edge gets
+    file_path TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    line_number INTEGER
+);
+
+-- Every call site as written, per enclosing symbol, so call edges can be
+-- relinked when a callee's file changes without re-parsing the caller.
+CREATE TABLE IF NOT EXISTS raw_calls (
+    file_path TEXT NOT NULL,
+    caller_id TEXT NOT NULL,    -- enclosing symbol id, or file path at module level
+    callee TEXT NOT NULL,       -- called name as written
+    qualifier TEXT,             -- receiver/module before the dot, if a plain name
+    line_number INTEGER
+);
+
 CREATE TABLE IF NOT EXISTS blast_radius (
     symbol_id TEXT PRIMARY KEY,
     file_path TEXT NOT NULL,
@@ -45,20 +67,118 @@ CREATE TABLE IF NOT EXISTS blast_radius (
     last_computed TEXT
 );
 
+-- 'generation' advances with every change to the graph's content
+-- (bump_generation); the MCP result cache keys graph.db on it, so writes
+-- to the reachability caches below do not invalidate cached queries.
 CREATE TABLE IF NOT EXISTS scan_state (
     key TEXT PRIMARY KEY,
     value TEXT
 );
 
+-- Cached transitive walks over import edges. A full rebuild starts with
+-- these empty; the incremental scanner drops the walks an edge change
+-- can reach.
+CREATE TABLE IF NOT EXISTS reachability_walks (
+    source TEXT NOT NULL,
+    direction TEXT NOT NULL,    -- importers|imports
+    max_depth INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    truncated INTEGER DEFAULT 0,
+    computed_at TEXT,
+    PRIMARY KEY (source, direction, max_depth)
+);
+
+CREATE TABLE IF NOT EXISTS reachability (
+    source TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    max_depth INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    member TEXT NOT NULL,
+    PRIMARY KEY (source, direction, max_depth, depth, member)
+) WITHOUT ROWID;
+
+-- Commit and line counts per path from git log --numstat, folded in
+-- incrementally up to scan_state['churn_head'] (see enki.graph.hotspots).
+CREATE TABLE IF NOT EXISTS git_churn (
+    path TEXT PRIMARY KEY,
+    commits INTEGER DEFAULT 0,
+    lines_added INTEGER DEFAULT 0,
+    lines_deleted INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS hotspots (
+    path TEXT PRIMARY KEY,
+    churn INTEGER DEFAULT 0,          -- commits touching the file
+    lines_changed INTEGER DEFAULT 0,  -- lines added + deleted by those commits
+    complexity INTEGER DEFAULT 0,     -- sum of symbol complexity
+    max_complexity INTEGER DEFAULT 0,
+    risk_score REAL DEFAULT 0,        -- churn x complexity, 0.0-1.0
+    computed_at TEXT
+);
+
+"""
+
+# Secondary indexes, kept separate so bulk rebuilds can create them after
+# the load instead of maintaining them row by row.
+GRAPH_INDEXES = """
 CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
 CREATE INDEX IF NOT EXISTS idx_edges_from ON edges(from_id);
 CREATE INDEX IF NOT EXISTS idx_edges_to ON edges(to_id);
 CREATE INDEX IF NOT EXISTS idx_edges_type ON edges(edge_type);
+CREATE INDEX IF NOT EXISTS idx_edges_to_type ON edges(to_id, edge_type, from_id);
+CREATE INDEX IF NOT EXISTS idx_edges_from_type ON edges(from_id, edge_type, to_id);
+CREATE INDEX IF NOT EXISTS idx_symbols_file_line ON symbols(file_path, line_start, id);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
 CREATE INDEX IF NOT EXISTS idx_blast_file ON blast_radius(file_path);
+CREATE INDEX IF NOT EXISTS idx_raw_imports_file ON raw_imports(file_path);
+CREATE INDEX IF NOT EXISTS idx_raw_calls_file ON raw_calls(file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_fingerprint ON symbols(fingerprint) WHERE fingerprint IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_reachability_member ON reachability(member, direction);
+CREATE INDEX IF NOT EXISTS idx_hotspots_risk ON hotspots(risk_score DESC, path);
 """
 
+GRAPH_SCHEMA = GRAPH_TABLES + GRAPH_INDEXES
+
+# Columns added after the first release, per table.
+_COLUMN_MIGRATIONS = {
+    "files": {
+        "content_hash": "TEXT",
+        "mtime_ns": "INTEGER",
+    },
+    "symbols": {
+        "fingerprint": "TEXT",
+    },
+}
+
 
-def create_graph_tables(conn) -> None:
-    conn.executescript(GRAPH_SCHEMA)
+def create_graph_tables(conn, indexes: bool = True) -> None:
+    conn.executescript(GRAPH_TABLES)
+    migrate_columns(conn)
+    if indexes:
+        create_graph_indexes(conn)
     conn.commit()
 
+
+def create_graph_indexes(conn) -> None:
+    conn.executescript(GRAPH_INDEXES)
+
+
+def migrate_columns(conn) -> None:
+    """Add columns to graph.db tables created before them."""
+    for table, columns in _COLUMN_MIGRATIONS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for col, coltype in columns.items():
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
+
+
+def bump_generation(conn) -> None:
+    """Advance scan_state['generation'] in the caller's transaction.
+
+    Every write that changes what graph queries return must call this
+    before it commits; cache-only writes (reachability walks) must not.
+    """
+    conn.execute(
+        "INSERT INTO scan_state (key, value) VALUES ('generation', '1') "
+        "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
@@ -0,0 +1,367 @@
+"""watcher.py — Keep graph.db current while files change.
+
+Change events only decide *when* to run the stat/content-hash
+incremental scan; the scan itself works out what changed. Events are
+debounced: an update runs once the tree has been quiet for
+`debounce_s`, or at most `max_delay_s` after the first event of a
+burst, so an agent rewriting twenty files triggers one small update.
+
+Backends:
+- inotify (Linux, via libc through ctypes — no extra dependency)
+- polling: periodic stat snapshot of discovered source files, used
+  when inotify is unavailable or the watch limit is exhausted
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from enki.graph.languages import SKIP_DIRS, detect_language
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE_S = 0.5
+DEFAULT_MAX_DELAY_S = 5.0
+DEFAULT_POLL_INTERVAL_S = 2.0
+
+
+# ── Change sources ──
+
+
+class PollingSource:
+    """Detect changes by comparing (size, mtime) snapshots of source files."""
+
+    backend = "polling"
+
+    def __init__(self, root: str, interval_s: float = DEFAULT_POLL_INTERVAL_S):
+        self.root = root
+        self.interval_s = interval_s
+        self._snapshot = self._take()
+
+    def _take(self) -> dict[str, tuple[int, int]]:
+        from enki.graph.scanner import discover_files
+
+        return {f["path"]: (f["size_bytes"], f["mtime_ns"]) for f in discover_files(self.root)}
+
+    def wait(self, timeout: float, stop: threading.Event | None = None) -> bool:
+        """Sleep up to timeout (at most one poll interval); True if anything changed."""
+        delay = min(timeout, self.interval_s)
+        if stop is not None:
+            if stop.wait(delay):
+                return False
+        else:
+            time.sleep(delay)
+        snapshot = self._take()
+        changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    """Linux inotify on every non-skipped directory under root."""
+
+    backend = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_IGNORED = 0x00008000
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    _MASK = (
+        IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+    )
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name or not hasattr(os, "read"):
+            raise OSError("inotify unavailable")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify unavailable")
+        self.root = root
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str) -> None:
+        for dirpath, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self._MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # removed before we got to it
+                raise OSError(err, f"inotify_add_watch failed for {dirpath}")
+            self._dirs[wd] = dirpath
+
+    def wait(self, timeout: float, stop: threading.Event | None = None) -> bool:
+        """Block up to timeout for relevant events; True if any arrived."""
+        _ = stop
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            changed |= self._handle(data)
+        return changed
+
+    def _handle(self, data: bytes) -> bool:
+        changed = False
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                changed = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None:
+                continue
+            if mask & self.IN_ISDIR:
+                if name in SKIP_DIRS:
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._watch_tree(os.path.join(parent, name))
+                    except OSError as e:
+                        # Usually fs.inotify.max_user_watches; the rest of
+                        # the tree stays watched.
+                        logger.warning("cannot watch new directory %s: %s", name, e)
+                changed = True
+            elif name and detect_language(name):
+                changed = True
+        return changed
+
+    def close(self) -> None:
+        if getattr(self, "_fd", -1) >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_source(root: str, poll: bool = False, poll_interval_s: float = DEFAULT_POLL_INTERVAL_S):
+    """inotify when available, otherwise polling."""
+    if not poll:
+        try:
+            return InotifySource(root)
+        except (OSError, AttributeError) as e:
+            logger.info("inotify unavailable for %s (%s); polling instead", root, e)
+    return PollingSource(root, poll_interval_s)
+
+
+# ── Watcher ──
+
+
+@dataclass
+class GraphWatcher:
+    """Debounce file changes under project_path into incremental scans."""
+
+    project: str
+    project_path: str
+    debounce_s: float = DEFAULT_DEBOUNCE_S
+    max_delay_s: float = DEFAULT_MAX_DELAY_S
+    poll: bool = False
+    poll_interval_s: float = DEFAULT_POLL_INTERVAL_S
+    on_update: object = None  # callable(stats) after each update
+    updates: int = field(default=0, init=False)
+    last_update: dict | None = field(default=None, init=False)
+    last_update_at: str | None = field(default=None, init=False)
+    last_error: str | None = field(default=None, init=False)
+    backend: str | None = field(default=None, init=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+    _source: object = field(default=None, init=False, repr=False)
+
+    def start(self) -> "GraphWatcher":
+        """Run in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._source = open_source(self.project_path, self.poll, self.poll_interval_s)
+        self.backend = self._source.backend
+        self._thread = threading.Thread(
+            target=self._loop, name=f"enki-graph-watch-{self.project}", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def run_forever(self) -> None:
+        """Run in the calling thread until stop() or KeyboardInterrupt."""
+        self._stop.clear()
+        self._source = open_source(self.project_path, self.poll, self.poll_interval_s)
+        self.backend = self._source.backend
+        try:
+            self._loop()
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def status(self) -> dict:
+        return {
+            "project": self.project,
+            "project_path": self.project_path,
+            "backend": self.backend,
+            "running": self.running,
+            "updates": self.updates,
+            "last_update_at": self.last_update_at,
+            "last_update": self.last_update,
+            "last_error": self.last_error,
+        }
+
+    def _loop(self) -> None:
+        source = self._source
+        try:
+            while not self._stop.is_set():
+                if not source.wait(0.5, self._stop):
+                    continue
+                # Debounce: wait for a quiet period, bounded by max_delay_s.
+                first = time.monotonic()
+                while not self._stop.is_set():
+                    remaining = self.max_delay_s - (time.monotonic() - first)
+                    if remaining <= 0 or not source.wait(min(self.debounce_s, remaining), self._stop):
+                        break
+                if self._stop.is_set():
+                    break
+                self.update_now()
+        finally:
+            source.close()
+
+    def update_now(self) -> dict | None:
+        """Run one incremental scan and record the outcome."""
+        from enki.graph.scanner import run_incremental_update
+
+        try:
+            stats = run_incremental_update(self.project, self.project_path)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning("graph watch update failed for %s: %s", self.project, e)
+            return None
+        self.updates += 1
+        self.last_update = stats
+        self.last_update_at = datetime.now(timezone.utc).isoformat()
+        if stats.get("errors"):
+            self.last_error = "; ".join(stats["errors"][:3])
+        if callable(self.on_update):
+            self.on_update(stats)
+        return stats
+
+
+# ── Per-project registry (MCP server) ──
+
+_watchers: dict[str, GraphWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def start_watch(project: str, project_path: str, **kwargs) -> GraphWatcher:
+    """Start (or return the running) watcher for a project."""
+    with _watchers_lock:
+        watcher = _watchers.get(project)
+        if watcher and watcher.running and watcher.project_path == project_path:
+            return watcher
+        if watcher:
+            watcher.stop()
+        watcher = GraphWatcher(project=project, project_path=project_path, **kwargs)
+        _watchers[project] = watcher.start()
+        return watcher
+
+
+def stop_watch(project: str) -> bool:
+    """Stop a project's watcher. False if none was running."""
+    with _watchers_lock:
+        watcher = _watchers.pop(project, None)
+    if not watcher:
+        return False
+    watcher.stop()
+    return True
+
+
+def watch_status(project: str | None = None) -> list[dict]:
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+    return [w.status() for w in watchers if project is None or w.project == project]
+
+
+def watch_settings() -> dict:
+    """GraphWatcher keyword arguments from the [graph] config section."""
+    from enki.config import get_config
+
+    cfg = get_config().get("graph", {})
+    return {
+        "debounce_s": float(cfg.get("watch_debounce_s", DEFAULT_DEBOUNCE_S)),
+        "max_delay_s": float(cfg.get("watch_max_delay_s", DEFAULT_MAX_DELAY_S)),
+        "poll": bool(cfg.get("watch_poll", False)),
+    }
+
+
+def sync_watch_to_phase(project: str, phase: str) -> None:
+    """Opt-in ([graph] watch_during_implement): watch only while implementing.
+
+    Called for every phase write (enki.project_state.write_phase).
+    """
+    from enki.config import get_config
+
+    if not get_config().get("graph", {}).get("watch_during_implement", False):
+        return
+    try:
+        if phase != "implement":
+            stop_watch(project)
+            return
+        from enki.db import wisdom_db
+
+        with wisdom_db() as conn:
+            row = conn.execute(
+                "SELECT path FROM projects WHERE name = ? LIMIT 1", (project,),
+            ).fetchone()
+        project_path = (row["path"] or "").strip() if row else ""
+        if project_path:
+            start_watch(project, project_path, **watch_settings())
+    except Exception as e:
+        logger.warning("Graph watch not synced to phase %s for %s: %s", phase, project, e)
@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
 import shutil
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 EXPECTED_HOOK_VERSIONS = {
     "enki-session-start.sh": "v4.1.0",
     "enki-subagent-start.sh": "v4.1.0",
     "enki-pre-tool-use.sh": "v4.0.1",
-    "enki-post-tool-use.sh": "v4.0.1",
+    "enki-post-tool-use.sh": "v4.1.0",
     "enki-pre-compact.sh": "v4.0.1",
     "enki-session-end.sh": "v4.0.1",
 }
@@ -45,19 +49,72 @@ def _read_hook_version(hook_path: Path) -> str | None:
     return None
 
 
-def check_hook_versions(hooks_dir: str = "~/.claude/hooks/") -> HookVersionResult:
-    """Compare deployed hook versions against expected versions."""
+def _stat_key(st: os.stat_result) -> list[int]:
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _load_manifest(manifest_path: Path) -> dict:
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if isinstance(data, dict) and isinstance(data.get("hooks"), dict):
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"hooks": {}}
+
+
+def _save_manifest(manifest_path: Path, manifest: dict) -> None:
+    """Atomically replace the manifest. Failures only cost a re-read next time."""
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, manifest_path)
+    except OSError:
+        pass
+
+
+def check_hook_versions(
+    hooks_dir: str = "~/.claude/hooks/",
+    manifest_path: str | Path | None = None,
+) -> HookVersionResult:
+    """Compare deployed hook versions against expected versions.
+
+    With manifest_path, parsed versions are cached by (mtime_ns, size, inode)
+    and hooks are only re-read when their stat changes, so an unchanged
+    install costs one stat per hook and no hook file reads.
+    """
     root = Path(hooks_dir).expanduser()
     mismatches: list[dict] = []
     missing: list[str] = []
 
+    manifest = None
+    dirty = False
+    if manifest_path is not None:
+        manifest_path = Path(manifest_path).expanduser()
+        manifest = _load_manifest(manifest_path)
+
     for hook, expected in EXPECTED_HOOK_VERSIONS.items():
         hook_path = root / hook
-        if not hook_path.exists():
+        try:
+            st = hook_path.stat()
+        except OSError:
             missing.append(hook)
             continue
 
-        deployed = _read_hook_version(hook_path)
+        if manifest is None:
+            deployed = _read_hook_version(hook_path)
+        else:
+            key = str(hook_path.absolute())
+            entry = manifest["hooks"].get(key)
+            stat_key = _stat_key(st)
+            if entry and entry.get("stat") == stat_key:
+                deployed = entry.get("version")
+            else:
+                deployed = _read_hook_version(hook_path)
+                manifest["hooks"][key] = {"stat": stat_key, "version": deployed}
+                dirty = True
+
         if deployed != expected:
             mismatches.append(
                 {
@@ -67,6 +124,9 @@ def check_hook_versions(hooks_dir: str = "~/.claude/hooks/") -> HookVersionResul
                 }
             )
 
+    if dirty:
+        _save_manifest(manifest_path, manifest)
+
     return HookVersionResult(
         all_current=(not mismatches and not missing),
         mismatches=mismatches,
@@ -74,6 +134,62 @@ def check_hook_versions(hooks_dir: str = "~/.claude/hooks/") -> HookVersionResul
     )
 
 
+@dataclass
+class HookHashResult:
+    hooks_dir: str
+    ok: bool
+    missing: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+
+
+def _sha256(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def expected_hook_hashes(source_dir: str | Path) -> dict[str, str]:
+    """SHA-256 of each expected hook in the source directory."""
+    src_root = Path(source_dir).expanduser()
+    hashes = {}
+    for hook in EXPECTED_HOOK_VERSIONS:
+        digest = _sha256(src_root / hook)
+        if digest:
+            hashes[hook] = digest
+    return hashes
+
+
+def _verify_dir(hooks_dir: Path, expected: dict[str, str]) -> HookHashResult:
+    missing, modified = [], []
+    for hook, digest in expected.items():
+        deployed = _sha256(hooks_dir / hook)
+        if deployed is None:
+            missing.append(hook)
+        elif deployed != digest:
+            modified.append(hook)
+    return HookHashResult(
+        hooks_dir=str(hooks_dir),
+        ok=not missing and not modified,
+        missing=missing,
+        modified=modified,
+    )
+
+
+def verify_hook_hashes(
+    hook_dirs: list[str | Path],
+    source_dir: str | Path,
+    max_workers: int = 8,
+) -> list[HookHashResult]:
+    """Compare deployed hook contents against source hooks, one dir per worker."""
+    expected = expected_hook_hashes(source_dir)
+    dirs = [Path(d).expanduser() for d in hook_dirs]
+    if not expected or not dirs:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(dirs)))) as pool:
+        return list(pool.map(lambda d: _verify_dir(d, expected), dirs))
+
+
 def format_hook_warning(result: HookVersionResult) -> str:
     """Build warning text for stale/missing deployed hooks."""
     stale = [m["hook"] for m in result.mismatches]
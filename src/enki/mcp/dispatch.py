@@ -0,0 +1,233 @@
+"""dispatch.py — Run synchronous MCP tool handlers off the event loop.
+
+Handlers are plain blocking functions (SQLite, git subprocesses,
+tree-sitter scans, embedding search). The dispatcher runs them on
+executor threads so one slow call no longer stalls the stdio server:
+
+- read-only tools run concurrently with everything else
+- state-mutating tools are serialized per project
+- heavy tools get their own small pool so they can't starve cheap calls
+- every tool class has a timeout (config [mcp.timeouts], seconds)
+
+Queue depth, wait time and timeouts are exposed via stats() for enki_status.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from enki.project_state import resolve_project
+
+# Tools that never write project state. Everything else takes the project lock.
+READ_ONLY_TOOLS = frozenset({
+    "enki_recall",
+    "enki_status",
+    "enki_restore",
+    "enki_graph_query",
+    "enki_mail_thread",
+    "enki_diagram",
+    "enki_sprint_summary",
+    "enki_next_actions",
+})
+
+# Long-running tools: git/worktree work, full scans, embedding search.
+HEAVY_TOOLS = frozenset({
+    "enki_graph_rebuild",
+    "enki_wave",
+    "enki_wave_reconcile",
+    "enki_recall",
+    "enki_memory_lint",
+    "enki_wrap",
+})
+
+# Arguments that turn an otherwise cheap tool into heavy work. A graph
+# query for a task refreshes that task's overlay and may first build the
+# sprint base graph (git worktree add plus a scan).
+HEAVY_ARGUMENTS = {
+    "enki_graph_query": "task_id",
+}
+
+DEFAULT_TIMEOUTS = {"read": 30.0, "write": 120.0, "heavy": 900.0}
+DEFAULT_WORKERS = 8
+DEFAULT_HEAVY_WORKERS = 2
+
+
+class ToolTimeout(Exception):
+    """A tool exceeded its class timeout. The handler thread keeps running."""
+
+
+def tool_class(name: str, arguments: dict | None = None) -> str:
+    """Timeout/pool class for a tool: 'heavy', 'read' or 'write'."""
+    if name in HEAVY_TOOLS:
+        return "heavy"
+    heavy_argument = HEAVY_ARGUMENTS.get(name)
+    if heavy_argument and (arguments or {}).get(heavy_argument):
+        return "heavy"
+    if name in READ_ONLY_TOOLS:
+        return "read"
+    return "write"
+
+
+def is_mutating(name: str) -> bool:
+    return name not in READ_ONLY_TOOLS
+
+
+def lock_key(arguments: dict) -> str:
+    """Project lock key: the project the handler will act on, resolved the
+    way the handlers resolve it, so "." or an omitted project and the name
+    it stands for share one lock."""
+    project = arguments.get("project")
+    return resolve_project(project if isinstance(project, str) else None)
+
+
+@dataclass
+class _ClassStats:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    started: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_ms_total / self.started, 2) if self.started else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 2),
+        }
+
+
+@dataclass
+class ToolDispatcher:
+    workers: int = DEFAULT_WORKERS
+    heavy_workers: int = DEFAULT_HEAVY_WORKERS
+    timeouts: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TIMEOUTS))
+
+    def __post_init__(self):
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="enki-tool")
+        self._heavy_pool = ThreadPoolExecutor(self.heavy_workers, thread_name_prefix="enki-heavy")
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._stats: dict[str, _ClassStats] = {c: _ClassStats() for c in DEFAULT_TIMEOUTS}
+        self._stats_lock = threading.Lock()
+
+    # ── Execution ──
+
+    async def run(self, name: str, arguments: dict, fn: Callable[[], str]) -> str:
+        """Run fn on an executor thread under the tool's lock and timeout."""
+        cls = tool_class(name, arguments)
+        stats = self._stats[cls]
+        enqueued = time.perf_counter()
+        with self._stats_lock:
+            stats.queued += 1
+
+        lock = self._locks.setdefault(lock_key(arguments), asyncio.Lock()) \
+            if is_mutating(name) else None
+        if lock is not None:
+            try:
+                await lock.acquire()
+            except BaseException:
+                # Cancelled while waiting: the call never reaches _call.
+                with self._stats_lock:
+                    stats.queued -= 1
+                raise
+
+        def _call() -> str:
+            waited = (time.perf_counter() - enqueued) * 1000
+            with self._stats_lock:
+                stats.queued -= 1
+                stats.running += 1
+                stats.started += 1
+                stats.wait_ms_total += waited
+                stats.wait_ms_max = max(stats.wait_ms_max, waited)
+            try:
+                return fn()
+            except Exception:
+                with self._stats_lock:
+                    stats.errors += 1
+                raise
+            finally:
+                with self._stats_lock:
+                    stats.running -= 1
+                    stats.completed += 1
+
+        loop = asyncio.get_running_loop()
+        pool = self._heavy_pool if cls == "heavy" else self._pool
+        try:
+            future = loop.run_in_executor(pool, _call)
+        except BaseException:
+            with self._stats_lock:
+                stats.queued -= 1
+            if lock is not None:
+                lock.release()
+            raise
+
+        timeout = self.timeouts.get(cls)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                stats.timeouts += 1
+            raise ToolTimeout(f"{name} timed out after {timeout:g}s ({cls} tool)") from None
+        finally:
+            if lock is not None:
+                # A timed-out handler still owns project state until it
+                # actually finishes, so only release the lock then.
+                if future.done():
+                    lock.release()
+                else:
+                    future.add_done_callback(lambda _f: lock.release())
+
+    # ── Reporting ──
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            classes = {cls: s.as_dict() for cls, s in self._stats.items()}
+        return {
+            "queue_depth": sum(c["queued"] for c in classes.values()),
+            "running": sum(c["running"] for c in classes.values()),
+            "workers": self.workers,
+            "heavy_workers": self.heavy_workers,
+            "timeouts_s": dict(self.timeouts),
+            "classes": classes,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._heavy_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_dispatcher: ToolDispatcher | None = None
+
+
+def get_dispatcher() -> ToolDispatcher:
+    """Process-wide dispatcher configured from enki.toml [mcp]."""
+    global _dispatcher
+    if _dispatcher is None:
+        from enki.config import get_config
+
+        mcp_config = get_config().get("mcp", {})
+        timeouts = dict(DEFAULT_TIMEOUTS)
+        timeouts.update({
+            k: float(v) for k, v in mcp_config.get("timeouts", {}).items()
+            if k in DEFAULT_TIMEOUTS
+        })
+        _dispatcher = ToolDispatcher(
+            workers=int(mcp_config.get("workers", DEFAULT_WORKERS)),
+            heavy_workers=int(mcp_config.get("heavy_workers", DEFAULT_HEAVY_WORKERS)),
+            timeouts=timeouts,
+        )
+    return _dispatcher
+
+
+def dispatcher_stats() -> dict | None:
+    """Stats for the running server's dispatcher, or None outside the server."""
+    return _dispatcher.stats() if _dispatcher is not None else None
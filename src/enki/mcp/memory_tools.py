@@ -15,19 +15,13 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-from enki.project_state import normalize_project_name, resolve_project_from_cwd
+from enki.project_state import normalize_project_name, resolve_project
 
 logger = logging.getLogger(__name__)
 
 
 def _resolve_project(project: str | None) -> str:
-    candidate = (project or "").strip()
-    if candidate and candidate not in {".", "default"}:
-        return normalize_project_name(candidate)
-    resolved = resolve_project_from_cwd(str(Path.cwd()))
-    if resolved:
-        return normalize_project_name(resolved)
-    return normalize_project_name(candidate) or "default"
+    return resolve_project(project)
 
 
 # ---------------------------------------------------------------------------
@@ -395,22 +389,13 @@ def _search_graph(project: str, query: str, limit: int = 5) -> list[dict]:
 
 
 def _update_access_timestamps(note_ids: list[str]):
-    """Update last_accessed for retrieved notes."""
+    """Update last_accessed for retrieved notes (batched, see enki.memory.access)."""
     if not note_ids:
         return
     try:
-        from enki.db import get_wisdom_db
-        conn = get_wisdom_db()
-        try:
-            now = datetime.now(timezone.utc).isoformat()
-            placeholders = ",".join("?" for _ in note_ids)
-            conn.execute(
-                f"UPDATE notes SET last_accessed = ? WHERE id IN ({placeholders})",
-                [now] + note_ids,
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        from enki.memory import access
+
+        access.touch("notes", note_ids, datetime.now(timezone.utc).isoformat())
     except Exception:
         pass  # Access tracking is best-effort
 
@@ -21,8 +21,9 @@ from enki.project_state import (
     normalize_project_name,
     project_db_path,
     read_project_state,
-    resolve_project_from_cwd,
+    resolve_project,
     stable_goal_id,
+    write_phase,
     write_project_state,
 )
 from enki.orch.schemas import create_tables as create_em_tables
@@ -79,6 +80,7 @@ from enki.orch.onboarding import (
     get_user_preference,
 )
 from enki.orch.bridge import extract_beads_from_project
+from enki.mcp.paging import clamp_page_size, decode_cursor, split_page
 from enki.orch.agents import AgentRole, get_blind_wall_filter
 from enki.memory import gemini as gemini_review
 from enki.memory.notes import create as create_note, update as update_note
@@ -569,13 +571,7 @@ TASK_PHASES = ["test_design", "implementing", "verifying", "complete"]
 
 
 def _resolve_project(project: str | None) -> str:
-    candidate = (project or "").strip()
-    if candidate and candidate not in {".", "default"}:
-        return normalize_project_name(candidate)
-    resolved = resolve_project_from_cwd(str(Path.cwd()))
-    if resolved:
-        return normalize_project_name(resolved)
-    return normalize_project_name(candidate) or "default"
+    return resolve_project(project)
 
 
 def _register_project_path(project: str, cwd: Path | None = None) -> str:
@@ -714,7 +710,7 @@ def enki_goal(
     write_project_state(project, "tier", detected_tier)
     write_project_state(project, "goal_id", goal_id)
     if not phase_preserved:
-        write_project_state(project, "phase", phase)
+        write_phase(project, phase)
     write_project_state(project, "spec_source", spec_mode)
     write_project_state(project, "spec_path", str(copied_spec) if copied_spec else "")
     created["project_state"] = previous_goal is None
@@ -942,7 +938,7 @@ def enki_phase(
         if missing:
             return {"error": f"Cannot advance to {target}. Required: {missing}"}
 
-        write_project_state(project, "phase", target)
+        write_phase(project, target)
         return {"phase": target, "required_next": _phase_required_next(target)}
 
     return {"error": f"Unknown action: {action}. Use 'advance' or 'status'."}
@@ -1037,7 +1033,7 @@ def enki_approve(
             _insert_implied_spec_approval(conn, project)
 
     target_phase = APPROVAL_TARGET_PHASE[stage_key]
-    write_project_state(project, "phase", target_phase)
+    write_phase(project, target_phase)
     approval_messages = {
         "igi": (
             "Igi approved. Phase → implement. "
@@ -2306,7 +2302,7 @@ def enki_spawn(
             complexity_score, model_recommended = select_model(
                 role=role_key,
                 task=task or {},
-                graph_context=None,
+                graph_context=_task_graph_context(project, task),
             )
         except Exception:
             complexity_score, model_recommended = 0, "claude-sonnet-4-6"
@@ -2355,7 +2351,7 @@ def enki_spawn(
                     assigned_files = []
             if isinstance(assigned_files, list) and assigned_files:
                 try:
-                    codebase_ctx = _build_codebase_context(project, assigned_files)
+                    codebase_ctx = _build_codebase_context(project, assigned_files, task)
                     if codebase_ctx:
                         merged_context["codebase_context"] = codebase_ctx
                 except Exception:
@@ -3313,9 +3309,26 @@ def enki_mail_inbox(
     return messages
 
 
-def enki_mail_thread(thread_id: str, project: str = ".") -> list[dict]:
-    """Get full thread history."""
-    return get_thread_messages(project, thread_id)
+def enki_mail_thread(
+    thread_id: str,
+    project: str = ".",
+    cursor: str | None = None,
+    page_size: int | None = None,
+) -> dict:
+    """Get thread history, one chronological page at a time."""
+    try:
+        after = decode_cursor(cursor, 2)
+    except ValueError as e:
+        return {"error": str(e)}
+    size = clamp_page_size(page_size)
+    rows = get_thread_messages(project, thread_id, after=after, limit=size + 1)
+    messages, next_cursor = split_page(rows, size, lambda m: (m["created_at"], m["id"]))
+    return {
+        "thread_id": thread_id,
+        "messages": messages,
+        "count": len(messages),
+        "next_cursor": next_cursor,
+    }
 
 
 # ── Bugs ──
@@ -3437,18 +3450,73 @@ def enki_graph_rebuild(
     }
 
 
+def enki_graph_watch(action: str = "status", project: str | None = None) -> dict:
+    """Start, stop or inspect the graph file watcher for a project.
+
+    While running, file changes under the project path are debounced
+    into incremental graph updates, so graph queries stay current
+    without calling enki_graph_rebuild.
+    """
+    from enki.graph.watcher import start_watch, stop_watch, watch_settings, watch_status
+
+    project = _resolve_project(project)
+    if action == "status":
+        watchers = watch_status(project)
+        return watchers[0] if watchers else {"project": project, "running": False}
+    if action == "stop":
+        stopped = stop_watch(project)
+        return {"project": project, "running": False, "stopped": stopped}
+    if action != "start":
+        return {"error": f"Unknown action: {action}. Use 'start', 'stop' or 'status'."}
+
+    project_path = _get_project_path(project)
+    if not project_path:
+        return {
+            "error": (
+                f"Project path not registered for '{project}'. "
+                "Call enki_register(path='.') first."
+            )
+        }
+    try:
+        watcher = start_watch(project, project_path, **watch_settings())
+    except Exception as e:
+        return {"error": f"Graph watch failed to start: {e}"}
+    return watcher.status()
+
+
 def enki_graph_query(
     query_type: str,
     target: str,
     project: str | None = None,
     limit: int = 10,
+    cursor: str | None = None,
+    page_size: int | None = None,
+    depth: int | None = None,
+    to: str | None = None,
+    task_id: str | None = None,
 ) -> dict:
-    """Query the codebase knowledge graph."""
+    """Query the codebase knowledge graph.
+
+    List results are keyset-paginated: pass back `next_cursor` to continue.
+    page_size defaults to limit. `depth` bounds callers (default 1 =
+    direct), transitive_importers/transitive_imports and path (default
+    MAX_REACH_DEPTH). `target` for callers/duplicates is a symbol id,
+    "path::name", a file path or a bare name; duplicates also accepts
+    "*" for every group. path finds the shortest import chain from
+    `target` to `to`. hotspots ranks files by churn x complexity risk,
+    under the `target` directory or "*" for all. `task_id` queries that task's worktree instead:
+    its overlay on the sprint base graph, refreshed first.
+    """
     project = _resolve_project(project)
 
-    from enki.db import graph_db, graph_db_path
+    from enki.db import graph_db_path
 
-    if not graph_db_path(project).exists():
+    task = None
+    if task_id:
+        task = get_task(project, task_id)
+        if not _task_worktree(task):
+            return {"error": f"Task '{task_id}' has no worktree. Omit task_id to query graph.db."}
+    elif not graph_db_path(project).exists():
         return {
             "error": (
                 "No graph.db found for this project. "
@@ -3456,81 +3524,230 @@ def enki_graph_query(
             )
         }
 
+    size = clamp_page_size(page_size, default=limit)
+    arity = {
+        "blast_radius": 1, "importers": 1, "imports": 1, "symbols": 2, "complexity": 2,
+        "callers": 2, "duplicates": 1, "transitive_importers": 2, "transitive_imports": 2,
+        "hotspots": 2,
+    }
+    try:
+        after = decode_cursor(cursor, arity.get(query_type, 0))
+    except ValueError as e:
+        return {"error": str(e)}
+
     try:
-        with graph_db(project) as conn:
+        with _graph_conn(project, task) as conn:
             if query_type == "blast_radius":
                 rows = conn.execute(
                     "SELECT b.*, f.language FROM blast_radius b "
                     "JOIN files f ON b.file_path = f.path "
-                    "WHERE b.file_path = ? OR b.symbol_id LIKE ?",
-                    (target, f"{target}%"),
+                    "WHERE (b.file_path = ? OR b.symbol_id LIKE ?) "
+                    "AND b.symbol_id > ? "
+                    "ORDER BY b.symbol_id LIMIT ?",
+                    (target, f"{target}%", after[0] if after else "", size + 1),
                 ).fetchall()
+                page, next_cursor = split_page(
+                    [dict(r) for r in rows], size, lambda r: (r["symbol_id"],),
+                )
                 return {
                     "query_type": query_type,
                     "target": target,
-                    "results": [dict(r) for r in rows[:limit]],
+                    "results": page,
+                    "next_cursor": next_cursor,
                 }
 
             if query_type == "importers":
                 rows = conn.execute(
                     "SELECT from_id, line_number FROM edges "
-                    "WHERE to_id = ? AND edge_type = 'imports' "
-                    "LIMIT ?",
-                    (target, limit),
+                    "WHERE to_id = ? AND edge_type = 'imports' AND from_id > ? "
+                    "ORDER BY from_id LIMIT ?",
+                    (target, after[0] if after else "", size + 1),
                 ).fetchall()
+                page, next_cursor = split_page(
+                    [r["from_id"] for r in rows], size, lambda r: (r,),
+                )
                 return {
                     "query_type": query_type,
                     "target": target,
-                    "importers": [r["from_id"] for r in rows],
-                    "count": len(rows),
+                    "importers": page,
+                    "count": len(page),
+                    "next_cursor": next_cursor,
                 }
 
             if query_type == "imports":
                 rows = conn.execute(
                     "SELECT to_id, line_number FROM edges "
-                    "WHERE from_id = ? AND edge_type = 'imports' "
-                    "LIMIT ?",
-                    (target, limit),
+                    "WHERE from_id = ? AND edge_type = 'imports' AND to_id > ? "
+                    "ORDER BY to_id LIMIT ?",
+                    (target, after[0] if after else "", size + 1),
                 ).fetchall()
+                page, next_cursor = split_page(
+                    [r["to_id"] for r in rows], size, lambda r: (r,),
+                )
                 return {
                     "query_type": query_type,
                     "target": target,
-                    "imports": [r["to_id"] for r in rows],
-                    "count": len(rows),
+                    "imports": page,
+                    "count": len(page),
+                    "next_cursor": next_cursor,
                 }
 
             if query_type == "symbols":
+                query = (
+                    "SELECT id, name, kind, line_start, complexity, is_exported "
+                    "FROM symbols WHERE file_path = ?"
+                )
+                params: list = [target]
+                if after:
+                    query += " AND (line_start > ? OR (line_start = ? AND id > ?))"
+                    params.extend([after[0], after[0], after[1]])
                 rows = conn.execute(
-                    "SELECT name, kind, line_start, complexity, is_exported "
-                    "FROM symbols WHERE file_path = ? "
-                    "ORDER BY line_start LIMIT ?",
-                    (target, limit),
+                    query + " ORDER BY line_start, id LIMIT ?", (*params, size + 1),
                 ).fetchall()
+                page, next_cursor = split_page(
+                    [dict(r) for r in rows], size, lambda r: (r["line_start"], r["id"]),
+                )
+                for r in page:
+                    r.pop("id")
                 return {
                     "query_type": query_type,
                     "target": target,
-                    "symbols": [dict(r) for r in rows],
-                    "count": len(rows),
+                    "symbols": page,
+                    "count": len(page),
+                    "next_cursor": next_cursor,
                 }
 
             if query_type == "complexity":
+                query = (
+                    "SELECT id, name, kind, line_start, complexity "
+                    "FROM symbols WHERE file_path = ?"
+                )
+                params = [target]
+                if after:
+                    query += " AND (complexity < ? OR (complexity = ? AND id > ?))"
+                    params.extend([after[0], after[0], after[1]])
                 rows = conn.execute(
-                    "SELECT name, kind, line_start, complexity "
-                    "FROM symbols WHERE file_path = ? "
-                    "ORDER BY complexity DESC LIMIT ?",
-                    (target, limit),
+                    query + " ORDER BY complexity DESC, id LIMIT ?", (*params, size + 1),
                 ).fetchall()
+                page, next_cursor = split_page(
+                    [dict(r) for r in rows], size, lambda r: (r["complexity"], r["id"]),
+                )
+                for r in page:
+                    r.pop("id")
                 return {
                     "query_type": query_type,
                     "target": target,
-                    "hotspots": [dict(r) for r in rows],
+                    "hotspots": page,
+                    "next_cursor": next_cursor,
+                }
+
+            if query_type == "hotspots":
+                query = (
+                    "SELECT path, churn, lines_changed, complexity, max_complexity, risk_score "
+                    "FROM hotspots WHERE 1=1"
+                )
+                params = []
+                if target not in ("", "*"):
+                    query += " AND substr(path, 1, length(?)) = ?"
+                    params.extend([target, target])
+                if after:
+                    query += " AND (risk_score < ? OR (risk_score = ? AND path > ?))"
+                    params.extend([after[0], after[0], after[1]])
+                rows = conn.execute(
+                    query + " ORDER BY risk_score DESC, path LIMIT ?", (*params, size + 1),
+                ).fetchall()
+                page, next_cursor = split_page(
+                    [dict(r) for r in rows], size, lambda r: (r["risk_score"], r["path"]),
+                )
+                return {
+                    "query_type": query_type,
+                    "target": target,
+                    "hotspots": page,
+                    "count": len(page),
+                    "next_cursor": next_cursor,
+                }
+
+            if query_type in ("callers", "duplicates"):
+                from enki.graph import queries
+
+                symbol_ids = None
+                if not (query_type == "duplicates" and target == "*"):
+                    symbol_ids = queries.target_symbols(conn, target)
+                    if not symbol_ids:
+                        return {"error": f"No symbol matches '{target}'."}
+
+                if query_type == "callers":
+                    depth = 1 if depth is None else depth
+                    rows = queries.callers(
+                        conn, symbol_ids, depth=depth,
+                        after=tuple(after) if after else None, limit=size + 1,
+                    )
+                    page, next_cursor = split_page(rows, size, lambda r: (r["depth"], r["id"]))
+                    return {
+                        "query_type": query_type,
+                        "target": target,
+                        "symbols": symbol_ids,
+                        "depth": max(1, min(int(depth), queries.MAX_CALLER_DEPTH)),
+                        "callers": page,
+                        "count": len(page),
+                        "next_cursor": next_cursor,
+                    }
+
+                groups = queries.duplicates(
+                    conn, symbol_ids, after=after[0] if after else None, limit=size + 1,
+                )
+                page, next_cursor = split_page(groups, size, lambda g: (g["fingerprint"],))
+                return {
+                    "query_type": query_type,
+                    "target": target,
+                    "groups": page,
+                    "count": len(page),
+                    "next_cursor": next_cursor,
+                }
+
+            if query_type in ("transitive_importers", "transitive_imports"):
+                from enki.graph import queries
+
+                direction = query_type.removeprefix("transitive_")
+                walk = queries.transitive_files(
+                    conn, target, direction, depth=depth,
+                    after=tuple(after) if after else None, limit=size + 1,
+                )
+                page, next_cursor = split_page(
+                    walk["files"], size, lambda r: (r["depth"], r["path"]),
+                )
+                return {
+                    "query_type": query_type,
+                    "target": target,
+                    "depth": queries.reach_depth(depth),
+                    direction: page,
+                    "count": len(page),
+                    "total": walk["total"],
+                    "truncated": walk["truncated"],
+                    "next_cursor": next_cursor,
+                }
+
+            if query_type == "path":
+                from enki.graph import queries
+
+                if not to:
+                    return {"error": "path needs `to`: the file the chain should reach."}
+                chain, truncated = queries.import_path(conn, target, to, depth=depth)
+                return {
+                    "query_type": query_type,
+                    "target": target,
+                    "to": to,
+                    "path": chain,
+                    "length": len(chain) - 1 if chain else None,
+                    "truncated": truncated,
                 }
 
             return {
                 "error": (
                     f"Unknown query_type '{query_type}'. "
                     "Options: blast_radius, importers, imports, "
-                    "symbols, complexity, duplicates, callers"
+                    "transitive_importers, transitive_imports, path, "
+                    "symbols, complexity, hotspots, duplicates, callers"
                 )
             }
     except Exception as e:
@@ -4105,12 +4322,25 @@ def enki_validate_update(
     }
 
 
-def enki_sprint_summary(sprint_id: str, project: str = ".") -> dict:
-    """Get sprint summary."""
+def enki_sprint_summary(
+    sprint_id: str,
+    project: str = ".",
+    cursor: str | None = None,
+    page_size: int | None = None,
+) -> dict:
+    """Get sprint summary with one page of tasks."""
     project = _resolve_project(project)
-    result = get_sprint_summary(project, sprint_id)
+    try:
+        after = decode_cursor(cursor, 2)
+    except ValueError as e:
+        return {"error": str(e)}
+    size = clamp_page_size(page_size)
+    result = get_sprint_summary(project, sprint_id, after=after, limit=size + 1)
     if result.get("error"):
         return result
+    result["tasks"], result["next_cursor"] = split_page(
+        result["tasks"], size, lambda t: (t["started_at"] or "", t["task_id"]),
+    )
 
     try:
         session_id = _get_current_session_id()
@@ -4264,7 +4494,7 @@ def enki_project_close(project: str | None = None) -> dict:
     except Exception as e:
         results["memory_wrap"] = f"failed: {e}"
 
-    write_project_state(project, "phase", "closing")
+    write_phase(project, "closing")
     return {
         "message": "Project close complete. Pending HITL acceptance.",
         "project": project,
@@ -4787,16 +5017,70 @@ def _get_impl_spec_path(project: str) -> Path | None:
     return sorted(candidates)[-1] if candidates else None
 
 
-def _build_codebase_context(project: str, assigned_files: list[str]) -> str | None:
-    """Build a codebase context block for assigned files from graph.db."""
+def _task_graph_context(project: str, task: dict) -> dict | None:
+    """Deep Thought graph signals for a task's files, from graph.db's
+    precomputed blast radius and hotspot tables."""
     from enki.db import graph_db, graph_db_path
+    from enki.graph.hotspots import file_hotspots
+
+    files = task.get("assigned_files") or []
+    if not files or not graph_db_path(project).exists():
+        return None
+    with graph_db(project) as conn:
+        max_blast = conn.execute(
+            "SELECT MAX(blast_score) FROM blast_radius "
+            "WHERE file_path IN (SELECT value FROM json_each(?))",
+            (json.dumps(files),),
+        ).fetchone()[0]
+        hotspots = file_hotspots(conn, files)
+    return {
+        "max_blast_score": max_blast or 0.0,
+        "max_hotspot_risk": max((h["risk_score"] for h in hotspots.values()), default=0.0),
+    }
+
+
+def _task_worktree(task: dict | None) -> str | None:
+    worktree = (task or {}).get("worktree_path")
+    return worktree if worktree and Path(worktree).is_dir() else None
+
+
+def _graph_conn(project: str, task: dict | None = None):
+    """graph.db, or the merged graph of the task's worktree if it has one.
+
+    A worktree's graph is its overlay on the sprint base graph (see
+    enki.graph.overlay), refreshed first so edits made there show up.
+    """
+    from enki.db import graph_db
+
+    worktree = _task_worktree(task)
+    if not worktree:
+        return graph_db(project)
+    from enki.graph.overlay import task_graph
+
+    return task_graph(
+        project, task["task_id"], worktree,
+        _get_sprint_base_branch(project, task["sprint_id"]),
+    )
+
+
+def _build_codebase_context(
+    project: str, assigned_files: list[str], task: dict | None = None,
+) -> str | None:
+    """Build a codebase context block for assigned files from graph.db.
 
-    if not graph_db_path(project).exists():
+    Uses the task's worktree graph when it has one.
+    """
+    from enki.db import graph_db_path
+
+    if not _task_worktree(task) and not graph_db_path(project).exists():
         return None
 
+    from enki.graph.hotspots import HOTSPOT_NOTABLE_RISK, file_hotspots
+
     lines = ["## Codebase Context (from knowledge graph)"]
     try:
-        with graph_db(project) as conn:
+        with _graph_conn(project, task) as conn:
+            hotspots = file_hotspots(conn, assigned_files[:5])
             for file_path in assigned_files[:5]:
                 importers = conn.execute(
                     "SELECT COUNT(*) as c FROM edges "
@@ -4810,10 +5094,15 @@ def _build_codebase_context(project: str, assigned_files: list[str]) -> str | No
                     (file_path,),
                 ).fetchone()
 
-                complexity = conn.execute(
-                    "SELECT MAX(complexity) as c FROM symbols WHERE file_path=?",
-                    (file_path,),
-                ).fetchone()["c"]
+                hotspot = hotspots.get(file_path)
+                if hotspot:
+                    complexity = hotspot["max_complexity"]
+                else:
+                    # Graph scanned before hotspots were materialized.
+                    complexity = conn.execute(
+                        "SELECT MAX(complexity) as c FROM symbols WHERE file_path=?",
+                        (file_path,),
+                    ).fetchone()["c"]
 
                 file_lines = [f"\n**{file_path}**"]
                 if importers > 0:
@@ -4831,6 +5120,11 @@ def _build_codebase_context(project: str, assigned_files: list[str]) -> str | No
                         "  - Max symbol complexity: "
                         f"{complexity} (above threshold — consider splitting)"
                     )
+                if hotspot and hotspot["risk_score"] >= HOTSPOT_NOTABLE_RISK:
+                    file_lines.append(
+                        f"  - Hotspot: changed in {hotspot['churn']} commit(s), "
+                        f"total complexity {hotspot['complexity']} — edit with care"
+                    )
 
                 dupe = conn.execute(
                     "SELECT to_id FROM edges "
@@ -6066,6 +6360,12 @@ def _process_merge_queue(project: str) -> list[dict]:
                         ["git", "branch", "-d", item["branch_name"]],
                         capture_output=True, timeout=30, cwd=project_path,
                     )
+                try:
+                    from enki.graph.overlay import drop_overlay
+
+                    drop_overlay(project, item["task_id"])
+                except Exception as e:
+                    logger.warning("Failed to drop graph overlay for %s: %s", item["task_id"], e)
                 results.append({"task_id": item["task_id"], "status": "merged"})
             else:
                 conflict = (r.stdout + r.stderr)[:2000]
@@ -0,0 +1,138 @@
+"""paging.py — Compact, paginated, size-bounded MCP tool responses.
+
+Tool results go to the model as text, so every byte costs context.
+Responses are serialized as compact JSON and capped at a byte budget;
+when a result would exceed it, the largest list (or string) is cut and
+a `_truncated` block says what was dropped. List-returning tools page
+with opaque keyset cursors instead of returning everything.
+"""
+
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_RESPONSE_BUDGET = 64 * 1024
+
+_TRUNCATION_MARK = "…[truncated]"
+
+
+# ── Cursors ──
+
+
+def encode_cursor(key: list | tuple) -> str:
+    """Opaque cursor for the keyset position after the given row key."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, arity: int) -> list | None:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(key, list) or len(key) != arity:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+def clamp_page_size(page_size: int | None, default: int = DEFAULT_PAGE_SIZE) -> int:
+    if page_size is None:
+        return default
+    return max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+
+def split_page(rows: list, page_size: int, key_fn) -> tuple[list, str | None]:
+    """Split rows fetched with LIMIT page_size + 1 into (page, next_cursor)."""
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor(key_fn(page[-1]))
+
+
+# ── Serialization ──
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _size(obj) -> int:
+    return len(_dumps(obj).encode("utf-8"))
+
+
+def response_budget() -> int:
+    from enki.config import get_config
+
+    return int(get_config().get("mcp", {}).get("response_budget_bytes", DEFAULT_RESPONSE_BUDGET))
+
+
+def to_json(result, budget: int | None = None) -> str:
+    """Compact JSON for a tool result, truncated to fit the byte budget."""
+    text = _dumps(result)
+    budget = response_budget() if budget is None else budget
+    total = len(text.encode("utf-8"))
+    if total <= budget:
+        return text
+    return _dumps(_truncate(result, budget, total))
+
+
+def _truncate(result, budget: int, total: int):
+    if isinstance(result, dict):
+        obj = dict(result)
+    elif isinstance(result, list):
+        obj = {"items": result}
+    else:
+        obj = {"value": result}
+    meta = {"bytes": total, "budget": budget}
+    obj["_truncated"] = meta
+
+    lists = [k for k, v in obj.items() if isinstance(v, list) and v]
+    if lists:
+        field = max(lists, key=lambda k: _size(obj[k]))
+        items = obj[field]
+        meta.update({"field": field, "total": len(items)})
+        if obj.get("next_cursor"):
+            # The cursor points past the untruncated page; a client that
+            # followed it would silently skip the dropped rows.
+            obj["next_cursor"] = None
+
+        def keep(n: int) -> int:
+            obj[field] = items[:n]
+            meta["returned"] = n
+            meta["hint"] = f"Re-request with page_size={max(n, 1)} or narrower arguments."
+            return _size(obj)
+
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if keep(mid) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        if keep(lo) <= budget:
+            return obj
+
+    strings = [k for k, v in obj.items() if isinstance(v, str)]
+    if strings:
+        field = max(strings, key=lambda k: len(obj[k]))
+        raw = obj[field].encode("utf-8")
+        meta["string_field"] = field
+        meta["chars"] = len(obj[field])
+        cut = len(raw)
+        # JSON escaping makes the encoded size larger than the raw bytes,
+        # so shrink until it fits rather than computing the cut once.
+        while cut > 0:
+            cut = max(0, cut - (_size(obj) - budget) - len(_TRUNCATION_MARK) - 16)
+            obj[field] = raw[:cut].decode("utf-8", "ignore") + _TRUNCATION_MARK
+            if _size(obj) <= budget:
+                return obj
+
+    return {
+        "error": "Response exceeded byte budget and could not be trimmed.",
+        "_truncated": {"bytes": total, "budget": budget},
+    }
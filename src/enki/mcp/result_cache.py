@@ -0,0 +1,230 @@
+"""result_cache.py — Generation-validated result cache for read-only MCP tools.
+
+During a wave the same read-only tools are called over and over with the
+same arguments. Results are cached per (tool, canonical args, cwd) and
+stored alongside a generation token built from every database the tool
+reads. A lookup recomputes the token and only serves the entry if it is
+unchanged, so there are no TTLs and no stale answers:
+
+- PRAGMA data_version on a long-lived read-only connection per DB file
+  changes whenever any other connection (hooks, other agents' servers,
+  the CLI) commits to it. graph.db is keyed on scan_state['generation']
+  instead, which scans advance with every content change, because graph
+  queries themselves persist reachability walks there.
+- The file's inode and size catch replaced files and checkpoints.
+- An in-process counter is bumped by every mutating tool call, and
+  enki.toml's stat is included for tools that read config.
+
+The token is taken before the handler runs, so a write that lands
+mid-computation makes the stored entry unreachable rather than stale.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+from enki import db
+
+# Databases each cacheable tool reads. "em" and "graph" cover every
+# project's em.db/graph.db, since project resolution may fall back to cwd.
+CACHEABLE_TOOLS: dict[str, frozenset[str]] = {
+    "enki_recall": frozenset({"wisdom", "abzu", "graph"}),
+    "enki_status": frozenset({"wisdom", "abzu"}),
+    "enki_graph_query": frozenset({"wisdom", "graph"}),
+    "enki_sprint_summary": frozenset({"wisdom", "em", "uru"}),
+    "enki_mail_inbox": frozenset({"wisdom", "em"}),
+    "enki_next_actions": frozenset({"wisdom", "em"}),
+}
+
+# Arguments that make a call read state no token covers; such calls are
+# never cached. A graph query with task_id reads the task's live worktree
+# through its overlay and base graphs.
+UNCACHEABLE_ARGUMENTS: dict[str, frozenset[str]] = {
+    "enki_graph_query": frozenset({"task_id"}),
+}
+
+# Databases that keep their own content generation (see module docstring).
+_GENERATION_SQL = {
+    "graph": "SELECT value FROM scan_state WHERE key='generation'",
+}
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def is_cacheable(tool: str, args: dict) -> bool:
+    if tool not in CACHEABLE_TOOLS:
+        return False
+    return not any(args.get(arg) for arg in UNCACHEABLE_ARGUMENTS.get(tool, ()))
+
+
+def _db_files(kind: str) -> list[Path]:
+    if kind in ("em", "graph"):
+        projects_dir = db.ENKI_ROOT / "projects"
+        try:
+            names = sorted(os.listdir(projects_dir))
+        except OSError:
+            return []
+        return [projects_dir / name / f"{kind}.db" for name in names]
+    return [db._db_path(f"{kind}.db")]
+
+
+def _stat_token(path: Path) -> tuple | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class _DataVersions:
+    """Long-lived read-only connections used only for version reads.
+
+    `version_sql` returns the value that changes when the content does;
+    PRAGMA data_version unless the database keeps its own generation.
+    """
+
+    def __init__(self):
+        self._conns: dict[str, tuple[int, sqlite3.Connection]] = {}
+        self._lock = threading.Lock()
+
+    def token(self, path: Path, generation_sql: str | None = None) -> tuple | None:
+        """(inode, size, data_version), or (inode, generation) when the
+        database keeps its own generation. The file size is left out then:
+        cache-only writes grow the file at checkpoint."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = str(path)
+        with self._lock:
+            cached = self._conns.get(key)
+            if cached is None or cached[0] != st.st_ino:
+                if cached is not None:
+                    cached[1].close()
+                try:
+                    conn = sqlite3.connect(
+                        f"file:{path}?mode=ro", uri=True, check_same_thread=False,
+                    )
+                except sqlite3.Error:
+                    return (st.st_ino, st.st_size, st.st_mtime_ns)
+                self._conns[key] = cached = (st.st_ino, conn)
+            try:
+                if generation_sql is not None:
+                    try:
+                        row = cached[1].execute(generation_sql).fetchone()
+                    except sqlite3.OperationalError:
+                        # No scan_state yet: nothing has been scanned into it.
+                        row = None
+                    return (st.st_ino, row[0] if row else None)
+                version = cached[1].execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error:
+                cached[1].close()
+                del self._conns[key]
+                return (st.st_ino, st.st_size, st.st_mtime_ns)
+        return (st.st_ino, st.st_size, version)
+
+    def close(self) -> None:
+        with self._lock:
+            for _, conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
+
+
+class ResultCache:
+    """Size-bounded LRU of tool results, validated by generation tokens."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[tuple, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = _DataVersions()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    # ── Keys and tokens ──
+
+    @staticmethod
+    def _key(tool: str, args: dict) -> tuple:
+        canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return (tool, canonical, os.getcwd())
+
+    def generation_token(self, tool: str) -> tuple:
+        from enki.config import CONFIG_PATH
+
+        parts: list = [self._generation, _stat_token(CONFIG_PATH)]
+        for kind in sorted(CACHEABLE_TOOLS[tool]):
+            for path in _db_files(kind):
+                parts.append((str(path), self._versions.token(path, _GENERATION_SQL.get(kind))))
+        return tuple(parts)
+
+    # ── Cache operations ──
+
+    def get_or_compute(self, tool: str, args: dict, compute: Callable[[], Any]) -> Any:
+        """Serve a valid cached result or compute, store and return a fresh one."""
+        if not is_cacheable(tool, args) or self.max_entries <= 0:
+            return compute()
+
+        key = self._key(tool, args)
+        token = self.generation_token(tool)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == token:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                self._stats["stale"] += 1
+            self._stats["misses"] += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (token, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self) -> None:
+        """Called after any mutating tool: every cached entry becomes unreachable."""
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._versions.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+_cache: ResultCache | None = None
+
+
+def get_result_cache() -> ResultCache:
+    """Process-wide cache sized from enki.toml [mcp] result_cache_entries."""
+    global _cache
+    if _cache is None:
+        from enki.config import get_config
+
+        size = get_config().get("mcp", {}).get("result_cache_entries", DEFAULT_MAX_ENTRIES)
+        _cache = ResultCache(max_entries=int(size))
+    return _cache
+
+
+def result_cache_stats() -> dict | None:
+    return _cache.stats() if _cache is not None else None
@@ -0,0 +1,122 @@
+"""warmup.py — Background warm-up of heavy modules for the MCP server.
+
+The first orchestration call used to pay for importing orch_tools (and
+everything behind it) inside the user-visible tool call, and the first
+recall paid for numpy plus the embedding model. The server starts this
+warm-up thread as soon as it begins serving, so those costs land while
+the client is still initializing.
+
+Import-lock semantics make this safe: a tool call that arrives mid-import
+simply waits for the in-flight import instead of doing it twice.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+WARM_MODULES = (
+    "enki.mcp.memory_tools",
+    "enki.mcp.orch_tools",
+    "enki.embeddings",
+    "enki.graph.scanner",
+)
+
+
+def _import_step(module: str) -> Callable[[], None]:
+    return lambda: importlib.import_module(module)
+
+
+def _load_embedding_model() -> None:
+    from enki.embeddings import _get_model
+    _get_model()
+
+
+def default_steps(load_model: bool = True) -> list[tuple[str, Callable[[], None]]]:
+    steps = [(f"import {m}", _import_step(m)) for m in WARM_MODULES]
+    if load_model:
+        steps.append(("embedding model", _load_embedding_model))
+    return steps
+
+
+class Warmup:
+    """Runs warm-up steps once on a daemon thread and records timings."""
+
+    def __init__(self, steps: list[tuple[str, Callable[[], None]]]):
+        self._steps = steps
+        self._state = "pending"
+        self._timings: dict[str, dict] = {}
+        self._total_s: float | None = None
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "Warmup":
+        with self._lock:
+            if self._thread is None:
+                self._state = "running"
+                self._thread = threading.Thread(
+                    target=self._run, name="enki-warmup", daemon=True,
+                )
+                self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        failed = False
+        for name, step in self._steps:
+            t0 = time.perf_counter()
+            entry = {"ok": True}
+            try:
+                step()
+            except Exception as e:
+                # A missing optional dependency must not take the server down;
+                # the tool that needs it will report the error itself.
+                logger.warning(f"Warm-up step {name!r} failed: {e}")
+                entry = {"ok": False, "error": str(e)}
+                failed = True
+            entry["seconds"] = round(time.perf_counter() - t0, 4)
+            self._timings[name] = entry
+        self._total_s = round(time.perf_counter() - started, 4)
+        self._state = "degraded" if failed else "ready"
+        self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "ready": self.ready,
+            "total_seconds": self._total_s,
+            "steps": dict(self._timings),
+        }
+
+
+_warmup: Warmup | None = None
+
+
+def start_warmup(steps: list[tuple[str, Callable[[], None]]] | None = None) -> Warmup:
+    """Start the process-wide warm-up (idempotent)."""
+    global _warmup
+    if _warmup is None:
+        if steps is None:
+            from enki.config import get_config
+            load_model = bool(get_config().get("mcp", {}).get("warm_embedding_model", True))
+            steps = default_steps(load_model=load_model)
+        _warmup = Warmup(steps)
+    return _warmup.start()
+
+
+def warmup_status() -> dict:
+    """Readiness and measured import times, for enki_status."""
+    if _warmup is None:
+        return {"state": "not_started", "ready": False, "total_seconds": None, "steps": {}}
+    return _warmup.status()
@@ -12,6 +12,7 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
 from .db import init_all
+from .mcp.paging import to_json
 
 logger = logging.getLogger(__name__)
 
@@ -410,6 +411,8 @@ async def list_tools() -> list[Tool]:
                 "properties": {
                     "sprint_id": {"type": "string", "description": "Sprint ID e.g. sprint-1"},
                     "project": {"type": "string", "default": "default"},
+                    "cursor": {"type": "string", "description": "next_cursor from the previous page"},
+                    "page_size": {"type": "integer", "description": "Max items per page (default 50, max 500)"},
                 },
                 "required": ["sprint_id"],
             },
@@ -557,9 +560,30 @@ async def list_tools() -> list[Tool]:
                 },
             },
         ),
+        Tool(
+            name="enki_graph_watch",
+            description=(
+                "Start, stop or check the graph file watcher. While running, file changes "
+                "are debounced into incremental graph.db updates."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": ["start", "stop", "status"], "default": "status"},
+                    "project": {"type": "string", "default": "default"},
+                },
+            },
+        ),
         Tool(
             name="enki_graph_query",
-            description="Query graph.db (blast radius, imports/importers, symbols, complexity hotspots).",
+            description=(
+                "Query graph.db (blast radius, imports/importers, symbols, complexity hotspots, "
+                "callers up to `depth` calls away, duplicate functions). transitive_importers/"
+                "transitive_imports walk imports up to `depth` hops; path gives the shortest "
+                "import chain from target to `to`. hotspots ranks files by churn x complexity "
+                "under a directory prefix, or everywhere with target \"*\". With task_id, "
+                "queries that task's worktree as edited so far."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -567,12 +591,33 @@ async def list_tools() -> list[Tool]:
                         "type": "string",
                         "enum": [
                             "blast_radius", "importers", "imports",
-                            "callers", "duplicates", "complexity", "symbols",
+                            "transitive_importers", "transitive_imports", "path",
+                            "callers", "duplicates", "complexity", "symbols", "hotspots",
                         ],
                     },
-                    "target": {"type": "string"},
+                    "target": {
+                        "type": "string",
+                        "description": (
+                            "File path, symbol id or name; hotspots: directory prefix or \"*\"; "
+                            "duplicates: also \"*\""
+                        ),
+                    },
                     "project": {"type": "string", "default": "default"},
                     "limit": {"type": "integer", "default": 10},
+                    "cursor": {"type": "string", "description": "next_cursor from the previous page"},
+                    "page_size": {"type": "integer", "description": "Max items per page (default: limit)"},
+                    "depth": {
+                        "type": "integer",
+                        "description": (
+                            "callers: 1 = direct (default), up to 10; transitive queries "
+                            "and path: max hops (default and cap 50)"
+                        ),
+                    },
+                    "to": {"type": "string", "description": "path only: destination file"},
+                    "task_id": {
+                        "type": "string",
+                        "description": "Query this wave task's worktree instead of graph.db",
+                    },
                 },
                 "required": ["query_type", "target"],
             },
@@ -598,12 +643,17 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="enki_mail_thread",
-            description="Read full message thread history by thread ID. Use to get complete context on an agent conversation.",
+            description=(
+                "Read message thread history by thread ID, oldest first. Use to get complete "
+                "context on an agent conversation; follow next_cursor for later pages."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
                     "thread_id": {"type": "string"},
                     "project": {"type": "string", "default": "default"},
+                    "cursor": {"type": "string", "description": "next_cursor from the previous page"},
+                    "page_size": {"type": "integer", "description": "Max items per page (default 50, max 500)"},
                 },
                 "required": ["thread_id"],
             },
@@ -689,7 +739,7 @@ def _handle_remember(args: dict) -> str:
         summary=args.get("summary"),
         tags=args.get("tags"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_recall(args: dict) -> str:
@@ -702,7 +752,7 @@ def _handle_recall(args: dict) -> str:
         files=args.get("files"),
     )
     if isinstance(results, dict):
-        return json.dumps(results, indent=2)
+        return to_json(results)
     if not results:
         return "No relevant knowledge found."
     lines = [f"Found {len(results)} results:\n"]
@@ -716,26 +766,42 @@ def _handle_recall(args: dict) -> str:
 def _handle_star(args: dict) -> str:
     from .mcp.memory_tools import enki_star
     result = enki_star(args["bead_id"])
-    return json.dumps(result)
+    return to_json(result)
 
 
 def _handle_status(args: dict) -> str:
+    from .mcp.dispatch import dispatcher_stats
     from .mcp.memory_tools import enki_status
-    result = enki_status(project=args.get("project"))
-    return json.dumps(result, indent=2)
+    from .mcp.result_cache import get_result_cache
+    from .mcp.warmup import warmup_status
+    from .telemetry import tool_stats
+    cache = get_result_cache()
+    result = dict(cache.get_or_compute(
+        "enki_status", args, lambda: enki_status(project=args.get("project")),
+    ))
+    queue = dispatcher_stats()
+    if queue is not None:
+        result["tool_queue"] = queue
+    result["result_cache"] = cache.stats()
+    result["warmup"] = warmup_status()
+    try:
+        result["tool_metrics"] = tool_stats(since_hours=24)[:10]
+    except Exception as e:
+        result["tool_metrics"] = {"error": str(e)}
+    return to_json(result)
 
 
 def _handle_restore(args: dict) -> str:
     from .mcp.memory_tools import enki_restore
     result = enki_restore(project=args.get("project"))
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_memory_lint(args: dict) -> str:
     from .mcp.memory_tools import enki_memory_lint
 
     result = enki_memory_lint(project=args.get("project"))
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_goal(args: dict) -> str:
@@ -749,7 +815,7 @@ def _handle_goal(args: dict) -> str:
         args.get("tier"),
         args.get("force", False),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_phase(args: dict) -> str:
@@ -759,7 +825,7 @@ def _handle_phase(args: dict) -> str:
         args.get("to"),
         args.get("project"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_approve(args: dict) -> str:
@@ -771,7 +837,7 @@ def _handle_approve(args: dict) -> str:
         skip_council=args.get("skip_council", False),
         skip_council_reason=args.get("skip_council_reason"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_spawn(args: dict) -> str:
@@ -782,7 +848,7 @@ def _handle_spawn(args: dict) -> str:
         context=args.get("context"),
         project=args.get("project"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_report(args: dict) -> str:
@@ -796,7 +862,7 @@ def _handle_report(args: dict) -> str:
         output=args.get("output"),
         project=args.get("project"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_wave(args: dict) -> str:
@@ -804,7 +870,7 @@ def _handle_wave(args: dict) -> str:
     result = enki_wave(
         project=args.get("project"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_complete(args: dict) -> str:
@@ -813,7 +879,7 @@ def _handle_complete(args: dict) -> str:
         task_id=args["task_id"],
         project=args.get("project", "."),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_decompose(args: dict) -> str:
@@ -822,7 +888,7 @@ def _handle_decompose(args: dict) -> str:
         tasks=args["tasks"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_debate(args: dict) -> str:
@@ -830,7 +896,7 @@ def _handle_debate(args: dict) -> str:
     result = enki_debate(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_debate_update(args: dict) -> str:
@@ -841,7 +907,7 @@ def _handle_debate_update(args: dict) -> str:
         output=args["output"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_kickoff(args: dict) -> str:
@@ -849,7 +915,7 @@ def _handle_kickoff(args: dict) -> str:
     result = enki_kickoff(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_kickoff_update(args: dict) -> str:
@@ -859,7 +925,7 @@ def _handle_kickoff_update(args: dict) -> str:
         output=args["output"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_kickoff_complete(args: dict) -> str:
@@ -867,7 +933,7 @@ def _handle_kickoff_complete(args: dict) -> str:
     result = enki_kickoff_complete(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_impl_council(args: dict) -> str:
@@ -876,7 +942,7 @@ def _handle_impl_council(args: dict) -> str:
         project=args.get("project", "default"),
         approved_specialists=args.get("approved_specialists"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_impl_council_update(args: dict) -> str:
@@ -886,7 +952,7 @@ def _handle_impl_council_update(args: dict) -> str:
         output=args["output"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_escalate(args: dict) -> str:
@@ -896,7 +962,7 @@ def _handle_escalate(args: dict) -> str:
         reason=args["reason"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_mark_blocked(args: dict) -> str:
@@ -906,7 +972,7 @@ def _handle_mark_blocked(args: dict) -> str:
         reason=args["reason"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_sprint_summary(args: dict) -> str:
@@ -914,8 +980,10 @@ def _handle_sprint_summary(args: dict) -> str:
     result = enki_sprint_summary(
         sprint_id=args["sprint_id"],
         project=args.get("project", "default"),
+        cursor=args.get("cursor"),
+        page_size=args.get("page_size"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_sprint_close(args: dict) -> str:
@@ -923,7 +991,7 @@ def _handle_sprint_close(args: dict) -> str:
     result = enki_sprint_close(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_validate(args: dict) -> str:
@@ -933,7 +1001,7 @@ def _handle_validate(args: dict) -> str:
         project=args.get("project", "default"),
         hitl_confirmed=bool(args.get("hitl_confirmed", False)),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_validate_update(args: dict) -> str:
@@ -943,7 +1011,7 @@ def _handle_validate_update(args: dict) -> str:
         output=args["output"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_project_close(args: dict) -> str:
@@ -951,7 +1019,7 @@ def _handle_project_close(args: dict) -> str:
     result = enki_project_close(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_document(args: dict) -> str:
@@ -960,7 +1028,7 @@ def _handle_document(args: dict) -> str:
         project=args.get("project", "default"),
         docs=args.get("docs"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_document_update(args: dict) -> str:
@@ -970,7 +1038,7 @@ def _handle_document_update(args: dict) -> str:
         output=args["output"],
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_wave_reconcile(args: dict) -> str:
@@ -978,7 +1046,7 @@ def _handle_wave_reconcile(args: dict) -> str:
     result = enki_wave_reconcile(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_diagram(args: dict) -> str:
@@ -987,7 +1055,7 @@ def _handle_diagram(args: dict) -> str:
         type=args.get("type", "dag"),
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_status_update(args: dict) -> str:
@@ -995,7 +1063,7 @@ def _handle_status_update(args: dict) -> str:
     result = enki_status_update(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_graph_rebuild(args: dict) -> str:
@@ -1005,7 +1073,17 @@ def _handle_graph_rebuild(args: dict) -> str:
         project=args.get("project", "default"),
         incremental=args.get("incremental", False),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
+
+
+def _handle_graph_watch(args: dict) -> str:
+    from .mcp.orch_tools import enki_graph_watch
+
+    result = enki_graph_watch(
+        action=args.get("action", "status"),
+        project=args.get("project", "default"),
+    )
+    return to_json(result)
 
 
 def _handle_graph_query(args: dict) -> str:
@@ -1016,8 +1094,13 @@ def _handle_graph_query(args: dict) -> str:
         target=args["target"],
         project=args.get("project", "default"),
         limit=args.get("limit", 10),
+        cursor=args.get("cursor"),
+        page_size=args.get("page_size"),
+        depth=args.get("depth"),
+        to=args.get("to"),
+        task_id=args.get("task_id"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_mail_inbox(args: dict) -> str:
@@ -1027,7 +1110,7 @@ def _handle_mail_inbox(args: dict) -> str:
         project=args.get("project", "default"),
         ack_ids=args.get("ack_ids"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_mail_thread(args: dict) -> str:
@@ -1035,8 +1118,10 @@ def _handle_mail_thread(args: dict) -> str:
     result = enki_mail_thread(
         thread_id=args["thread_id"],
         project=args.get("project", "default"),
+        cursor=args.get("cursor"),
+        page_size=args.get("page_size"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_next_actions(args: dict) -> str:
@@ -1044,14 +1129,14 @@ def _handle_next_actions(args: dict) -> str:
     result = enki_next_actions(
         project=args.get("project", "default"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_wrap(args: dict) -> str:
     from .mcp.orch_tools import enki_wrap
     _ = args
     result = enki_wrap()
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_bug(args: dict) -> str:
@@ -1064,7 +1149,7 @@ def _handle_bug(args: dict) -> str:
         bug_id=args.get("bug_id"),
         project=args.get("project", "."),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 def _handle_register(args: dict) -> str:
@@ -1073,7 +1158,7 @@ def _handle_register(args: dict) -> str:
         project=args.get("project"),
         path=args.get("path"),
     )
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 # =============================================================================
@@ -1114,6 +1199,7 @@ TOOL_HANDLERS = {
     "enki_diagram": _handle_diagram,
     "enki_status_update": _handle_status_update,
     "enki_graph_rebuild": _handle_graph_rebuild,
+    "enki_graph_watch": _handle_graph_watch,
     "enki_graph_query": _handle_graph_query,
     "enki_mail_inbox": _handle_mail_inbox,
     "enki_mail_thread": _handle_mail_thread,
@@ -1125,99 +1211,123 @@ TOOL_HANDLERS = {
 }
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Handle tool calls via dispatch map."""
+def _call_tool_sync(name: str, args: dict) -> str:
+    """Run one tool call to completion. Executes on a dispatcher thread."""
+    from .telemetry import get_tool_metrics
+
     init_all()
-    args = arguments or {}
+    return get_tool_metrics().timed_call(name, args, lambda: _run_cached(name, args))
+
 
+def _run_cached(name: str, args: dict) -> str:
+    from .mcp.dispatch import is_mutating
+    from .mcp.result_cache import CACHEABLE_TOOLS, get_result_cache
+
+    cache = get_result_cache()
+    if name == "enki_status":
+        # Caches only its memory payload; queue/warm-up stats stay live.
+        return _run_tool(name, args)
     try:
-        if name == "enki_decompose":
-            from .mcp.orch_tools import enki_decompose
-            result = enki_decompose(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_debate":
-            from .mcp.orch_tools import enki_debate
-            result = enki_debate(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_debate_update":
-            from .mcp.orch_tools import enki_debate_update
-            result = enki_debate_update(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_kickoff":
-            from .mcp.orch_tools import enki_kickoff
-            result = enki_kickoff(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_kickoff_update":
-            from .mcp.orch_tools import enki_kickoff_update
-            result = enki_kickoff_update(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_kickoff_complete":
-            from .mcp.orch_tools import enki_kickoff_complete
-            result = enki_kickoff_complete(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_impl_council":
-            from .mcp.orch_tools import enki_impl_council
-            result = enki_impl_council(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_impl_council_update":
-            from .mcp.orch_tools import enki_impl_council_update
-            result = enki_impl_council_update(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_escalate":
-            from .mcp.orch_tools import enki_escalate
-            result = enki_escalate(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_mark_blocked":
-            from .mcp.orch_tools import enki_mark_blocked
-            result = enki_mark_blocked(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_sprint_summary":
-            from .mcp.orch_tools import enki_sprint_summary
-            result = enki_sprint_summary(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_sprint_close":
-            from .mcp.orch_tools import enki_sprint_close
-            result = enki_sprint_close(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_wave_reconcile":
-            from .mcp.orch_tools import enki_wave_reconcile
-            result = enki_wave_reconcile(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_diagram":
-            from .mcp.orch_tools import enki_diagram
-            result = enki_diagram(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_status_update":
-            from .mcp.orch_tools import enki_status_update
-            result = enki_status_update(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_mail_inbox":
-            from .mcp.orch_tools import enki_mail_inbox
-            result = enki_mail_inbox(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_mail_thread":
-            from .mcp.orch_tools import enki_mail_thread
-            result = enki_mail_thread(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-        elif name == "enki_next_actions":
-            from .mcp.orch_tools import enki_next_actions
-            result = enki_next_actions(**args)
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-    except Exception as e:
-        logger.exception(f"Error in {name}")
-        return [TextContent(type="text", text=f"Error: {e}")]
+        return cache.get_or_compute(name, args, lambda: _run_tool(name, args))
+    finally:
+        # Cacheable tools only write to DBs their generation token already
+        # tracks (mail acks), so only other mutating tools need to invalidate.
+        if is_mutating(name) and name not in CACHEABLE_TOOLS:
+            cache.invalidate()
+
+
+def _run_tool(name: str, args: dict) -> str:
+    if name == "enki_decompose":
+        from .mcp.orch_tools import enki_decompose
+        result = enki_decompose(**args)
+        return to_json(result)
+    elif name == "enki_debate":
+        from .mcp.orch_tools import enki_debate
+        result = enki_debate(**args)
+        return to_json(result)
+    elif name == "enki_debate_update":
+        from .mcp.orch_tools import enki_debate_update
+        result = enki_debate_update(**args)
+        return to_json(result)
+    elif name == "enki_kickoff":
+        from .mcp.orch_tools import enki_kickoff
+        result = enki_kickoff(**args)
+        return to_json(result)
+    elif name == "enki_kickoff_update":
+        from .mcp.orch_tools import enki_kickoff_update
+        result = enki_kickoff_update(**args)
+        return to_json(result)
+    elif name == "enki_kickoff_complete":
+        from .mcp.orch_tools import enki_kickoff_complete
+        result = enki_kickoff_complete(**args)
+        return to_json(result)
+    elif name == "enki_impl_council":
+        from .mcp.orch_tools import enki_impl_council
+        result = enki_impl_council(**args)
+        return to_json(result)
+    elif name == "enki_impl_council_update":
+        from .mcp.orch_tools import enki_impl_council_update
+        result = enki_impl_council_update(**args)
+        return to_json(result)
+    elif name == "enki_escalate":
+        from .mcp.orch_tools import enki_escalate
+        result = enki_escalate(**args)
+        return to_json(result)
+    elif name == "enki_mark_blocked":
+        from .mcp.orch_tools import enki_mark_blocked
+        result = enki_mark_blocked(**args)
+        return to_json(result)
+    elif name == "enki_sprint_summary":
+        from .mcp.orch_tools import enki_sprint_summary
+        result = enki_sprint_summary(**args)
+        return to_json(result)
+    elif name == "enki_sprint_close":
+        from .mcp.orch_tools import enki_sprint_close
+        result = enki_sprint_close(**args)
+        return to_json(result)
+    elif name == "enki_wave_reconcile":
+        from .mcp.orch_tools import enki_wave_reconcile
+        result = enki_wave_reconcile(**args)
+        return to_json(result)
+    elif name == "enki_diagram":
+        from .mcp.orch_tools import enki_diagram
+        result = enki_diagram(**args)
+        return to_json(result)
+    elif name == "enki_status_update":
+        from .mcp.orch_tools import enki_status_update
+        result = enki_status_update(**args)
+        return to_json(result)
+    elif name == "enki_mail_inbox":
+        from .mcp.orch_tools import enki_mail_inbox
+        result = enki_mail_inbox(**args)
+        return to_json(result)
+    elif name == "enki_mail_thread":
+        from .mcp.orch_tools import enki_mail_thread
+        result = enki_mail_thread(**args)
+        return to_json(result)
+    elif name == "enki_next_actions":
+        from .mcp.orch_tools import enki_next_actions
+        result = enki_next_actions(**args)
+        return to_json(result)
 
     handler = TOOL_HANDLERS.get(name)
     if handler:
-        try:
-            result = handler(args)
-            return [TextContent(type="text", text=result)]
-        except Exception as e:
-            logger.exception(f"Error in {name}")
-            return [TextContent(type="text", text=f"Error: {e}")]
+        return handler(args)
+    return f"Unknown tool: {name}"
+
+
+@server.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Handle tool calls via dispatch map, off the event loop."""
+    from .mcp.dispatch import get_dispatcher
 
-    return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    args = arguments or {}
+    try:
+        text = await get_dispatcher().run(name, args, lambda: _call_tool_sync(name, args))
+    except Exception as e:
+        logger.exception(f"Error in {name}")
+        return [TextContent(type="text", text=f"Error: {e}")]
+    return [TextContent(type="text", text=text)]
 
 
 # =============================================================================
@@ -1251,7 +1361,11 @@ def handle_tool(name: str, arguments: dict) -> dict | str:
 
 async def main():
     """Run the MCP server."""
+    from .mcp.warmup import start_warmup
+
     async with stdio_server() as (read_stream, write_stream):
+        # Warm heavy imports while the client is still initializing.
+        start_warmup()
         await server.run(read_stream, write_stream, server.create_initialization_options())
 
 
@@ -0,0 +1,95 @@
+"""access.py — Batched last_accessed updates for recalled notes and beads.
+
+Recall used to commit an UPDATE to wisdom.db on every call. Each commit
+also changed wisdom.db's data_version, so the MCP result cache never
+served a repeated recall: the recall invalidated its own entry. Touches
+are buffered in-process instead and written in one transaction when
+ACCESS_FLUSH_INTERVAL_S has passed since the last write, when the buffer
+holds ACCESS_FLUSH_MAX_IDS ids, before decay and digests read the
+column, and at exit.
+
+Decay works in days, so a last_accessed that lands a minute late
+changes nothing.
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from enki import db
+
+logger = logging.getLogger(__name__)
+
+ACCESS_FLUSH_INTERVAL_S = 300.0
+ACCESS_FLUSH_MAX_IDS = 500
+
+_TABLES = ("notes", "beads")
+
+# {wisdom.db path: {table: {id: accessed_at}}}. Keyed by path so a flush
+# writes to the database the recall read, even if ENKI_ROOT moved since.
+_pending: dict[Path, dict[str, dict[str, str]]] = {}
+_pending_count = 0
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+def touch(table: str, ids: list[str], accessed_at: str) -> None:
+    """Record that ids in `table` were returned by a recall at accessed_at."""
+    global _pending_count, _atexit_registered
+    if table not in _TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    if not ids:
+        return
+    path = db._db_path("wisdom.db")
+    with _lock:
+        rows = _pending.setdefault(path, {}).setdefault(table, {})
+        for item_id in ids:
+            if item_id not in rows:
+                _pending_count += 1
+            rows[item_id] = accessed_at
+        if not _atexit_registered:
+            atexit.register(_flush_at_exit)
+            _atexit_registered = True
+        due = (
+            _pending_count >= ACCESS_FLUSH_MAX_IDS
+            or time.monotonic() - _last_flush >= ACCESS_FLUSH_INTERVAL_S
+        )
+    if due:
+        flush()
+
+
+def flush() -> int:
+    """Write every buffered touch. Returns the number of rows updated."""
+    global _pending_count, _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _pending_count = 0
+        _last_flush = time.monotonic()
+
+    updated = 0
+    for path, tables in pending.items():
+        if not path.exists():
+            continue
+        try:
+            with db.connect(path) as conn:
+                for table, rows in tables.items():
+                    cursor = conn.executemany(
+                        f"UPDATE {table} SET last_accessed = ? WHERE id = ?",
+                        [(accessed_at, item_id) for item_id, accessed_at in rows.items()],
+                    )
+                    updated += cursor.rowcount
+        except sqlite3.Error as e:
+            logger.debug("Access timestamps not written to %s: %s", path, e)
+    return updated
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush()
+    except Exception as e:
+        logger.debug("Access timestamps not flushed at exit: %s", e)
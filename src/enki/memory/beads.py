@@ -443,11 +443,8 @@ def store_with_dedup(
 
 
 def _touch_beads(bead_ids: list[str]) -> None:
-    """Update last_accessed timestamp for recalled beads."""
-    now = datetime.now().isoformat()
-    with wisdom_db() as conn:
-        for bead_id in bead_ids:
-            conn.execute(
-                "UPDATE beads SET last_accessed = ? WHERE id = ?",
-                (now, bead_id),
-            )
+    """Update last_accessed timestamp for recalled beads (batched, see
+    enki.memory.access)."""
+    from enki.memory import access
+
+    access.touch("beads", bead_ids, datetime.now().isoformat())
@@ -247,14 +247,11 @@ def list_notes(
 
 
 def touch(note_ids: list[str]) -> None:
-    """Update last_accessed timestamp for recalled notes."""
-    now = datetime.now().isoformat()
-    with wisdom_db() as conn:
-        for note_id in note_ids:
-            conn.execute(
-                "UPDATE notes SET last_accessed = ? WHERE id = ?",
-                (now, note_id),
-            )
+    """Update last_accessed timestamp for recalled notes (batched, see
+    enki.memory.access)."""
+    from enki.memory import access
+
+    access.touch("notes", note_ids, datetime.now().isoformat())
 
 
 def _hash_content(content: str) -> str:
@@ -25,6 +25,9 @@ def run_decay() -> dict:
 
     Returns stats dict with counts of notes affected at each threshold.
     """
+    from enki.memory import access
+
+    access.flush()
     config = get_config()
     thresholds = config["memory"]["decay_thresholds"]
     now = datetime.now()
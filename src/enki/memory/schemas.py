@@ -349,6 +349,34 @@ def _create_wisdom_v4_tables(conn) -> None:
         )
     """)
 
+    # Per-file extraction results for code_knowledge scans, reused while
+    # the file's content hash is unchanged. llm_items stays NULL until the
+    # local model has answered for this content.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS code_extraction_cache (
+            project TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_hash TEXT NOT NULL,
+            facts TEXT NOT NULL,
+            llm_items TEXT,
+            extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (project, file_path)
+        )
+    """)
+
+    # sha256 of files referenced by code_knowledge notes, trusted while the
+    # file's stat (size, mtime_ns, inode) is unchanged.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS file_hash_cache (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            hashed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
     # FTS5 virtual table for notes — cannot use IF NOT EXISTS
     existing = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='notes_fts'"
@@ -21,6 +21,9 @@ def generate_weekly_digest(project: str | None = None, as_json: bool = False) ->
     - Staging rejections (count + common reasons)
     - Cross-project patterns (if multiple projects active)
     """
+    from enki.memory import access
+
+    access.flush()  # "most recalled" reads last_accessed
     cutoff = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
     data: dict = {}
 
@@ -61,6 +61,9 @@ def compute_task_complexity(
     if graph_context:
         max_blast = float(graph_context.get("max_blast_score", 0) or 0)
         score += int(max_blast * 15)
+        # Frequently changed, complex files (enki.graph.hotspots).
+        max_hotspot = float(graph_context.get("max_hotspot_risk", 0) or 0)
+        score += int(max_hotspot * 10)
 
     criteria_count = len(task.get("acceptance_criteria") or [])
     score += min(criteria_count, 5)
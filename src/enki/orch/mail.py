@@ -261,14 +261,29 @@ def get_inbox(
         return [dict(r) for r in rows]
 
 
-def get_thread_messages(project: str, thread_id: str) -> list[dict]:
-    """Get all messages in a thread, ordered chronologically."""
+def get_thread_messages(
+    project: str,
+    thread_id: str,
+    after: tuple[str, str] | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Get messages in a thread, ordered chronologically.
+
+    Keyset-paginated on (created_at, id): pass the last row's
+    (created_at, id) as `after` to continue from it.
+    """
+    query = "SELECT * FROM mail_messages WHERE thread_id = ?"
+    params: list = [thread_id]
+    if after is not None:
+        query += " AND (created_at > ? OR (created_at = ? AND id > ?))"
+        params.extend([after[0], after[0], after[1]])
+    query += " ORDER BY created_at, id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
     with em_db(project) as conn:
-        rows = conn.execute(
-            "SELECT * FROM mail_messages "
-            "WHERE thread_id = ? ORDER BY created_at",
-            (thread_id,),
-        ).fetchall()
+        rows = conn.execute(query, params).fetchall()
         return [dict(r) for r in rows]
 
 
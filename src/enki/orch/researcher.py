@@ -7,8 +7,11 @@ Consumers: PM, Architect, Dev, QA, DevOps, Reviewer, User Profile.
 """
 
 import os
+from collections.abc import Iterable
 from pathlib import Path
 
+from enki.graph.discovery import FileEntry, discover
+
 
 # File extensions by language
 _LANGUAGE_MAP = {
@@ -116,11 +119,13 @@ def get_codebase_profile_schema() -> dict:
     }
 
 
-def analyze_codebase(repo_path: str) -> dict:
+def analyze_codebase(repo_path: str, entries: Iterable[FileEntry] | None = None) -> dict:
     """Produce Codebase Profile from existing codebase.
 
     Read-only: never modifies files.
-    Returns structured JSON profile.
+    Returns structured JSON profile. `entries` reuses a discovery result
+    (enki.graph.discovery.discover) already made for this run, e.g. by
+    the graph scan; otherwise the tree is listed once here.
     """
     root = Path(repo_path)
     if not root.exists():
@@ -130,7 +135,9 @@ def analyze_codebase(repo_path: str) -> dict:
     profile["project"]["name"] = root.name
 
     # Detect languages
-    lang_counts = _count_languages(root)
+    if entries is None:
+        entries = discover(str(root))
+    lang_counts = _count_languages(entries)
     if lang_counts:
         profile["project"]["languages"] = list(lang_counts.keys())
         profile["project"]["primary_language"] = max(
@@ -199,23 +206,21 @@ def scope_to_request(
 # ── Private helpers ──
 
 
-def _count_languages(root: Path) -> dict[str, int]:
+def _count_languages(entries: Iterable[FileEntry]) -> dict[str, int]:
     """Count files by language, skipping hidden/vendor dirs."""
     counts: dict[str, int] = {}
     skip_dirs = {".git", "node_modules", ".venv", "venv", "__pycache__",
                  "dist", "build", ".next", "target"}
 
-    for dirpath, dirnames, filenames in os.walk(root):
+    for entry in entries:
         # Skip hidden and vendor directories
-        dirnames[:] = [
-            d for d in dirnames
-            if d not in skip_dirs and not d.startswith(".")
-        ]
-        for f in filenames:
-            ext = Path(f).suffix
-            if ext in _LANGUAGE_MAP:
-                lang = _LANGUAGE_MAP[ext]
-                counts[lang] = counts.get(lang, 0) + 1
+        dirs = entry.path.split(os.sep)[:-1]
+        if any(d in skip_dirs or d.startswith(".") for d in dirs):
+            continue
+        ext = os.path.splitext(entry.path)[1]
+        if ext in _LANGUAGE_MAP:
+            lang = _LANGUAGE_MAP[ext]
+            counts[lang] = counts.get(lang, 0) + 1
 
     return counts
 
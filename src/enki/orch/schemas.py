@@ -105,6 +105,10 @@ def create_tables(conn) -> None:
         "CREATE INDEX IF NOT EXISTS idx_mail_thread "
         "ON mail_messages(thread_id)"
     )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mail_thread_created "
+        "ON mail_messages(thread_id, created_at, id)"
+    )
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_mail_project "
         "ON mail_messages(project_id)"
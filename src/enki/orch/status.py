@@ -122,8 +122,34 @@ def send_status_to_thread(project: str, status_text: str) -> str:
     return msg_id
 
 
-def get_sprint_summary(project: str, sprint_id: str) -> dict:
-    """Get summary for a specific sprint."""
+def get_sprint_summary(
+    project: str,
+    sprint_id: str,
+    after: tuple[str, str] | None = None,
+    limit: int | None = None,
+) -> dict:
+    """Get summary for a specific sprint.
+
+    Tasks are keyset-paginated on (started_at, task_id), with unstarted
+    tasks first: pass the last task's (started_at or "", task_id) as
+    `after`. Totals always cover the whole sprint.
+    """
+    task_query = (
+        "SELECT task_id, task_name, status, tier, started_at FROM task_state "
+        "WHERE project_id = ? AND sprint_id = ? AND work_type = 'task'"
+    )
+    params: list = [project, sprint_id]
+    if after is not None:
+        task_query += (
+            " AND (COALESCE(started_at, '') > ? "
+            "OR (COALESCE(started_at, '') = ? AND task_id > ?))"
+        )
+        params.extend([after[0], after[0], after[1]])
+    task_query += " ORDER BY COALESCE(started_at, ''), task_id"
+    if limit is not None:
+        task_query += " LIMIT ?"
+        params.append(limit)
+
     with em_db(project) as conn:
         sprint = conn.execute(
             "SELECT * FROM sprint_state WHERE sprint_id = ? AND project_id = ?",
@@ -133,12 +159,15 @@ def get_sprint_summary(project: str, sprint_id: str) -> dict:
         if not sprint:
             return {"error": f"Sprint {sprint_id} not found"}
 
-        tasks = conn.execute(
-            "SELECT task_id, task_name, status, tier FROM task_state "
-            "WHERE project_id = ? AND sprint_id = ? AND work_type = 'task' "
-            "ORDER BY started_at",
+        tasks = conn.execute(task_query, params).fetchall()
+
+        totals = conn.execute(
+            "SELECT COUNT(*) AS total, "
+            "COALESCE(SUM(status = 'completed'), 0) AS completed "
+            "FROM task_state "
+            "WHERE project_id = ? AND sprint_id = ? AND work_type = 'task'",
             (project, sprint_id),
-        ).fetchall()
+        ).fetchone()
 
         bugs = conn.execute(
             "SELECT id, title, priority, status FROM bugs "
@@ -151,6 +180,6 @@ def get_sprint_summary(project: str, sprint_id: str) -> dict:
         "status": sprint["status"],
         "tasks": [dict(t) for t in tasks],
         "bugs": [dict(b) for b in bugs],
-        "total_tasks": len(tasks),
-        "completed": sum(1 for t in tasks if t["status"] == "completed"),
+        "total_tasks": totals["total"],
+        "completed": totals["completed"],
     }
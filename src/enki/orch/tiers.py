@@ -12,6 +12,7 @@ from enki.project_state import (
     normalize_project_name,
     read_project_state,
     stable_goal_id,
+    write_phase,
     write_project_state,
 )
 from enki.orch.pm import is_spec_approved
@@ -217,7 +218,7 @@ def _set_goal(project: str, description: str, tier: str) -> None:
 def _set_phase(project: str, phase: str) -> None:
     """Write phase to project_state."""
     project = normalize_project_name(project)
-    write_project_state(project, "phase", phase)
+    write_phase(project, phase)
 
 
 def _tier_reasoning(description: str, tier: str) -> str:
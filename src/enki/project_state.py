@@ -73,6 +73,18 @@ def write_project_state(project: str | None, key: str, value: str) -> None:
         )
 
 
+def write_phase(project: str | None, phase: str) -> None:
+    """Write the phase and start or stop the graph watcher to match.
+
+    Every phase change goes through here so the watcher follows
+    approvals and closes as well as enki_phase advances.
+    """
+    write_project_state(project, "phase", phase)
+    from enki.graph.watcher import sync_watch_to_phase
+
+    sync_watch_to_phase(normalize_project_name(project), phase)
+
+
 def read_all_project_state(project: str | None) -> dict[str, str | None]:
     return {
         "phase": read_project_state(project, "phase"),
@@ -123,6 +135,18 @@ def resolve_project_from_cwd(cwd: str) -> str | None:
     return best_name
 
 
+def resolve_project(project: str | None) -> str:
+    """Project a tool call acts on: an explicit name, else the registered
+    project containing the cwd ('.', 'default' or omitted), else 'default'."""
+    candidate = (project or "").strip()
+    if candidate and candidate not in {".", "default"}:
+        return normalize_project_name(candidate)
+    resolved = resolve_project_from_cwd(str(Path.cwd()))
+    if resolved:
+        return normalize_project_name(resolved)
+    return normalize_project_name(candidate) or "default"
+
+
 def deprecate_global_project_marker() -> None:
     """Rename legacy ~/.enki/PROJECT marker to ~/.enki/PROJECT.deprecated."""
     legacy = db.ENKI_ROOT / "PROJECT"
@@ -0,0 +1,416 @@
+"""telemetry.py — Per-tool latency and payload telemetry for the MCP server.
+
+Every MCP tool call records wall time, CPU time (handler thread), time
+spent in SQLite through enki.db connections, response bytes and whether
+it failed. Samples are aggregated in memory per (UTC hour, tool, project)
+and flushed to metrics.db at most every FLUSH_INTERVAL_S seconds on a
+background thread, so the recording call never waits on the write or the
+textfile rewrite. Rows older than RETENTION_HOURS roll off.
+
+Latency is kept as a fixed-bucket histogram so percentiles can be read
+back without storing individual samples. The same data is available as a
+Prometheus textfile for node_exporter's textfile collector. Its values are
+sums over the retention window, which shrink as hours roll off, so they
+are exported as gauges with a `_window` suffix rather than as counters.
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf)
+RETENTION_HOURS = 24 * 7
+FLUSH_INTERVAL_S = 10.0
+UNSPECIFIED_PROJECT = "-"
+
+METRICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tool_metrics (
+    hour TEXT NOT NULL,             -- UTC hour bucket, YYYY-MM-DDTHH:00
+    tool TEXT NOT NULL,
+    project TEXT NOT NULL,
+    calls INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    wall_ms REAL DEFAULT 0,
+    wall_ms_max REAL DEFAULT 0,
+    cpu_ms REAL DEFAULT 0,
+    db_ms REAL DEFAULT 0,
+    response_bytes INTEGER DEFAULT 0,
+    response_bytes_max INTEGER DEFAULT 0,
+    PRIMARY KEY (hour, tool, project)
+);
+
+CREATE TABLE IF NOT EXISTS tool_latency_hist (
+    hour TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    project TEXT NOT NULL,
+    le_ms REAL NOT NULL,            -- bucket upper bound (non-cumulative count)
+    count INTEGER DEFAULT 0,
+    PRIMARY KEY (hour, tool, project, le_ms)
+);
+"""
+
+
+def create_tables(conn) -> None:
+    conn.executescript(METRICS_SCHEMA)
+
+
+def _hour(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:00")
+
+
+def _bucket(wall_ms: float) -> float:
+    for le in LATENCY_BUCKETS_MS:
+        if wall_ms <= le:
+            return le
+    return math.inf
+
+
+def project_label(arguments: dict) -> str:
+    project = arguments.get("project")
+    if isinstance(project, str) and project.strip() and project.strip() != ".":
+        return project.strip()
+    return UNSPECIFIED_PROJECT
+
+
+@dataclass
+class ToolSample:
+    tool: str
+    project: str
+    wall_ms: float
+    cpu_ms: float
+    db_ms: float
+    response_bytes: int
+    error: bool
+    ts: float = 0.0
+
+
+# ── Recorder ──
+
+
+class ToolMetrics:
+    """In-memory aggregation with periodic flush to metrics.db."""
+
+    def __init__(self, flush_interval_s: float = FLUSH_INTERVAL_S,
+                 prometheus_path: str | None = None):
+        self.flush_interval_s = flush_interval_s
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[tuple, dict] = {}
+        self._pending_hist: dict[tuple, int] = {}
+        self._last_flush = time.monotonic()
+        self._flushing = False
+
+    def record(self, sample: ToolSample) -> None:
+        key = (_hour(sample.ts or time.time()), sample.tool, sample.project)
+        with self._lock:
+            agg = self._pending.get(key)
+            if agg is None:
+                agg = self._pending[key] = {
+                    "calls": 0, "errors": 0, "wall_ms": 0.0, "wall_ms_max": 0.0,
+                    "cpu_ms": 0.0, "db_ms": 0.0, "response_bytes": 0, "response_bytes_max": 0,
+                }
+            agg["calls"] += 1
+            agg["errors"] += int(sample.error)
+            agg["wall_ms"] += sample.wall_ms
+            agg["wall_ms_max"] = max(agg["wall_ms_max"], sample.wall_ms)
+            agg["cpu_ms"] += sample.cpu_ms
+            agg["db_ms"] += sample.db_ms
+            agg["response_bytes"] += sample.response_bytes
+            agg["response_bytes_max"] = max(agg["response_bytes_max"], sample.response_bytes)
+            hkey = (*key, _bucket(sample.wall_ms))
+            self._pending_hist[hkey] = self._pending_hist.get(hkey, 0) + 1
+            due = (
+                not self._flushing
+                and time.monotonic() - self._last_flush >= self.flush_interval_s
+            )
+            if due:
+                self._flushing = True
+        if due:
+            threading.Thread(
+                target=self._background_flush, name="enki-telemetry-flush", daemon=True,
+            ).start()
+
+    def _background_flush(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Telemetry flush failed: {e}")
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def flush(self) -> int:
+        """Write pending aggregates to metrics.db. Returns rows upserted."""
+        from enki.db import metrics_db
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                hist, self._pending_hist = self._pending_hist, {}
+                self._last_flush = time.monotonic()
+            if pending:
+                cutoff = _hour(time.time() - RETENTION_HOURS * 3600)
+                with metrics_db() as conn:
+                    conn.executemany(
+                        "INSERT INTO tool_metrics (hour, tool, project, calls, errors, wall_ms, "
+                        "wall_ms_max, cpu_ms, db_ms, response_bytes, response_bytes_max) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(hour, tool, project) DO UPDATE SET "
+                        "calls = calls + excluded.calls, "
+                        "errors = errors + excluded.errors, "
+                        "wall_ms = wall_ms + excluded.wall_ms, "
+                        "wall_ms_max = MAX(wall_ms_max, excluded.wall_ms_max), "
+                        "cpu_ms = cpu_ms + excluded.cpu_ms, "
+                        "db_ms = db_ms + excluded.db_ms, "
+                        "response_bytes = response_bytes + excluded.response_bytes, "
+                        "response_bytes_max = MAX(response_bytes_max, excluded.response_bytes_max)",
+                        [
+                            (*key, a["calls"], a["errors"], a["wall_ms"], a["wall_ms_max"],
+                             a["cpu_ms"], a["db_ms"], a["response_bytes"], a["response_bytes_max"])
+                            for key, a in pending.items()
+                        ],
+                    )
+                    conn.executemany(
+                        "INSERT INTO tool_latency_hist (hour, tool, project, le_ms, count) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(hour, tool, project, le_ms) DO UPDATE SET "
+                        "count = count + excluded.count",
+                        [(*key, count) for key, count in hist.items()],
+                    )
+                    conn.execute("DELETE FROM tool_metrics WHERE hour < ?", (cutoff,))
+                    conn.execute("DELETE FROM tool_latency_hist WHERE hour < ?", (cutoff,))
+            if self.prometheus_path:
+                try:
+                    write_prometheus_textfile(self.prometheus_path)
+                except OSError:
+                    pass
+            return len(pending)
+
+    def timed_call(self, tool: str, arguments: dict, fn: Callable[[], str]) -> str:
+        """Run fn on the current thread and record one sample for it."""
+        from enki.db import start_db_timer, stop_db_timer
+
+        error = True
+        text = ""
+        start_db_timer()
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            text = fn()
+            error = text.startswith('{"error"')
+            return text
+        finally:
+            wall_ms = (time.perf_counter() - wall0) * 1000
+            cpu_ms = (time.thread_time() - cpu0) * 1000
+            db_ms = stop_db_timer()
+            sample = ToolSample(
+                tool=tool,
+                project=project_label(arguments),
+                wall_ms=wall_ms,
+                cpu_ms=cpu_ms,
+                db_ms=db_ms,
+                response_bytes=len(text.encode("utf-8")) if isinstance(text, str) else 0,
+                error=error,
+                ts=time.time(),
+            )
+            try:
+                self.record(sample)
+            except Exception as e:
+                # Telemetry must never turn a successful tool call into a failure.
+                logger.warning(f"Failed to record telemetry for {tool}: {e}")
+
+
+_metrics: ToolMetrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_tool_metrics() -> ToolMetrics:
+    """Process-wide recorder, flushed at exit. Config: [mcp] prometheus_textfile."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            from enki.config import get_config
+
+            mcp_config = get_config().get("mcp", {})
+            _metrics = ToolMetrics(prometheus_path=mcp_config.get("prometheus_textfile") or None)
+            atexit.register(_flush_at_exit)
+    return _metrics
+
+
+def _flush_at_exit() -> None:
+    if _metrics is not None:
+        try:
+            _metrics.flush()
+        except Exception:
+            pass
+
+
+# ── Reporting ──
+
+
+def _percentile_from_hist(buckets: list[tuple[float, int]], q: float) -> float | None:
+    total = sum(c for _, c in buckets)
+    if not total:
+        return None
+    threshold = q * total
+    running = 0
+    for le, count in sorted(buckets):
+        running += count
+        if running >= threshold:
+            return le
+    return buckets[-1][0]
+
+
+def tool_stats(since_hours: int = 24, project: str | None = None) -> list[dict]:
+    """Per-tool aggregates over the window, slowest (p95) first."""
+    from enki.db import metrics_db
+
+    if _metrics is not None:
+        _metrics.flush()
+    since = _hour(time.time() - since_hours * 3600)
+    where = "WHERE hour >= ?"
+    params: list = [since]
+    if project:
+        where += " AND project = ?"
+        params.append(project)
+
+    with metrics_db() as conn:
+        rows = conn.execute(
+            "SELECT tool, SUM(calls) AS calls, SUM(errors) AS errors, "
+            "SUM(wall_ms) AS wall_ms, MAX(wall_ms_max) AS wall_ms_max, "
+            "SUM(cpu_ms) AS cpu_ms, SUM(db_ms) AS db_ms, "
+            "SUM(response_bytes) AS response_bytes, "
+            "MAX(response_bytes_max) AS response_bytes_max "
+            f"FROM tool_metrics {where} GROUP BY tool",
+            params,
+        ).fetchall()
+        hist_rows = conn.execute(
+            f"SELECT tool, le_ms, SUM(count) AS count FROM tool_latency_hist {where} "
+            "GROUP BY tool, le_ms",
+            params,
+        ).fetchall()
+
+    hists: dict[str, list[tuple[float, int]]] = {}
+    for r in hist_rows:
+        hists.setdefault(r["tool"], []).append((r["le_ms"], r["count"]))
+
+    stats = []
+    for r in rows:
+        calls = r["calls"] or 0
+        hist = hists.get(r["tool"], [])
+        stats.append({
+            "tool": r["tool"],
+            "calls": calls,
+            "errors": r["errors"] or 0,
+            "avg_wall_ms": round(r["wall_ms"] / calls, 2) if calls else 0.0,
+            "p50_ms": _percentile_from_hist(hist, 0.50),
+            "p95_ms": _percentile_from_hist(hist, 0.95),
+            "max_wall_ms": round(r["wall_ms_max"] or 0.0, 2),
+            "avg_cpu_ms": round(r["cpu_ms"] / calls, 2) if calls else 0.0,
+            "avg_db_ms": round(r["db_ms"] / calls, 2) if calls else 0.0,
+            "avg_bytes": int(r["response_bytes"] / calls) if calls else 0,
+            "max_bytes": r["response_bytes_max"] or 0,
+        })
+    stats.sort(key=lambda s: (-(s["p95_ms"] or 0), -s["calls"]))
+    return stats
+
+
+def _fmt_ms(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return "inf" if math.isinf(value) else f"{value:g}"
+
+
+def format_tool_stats(stats: list[dict], since_hours: int) -> str:
+    if not stats:
+        return f"No MCP tool calls recorded in the last {since_hours}h."
+    header = (
+        f"{'TOOL':<28} {'CALLS':>6} {'ERR':>4} {'P50':>6} {'P95':>6} {'AVG':>8} "
+        f"{'CPU':>8} {'DB':>8} {'AVG B':>8} {'MAX B':>8}"
+    )
+    lines = [f"MCP tool calls, last {since_hours}h (ms; p50/p95 are bucket upper bounds)", header]
+    for s in stats:
+        lines.append(
+            f"{s['tool']:<28} {s['calls']:>6} {s['errors']:>4} {_fmt_ms(s['p50_ms']):>6} "
+            f"{_fmt_ms(s['p95_ms']):>6} {s['avg_wall_ms']:>8.1f} {s['avg_cpu_ms']:>8.1f} "
+            f"{s['avg_db_ms']:>8.1f} {s['avg_bytes']:>8} {s['max_bytes']:>8}"
+        )
+    return "\n".join(lines)
+
+
+# ── Prometheus export ──
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text() -> str:
+    """Retained telemetry in Prometheus text exposition format."""
+    from enki.db import metrics_db
+
+    with metrics_db() as conn:
+        rows = conn.execute(
+            "SELECT tool, project, SUM(calls) AS calls, SUM(errors) AS errors, "
+            "SUM(wall_ms) AS wall_ms, SUM(cpu_ms) AS cpu_ms, SUM(db_ms) AS db_ms, "
+            "SUM(response_bytes) AS response_bytes "
+            "FROM tool_metrics GROUP BY tool, project ORDER BY tool, project"
+        ).fetchall()
+        hist_rows = conn.execute(
+            "SELECT tool, project, le_ms, SUM(count) AS count FROM tool_latency_hist "
+            "GROUP BY tool, project, le_ms ORDER BY tool, project, le_ms"
+        ).fetchall()
+
+    window = f"over the last {RETENTION_HOURS}h"
+    series = {
+        "enki_mcp_tool_calls_window": ("calls", 1, "MCP tool calls"),
+        "enki_mcp_tool_errors_window": ("errors", 1, "Failed MCP tool calls"),
+        "enki_mcp_tool_wall_seconds_window": ("wall_ms", 1000, "Tool wall time"),
+        "enki_mcp_tool_cpu_seconds_window": ("cpu_ms", 1000, "Handler CPU time"),
+        "enki_mcp_tool_db_seconds_window": ("db_ms", 1000, "Time spent in SQLite"),
+        "enki_mcp_tool_response_bytes_window": ("response_bytes", 1, "Response payload bytes"),
+    }
+    out = []
+    for name, (column, divisor, help_text) in series.items():
+        out.append(f"# HELP {name} {help_text} {window}.")
+        out.append(f"# TYPE {name} gauge")
+        for r in rows:
+            labels = f'tool="{_label(r["tool"])}",project="{_label(r["project"])}"'
+            out.append(f"{name}{{{labels}}} {(r[column] or 0) / divisor:g}")
+
+    # Cumulative per `le` like a histogram's buckets, so histogram_quantile
+    # applies directly (no rate()).
+    bucket_name = "enki_mcp_tool_duration_seconds_window_bucket"
+    out.append(f"# HELP {bucket_name} Tool calls at or under `le` seconds {window}.")
+    out.append(f"# TYPE {bucket_name} gauge")
+    grouped: dict[tuple[str, str], list[tuple[float, int]]] = {}
+    for r in hist_rows:
+        grouped.setdefault((r["tool"], r["project"]), []).append((r["le_ms"], r["count"]))
+    for (tool, project), buckets in grouped.items():
+        labels = f'tool="{_label(tool)}",project="{_label(project)}"'
+        counts = dict(buckets)
+        running = 0
+        for le in LATENCY_BUCKETS_MS:
+            running += counts.get(le, 0)
+            le_label = "+Inf" if math.isinf(le) else f"{le / 1000:g}"
+            out.append(f'{bucket_name}{{{labels},le="{le_label}"}} {running}')
+    return "\n".join(out) + "\n"
+
+
+def write_prometheus_textfile(path: str | Path) -> Path:
+    """Atomically write the textfile node_exporter's collector reads."""
+    target = Path(path).expanduser()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(prometheus_text(), encoding="utf-8")
+    os.replace(tmp, target)
+    return target
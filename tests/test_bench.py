@@ -0,0 +1,70 @@
+"""Tests for the hook latency benchmark harness."""
+
+import json
+import sys
+from pathlib import Path
+
+from enki.bench import (
+    HOOK_SCRIPTS,
+    compare_results,
+    load_trace,
+    run_hooks_benchmark,
+    stage_hook_scripts,
+    summarize,
+    synthetic_trace,
+)
+
+REPO_HOOKS = Path(__file__).resolve().parents[1] / "scripts" / "hooks"
+
+
+def test_synthetic_trace_covers_all_hook_events():
+    events = synthetic_trace(count=50)
+    assert {e["hook_event_name"] for e in events} == set(HOOK_SCRIPTS)
+    assert synthetic_trace(count=50) == events
+    # --events counts hook events, not tool calls.
+    for count in (1, 2, 30, 31, 200):
+        assert len(synthetic_trace(count=count)) == count
+
+
+def test_load_trace_skips_blank_and_unknown_records(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        json.dumps({"hook_event_name": "PreToolUse", "tool_name": "Read"}) + "\n\n"
+        + json.dumps({"hook_event_name": "SessionStart"}) + "\n"
+    )
+    events = load_trace(path)
+    assert [e["tool_name"] for e in events] == ["Read"]
+
+
+def test_summarize_percentiles():
+    stats = summarize({"layer": [float(i) for i in range(1, 101)]})["layer"]
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 50.0
+    assert stats["p95_ms"] == 95.0
+    assert stats["p99_ms"] == 99.0
+    assert stats["max_ms"] == 100.0
+
+
+def test_compare_results_flags_p95_regressions():
+    baseline = {"gate_layers": {"a": {"p95_ms": 10.0}, "b": {"p95_ms": 10.0}}}
+    current = {"gate_layers": {"a": {"p95_ms": 20.0}, "b": {"p95_ms": 11.0}}}
+    regressions = compare_results(baseline, current, max_regression_pct=25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("gate_layers/a")
+
+
+def test_stage_hook_scripts_rewrites_interpreter(tmp_path):
+    staged = stage_hook_scripts(REPO_HOOKS, tmp_path / "hooks")
+    assert set(staged) == set(HOOK_SCRIPTS)
+    text = staged["PostToolUse"].read_text()
+    assert "/home/partha/" not in text
+    assert sys.executable in text
+
+
+def test_in_process_benchmark_reports_gate_layers():
+    results = run_hooks_benchmark(synthetic_trace(count=20), scripts=False, warmup=0)
+    assert results["trace_events"] > 0
+    assert "uru.pre_tool_use" in results["gate_layers"]
+    assert "sentrux.score" in results["gate_layers"]
+    assert results["hook_scripts"] == {}
+    json.dumps(results)
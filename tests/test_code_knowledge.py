@@ -177,6 +177,124 @@ class TestCheckStaleness:
             results = check_staleness(project="proj-a")
             assert len(results) == 1
 
+    def test_each_file_hashed_once_then_cached_by_stat(self, tmp_enki, tmp_path):
+        import os
+
+        with _patch_db(tmp_enki):
+            from enki.db import get_wisdom_db
+            f = tmp_path / "shared.py"
+            f.write_text("shared content")
+            os.utime(f, ns=(10**18, 10**18))
+            conn = get_wisdom_db()
+            try:
+                for i in range(5):
+                    _insert_code_note(conn, str(f), content=f"note {i}")
+            finally:
+                conn.close()
+
+            def cached_hashes():
+                conn = get_wisdom_db()
+                try:
+                    return conn.execute("SELECT COUNT(*) FROM file_hash_cache").fetchone()[0]
+                finally:
+                    conn.close()
+
+            real = compute_file_hash
+            with patch("enki.code_knowledge.compute_file_hash", side_effect=real) as hashed:
+                # A plain check is read-only: the hash is not cached.
+                first = check_staleness()
+                assert hashed.call_count == 1
+                assert cached_hashes() == 0
+
+                assert check_staleness(cache_hashes=True) == first
+                assert hashed.call_count == 2
+                assert check_staleness() == first
+                assert hashed.call_count == 2
+
+                f.write_text("edited content")
+                os.utime(f, ns=(10**18 + 1, 10**18 + 1))
+                assert {r["current_hash"] for r in check_staleness()} == {real(str(f))}
+                assert hashed.call_count == 3
+
+    def test_reuses_graph_scanner_hashes(self, tmp_enki, tmp_path):
+        import os
+        import sqlite3
+
+        from enki.graph.schema import create_graph_tables
+
+        with _patch_db(tmp_enki):
+            from enki.db import get_wisdom_db, graph_db_path
+            root = tmp_path / "repo"
+            (root / "src").mkdir(parents=True)
+            f = root / "src" / "app.py"
+            f.write_text("app")
+            os.utime(f, ns=(10**18, 10**18))
+            conn = get_wisdom_db()
+            try:
+                conn.execute("INSERT INTO projects (name, path) VALUES ('repo', ?)", (str(root),))
+                _insert_code_note(conn, str(f), file_hash="graph-hash", project="repo")
+            finally:
+                conn.close()
+
+            path = graph_db_path("repo")
+            path.parent.mkdir(parents=True)
+            graph = sqlite3.connect(path)
+            create_graph_tables(graph)
+            graph.execute(
+                "INSERT INTO files (path, language, size_bytes, mtime_ns, content_hash) "
+                "VALUES (?, 'python', 3, ?, 'graph-hash')",
+                (os.path.join("src", "app.py"), 10**18),
+            )
+            graph.commit()
+            graph.close()
+
+            with patch(
+                "enki.code_knowledge.compute_file_hash",
+                side_effect=AssertionError("file was read"),
+            ):
+                results = check_staleness()
+            assert [r["status"] for r in results] == ["current"]
+
+    def test_mark_writes_back_only_flipped_notes(self, tmp_enki, tmp_path):
+        with _patch_db(tmp_enki):
+            from enki.db import get_wisdom_db
+            f = tmp_path / "mod.py"
+            f.write_text("original")
+            good = compute_file_hash(str(f))
+            conn = get_wisdom_db()
+            try:
+                current = _insert_code_note(conn, str(f), content="a", file_hash=good)
+                stale = _insert_code_note(conn, str(f), content="b", file_hash="old")
+                gone = _insert_code_note(conn, str(tmp_path / "gone.py"), content="c")
+            finally:
+                conn.close()
+
+            assert check_staleness()  # read-only by default
+            check_staleness(mark=True)
+
+            conn = get_wisdom_db()
+            try:
+                verified = {
+                    r["id"]: r["last_verified"]
+                    for r in conn.execute("SELECT id, last_verified FROM notes")
+                }
+            finally:
+                conn.close()
+            assert verified[current] is not None
+            assert verified[stale] is None and verified[gone] is None
+
+            # A note marked stale whose file matches again is verified again.
+            mark_stale([current])
+            check_staleness(mark=True)
+            conn = get_wisdom_db()
+            try:
+                row = conn.execute(
+                    "SELECT last_verified FROM notes WHERE id = ?", (current,),
+                ).fetchone()
+            finally:
+                conn.close()
+            assert row["last_verified"] is not None
+
 
 # ---------------------------------------------------------------------------
 # mark_stale
@@ -436,3 +554,78 @@ class TestScanChangedFiles:
             ):
                 items = scan_changed_files("/fake", "proj")
                 assert items == []
+
+    def test_unchanged_files_come_from_cache(self, tmp_enki, tmp_path):
+        with _patch_db(tmp_enki):
+            src = tmp_path / "project" / "svc.py"
+            src.parent.mkdir(parents=True, exist_ok=True)
+            src.write_text(
+                '"""Service layer.\n\nOwns retries and backoff for outbound calls.\n"""\n\n'
+                "def call(x):\n    return x\n"
+            )
+            project_path = str(tmp_path / "project")
+            with patch("enki.code_knowledge.get_changed_files", return_value=["svc.py"]):
+                first = scan_changed_files(project_path, "test-proj")
+                with patch(
+                    "enki.code_knowledge._structural_extract",
+                    side_effect=AssertionError("re-extracted"),
+                ):
+                    assert scan_changed_files(project_path, "test-proj") == first
+
+                src.write_text(src.read_text() + "\n\ndef other():\n    return 2\n")
+                with patch(
+                    "enki.code_knowledge._structural_extract", return_value=[],
+                ) as extract:
+                    assert scan_changed_files(project_path, "test-proj") == []
+                assert extract.call_count == 1
+
+    def test_structural_facts_from_tree_sitter(self, tmp_enki, tmp_path):
+        pytest.importorskip("tree_sitter_languages")
+        with _patch_db(tmp_enki):
+            src = tmp_path / "project" / "api.ts"
+            src.parent.mkdir(parents=True, exist_ok=True)
+            src.write_text(
+                "import { db } from './db';\n"
+                "export class Router {}\n"
+                "export function route(p: string) { if (p) { return db(p); } return null; }\n"
+            )
+            with patch("enki.code_knowledge.get_changed_files", return_value=["api.ts"]):
+                items = scan_changed_files(str(tmp_path / "project"), "test-proj")
+            assert len(items) == 1
+            assert "class Router" in items[0]["content"]
+            assert "function route (line 3, complexity 2)" in items[0]["content"]
+            assert "imports ./db" in items[0]["content"]
+            assert items[0]["keywords"] == "Router,route"
+
+    def test_local_model_pass_is_bounded_and_retried(self, tmp_enki, tmp_path):
+        import threading
+        import time
+
+        release = threading.Event()
+
+        def model(content, file_path):
+            if file_path == "slow.py":
+                release.wait(10)
+            return [{"content": f"LLM note for {file_path}", "keywords": "", "summary": ""}]
+
+        with _patch_db(tmp_enki):
+            root = tmp_path / "project"
+            root.mkdir(parents=True, exist_ok=True)
+            for name in ("fast.py", "slow.py"):
+                (root / name).write_text(f"def {name[:4]}():\n    return 'padding to pass the size floor'\n")
+            with patch("enki.code_knowledge.get_changed_files", return_value=["fast.py", "slow.py"]), \
+                 patch("enki.code_knowledge._local_model_available", return_value=True), \
+                 patch("enki.local_model.extract_code_knowledge", side_effect=model) as calls:
+                started = time.monotonic()
+                items = scan_changed_files(str(root), "test-proj", llm_budget_s=0.5)
+                assert time.monotonic() - started < 5
+                notes = {i["content"] for i in items if i["content"].startswith("LLM")}
+                assert notes == {"LLM note for fast.py"}
+
+                # Only the file the model never answered for is asked again.
+                release.set()
+                calls.reset_mock()
+                items = scan_changed_files(str(root), "test-proj", llm_budget_s=5)
+                assert [c.args[1] for c in calls.call_args_list] == ["slow.py"]
+                notes = {i["content"] for i in items if i["content"].startswith("LLM")}
+                assert notes == {"LLM note for fast.py", "LLM note for slow.py"}
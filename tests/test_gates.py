@@ -12,6 +12,9 @@ import pytest
 from enki.db import connect
 from enki.gates.layer0 import (
     ENKI_ROOT,
+    MAX_ANALYZED_COMMAND_CHARS,
+    UNANALYZABLE_TARGET,
+    analyze_command,
     extract_db_targets,
     extract_write_targets,
     is_exempt,
@@ -229,6 +232,122 @@ class TestDBTargetExtraction:
         assert len(targets) == 0
 
 
+class TestCommandAnalysis:
+    """Single-pass tokenizer: quoting, heredocs, substitutions, budgets."""
+
+    def test_quoted_operator_not_redirect(self):
+        targets = extract_write_targets('echo "a > b.py" > out.txt')
+        assert targets == ["out.txt"]
+
+    def test_fd_duplication_not_target(self):
+        assert extract_write_targets("make test 2>&1 | tail -5") == []
+
+    def test_heredoc_body_not_scanned(self):
+        command = "cat > gen.py <<'EOF'\nrm -rf src/\necho x > evil.py\nEOF\necho done > log.txt"
+        assert extract_write_targets(command) == ["gen.py", "log.txt"]
+
+    def test_indented_heredoc_terminator(self):
+        command = "cat <<-EOF > t.txt\n\tsqlite3 ~/.enki/uru.db\n\tEOF\n"
+        analysis = analyze_command(command)
+        assert analysis.write_targets == ["t.txt"]
+        assert analysis.db_targets == []
+
+    def test_command_substitution_scanned(self):
+        targets = extract_write_targets('echo "$(cp a.py b.py)" `rm c.py`')
+        assert "b.py" in targets
+        assert "c.py" in targets
+
+    def test_find_exec_and_wrappers(self):
+        assert extract_write_targets("find . -name '*.pyc' -exec rm {} \\;") == ["{}"]
+        assert extract_write_targets("sudo tee -a /etc/hosts") == ["/etc/hosts"]
+
+    def test_python_write_after_semicolon_in_script(self):
+        targets = extract_write_targets(
+            "python3 -c \"import os; open('x.py', 'w').write('')\""
+        )
+        assert "__PYTHON_WRITE__" in targets
+
+    def test_sqlite3_behind_flags_and_wrappers(self):
+        targets = extract_db_targets('sudo sqlite3 -header ~/.enki/uru.db "SELECT 1"')
+        assert targets == ["~/.enki/uru.db"]
+
+    def test_write_and_db_targets_in_one_pass(self):
+        analysis = analyze_command("cp a.db /tmp/b.db && echo ok > log.txt")
+        assert analysis.complete
+        assert analysis.write_targets == ["/tmp/b.db", "log.txt"]
+        assert analysis.db_targets == ["a.db", "/tmp/b.db"]
+
+    def test_large_heredoc_within_budget(self):
+        body = "x = 'a > b; rm c'\n" * 20000
+        analysis = analyze_command(f"cat > gen.py <<'EOF'\n{body}EOF\n")
+        assert analysis.complete
+        assert analysis.write_targets == ["gen.py"]
+
+    def test_heredoc_fed_to_shell_is_scanned(self):
+        for command in [
+            "bash <<'EOF'\nrm src/enki/gates/layer0.py\nEOF",
+            "sudo env X=1 sh <<-EOF\n\techo x > src/enki/gates/uru.py\n\tEOF\n",
+            "zsh <<< 'rm src/enki/gates/layer0.py'",
+        ]:
+            analysis = analyze_command(command)
+            assert analysis.complete
+            assert analysis.write_targets in (
+                ["src/enki/gates/layer0.py"], ["src/enki/gates/uru.py"],
+            ), command
+
+    def test_shell_dash_c_string_is_scanned(self):
+        assert extract_write_targets("bash -c 'rm src/enki/gates/layer0.py'") == [
+            "src/enki/gates/layer0.py"
+        ]
+        assert extract_write_targets(
+            "sudo /bin/sh -ec \"cd /repo && echo x > src/enki/gates/uru.py\""
+        ) == ["src/enki/gates/uru.py"]
+        # Nested shells unwrap too.
+        assert extract_write_targets(
+            "bash -c \"dash -c 'mv a.py src/enki/gates/uru.py'\""
+        ) == ["src/enki/gates/uru.py"]
+
+    def test_eval_arguments_are_scanned(self):
+        for command in [
+            'eval "rm src/enki/gates/layer0.py"',
+            "eval rm src/enki/gates/layer0.py",
+            "eval 'echo x > src/enki/gates/layer0.py'",
+        ]:
+            targets = extract_write_targets(command)
+            assert targets and set(targets) == {"src/enki/gates/layer0.py"}, command
+            assert all(is_layer0_protected(t) for t in targets)
+
+    def test_unquoted_heredoc_substitutions_scanned(self):
+        command = "cat > notes.md <<EOF\n$(rm src/enki/gates/uru.py)\nEOF\n"
+        assert extract_write_targets(command) == ["notes.md", "src/enki/gates/uru.py"]
+
+    def test_python_script_on_stdin_fails_closed(self):
+        for command in [
+            "python - <<'EOF'\nopen('src/enki/gates/uru.py', 'w')\nEOF",
+            "python3 <<'EOF'\nprint(1)\nEOF",
+        ]:
+            analysis = analyze_command(command)
+            assert not analysis.complete
+            assert "stdin" in analysis.reason
+        # A script file reads the heredoc as data.
+        assert analyze_command("python3 gen.py <<'EOF'\nrm x\nEOF").complete
+
+    def test_oversized_command_fails_closed(self):
+        command = "echo " + "x" * MAX_ANALYZED_COMMAND_CHARS
+        assert not analyze_command(command).complete
+        assert UNANALYZABLE_TARGET in extract_write_targets(command)
+        assert UNANALYZABLE_TARGET in extract_db_targets(command)
+
+    def test_deep_nesting_fails_closed(self):
+        analysis = analyze_command("echo " + "$(" * 100 + "x" + ")" * 100)
+        assert not analysis.complete
+
+    def test_time_budget_fails_closed(self):
+        with patch("enki.gates.layer0.ANALYSIS_TIME_BUDGET_S", -1.0):
+            analysis = analyze_command("echo 'a' " * 2000)
+        assert not analysis.complete
+
+
 # ── Gate checks (Layer 1) ──
 
 
@@ -535,6 +654,17 @@ class TestGateChecks:
         assert result["decision"] == "block"
         assert "Layer 0.5" in result["reason"]
 
+    def test_layer05_blocks_unanalyzable_bash(self, mock_project):
+        from enki.gates.uru import check_pre_tool_use
+
+        _, _, db_path = mock_project
+        self._set_goal(db_path)
+        self._set_phase(db_path, "implement")
+        command = "echo " + "x" * MAX_ANALYZED_COMMAND_CHARS
+        result = check_pre_tool_use("Bash", {"command": command})
+        assert result["decision"] == "block"
+        assert "Layer 0.5" in result["reason"]
+
     def test_layer05_allows_normal_bash(self, mock_project):
         from enki.gates.uru import check_pre_tool_use
 
@@ -589,6 +719,23 @@ class TestGateChecks:
         )
         assert result["decision"] == "allow"
 
+    def test_layer0_blocks_protected_write_through_shell(self, mock_project):
+        from enki.gates.uru import check_pre_tool_use
+
+        _, _, db_path = mock_project
+        self._set_goal(db_path)
+        self._set_phase(db_path, "implement")
+        for command in [
+            "bash <<'EOF'\nrm src/enki/gates/layer0.py\nEOF",
+            "bash <<'EOF'\necho x > src/enki/gates/uru.py\nEOF",
+            "bash -c 'rm src/enki/gates/layer0.py'",
+            'eval "rm src/enki/gates/layer0.py"',
+            "eval rm src/enki/gates/layer0.py",
+            "python - <<'EOF'\nprint(1)\nEOF",
+        ]:
+            result = check_pre_tool_use("Bash", {"command": command})
+            assert result["decision"] == "block", command
+
     def test_read_tools_always_pass(self, mock_project):
         from enki.gates.uru import check_pre_tool_use
 
@@ -785,6 +932,40 @@ class TestNudges:
         if "nudges" in result:
             assert any("checkpoint" in n or "capture" in n for n in result["nudges"])
 
+    def test_post_tool_use_batches_uru_writes(self, mock_nudge_env):
+        import enki.gates.sentrux as sentrux
+        import enki.gates.uru as uru
+
+        calls = []
+        real_uru_db = uru.uru_db
+
+        def counting_uru_db():
+            calls.append(1)
+            return real_uru_db()
+
+        with patch.object(uru, "uru_db", counting_uru_db), \
+             patch.object(sentrux, "DRIFT_PATTERNS_PATH", mock_nudge_env / "drift-patterns.json"), \
+             patch.object(sentrux, "_matcher_cache", None):
+            result = uru.check_post_tool_use(
+                "enki_phase", {"action": "advance"},
+                assistant_response="I decided to use JWT instead of sessions",
+                hook_context={"session_id": "hook-session", "project": "testproj"},
+            )
+
+        assert len(calls) == 1
+        assert result["decision"] == "allow"
+        assert result["drift"]["pattern_matched"] == "manual_phase_advance"
+        assert any("enki_remember" in n for n in result["nudges"])
+        with connect(mock_nudge_env / "uru.db") as conn:
+            drift = conn.execute(
+                "SELECT cumulative_score FROM session_drift WHERE session_id = 'hook-session'"
+            ).fetchone()
+            logged = conn.execute(
+                "SELECT COUNT(*) FROM enforcement_log WHERE hook = 'post-tool-use'"
+            ).fetchone()
+        assert drift[0] == 4.0
+        assert logged[0] == 1
+
 
 def test_gate_checks_are_project_scoped(tmp_path):
     enki_root = tmp_path / ".enki"
@@ -0,0 +1,116 @@
+"""Tests for per-file blast-radius reachability."""
+
+import random
+import sqlite3
+
+import pytest
+
+from enki.graph.blast import (
+    graph_importer_counts,
+    importer_counts_sql,
+    importer_graph,
+    importer_map,
+    imported_closure_sql,
+    transitive_importer_counts,
+)
+from enki.graph.schema import create_graph_tables
+
+
+def _naive(importers: dict[str, set[str]], file_path: str) -> int:
+    """The per-symbol DFS compute_blast_radius used to run."""
+    visited: set[str] = set()
+    queue = list(importers.get(file_path, set()))
+    while queue:
+        current = queue.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+        queue.extend(importers.get(current, set()) - visited)
+    return len(visited)
+
+
+def _random_edges(seed: int, nodes: int = 60, edges: int = 150) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [(f"f{rng.randrange(nodes)}", f"f{rng.randrange(nodes)}") for _ in range(edges)]
+
+
+def _graph_conn(edges):
+    conn = sqlite3.connect(":memory:")
+    create_graph_tables(conn)
+    conn.executemany(
+        "INSERT OR IGNORE INTO edges (id, from_id, to_id, edge_type) VALUES (?, ?, ?, 'imports')",
+        [(f"{a}->{b}", a, b) for a, b in edges],
+    )
+    return conn
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_scc_counts_match_per_file_dfs(seed):
+    edges = _random_edges(seed)
+    importers = importer_map(edges)
+    nodes = {n for edge in edges for n in edge}
+    counts = transitive_importer_counts(importers)
+    assert counts == {n: _naive(importers, n) for n in nodes}
+
+    subset = set(sorted(nodes)[:5])
+    partial = transitive_importer_counts(importers, subset)
+    assert {n: partial[n] for n in subset} == {n: counts[n] for n in subset}
+
+
+@pytest.mark.parametrize("block_bits", [1, 7, 64])
+def test_blocked_counts_match_unblocked(block_bits):
+    edges = _random_edges(3, nodes=200, edges=600)
+    graph = importer_graph(edges + edges[:50])  # repeated edges collapse
+    importers = importer_map(edges)
+    assert graph_importer_counts(graph, block_bits=block_bits) == transitive_importer_counts(importers)
+    for node, sources in importers.items():
+        assert graph.direct(graph.ids[node]) == len(sources)
+
+
+def test_cycles_and_self_imports():
+    importers = importer_map([("a", "b"), ("b", "a"), ("c", "a"), ("s", "s"), ("x", "s")])
+    counts = transitive_importer_counts(importers)
+    assert counts["a"] == 3  # b, a (via the cycle), c
+    assert counts["c"] == 0
+    assert counts["s"] == 2  # itself and x
+    assert counts["x"] == 0
+
+
+def test_deep_chain_does_not_recurse():
+    edges = [(f"n{i + 1}", f"n{i}") for i in range(5000)]
+    counts = transitive_importer_counts(importer_map(edges))
+    assert counts["n0"] == 5000
+    assert counts["n5000"] == 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sql_walks_match(seed):
+    edges = _random_edges(seed)
+    importers = importer_map(edges)
+    conn = _graph_conn(edges)
+    for node in {n for edge in edges for n in edge}:
+        assert importer_counts_sql(conn, node) == (
+            len(importers.get(node, ())), _naive(importers, node),
+        )
+
+    imports: dict[str, set[str]] = {}
+    for a, b in edges:
+        imports.setdefault(a, set()).add(b)
+    expected = {"f0"}
+    stack = ["f0"]
+    while stack:
+        for nxt in imports.get(stack.pop(), ()):
+            if nxt not in expected:
+                expected.add(nxt)
+                stack.append(nxt)
+    assert imported_closure_sql(conn, ["f0"]) == expected
+    assert imported_closure_sql(conn, []) == set()
+
+
+def test_blast_benchmark_small_graph():
+    from enki.bench import format_blast_results, run_blast_benchmark
+
+    results = run_blast_benchmark(files=400, exports_per_file=2, verify_sample=400)
+    assert results["identical"] is True
+    assert results["symbols"] == 800
+    assert "full recompute" in format_blast_results(results)
@@ -0,0 +1,129 @@
+"""Tests for call edges, duplicate fingerprints and their graph queries."""
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db
+from enki.graph.scanner import run_full_scan, run_incremental_update
+
+BODY = (
+    "    total = 0\n"
+    "    for item in items:\n"
+    "        if item.enabled and item.weight > limit:\n"
+    "            total += item.weight * 2\n"
+    "        elif item.weight:\n"
+    "            total -= 1\n"
+    "    return {'total': total, 'count': len(items)}\n"
+)
+
+
+@pytest.fixture
+def call_repo(tmp_path):
+    root = tmp_path / "calls"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "__init__.py").write_text("")
+    (root / "pkg" / "core.py").write_text(
+        "def helper(x):\n    return x\n\n\n"
+        f"def tally(items, limit):\n{BODY}"
+    )
+    (root / "pkg" / "service.py").write_text(
+        "from pkg.core import helper\n\n\n"
+        "def use(x):\n    return helper(x)\n\n\n"
+        "class Service:\n"
+        "    def run(self):\n        return self.check(use(1))\n\n"
+        "    def check(self, y):\n        return y\n"
+    )
+    (root / "app.py").write_text(
+        "from pkg import service\n\n\n"
+        "def main():\n    service.use(2)\n\n\n"
+        f"def summarize(items, limit):\n{BODY}\n\n"
+        "main()\n"
+    )
+    then = time.time() - 60
+    for path in root.rglob("*.py"):
+        os.utime(path, (then, then))
+    return root
+
+
+def _calls(project: str) -> set[tuple[str, str]]:
+    with graph_db(project) as conn:
+        return {
+            (r["from_id"], r["to_id"])
+            for r in conn.execute("SELECT from_id, to_id FROM edges WHERE edge_type='calls'")
+        }
+
+
+def test_call_edges_resolve_through_imports(enki_root, call_repo):
+    stats = run_full_scan("calls", str(call_repo), workers=1)
+    assert stats["calls_found"] == len(_calls("calls"))
+    assert _calls("calls") == {
+        ("pkg/service.py::use::3", "pkg/core.py::helper::0"),
+        ("pkg/service.py::run::8", "pkg/service.py::check::11"),
+        ("pkg/service.py::run::8", "pkg/service.py::use::3"),
+        ("app.py::main::3", "pkg/service.py::use::3"),
+        ("app.py", "app.py::main::3"),
+    }
+
+
+def test_duplicate_functions_share_fingerprint(enki_root, call_repo):
+    run_full_scan("calls", str(call_repo), workers=1)
+    with graph_db("calls") as conn:
+        prints = {
+            r["name"]: r["fingerprint"]
+            for r in conn.execute("SELECT name, fingerprint FROM symbols")
+        }
+        dupes = {
+            (r["from_id"], r["to_id"], r["weight"])
+            for r in conn.execute("SELECT * FROM edges WHERE edge_type='duplicates'")
+        }
+    assert prints["tally"] and prints["tally"] == prints["summarize"]
+    assert prints["helper"] is None  # too small to fingerprint
+    assert dupes == {("app.py", "pkg/core.py", 1.0), ("pkg/core.py", "app.py", 1.0)}
+
+
+def test_incremental_relinks_calls_into_edited_file(enki_root, call_repo):
+    run_full_scan("calls", str(call_repo), workers=1)
+    # Shift every symbol in core.py down two lines: ids change.
+    core = call_repo / "pkg" / "core.py"
+    core.write_text("# header\n\n" + core.read_text())
+    stats = run_incremental_update("calls", str(call_repo), workers=1)
+    assert stats["files_updated"] == 1
+    assert ("pkg/service.py::use::3", "pkg/core.py::helper::2") in _calls("calls")
+    assert not any(to == "pkg/core.py::helper::0" for _, to in _calls("calls"))
+
+    run_full_scan("full", str(call_repo), workers=1)
+    assert _calls("calls") == _calls("full")
+
+
+def test_graph_query_callers_and_duplicates(enki_root, call_repo):
+    from enki.mcp.orch_tools import enki_graph_query
+
+    run_full_scan("calls", str(call_repo), workers=1)
+    direct = enki_graph_query("callers", "pkg/core.py::helper", project="calls")
+    assert [c["id"] for c in direct["callers"]] == ["pkg/service.py::use::3"]
+
+    deep = enki_graph_query("callers", "helper", project="calls", depth=3)
+    assert [(c["id"], c["depth"]) for c in deep["callers"]] == [
+        ("pkg/service.py::use::3", 1),
+        ("app.py::main::3", 2),
+        ("pkg/service.py::run::8", 2),
+        ("app.py", 3),
+    ]
+
+    first = enki_graph_query("callers", "helper", project="calls", depth=3, page_size=2)
+    rest = enki_graph_query(
+        "callers", "helper", project="calls", depth=3, page_size=2, cursor=first["next_cursor"],
+    )
+    assert [c["id"] for c in first["callers"] + rest["callers"]] == [c["id"] for c in deep["callers"]]
+    assert rest["next_cursor"] is None
+
+    groups = enki_graph_query("duplicates", "app.py", project="calls")["groups"]
+    assert len(groups) == 1
+    assert {s["name"] for s in groups[0]["symbols"]} == {"tally", "summarize"}
+    assert enki_graph_query("duplicates", "*", project="calls")["groups"] == groups
+    assert enki_graph_query("duplicates", "pkg/core.py::helper", project="calls")["groups"] == []
+    assert "error" in enki_graph_query("callers", "no_such_symbol", project="calls")
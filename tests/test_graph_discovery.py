@@ -0,0 +1,69 @@
+"""Tests for shared project discovery (git ls-files and the .gitignore walker)."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from enki.graph import discovery
+from enki.graph.discovery import discover
+
+VISIBLE = {
+    "a.py", "nested/build-out/c.py", "docs/deep/b.md", "sub/other.py", ".gitignore",
+    "sub/.gitignore",
+}
+
+
+def _make_tree(root):
+    files = {
+        ".gitignore": "# generated\n*.log\n/build-out/\ngen/\n!gen/keep.py\ndocs/*.md\n",
+        "sub/.gitignore": "local.py\n",
+        "a.py": "", "x.log": "", "build-out/b.py": "", "nested/build-out/c.py": "",
+        "gen/keep.py": "", "docs/a.md": "", "docs/deep/b.md": "",
+        "sub/local.py": "", "sub/other.py": "", "node_modules/m.js": "",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def _paths(entries):
+    return {e.path.replace(os.sep, "/") for e in entries}
+
+
+def test_walker_applies_gitignore_rules(tmp_path, monkeypatch):
+    monkeypatch.setattr(discovery, "_git_paths", lambda root: None)
+    root = _make_tree(tmp_path / "p")
+    entries = discover(str(root))
+    assert _paths(entries) == VISIBLE
+    a = next(e for e in entries if e.path == "a.py")
+    assert a.size_bytes == 0 and a.mtime_ns == os.stat(root / "a.py").st_mtime_ns
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_git_listing_matches_walker(tmp_path, monkeypatch):
+    root = _make_tree(tmp_path / "p")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    (root / "tracked_then_deleted.py").write_text("")
+    subprocess.run(["git", "add", "tracked_then_deleted.py"], cwd=root, check=True)
+    (root / "tracked_then_deleted.py").unlink()
+
+    via_git = _paths(discover(str(root)))
+    monkeypatch.setattr(discovery, "_git_paths", lambda root: None)
+    assert via_git == _paths(discover(str(root))) == VISIBLE
+
+
+def test_scanner_and_profile_share_one_listing(tmp_path):
+    from enki.graph.scanner import discover_files
+    from enki.orch.researcher import analyze_codebase
+
+    root = _make_tree(tmp_path / "p")
+    entries = discover(str(root))
+    assert {f["path"] for f in discover_files(str(root), entries)} == {
+        "a.py", os.path.join("nested", "build-out", "c.py"), os.path.join("sub", "other.py"),
+    }
+    profile = analyze_codebase(str(root), entries)
+    assert profile["project"]["languages"] == ["python"]
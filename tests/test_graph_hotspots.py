@@ -0,0 +1,108 @@
+"""Tests for materialized churn x complexity hotspots."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db
+from enki.graph import hotspots
+from enki.graph.hotspots import risk_score
+from enki.graph.scanner import run_full_scan, run_incremental_update
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.email=t@t", "-c", "user.name=t", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+
+def _commit(root, message="change"):
+    _git(root, "add", "-A")
+    _git(root, "commit", "-qm", message)
+
+
+@pytest.fixture
+def repo(enki_root, tmp_path):
+    root = tmp_path / "hot"
+    root.mkdir()
+    _git(root, "init", "-q", "-b", "main")
+    for i in range(3):
+        (root / "busy.py").write_text(
+            "def busy(x):\n" + "".join(f"    if x == {n}:\n        return {n}\n" for n in range(i + 1))
+        )
+        _commit(root)
+    (root / "calm.py").write_text("def calm():\n    return 1\n")
+    (root / "notes.md").write_text("text\n")
+    _commit(root)
+    return root
+
+
+def _rows(project: str) -> dict:
+    with graph_db(project) as conn:
+        return {
+            r["path"]: (r["churn"], r["lines_changed"], r["complexity"], r["max_complexity"],
+                        r["risk_score"])
+            for r in conn.execute("SELECT * FROM hotspots")
+        }
+
+
+def test_full_scan_materializes_hotspots(repo):
+    stats = run_full_scan("hot", str(repo), workers=1)
+    assert stats["hotspots_computed"] == 2
+    rows = _rows("hot")
+    # busy.py: 3 commits adding 3 + 2 + 2 lines; complexity 1 + 3 branches.
+    assert rows["busy.py"] == (3, 7, 4, 4, risk_score(3, 4))
+    assert rows["calm.py"][:3] == (1, 2, 1)
+    assert rows["busy.py"][4] > rows["calm.py"][4]
+    with graph_db("hot") as conn:
+        row = conn.execute(
+            "SELECT git_change_frequency, complexity_score FROM files WHERE path='busy.py'"
+        ).fetchone()
+    assert tuple(row) == (3, 4)
+
+
+def test_later_scans_read_only_new_commits(repo):
+    run_full_scan("hot", str(repo), workers=1)
+    (repo / "calm.py").write_text("def calm(x):\n    return x or 1\n")
+    _commit(repo)
+
+    seen = []
+    real = hotspots.read_churn
+
+    def spy(project_path, revisions):
+        seen.append(revisions)
+        return real(project_path, revisions)
+
+    with patch.object(hotspots, "read_churn", side_effect=spy):
+        stats = run_incremental_update("hot", str(repo), workers=1)
+        run_incremental_update("hot", str(repo), workers=1)
+        run_full_scan("hot-again", str(repo), workers=1)
+    assert len(seen) == 2 and ".." in seen[0]  # a range, then a fresh history
+    assert stats["hotspots_computed"] == 1
+    assert _rows("hot") == {path: row for path, row in _rows("hot-again").items()}
+    assert _rows("hot")["calm.py"][0] == 2
+
+
+def test_rewritten_history_recounts(repo):
+    run_full_scan("hot", str(repo), workers=1)
+    _git(repo, "reset", "-q", "--hard", "HEAD~2")
+    (repo / "busy.py").write_text("def busy():\n    return 0\n")
+    _commit(repo, "rewrite")
+    run_incremental_update("hot", str(repo), workers=1)
+    rows = _rows("hot")
+    assert rows["busy.py"][0] == 3 and "calm.py" not in rows
+
+
+def test_graph_query_ranks_hotspots(repo):
+    from enki.mcp.orch_tools import enki_graph_query
+
+    run_full_scan("hot", str(repo), workers=1)
+    first = enki_graph_query("hotspots", "*", project="hot", page_size=1)
+    assert [h["path"] for h in first["hotspots"]] == ["busy.py"]
+    rest = enki_graph_query("hotspots", "*", project="hot", page_size=1, cursor=first["next_cursor"])
+    assert [h["path"] for h in rest["hotspots"]] == ["calm.py"] and rest["next_cursor"] is None
+    assert enki_graph_query("hotspots", "calm", project="hot")["count"] == 1
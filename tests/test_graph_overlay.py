@@ -0,0 +1,184 @@
+"""Tests for task worktree graphs: shared base plus per-task overlay."""
+
+import os
+import subprocess
+import time
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db, graph_db_path
+from enki.graph.overlay import (
+    base_graph,
+    drop_overlay,
+    overlay_db,
+    overlay_graph,
+    refresh_overlay,
+)
+from enki.graph.scanner import run_full_scan
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.email=t@t", "-c", "user.name=t", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+
+def _age(root):
+    then = time.time() - 60
+    for path in root.rglob("*"):
+        if path.is_file() and ".git" not in path.parts:
+            os.utime(path, (then, then))
+
+
+@pytest.fixture
+def repo(enki_root, tmp_path):
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "__init__.py").write_text("")
+    (root / "pkg" / "core.py").write_text(
+        "def core(a):\n    return a\n\n\ndef spare():\n    return 0\n"
+    )
+    (root / "pkg" / "util.py").write_text(
+        "from pkg import core\n\n\ndef util(x):\n    return core.core(x)\n"
+    )
+    for name in ("app", "cli", "web"):
+        (root / f"{name}.py").write_text(
+            "from pkg import util\n\n\n"
+            f"def {name}_main():\n    return util.util(1)\n"
+        )
+    (root / "lonely.py").write_text("def lonely():\n    return 1\n")
+    # Enough files that blast scores depend on the file count.
+    for i in range(12):
+        (root / f"leaf{i}.py").write_text(f"def leaf{i}():\n    return {i}\n")
+    _git(root, "init", "-q", "-b", "main")
+    _git(root, "add", ".")
+    _git(root, "commit", "-qm", "base")
+    _age(root)
+    run_full_scan("ov", str(root), workers=1)
+    worktree = tmp_path / "wt"
+    _git(root, "worktree", "add", "-q", "-b", "task/t1", str(worktree), "main")
+    return root, worktree
+
+
+def _dump(conn) -> dict:
+    return {
+        "files": [tuple(r) for r in conn.execute(
+            "SELECT path, language, size_bytes, symbol_count FROM files ORDER BY path")],
+        "symbols": [tuple(r) for r in conn.execute(
+            "SELECT id, file_path, name, kind, line_start, line_end, signature, "
+            "complexity, is_exported, fingerprint FROM symbols ORDER BY id")],
+        "edges": [tuple(r) for r in conn.execute(
+            "SELECT id, from_id, to_id, edge_type, weight, line_number FROM edges ORDER BY id")],
+        "blast": [tuple(r) for r in conn.execute(
+            "SELECT symbol_id, file_path, direct_importers, transitive_importers, "
+            "blast_score, risk_level FROM blast_radius ORDER BY symbol_id")],
+        "hotspots": [tuple(r) for r in conn.execute(
+            "SELECT path, churn, lines_changed, complexity, max_complexity, risk_score "
+            "FROM hotspots ORDER BY path")],
+    }
+
+
+def _matches_full_scan(worktree) -> None:
+    run_full_scan("ref", str(worktree), workers=1)
+    with overlay_db("ov", "t1") as merged, graph_db("ref") as full:
+        assert _dump(merged) == _dump(full)
+
+
+def test_untouched_worktree_reads_the_base(repo):
+    _, worktree = repo
+    stats = refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    assert stats["errors"] == [] and stats["files_changed"] == 0
+    assert graph_db_path("ov", base_graph(stats["base_commit"])).exists()
+    _matches_full_scan(worktree)
+
+
+def test_overlay_matches_full_scan_of_worktree(repo):
+    _, worktree = repo
+    # util stops importing core; a new module imports core; cli goes away.
+    (worktree / "pkg" / "util.py").write_text("def util(x):\n    return x\n")
+    (worktree / "pkg" / "extra.py").write_text(
+        "from pkg import core\n\n\ndef extra():\n    return core.core(2)\n"
+    )
+    (worktree / "pkg" / "more.py").write_text("from pkg import extra\n")
+    (worktree / "cli.py").unlink()
+    stats = refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    assert stats["errors"] == []
+    assert (stats["files_changed"], stats["files_deleted"]) == (3, 1)
+    # app and web import util; nothing else is re-derived.
+    assert stats["files_relinked"] == 2
+    _matches_full_scan(worktree)
+
+    with graph_db("ov", overlay_graph("t1")) as conn:
+        own = {r[0] for r in conn.execute("SELECT path FROM files")}
+    assert own == {os.path.join("pkg", p) for p in ("util.py", "extra.py", "more.py")}
+
+
+def test_refresh_reparses_only_what_moved(repo):
+    from unittest.mock import patch
+
+    from enki.graph import overlay
+
+    _, worktree = repo
+    (worktree / "lonely.py").write_text("def lonely():\n    return 2\n")
+    refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    _age(worktree)
+    # Stat moved: the file is re-parsed once.
+    assert refresh_overlay("ov", "t1", str(worktree), "main", workers=1)["files_parsed"] == 1
+    with patch.object(overlay, "parse_files", side_effect=AssertionError("parsed")):
+        again = refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    assert again["unchanged"] is True and again["files_changed"] == 1
+
+    # Reverting the edit drops the file from the overlay.
+    (worktree / "lonely.py").write_text("def lonely():\n    return 1\n")
+    stats = refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    assert stats["files_changed"] == 0
+    _matches_full_scan(worktree)
+
+
+def test_overlays_share_one_base(repo):
+    root, worktree = repo
+    other = root.parent / "wt2"
+    _git(root, "worktree", "add", "-q", "-b", "task/t2", str(other), "main")
+    (other / "lonely.py").write_text("def lonely2():\n    return 1\n")
+    first = refresh_overlay("ov", "t1", str(worktree), "main", workers=1)
+    second = refresh_overlay("ov", "t2", str(other), "main", workers=1)
+    assert first["base_commit"] == second["base_commit"]
+
+    with overlay_db("ov", "t2") as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM symbols WHERE file_path='lonely.py'")}
+    assert names == {"lonely2"}
+    with overlay_db("ov", "t1") as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM symbols WHERE file_path='lonely.py'")}
+    assert names == {"lonely"}
+
+    base = graph_db_path("ov", base_graph(first["base_commit"]))
+    assert drop_overlay("ov", "t1") == {"overlay_removed": True, "bases_removed": []}
+    assert drop_overlay("ov", "t2")["bases_removed"] == [first["base_commit"]]
+    assert not base.exists()
+
+
+def test_graph_query_reads_task_worktree(repo):
+    from enki.db import em_db
+    from enki.mcp.orch_tools import enki_graph_query
+
+    _, worktree = repo
+    with em_db("ov") as conn:
+        conn.execute(
+            "INSERT INTO task_state (task_id, project_id, sprint_id, task_name, tier, "
+            "worktree_path) VALUES ('t1', 'ov', 's1', 'task', 'standard', ?)",
+            (str(worktree),),
+        )
+        conn.execute(
+            "INSERT INTO task_state (task_id, project_id, sprint_id, task_name, tier) "
+            "VALUES ('t2', 'ov', 's1', 'task', 'standard')"
+        )
+    (worktree / "web.py").write_text("def web_main():\n    return 0\n")
+
+    importers = enki_graph_query("importers", os.path.join("pkg", "util.py"), project="ov", task_id="t1")
+    assert importers["importers"] == ["app.py", "cli.py"]
+    project_wide = enki_graph_query("importers", os.path.join("pkg", "util.py"), project="ov")
+    assert project_wide["importers"] == ["app.py", "cli.py", "web.py"]
+    assert "error" in enki_graph_query("symbols", "web.py", project="ov", task_id="t2")
@@ -0,0 +1,103 @@
+"""Tests for transitive import queries, import paths and the reachability cache."""
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db
+from enki.graph import queries
+from enki.graph.scanner import run_full_scan, run_incremental_update
+
+
+@pytest.fixture
+def chain_repo(tmp_path):
+    # a -> b -> c -> d, e -> c, d -> b (cycle b/c/d)
+    root = tmp_path / "chain"
+    root.mkdir()
+    (root / "a.py").write_text("import b\n")
+    (root / "b.py").write_text("import c\n")
+    (root / "c.py").write_text("import d\n")
+    (root / "d.py").write_text("import b\n")
+    (root / "e.py").write_text("import c\n")
+    then = time.time() - 60
+    for path in root.glob("*.py"):
+        os.utime(path, (then, then))
+    run_full_scan("chain", str(root), workers=1)
+    return root
+
+
+def _walk(direction: str, target: str, **kwargs) -> list[tuple[str, int]]:
+    with graph_db("chain") as conn:
+        walk = queries.transitive_files(conn, target, direction, limit=100, **kwargs)
+    return [(f["path"], f["depth"]) for f in walk["files"]]
+
+
+def test_transitive_walks_report_nearest_depth(enki_root, chain_repo):
+    assert _walk("importers", "c.py") == [
+        ("b.py", 1), ("e.py", 1), ("a.py", 2), ("d.py", 2), ("c.py", 3),
+    ]
+    assert _walk("importers", "c.py", depth=1) == [("b.py", 1), ("e.py", 1)]
+    assert _walk("imports", "a.py") == [("b.py", 1), ("c.py", 2), ("d.py", 3)]
+    assert _walk("imports", "d.py") == [("b.py", 1), ("c.py", 2), ("d.py", 3)]
+
+
+def test_import_path_is_shortest_chain(enki_root, chain_repo):
+    with graph_db("chain") as conn:
+        assert queries.import_path(conn, "a.py", "d.py") == (["a.py", "b.py", "c.py", "d.py"], False)
+        assert queries.import_path(conn, "e.py", "b.py") == (["e.py", "c.py", "d.py", "b.py"], False)
+        assert queries.import_path(conn, "a.py", "d.py", depth=2) == (None, False)
+        assert queries.import_path(conn, "d.py", "a.py") == (None, False)
+
+
+def test_fan_out_limit_keeps_nearest(enki_root, chain_repo, monkeypatch):
+    monkeypatch.setattr(queries, "MAX_REACHABLE", 3)
+    with graph_db("chain") as conn:
+        walk = queries.transitive_files(conn, "c.py", "importers", limit=100)
+    assert walk["truncated"] is True
+    assert [f["path"] for f in walk["files"]] == ["b.py", "e.py", "a.py"]
+
+
+def test_cached_walks_invalidated_by_incremental_scan(enki_root, chain_repo, monkeypatch):
+    monkeypatch.setattr(queries, "REACH_CACHE_MIN", 1)
+    with graph_db("chain") as conn:
+        assert queries.transitive_files(conn, "c.py", "importers")["cached"] is False
+        assert queries.transitive_files(conn, "c.py", "importers")["cached"] is True
+        queries.transitive_files(conn, "a.py", "imports")
+
+    (chain_repo / "e.py").write_text("import os\n")
+    run_incremental_update("chain", str(chain_repo), workers=1)
+
+    with graph_db("chain") as conn:
+        kept = {
+            (r["source"], r["direction"])
+            for r in conn.execute("SELECT source, direction FROM reachability_walks")
+        }
+    # Dropping e -> c changes who imports c, not what a imports.
+    assert kept == {("a.py", "imports")}
+    assert ("e.py", 1) not in _walk("importers", "c.py")
+
+    run_full_scan("chain", str(chain_repo), workers=1)
+    with graph_db("chain") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM reachability").fetchone()[0] == 0
+
+
+def test_graph_query_transitive_and_path(enki_root, chain_repo):
+    from enki.mcp.orch_tools import enki_graph_query
+
+    first = enki_graph_query("transitive_importers", "c.py", project="chain", page_size=2)
+    assert [f["path"] for f in first["importers"]] == ["b.py", "e.py"]
+    assert first["total"] == 5 and first["truncated"] is False
+    rest = enki_graph_query(
+        "transitive_importers", "c.py", project="chain", page_size=2, cursor=first["next_cursor"],
+    )
+    assert [f["path"] for f in rest["importers"]] == ["a.py", "d.py"]
+
+    imports = enki_graph_query("transitive_imports", "a.py", project="chain", depth=2)
+    assert [f["path"] for f in imports["imports"]] == ["b.py", "c.py"]
+
+    path = enki_graph_query("path", "a.py", project="chain", to="d.py")
+    assert path["path"] == ["a.py", "b.py", "c.py", "d.py"] and path["length"] == 3
+    assert "error" in enki_graph_query("path", "a.py", project="chain")
@@ -0,0 +1,126 @@
+"""Tests for module resolution in the code graph."""
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db
+from enki.graph.resolve import ModuleIndex
+from enki.graph.scanner import run_full_scan, run_incremental_update
+
+FIXTURE = {
+    # Python, src layout with relative imports
+    "py/src/app/__init__.py": "",
+    "py/src/app/db.py": "def connect():\n    pass\n",
+    "py/src/app/models/__init__.py": "from .user import User\n",
+    "py/src/app/models/user.py": "from ..db import connect\nimport os\n\nclass User:\n    pass\n",
+    "py/src/app/cli.py": (
+        "import app.db as database\n"
+        "from app import models\n"
+        "from app.models.user import User\n"
+        "from . import db\n"
+    ),
+    "py/tests/test_cli.py": "from app.cli import database\nimport pytest\n",
+    # TypeScript with a tsconfig (comments, trailing comma) and aliases
+    "web/tsconfig.json": (
+        "{\n  // generated\n  \"compilerOptions\": {\n    \"baseUrl\": \"src\",\n"
+        "    \"paths\": { \"@lib/*\": [\"lib/*\"], \"@config\": [\"config/index\"], },\n  },\n}\n"
+    ),
+    "web/src/lib/http.ts": "export function get() {}\n",
+    "web/src/lib/format/index.ts": "export const fmt = 1;\n",
+    "web/src/config/index.ts": "export const cfg = {};\n",
+    "web/src/utils.ts": "export const u = 1;\n",
+    "web/src/app.ts": (
+        "import { get } from '@lib/http';\n"
+        "import { fmt } from '@lib/format';\n"
+        "import { cfg } from '@config';\n"
+        "import { u } from 'utils';\n"
+        "import { x } from './lib/http.ts';\n"
+        "import React from 'react';\n"
+    ),
+    # Go module
+    "svc/go.mod": "module example.com/svc\n\ngo 1.22\n",
+    "svc/main.go": (
+        "package main\n\nimport (\n\t\"fmt\"\n\t\"example.com/svc/internal/store\"\n)\n\n"
+        "func main() { fmt.Println(store.Open()) }\n"
+    ),
+    "svc/internal/store/store.go": "package store\n\nfunc Open() int { return 1 }\n",
+    "svc/internal/store/cache.go": "package store\n\nfunc cache() {}\n",
+    "svc/internal/store/store_test.go": "package store\n",
+}
+
+EXPECTED = {
+    ("py/src/app/models/__init__.py", "py/src/app/models/user.py"),
+    ("py/src/app/models/user.py", "py/src/app/db.py"),
+    ("py/src/app/cli.py", "py/src/app/db.py"),
+    ("py/src/app/cli.py", "py/src/app/__init__.py"),
+    ("py/src/app/cli.py", "py/src/app/models/__init__.py"),
+    ("py/src/app/cli.py", "py/src/app/models/user.py"),
+    ("py/tests/test_cli.py", "py/src/app/cli.py"),
+    ("web/src/app.ts", "web/src/lib/http.ts"),
+    ("web/src/app.ts", "web/src/lib/format/index.ts"),
+    ("web/src/app.ts", "web/src/config/index.ts"),
+    ("web/src/app.ts", "web/src/utils.ts"),
+    ("svc/main.go", "svc/internal/store/store.go"),
+    ("svc/main.go", "svc/internal/store/cache.go"),
+}
+
+
+@pytest.fixture
+def fixture_repo(tmp_path):
+    root = tmp_path / "mono"
+    for rel, text in FIXTURE.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def _edges(project: str) -> set[tuple[str, str]]:
+    with graph_db(project) as conn:
+        return {
+            (r["from_id"], r["to_id"])
+            for r in conn.execute("SELECT from_id, to_id FROM edges WHERE edge_type='imports'")
+        }
+
+
+def test_resolution_accuracy_on_fixture_repo(enki_root, fixture_repo):
+    run_full_scan("mono", str(fixture_repo), workers=1)
+    found = _edges("mono")
+    true_positive = found & EXPECTED
+    precision = len(true_positive) / len(found)
+    recall = len(true_positive) / len(EXPECTED)
+    assert (precision, recall) == (1.0, 1.0), (found - EXPECTED, EXPECTED - found)
+
+
+def test_index_lookups(fixture_repo):
+    files = {rel for rel in FIXTURE if not rel.endswith("go.mod")}
+    index = ModuleIndex.build(files, str(fixture_repo))
+    assert index.resolve("app.models", "py/src/app/cli.py") == ["py/src/app/models/__init__.py"]
+    assert index.resolve("app.db.connect", "py/src/app/cli.py") == []
+    assert index.resolve("...db", "py/src/app/models/user.py") == []
+    assert index.resolve("./lib/http", "web/src/app.ts") == ["web/src/lib/http.ts"]
+    assert index.resolve("example.com/other", "svc/main.go") == []
+    assert index.fingerprint
+
+
+def test_tsconfig_change_relinks_importers(enki_root, fixture_repo):
+    import os
+    import time
+
+    then = time.time() - 60
+    for path in fixture_repo.rglob("*"):
+        if path.is_file():
+            os.utime(path, (then, then))
+    run_full_scan("mono", str(fixture_repo), workers=1)
+    assert ("web/src/app.ts", "web/src/lib/format/index.ts") in _edges("mono")
+
+    (fixture_repo / "web" / "tsconfig.json").write_text(
+        '{"compilerOptions": {"baseUrl": "src", "paths": {"@lib/*": ["lib/format/*"]}}}'
+    )
+    stats = run_incremental_update("mono", str(fixture_repo), workers=1)
+    assert stats["errors"] == []
+    edges = _edges("mono")
+    # '@lib/format' now points at lib/format/format, which does not exist.
+    assert ("web/src/app.ts", "web/src/lib/format/index.ts") not in edges
+    assert ("web/src/app.ts", "web/src/utils.ts") in edges
@@ -0,0 +1,336 @@
+"""Tests for the code graph scanner."""
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from enki.db import graph_db
+from enki.graph.scanner import (
+    discover_files,
+    extract_file,
+    get_parser,
+    parse_files,
+    run_full_scan,
+)
+
+
+def _make_project(root, modules: int = 12):
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "core.ts").write_text(
+        "export function core(a: number) {\n  if (a > 1) { return a; }\n  return 0;\n}\n"
+    )
+    for i in range(modules):
+        (root / "src" / f"m{i}.ts").write_text(
+            "import { core } from './core';\n"
+            f"import {{ f{i - 1} }} from './m{i - 1}';\n"
+            f"export function f{i}() {{ return core({i}); }}\n"
+            f"export class C{i} {{}}\n"
+        )
+    (root / "tool.py").write_text(
+        "def helper(x):\n    return x or 1\n\n\nclass _Private:\n    pass\n"
+    )
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "index.js").write_text("export const x = 1;\n")
+    return root
+
+
+def _dump(project: str) -> dict:
+    with graph_db(project) as conn:
+        return {
+            "files": [tuple(r) for r in conn.execute(
+                "SELECT path, language, size_bytes, symbol_count FROM files ORDER BY path")],
+            "symbols": [tuple(r) for r in conn.execute("SELECT * FROM symbols ORDER BY id")],
+            "edges": [tuple(r) for r in conn.execute("SELECT * FROM edges ORDER BY id")],
+            "blast": [tuple(r) for r in conn.execute(
+                "SELECT symbol_id, direct_importers, transitive_importers, risk_level "
+                "FROM blast_radius ORDER BY symbol_id")],
+        }
+
+
+def test_discovery_skips_vendor_dirs(tmp_path):
+    files = {f["path"] for f in discover_files(str(_make_project(tmp_path / "p")))}
+    assert "tool.py" in files
+    assert not any(p.startswith("node_modules") for p in files)
+
+
+def test_extract_file_single_walk(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(
+        "import os\n"
+        "from pkg import util\n\n"
+        "def outer(x):\n"
+        "    if x:\n"
+        "        for i in x:\n"
+        "            pass\n"
+        "    def _inner(y):\n"
+        "        return y if y else 0\n"
+        "    return _inner\n"
+    )
+    symbols, imports = extract_file(
+        {"path": "mod.py", "full_path": str(path), "language": "python"}
+    )
+    by_name = {s["name"]: s for s in symbols}
+    assert [s["name"] for s in symbols] == ["outer", "_inner"]
+    # outer counts the nested function's conditional too.
+    assert by_name["outer"]["complexity"] == 4
+    assert by_name["_inner"]["complexity"] == 2
+    assert by_name["outer"]["is_exported"] == 1
+    assert by_name["_inner"]["is_exported"] == 0
+    # Names from a module are qualified so submodule imports can resolve.
+    assert [i["to_id"] for i in imports] == ["os", "pkg", "pkg.util"]
+
+
+def test_parser_cached_per_language():
+    assert get_parser("python") is get_parser("python")
+    assert get_parser("python") is not get_parser("typescript")
+
+
+def test_unreadable_file_yields_nothing(tmp_path):
+    info = {"path": "gone.py", "full_path": str(tmp_path / "gone.py"), "language": "python"}
+    assert extract_file(info) == ([], [])
+
+
+def test_parse_files_preserves_input_order(tmp_path):
+    files = discover_files(str(_make_project(tmp_path / "p")))
+    serial = list(parse_files(files, workers=1))
+    parallel = list(parse_files(files, workers=2, chunk_size=3))
+    assert [r["path"] for r in parallel] == [f["path"] for f in files]
+    assert parallel == serial
+
+
+def test_parse_files_streams_bounded_window(tmp_path):
+    files = discover_files(str(_make_project(tmp_path / "p", modules=40)))
+    read = []
+
+    def source():
+        for file_info in files:
+            read.append(file_info["path"])
+            yield file_info
+
+    results = parse_files(source(), workers=2, chunk_size=2)
+    first = next(results)
+    # Two workers with two queued chunks each: nowhere near all 42 files.
+    assert first["path"] == files[0]["path"]
+    assert len(read) <= 2 * 2 * 2 + 2
+    assert [r["path"] for r in [first, *results]] == [f["path"] for f in files]
+
+
+def test_scan_benchmark_reports_peak_memory(tmp_path):
+    from enki.bench import format_graph_results, run_graph_benchmark
+
+    results = run_graph_benchmark(str(_make_project(tmp_path / "p")), worker_counts=(1,))
+    scan = results["full_scan"]["1"]
+    assert scan["files"] == results["files"] and scan["errors"] == 0
+    assert scan["max_rss_mb"] is None or scan["max_rss_mb"] > 0
+    assert "max RSS MB" in format_graph_results(results)
+
+
+def test_parallel_scan_matches_serial(enki_root, tmp_path):
+    project_dir = str(_make_project(tmp_path / "p"))
+    serial = run_full_scan("serial", project_dir, workers=1)
+    parallel = run_full_scan("parallel", project_dir, workers=2, chunk_size=2)
+
+    assert serial["errors"] == parallel["errors"] == []
+    assert serial["edges_found"] > 0
+    for key in ("files_scanned", "symbols_extracted", "edges_found", "blast_radius_computed"):
+        assert serial[key] == parallel[key]
+    assert _dump("serial") == _dump("parallel")
+
+
+def test_bench_graph_reports_each_worker_count(tmp_path):
+    from enki.bench import format_graph_results, run_graph_benchmark
+
+    results = run_graph_benchmark(
+        _make_project(tmp_path / "p"), worker_counts=(1, 2), chunk_size=4,
+    )
+    assert results["files"] == 14
+    assert set(results["graph_scan"]) == {"1", "2"}
+    assert all(run["identical"] for run in results["graph_scan"].values())
+    assert all(run["files_per_s"] > 0 for run in results["graph_scan"].values())
+    assert "files/s" in format_graph_results(results)
+
+
+# -- Incremental ---------------------------------------------------------------
+
+
+def _age(root, seconds: int = 60):
+    """Backdate mtimes so files are outside the racy-mtime window."""
+    import os
+    import time
+
+    then = time.time() - seconds
+    for path in root.rglob("*"):
+        if path.is_file():
+            os.utime(path, (then, then))
+
+
+@pytest.fixture
+def scanned(enki_root, tmp_path):
+    root = _make_project(tmp_path / "p", modules=4)
+    _age(root)
+    run_full_scan("inc", str(root), workers=1)
+    return root
+
+
+def _edges(project="inc") -> set[tuple[str, str]]:
+    with graph_db(project) as conn:
+        return {(r["from_id"], r["to_id"]) for r in conn.execute("SELECT from_id, to_id FROM edges")}
+
+
+def test_noop_incremental_parses_nothing(scanned):
+    from unittest.mock import patch
+
+    from enki.graph import scanner
+
+    with patch.object(scanner, "parse_files", side_effect=AssertionError("parsed")):
+        stats = scanner.run_incremental_update("inc", str(scanned), workers=1)
+    assert stats["files_unchanged"] == 6
+    assert stats["files_updated"] == stats["files_added"] == stats["files_deleted"] == 0
+
+
+def test_touch_without_content_change_is_not_reparsed(scanned):
+    import os
+
+    from enki.graph.scanner import run_incremental_update
+
+    os.utime(scanned / "tool.py", (1, 1))
+    stats = run_incremental_update("inc", str(scanned), workers=1)
+    assert stats["files_updated"] == 0
+    assert stats["files_unchanged"] == 6
+
+
+def test_modified_file_reparsed(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    (scanned / "tool.py").write_text("def renamed_helper():\n    return 2\n")
+    stats = run_incremental_update("inc", str(scanned), workers=1)
+    assert stats["files_updated"] == 1
+    with graph_db("inc") as conn:
+        names = {r["name"] for r in conn.execute("SELECT name FROM symbols WHERE file_path='tool.py'")}
+    assert names == {"renamed_helper"}
+
+
+def test_added_and_deleted_files_relink_edges(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    # m0 imports './m-1', which does not exist yet.
+    assert ("src/m0.ts", "src/m-1.ts") not in _edges()
+    (scanned / "src" / "m-1.ts").write_text("export const base = 1;\n")
+    (scanned / "src" / "m3.ts").unlink()
+    stats = run_incremental_update("inc", str(scanned), workers=1)
+
+    assert stats["files_added"] == 1 and stats["files_deleted"] == 1
+    edges = _edges()
+    assert ("src/m0.ts", "src/m-1.ts") in edges
+    assert not any("src/m3.ts" in edge for edge in edges)
+    with graph_db("inc") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM symbols WHERE file_path='src/m3.ts'").fetchone()[0] == 0
+
+
+def test_rename_detected_by_hash(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    (scanned / "tool.py").rename(scanned / "tools.py")
+    stats = run_incremental_update("inc", str(scanned), workers=1)
+    assert stats["files_renamed"] == 1
+    with graph_db("inc") as conn:
+        paths = {r["file_path"] for r in conn.execute("SELECT file_path FROM symbols")}
+    assert "tools.py" in paths and "tool.py" not in paths
+
+
+def test_incremental_converges_to_full_scan(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    (scanned / "src" / "m-1.ts").write_text("export function base() { return 1; }\n")
+    (scanned / "src" / "m2.ts").write_text("import { core } from './core';\nexport const two = 2;\n")
+    (scanned / "src" / "m1.ts").unlink()
+    run_incremental_update("inc", str(scanned), workers=1)
+    run_full_scan("full", str(scanned), workers=1)
+    assert _dump("inc") == _dump("full")
+
+
+def test_incremental_import_change_matches_full_scan(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    # m2 stops importing m1 and starts importing m3: only blast rows
+    # downstream of those edges are recomputed.
+    (scanned / "src" / "m2.ts").write_text(
+        "import { core } from './core';\nimport { f3 } from './m3';\n"
+        "export function f2() { return core(2); }\n"
+    )
+    stats = run_incremental_update("inc", str(scanned), workers=1)
+    assert stats["files_updated"] == 1
+    run_full_scan("full", str(scanned), workers=1)
+    assert _dump("inc") == _dump("full")
+
+
+def test_deleting_file_relinks_calls_of_its_importers(enki_root, tmp_path):
+    from enki.graph.scanner import run_incremental_update
+
+    # f0's call to common() is ambiguous until m1 goes away.
+    root = tmp_path / "dup"
+    root.mkdir()
+    (root / "m0.py").write_text("from m1 import *\nfrom m3 import *\n\ndef f0():\n    return common()\n")
+    (root / "m1.py").write_text("def common():\n    return 1\n")
+    (root / "m3.py").write_text("def common():\n    return 3\n")
+    _age(root)
+    run_full_scan("inc", str(root), workers=1)
+    (root / "m1.py").unlink()
+    run_incremental_update("inc", str(root), workers=1)
+    run_full_scan("full", str(root), workers=1)
+    assert ("m0.py::f0::3", "m3.py::common::0") in _edges("full")
+    assert _dump("inc") == _dump("full")
+
+
+# -- Bulk rebuild --------------------------------------------------------------
+
+
+def test_full_scan_reports_write_timings(scanned):
+    stats = run_full_scan("inc", str(scanned), workers=1)
+    timings = stats["timings"]
+    for key in ("discover_s", "parse_s", "load_s", "link_s", "index_s", "blast_s", "publish_s"):
+        assert timings[key] >= 0
+    assert timings["write_s"] >= timings["load_s"] + timings["publish_s"]
+    # The scratch build database is gone once published.
+    from enki.db import graph_db_path
+
+    leftovers = [p.name for p in graph_db_path("inc").parent.iterdir() if "build" in p.name]
+    assert leftovers == []
+
+
+def test_readers_see_previous_graph_during_rebuild(scanned):
+    from unittest.mock import patch
+
+    from enki.graph import scanner
+
+    before = _dump("inc")
+    seen = []
+    real_blast = scanner.compute_blast_radius
+
+    def blast_and_peek(project, conn, *args, **kwargs):
+        real_blast(project, conn, *args, **kwargs)
+        seen.append(_dump("inc"))
+
+    (scanned / "tool.py").write_text("def replaced():\n    return 3\n")
+    with patch.object(scanner, "compute_blast_radius", side_effect=blast_and_peek):
+        run_full_scan("inc", str(scanned), workers=1)
+
+    assert seen == [before]
+    with graph_db("inc") as conn:
+        names = {r["name"] for r in conn.execute("SELECT name FROM symbols WHERE file_path='tool.py'")}
+        assert names == {"replaced"}
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='index' AND name='idx_edges_to_type'"
+        ).fetchone()[0] == 1
+
+
+def test_rebuild_keeps_other_scan_state(scanned):
+    from enki.graph.scanner import run_incremental_update
+
+    (scanned / "tool.py").write_text("def changed():\n    return 2\n")
+    run_incremental_update("inc", str(scanned), workers=1)
+    run_full_scan("inc", str(scanned), workers=1)
+    with graph_db("inc") as conn:
+        keys = {r["key"] for r in conn.execute("SELECT key FROM scan_state")}
+    assert {"last_full_scan", "last_incremental_scan"} <= keys
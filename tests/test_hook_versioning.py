@@ -1,13 +1,17 @@
 """Tests for hook versioning and deployment."""
 
+import os
 from pathlib import Path
+from unittest.mock import patch
 
+import enki.hook_versioning as hook_versioning
 from enki.hook_versioning import (
     EXPECTED_HOOK_VERSIONS,
     HookVersionResult,
     check_hook_versions,
     deploy_hooks,
     format_hook_warning,
+    verify_hook_hashes,
 )
 
 
@@ -111,3 +115,59 @@ def test_warning_message_format():
     assert warning.startswith("Hooks outdated:")
     assert "enki-pre-tool-use.sh" in warning
     assert "Run `enki hooks deploy` to update." in warning
+
+
+def test_manifest_skips_reads_when_unchanged(tmp_path):
+    hooks_dir = tmp_path / "hooks"
+    hooks_dir.mkdir()
+    for hook, version in EXPECTED_HOOK_VERSIONS.items():
+        _write_hook(hooks_dir / hook, version)
+    manifest = tmp_path / "cache" / "hook-manifest.json"
+
+    assert check_hook_versions(str(hooks_dir), manifest_path=manifest).all_current
+    assert manifest.exists()
+    mtime = manifest.stat().st_mtime_ns
+
+    with patch.object(hook_versioning, "_read_hook_version") as read:
+        result = check_hook_versions(str(hooks_dir), manifest_path=manifest)
+    assert result.all_current is True
+    read.assert_not_called()
+    assert manifest.stat().st_mtime_ns == mtime
+
+
+def test_manifest_revalidates_changed_hook(tmp_path):
+    hooks_dir = tmp_path / "hooks"
+    hooks_dir.mkdir()
+    for hook, version in EXPECTED_HOOK_VERSIONS.items():
+        _write_hook(hooks_dir / hook, version)
+    manifest = tmp_path / "hook-manifest.json"
+    check_hook_versions(str(hooks_dir), manifest_path=manifest)
+
+    stale_hook = next(iter(EXPECTED_HOOK_VERSIONS))
+    _write_hook(hooks_dir / stale_hook, "v0.0.1-stale")
+    st = (hooks_dir / stale_hook).stat()
+    os.utime(hooks_dir / stale_hook, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    result = check_hook_versions(str(hooks_dir), manifest_path=manifest)
+    assert [m["hook"] for m in result.mismatches] == [stale_hook]
+    assert result.mismatches[0]["deployed_version"] == "v0.0.1-stale"
+
+
+def test_verify_hashes_reports_modified_and_missing(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    for hook, version in EXPECTED_HOOK_VERSIONS.items():
+        _write_hook(source / hook, version)
+
+    good = tmp_path / "good"
+    deploy_hooks(str(source), str(good))
+    bad = tmp_path / "bad"
+    deploy_hooks(str(source), str(bad))
+    hooks = list(EXPECTED_HOOK_VERSIONS)
+    (bad / hooks[0]).write_text("#!/bin/bash\necho tampered\n", encoding="utf-8")
+    (bad / hooks[1]).unlink()
+
+    results = verify_hook_hashes([good, bad], source, max_workers=2)
+    assert [r.ok for r in results] == [True, False]
+    assert results[1].modified == [hooks[0]]
+    assert results[1].missing == [hooks[1]]
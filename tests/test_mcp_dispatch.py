@@ -0,0 +1,167 @@
+"""Tests for off-loop MCP tool dispatch."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from enki.mcp.dispatch import ToolDispatcher, ToolTimeout, is_mutating, lock_key, tool_class
+
+
+@pytest.fixture(autouse=True)
+def _enki_root(enki_root):
+    # lock_key resolves projects against wisdom.db.
+    yield enki_root
+
+
+def _sleeper(seconds: float, log: list | None = None, tag: str = ""):
+    def fn():
+        if log is not None:
+            log.append(("start", tag))
+        time.sleep(seconds)
+        if log is not None:
+            log.append(("end", tag))
+        return tag
+    return fn
+
+
+def test_tool_classification():
+    assert tool_class("enki_graph_rebuild") == "heavy"
+    assert tool_class("enki_graph_query") == "read"
+    assert tool_class("enki_graph_query", {"task_id": "t1"}) == "heavy"
+    assert tool_class("enki_graph_query", {"task_id": None}) == "read"
+    assert tool_class("enki_phase") == "write"
+    assert not is_mutating("enki_status")
+    assert is_mutating("enki_wave")
+    assert lock_key({"project": "alpha"}) == "alpha"
+    assert lock_key({}) == lock_key({"project": "."})
+
+
+async def test_handlers_run_off_event_loop():
+    dispatcher = ToolDispatcher(workers=2)
+    loop_thread = threading.get_ident()
+    result = await dispatcher.run("enki_status", {}, lambda: str(threading.get_ident()))
+    assert int(result) != loop_thread
+    dispatcher.shutdown()
+
+
+async def test_slow_heavy_tool_does_not_block_cheap_calls():
+    dispatcher = ToolDispatcher(workers=2, heavy_workers=1)
+    slow = asyncio.create_task(
+        dispatcher.run("enki_graph_rebuild", {"project": "a"}, _sleeper(0.5, tag="rebuild"))
+    )
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    assert await dispatcher.run("enki_phase", {"project": "b"}, lambda: "ok") == "ok"
+    assert time.perf_counter() - started < 0.3
+    assert not slow.done()
+    assert await slow == "rebuild"
+    dispatcher.shutdown()
+
+
+async def test_mutating_tools_serialized_per_project():
+    dispatcher = ToolDispatcher(workers=4)
+    log: list = []
+    await asyncio.gather(
+        dispatcher.run("enki_phase", {"project": "p"}, _sleeper(0.1, log, "one")),
+        dispatcher.run("enki_goal", {"project": "p"}, _sleeper(0.1, log, "two")),
+    )
+    assert [event for event, _ in log] == ["start", "end", "start", "end"]
+    dispatcher.shutdown()
+
+
+async def test_cwd_project_and_its_name_share_one_lock(tmp_path, monkeypatch):
+    from enki.db import wisdom_db
+
+    with wisdom_db() as conn:
+        conn.execute("INSERT INTO projects (name, path) VALUES ('alpha', ?)", (str(tmp_path),))
+    monkeypatch.chdir(tmp_path)
+    assert lock_key({"project": "."}) == lock_key({}) == lock_key({"project": "default"}) \
+        == lock_key({"project": "ALPHA"}) == "alpha"
+
+    dispatcher = ToolDispatcher(workers=4)
+    log: list = []
+    await asyncio.gather(
+        dispatcher.run("enki_phase", {"project": "."}, _sleeper(0.1, log, "cwd")),
+        dispatcher.run("enki_goal", {"project": "alpha"}, _sleeper(0.1, log, "named")),
+    )
+    assert [event for event, _ in log] == ["start", "end", "start", "end"]
+    dispatcher.shutdown()
+
+
+async def test_reads_and_other_projects_run_concurrently():
+    dispatcher = ToolDispatcher(workers=4)
+    started = time.perf_counter()
+    await asyncio.gather(
+        dispatcher.run("enki_phase", {"project": "p"}, _sleeper(0.2)),
+        dispatcher.run("enki_phase", {"project": "q"}, _sleeper(0.2)),
+        dispatcher.run("enki_status", {"project": "p"}, _sleeper(0.2)),
+        dispatcher.run("enki_status", {"project": "p"}, _sleeper(0.2)),
+    )
+    assert time.perf_counter() - started < 0.6
+    dispatcher.shutdown()
+
+
+async def test_timeout_keeps_project_locked_until_handler_finishes():
+    dispatcher = ToolDispatcher(workers=2, timeouts={"read": 1, "write": 0.1, "heavy": 1})
+    log: list = []
+    with pytest.raises(ToolTimeout):
+        await dispatcher.run("enki_phase", {"project": "p"}, _sleeper(0.3, log, "slow"))
+    await dispatcher.run("enki_phase", {"project": "p"}, _sleeper(0, log, "next"))
+    assert log == [("start", "slow"), ("end", "slow"), ("start", "next"), ("end", "next")]
+    stats = dispatcher.stats()
+    assert stats["classes"]["write"]["timeouts"] == 1
+    dispatcher.shutdown()
+
+
+async def test_stats_report_queue_depth_and_wait():
+    dispatcher = ToolDispatcher(workers=1)
+    gate = threading.Event()
+    blocker = asyncio.create_task(dispatcher.run("enki_status", {}, gate.wait))
+    queued = asyncio.create_task(dispatcher.run("enki_graph_query", {}, lambda: "done"))
+    await asyncio.sleep(0.05)
+    stats = dispatcher.stats()
+    assert stats["queue_depth"] == 1
+    assert stats["running"] == 1
+    gate.set()
+    await asyncio.gather(blocker, queued)
+    stats = dispatcher.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["classes"]["read"]["completed"] == 2
+    assert stats["classes"]["read"]["max_wait_ms"] > 0
+    dispatcher.shutdown()
+
+
+async def test_cancel_while_waiting_for_lock_leaves_queue_empty():
+    dispatcher = ToolDispatcher(workers=2)
+    gate = threading.Event()
+    holder = asyncio.create_task(dispatcher.run("enki_phase", {"project": "p"}, gate.wait))
+    try:
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(dispatcher.run("enki_phase", {"project": "p"}, lambda: "x"))
+        await asyncio.sleep(0.05)
+        assert dispatcher.stats()["queue_depth"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert dispatcher.stats()["queue_depth"] == 0
+    finally:
+        gate.set()
+    await holder
+    assert await dispatcher.run("enki_phase", {"project": "p"}, lambda: "ok") == "ok"
+    dispatcher.shutdown()
+
+
+async def test_handler_errors_propagate_and_count():
+    dispatcher = ToolDispatcher(workers=1)
+
+    def boom():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        await dispatcher.run("enki_phase", {}, boom)
+    assert dispatcher.stats()["classes"]["write"]["errors"] == 1
+    # Lock released after error
+    assert await dispatcher.run("enki_phase", {}, lambda: "ok") == "ok"
+    dispatcher.shutdown()
@@ -0,0 +1,154 @@
+"""Tests for compact, paginated and size-bounded MCP responses."""
+
+import json
+
+import pytest
+
+from enki.db import em_db, graph_db
+from enki.graph.schema import create_graph_tables
+from enki.mcp.paging import decode_cursor, encode_cursor, to_json
+
+PROJECT = "paging-proj"
+
+
+class TestSerialization:
+    def test_compact_json(self):
+        assert to_json({"a": [1, 2], "b": "x"}) == '{"a":[1,2],"b":"x"}'
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(("2026-01-01 00:00:00", "id-1"))
+        assert decode_cursor(cursor, 2) == ["2026-01-01 00:00:00", "id-1"]
+        assert decode_cursor(None, 2) is None
+
+    @pytest.mark.parametrize("bad", ["!!!", encode_cursor(["only-one"])])
+    def test_malformed_cursor_rejected(self, bad):
+        with pytest.raises(ValueError):
+            decode_cursor(bad, 2)
+
+    def test_large_list_truncated_within_budget(self):
+        result = {"thread_id": "t", "messages": [{"body": "x" * 100}] * 500,
+                  "next_cursor": "abc"}
+        text = to_json(result, budget=4096)
+        assert len(text.encode()) <= 4096
+        data = json.loads(text)
+        meta = data["_truncated"]
+        assert meta["field"] == "messages"
+        assert meta["total"] == 500
+        assert 0 < meta["returned"] == len(data["messages"]) < 500
+        assert data["next_cursor"] is None
+
+    def test_top_level_list_wrapped_when_truncated(self):
+        data = json.loads(to_json([{"n": i} for i in range(1000)], budget=1024))
+        assert data["_truncated"]["field"] == "items"
+        assert len(data["items"]) == data["_truncated"]["returned"]
+
+    def test_large_string_truncated(self):
+        result = {"diagram": 'graph LR\n  "a" --> "b"\n' * 5000}
+        text = to_json(result, budget=2048)
+        assert len(text.encode()) <= 2048
+        data = json.loads(text)
+        assert data["diagram"].endswith("…[truncated]")
+        assert data["_truncated"]["string_field"] == "diagram"
+
+
+class TestMailThreadPaging:
+    def test_pages_cover_thread_in_order(self, enki_root):
+        from enki.mcp.orch_tools import enki_mail_thread
+        from enki.orch.mail import create_thread, send
+
+        tid = create_thread(PROJECT, "design")
+        sent = [send(PROJECT, tid, "PM", "Dev", body=f"msg {i}") for i in range(7)]
+
+        seen, cursor = [], None
+        while True:
+            page = enki_mail_thread(tid, project=PROJECT, cursor=cursor, page_size=3)
+            assert page["count"] <= 3
+            seen.extend(m["id"] for m in page["messages"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert sorted(seen) == sorted(sent)
+        assert len(seen) == len(set(seen))
+
+    def test_invalid_cursor_returns_error(self, enki_root):
+        from enki.mcp.orch_tools import enki_mail_thread
+
+        assert "error" in enki_mail_thread("t", project=PROJECT, cursor="garbage")
+
+
+class TestSprintSummaryPaging:
+    def test_tasks_paged_totals_complete(self, enki_root):
+        from enki.mcp.orch_tools import enki_sprint_summary
+
+        with em_db(PROJECT) as conn:
+            conn.execute(
+                "INSERT INTO sprint_state (sprint_id, project_id, sprint_number, status) "
+                "VALUES ('s1', ?, 1, 'active')",
+                (PROJECT,),
+            )
+            for i in range(5):
+                conn.execute(
+                    "INSERT INTO task_state (task_id, project_id, sprint_id, task_name, "
+                    "status, tier, work_type, started_at) VALUES (?, ?, 's1', ?, ?, 'standard', 'task', ?)",
+                    (f"t{i}", PROJECT, f"task {i}", "completed" if i < 2 else "pending",
+                     None if i % 2 else "2026-01-01 00:00:00"),
+                )
+
+        ids, cursor = [], None
+        while True:
+            result = enki_sprint_summary("s1", project=PROJECT, cursor=cursor, page_size=2)
+            assert result["total_tasks"] == 5
+            assert result["completed"] == 2
+            ids.extend(t["task_id"] for t in result["tasks"])
+            cursor = result["next_cursor"]
+            if not cursor:
+                break
+        assert sorted(ids) == [f"t{i}" for i in range(5)]
+        assert len(ids) == 5
+
+
+class TestGraphQueryPaging:
+    def test_importers_keyset_pages(self, enki_root):
+        from enki.mcp.orch_tools import enki_graph_query
+
+        with graph_db(PROJECT) as conn:
+            create_graph_tables(conn)
+            for i in range(25):
+                conn.execute(
+                    "INSERT INTO edges (id, from_id, to_id, edge_type) VALUES (?, ?, 'core.py', 'imports')",
+                    (f"m{i:02d}.py::imports::core.py", f"m{i:02d}.py"),
+                )
+            conn.commit()
+
+        first = enki_graph_query("importers", "core.py", project=PROJECT, page_size=10)
+        assert first["importers"] == [f"m{i:02d}.py" for i in range(10)]
+        second = enki_graph_query(
+            "importers", "core.py", project=PROJECT, page_size=10, cursor=first["next_cursor"],
+        )
+        assert second["importers"][0] == "m10.py"
+        third = enki_graph_query(
+            "importers", "core.py", project=PROJECT, page_size=10, cursor=second["next_cursor"],
+        )
+        assert third["count"] == 5
+        assert third["next_cursor"] is None
+
+    def test_limit_still_caps_default_page(self, enki_root):
+        from enki.mcp.orch_tools import enki_graph_query
+
+        with graph_db(PROJECT) as conn:
+            create_graph_tables(conn)
+            conn.execute("INSERT INTO files (path, language) VALUES ('a.py', 'python')")
+            for i in range(6):
+                conn.execute(
+                    "INSERT INTO symbols (id, file_path, name, kind, line_start, complexity) "
+                    "VALUES (?, 'a.py', ?, 'function', ?, ?)",
+                    (f"a.py::f{i}::{i}", f"f{i}", i, i % 3),
+                )
+            conn.commit()
+
+        result = enki_graph_query("complexity", "a.py", project=PROJECT, limit=4)
+        assert [h["complexity"] for h in result["hotspots"]] == [2, 2, 1, 1]
+        rest = enki_graph_query(
+            "complexity", "a.py", project=PROJECT, limit=4, cursor=result["next_cursor"],
+        )
+        assert [h["complexity"] for h in rest["hotspots"]] == [0, 0]
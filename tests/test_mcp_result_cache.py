@@ -0,0 +1,174 @@
+"""Tests for the generation-validated MCP result cache."""
+
+from enki.db import em_db, wisdom_db
+from enki.mcp.result_cache import ResultCache
+
+
+def _counter():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return f"result-{len(calls)}"
+    return compute, calls
+
+
+def _write_wisdom(tag: str) -> None:
+    with wisdom_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO projects (name, path) VALUES (?, ?)", (tag, f"/tmp/{tag}"),
+        )
+
+
+def test_repeat_call_is_served_from_cache(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    assert cache.get_or_compute("enki_status", {"project": "p"}, compute) == "result-1"
+    assert cache.get_or_compute("enki_status", {"project": "p"}, compute) == "result-1"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_argument_order_does_not_change_key(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    cache.get_or_compute("enki_graph_query", {"query_type": "a", "target": "b"}, compute)
+    cache.get_or_compute("enki_graph_query", {"target": "b", "query_type": "a"}, compute)
+    assert len(calls) == 1
+
+
+def test_commit_from_another_connection_invalidates(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    cache.get_or_compute("enki_status", {}, compute)
+    _write_wisdom("other")
+    assert cache.get_or_compute("enki_status", {}, compute) == "result-2"
+    assert cache.stats()["stale"] == 1
+
+
+def test_only_dependent_databases_invalidate(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    with em_db("proj") as conn:
+        conn.execute("SELECT 1")
+    cache.get_or_compute("enki_status", {}, compute)
+    with em_db("proj") as conn:
+        conn.execute(
+            "INSERT INTO mail_threads (thread_id, project_id, type) VALUES ('t1', 'proj', 'x')"
+        )
+    cache.get_or_compute("enki_status", {}, compute)
+    assert len(calls) == 1
+
+    compute2, calls2 = _counter()
+    cache.get_or_compute("enki_next_actions", {"project": "proj"}, compute2)
+    with em_db("proj") as conn:
+        conn.execute(
+            "INSERT INTO mail_threads (thread_id, project_id, type) VALUES ('t2', 'proj', 'x')"
+        )
+    cache.get_or_compute("enki_next_actions", {"project": "proj"}, compute2)
+    assert len(calls2) == 2
+
+
+def test_write_during_compute_is_not_served_later(enki_root):
+    cache = ResultCache()
+
+    def compute_with_write():
+        _write_wisdom("mid")
+        return "computed-before-write-visible"
+
+    cache.get_or_compute("enki_status", {}, compute_with_write)
+    compute, calls = _counter()
+    assert cache.get_or_compute("enki_status", {}, compute) == "result-1"
+
+
+def test_invalidate_drops_all_entries(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    cache.get_or_compute("enki_recall", {"query": "x"}, compute)
+    cache.invalidate()
+    cache.get_or_compute("enki_recall", {"query": "x"}, compute)
+    assert len(calls) == 2
+
+
+def test_lru_eviction(enki_root):
+    cache = ResultCache(max_entries=2)
+    compute, calls = _counter()
+    for q in ("a", "b", "a", "c", "a", "b"):
+        cache.get_or_compute("enki_recall", {"query": q}, compute)
+    # a, b, (a hit), c evicts b, (a hit), b recomputed and evicts c
+    assert len(calls) == 4
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["entries"] == 2
+
+
+def test_uncacheable_tools_always_compute(enki_root):
+    cache = ResultCache()
+    compute, calls = _counter()
+    cache.get_or_compute("enki_phase", {"action": "status"}, compute)
+    cache.get_or_compute("enki_phase", {"action": "status"}, compute)
+    assert len(calls) == 2
+    assert cache.stats()["misses"] == 0
+
+
+def test_task_graph_queries_are_not_cached(enki_root):
+    # A task query reads the live worktree, which no token covers.
+    cache = ResultCache()
+    compute, calls = _counter()
+    args = {"query_type": "symbols", "target": "a.py", "task_id": "t1"}
+    cache.get_or_compute("enki_graph_query", args, compute)
+    assert cache.get_or_compute("enki_graph_query", args, compute) == "result-2"
+    assert cache.stats()["misses"] == 0
+
+
+def test_repeat_recall_is_served_from_cache(enki_root):
+    # Recall touches last_accessed; the write must not invalidate its own entry.
+    import json
+
+    from enki.mcp.memory_tools import enki_recall
+    from enki.memory import access
+    from enki.memory.notes import create
+
+    note = create("Connection pooling xyzzy with pgbouncer", "learning", project="p")
+    args = {"query": "xyzzy", "project": "p", "scope": "knowledge"}
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return json.dumps(enki_recall(**args), default=str)
+
+    results = [cache.get_or_compute("enki_recall", args, compute) for _ in range(3)]
+    assert note["id"] in results[0]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["stale"] == 0
+
+    assert access.flush() >= 1
+    # The flushed touch is a real write, so the next recall recomputes.
+    cache.get_or_compute("enki_recall", args, compute)
+    assert len(calls) == 2
+
+
+def test_reachability_writes_do_not_invalidate_graph_queries(enki_root):
+    from enki.db import graph_db
+    from enki.graph.schema import bump_generation, create_graph_tables
+
+    with graph_db("p") as conn:
+        create_graph_tables(conn)
+        bump_generation(conn)
+        conn.commit()
+    cache = ResultCache()
+    before = cache.generation_token("enki_graph_query")
+    with graph_db("p") as conn:
+        conn.execute(
+            "INSERT INTO reachability_walks (source, direction, max_depth, total) "
+            "VALUES ('a.py', 'importers', 3, 0)"
+        )
+        conn.commit()
+    assert cache.generation_token("enki_graph_query") == before
+
+    with graph_db("p") as conn:
+        bump_generation(conn)
+        conn.commit()
+    assert cache.generation_token("enki_graph_query") != before
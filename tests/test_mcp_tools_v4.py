@@ -519,6 +519,23 @@ class TestMCPDispatch:
             result = handle_tool("enki_star", {"bead_id": "fake-id"})
             assert result["starred"] is False
 
+    def test_graph_query_enum_lists_every_handled_query_type(self, tmp_enki):
+        import inspect
+        import re
+
+        from enki.mcp.orch_tools import enki_graph_query
+
+        source = inspect.getsource(enki_graph_query)
+        handled = set()
+        for match in re.finditer(r'query_type (?:==|in) (\([^)]*\)|"\w+")', source):
+            handled.update(re.findall(r'"(\w+)"', match.group(1)))
+        assert "hotspots" in handled
+        with _patch_db(tmp_enki):
+            from enki.mcp_server import get_tools
+            tools = get_tools()
+            query = [t for t in tools if t["name"] == "enki_graph_query"][0]
+            assert handled <= set(query["inputSchema"]["properties"]["query_type"]["enum"])
+
     def test_category_enum_includes_code_knowledge(self, tmp_enki):
         with _patch_db(tmp_enki):
             from enki.mcp_server import get_tools
@@ -0,0 +1,60 @@
+"""Tests for MCP server background warm-up."""
+
+import threading
+from unittest.mock import patch
+
+import enki.mcp.warmup as warmup
+from enki.mcp.warmup import Warmup, default_steps
+
+
+def test_runs_steps_in_background_and_reports_timings():
+    release = threading.Event()
+    calls = []
+    w = Warmup([
+        ("first", lambda: calls.append("first")),
+        ("blocked", release.wait),
+    ]).start()
+    assert w.status()["state"] == "running"
+    assert not w.ready
+
+    release.set()
+    assert w.wait(timeout=5)
+    status = w.status()
+    assert status["state"] == "ready"
+    assert calls == ["first"]
+    assert set(status["steps"]) == {"first", "blocked"}
+    assert all(s["ok"] and s["seconds"] >= 0 for s in status["steps"].values())
+    assert status["total_seconds"] is not None
+
+
+def test_failed_step_degrades_without_raising():
+    def broken():
+        raise ImportError("no module named sentence_transformers")
+
+    w = Warmup([("model", broken), ("ok", lambda: None)]).start()
+    assert w.wait(timeout=5)
+    status = w.status()
+    assert status["state"] == "degraded"
+    assert status["steps"]["model"]["ok"] is False
+    assert "sentence_transformers" in status["steps"]["model"]["error"]
+    assert status["steps"]["ok"]["ok"] is True
+
+
+def test_start_warmup_is_idempotent():
+    count = []
+    with patch.object(warmup, "_warmup", None):
+        assert warmup.warmup_status()["state"] == "not_started"
+        first = warmup.start_warmup([("count", lambda: count.append(1))])
+        second = warmup.start_warmup([("count", lambda: count.append(1))])
+        assert first is second
+        assert first.wait(timeout=5)
+        assert warmup.warmup_status()["ready"] is True
+    assert count == [1]
+
+
+def test_default_steps_import_real_modules():
+    steps = default_steps(load_model=False)
+    assert "import enki.mcp.orch_tools" in [name for name, _ in steps]
+    w = Warmup(steps).start()
+    assert w.wait(timeout=60)
+    assert w.status()["state"] == "ready"
@@ -0,0 +1,141 @@
+"""Tests for Sentrux drift scoring."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+import enki.gates.sentrux as sentrux
+from enki.db import uru_db
+
+
+@pytest.fixture
+def drift_env(enki_root):
+    patterns_path = enki_root / "drift-patterns.json"
+    with patch.object(sentrux, "ENKI_ROOT", enki_root), \
+         patch.object(sentrux, "DRIFT_PATTERNS_PATH", patterns_path), \
+         patch.object(sentrux, "_matcher_cache", None):
+        yield patterns_path
+
+
+def _naive_first_match(patterns: dict, tool_name: str, tool_input: dict) -> str | None:
+    """Reference implementation: per-pattern substring scans."""
+    tool_input_str = json.dumps(tool_input)[:500]
+    for name, pattern in patterns.items():
+        signals = pattern.get("signals", [])
+        if pattern.get("tool_name") and pattern["tool_name"] != tool_name:
+            continue
+        match_type = pattern.get("match_type", "tool_input_contains")
+        if match_type == "tool_input_contains":
+            if any(sig in tool_input_str for sig in signals):
+                return name
+        elif match_type == "file_content_contains":
+            file_path = (tool_input.get("file_path") or tool_input.get("path", "")).lower()
+            file_pattern = (pattern.get("file_pattern") or "").lower()
+            content = tool_input.get("content") or tool_input.get("new_string", "")
+            if file_pattern and file_pattern in file_path and any(sig in content for sig in signals):
+                return name
+    return None
+
+
+class TestDriftMatcher:
+    CASES = [
+        ("enki_phase", {"action": "advance", "force": True}),
+        ("enki_phase", {"action": "status"}),
+        ("enki_report", {"status": "completed"}),
+        ("enki_goal", {"note": "skip_council=True please"}),
+        ("Write", {"file_path": "tests/test_x.py", "content": "def test():\n    assert True\n"}),
+        ("Write", {"file_path": "src/x.py", "content": "assert True"}),
+        ("Edit", {"file_path": "app.spec.ts", "new_string": "expect(true).toBe(true)"}),
+        ("Bash", {"command": "echo " + "x" * 2000 + " force=True"}),
+    ]
+
+    @pytest.mark.parametrize("tool_name,tool_input", CASES)
+    def test_matches_naive_scan(self, tool_name, tool_input):
+        matcher = sentrux._DriftMatcher(sentrux.DEFAULT_DRIFT_PATTERNS)
+        idx = matcher.first_match(tool_name, tool_input, sentrux._summarize_input(tool_input))
+        got = matcher.patterns[idx][0] if idx is not None else None
+        assert got == _naive_first_match(sentrux.DEFAULT_DRIFT_PATTERNS, tool_name, tool_input)
+
+    def test_overlapping_signals_all_found(self):
+        patterns = {
+            "long": {"weight": 1.0, "signals": ["abcdef"], "tool_name": "never"},
+            "prefix": {"weight": 1.0, "signals": ["abc"]},
+            "overlap": {"weight": 1.0, "signals": ["defg"]},
+        }
+        matcher = sentrux._DriftMatcher(patterns)
+        assert matcher.matching_patterns("xxabcdefgxx") == {0, 1, 2}
+
+    def test_summary_matches_full_dump_prefix(self):
+        tool_input = {"content": "é\n\"" * 1000, "file_path": "a.py"}
+        assert sentrux._summarize_input(tool_input) == json.dumps(tool_input)[:500]
+
+    def test_hundreds_of_signals(self):
+        patterns = {
+            f"p{i}": {"weight": 1.0, "signals": [f"needle_{i}_a", f"needle_{i}_b"]}
+            for i in range(300)
+        }
+        matcher = sentrux._DriftMatcher(patterns)
+        tool_input = {"command": "run needle_250_b"}
+        idx = matcher.first_match("Bash", tool_input, sentrux._summarize_input(tool_input))
+        assert matcher.patterns[idx][0] == "p250"
+
+
+class TestMatcherCache:
+    def test_compiled_once_per_mtime(self, drift_env):
+        first = sentrux._get_matcher()
+        assert drift_env.exists()
+        assert sentrux._get_matcher() is first
+
+    def test_recompiled_when_file_changes(self, drift_env):
+        first = sentrux._get_matcher()
+        drift_env.write_text(json.dumps({
+            "custom": {"weight": 2.0, "signals": ["danger_zone"], "match_type": "tool_input_contains"},
+        }))
+        second = sentrux._get_matcher()
+        assert second is not first
+        assert [name for name, _ in second.patterns] == ["custom"]
+
+
+class TestScoreToolCall:
+    def test_accumulates_with_single_upsert(self, drift_env):
+        for _ in range(2):
+            result = sentrux.score_tool_call(
+                "sess-1", "enki_phase", {"action": "advance"}, {}, project="p",
+            )
+        assert result["pattern_matched"] == "manual_phase_advance"
+        assert result["cumulative_drift"] == 8.0
+        assert result["action"] == "nudge"
+
+        with uru_db() as conn:
+            row = conn.execute(
+                "SELECT cumulative_score, nudge_count FROM session_drift WHERE session_id = ?",
+                ("sess-1",),
+            ).fetchone()
+        assert row["cumulative_score"] == 8.0
+        assert row["nudge_count"] == 1
+
+    def test_nudge_fires_once(self, drift_env):
+        actions = [
+            sentrux.score_tool_call("sess-2", "enki_phase", {"action": "advance"}, {})["action"]
+            for _ in range(3)
+        ]
+        assert actions == ["none", "nudge", "none"]
+
+    def test_escalates_past_threshold(self, drift_env):
+        for _ in range(7):
+            result = sentrux.score_tool_call(
+                "sess-3", "enki_report", {"note": "enki_report force=True"}, {},
+            )
+        assert result["cumulative_drift"] >= sentrux.ESCALATE_THRESHOLD
+        assert result["action"] == "escalate"
+        with uru_db() as conn:
+            row = conn.execute(
+                "SELECT escalated FROM session_drift WHERE session_id = ?", ("sess-3",),
+            ).fetchone()
+        assert row["escalated"] == 1
+
+    def test_clean_call_scores_zero(self, drift_env):
+        result = sentrux.score_tool_call("sess-4", "Read", {"file_path": "x.py"}, {})
+        assert result["drift_contribution"] == 0.0
+        assert result["action"] == "none"
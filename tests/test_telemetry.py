@@ -0,0 +1,144 @@
+"""Tests for MCP tool telemetry."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from enki.db import metrics_db, start_db_timer, stop_db_timer, wisdom_db
+from enki.telemetry import (
+    ToolMetrics,
+    ToolSample,
+    format_tool_stats,
+    prometheus_text,
+    tool_stats,
+    write_prometheus_textfile,
+)
+
+
+def _sample(tool="enki_recall", wall_ms=12.0, error=False, project="p", response_bytes=100):
+    return ToolSample(
+        tool=tool, project=project, wall_ms=wall_ms, cpu_ms=wall_ms / 2,
+        db_ms=wall_ms / 4, response_bytes=response_bytes, error=error, ts=time.time(),
+    )
+
+
+def test_db_timer_counts_statements_on_this_thread(enki_root):
+    start_db_timer()
+    with wisdom_db() as conn:
+        conn.execute("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c WHERE x<20000) "
+                     "SELECT SUM(x) FROM c").fetchone()
+    assert stop_db_timer() > 0
+    # Timer off: nothing accumulates.
+    with wisdom_db() as conn:
+        conn.execute("SELECT 1")
+    assert stop_db_timer() == 0.0
+
+
+def test_timed_call_records_and_flushes(enki_root):
+    metrics = ToolMetrics(flush_interval_s=3600)
+
+    def handler():
+        with wisdom_db() as conn:
+            conn.execute("SELECT COUNT(*) FROM notes").fetchone()
+        return '{"ok":true}'
+
+    for _ in range(3):
+        assert metrics.timed_call("enki_status", {"project": "p"}, handler) == '{"ok":true}'
+    metrics.timed_call("enki_status", {"project": "p"}, lambda: '{"error":"nope"}')
+    assert metrics.flush() == 1
+
+    stats = tool_stats(since_hours=1)
+    assert len(stats) == 1
+    row = stats[0]
+    assert row["tool"] == "enki_status"
+    assert row["calls"] == 4
+    assert row["errors"] == 1
+    assert row["avg_bytes"] > 0
+    assert row["avg_db_ms"] >= 0
+
+
+def test_exceptions_counted_and_propagated(enki_root):
+    metrics = ToolMetrics(flush_interval_s=3600)
+
+    def boom():
+        raise RuntimeError("handler failed")
+
+    with pytest.raises(RuntimeError):
+        metrics.timed_call("enki_wave", {}, boom)
+    metrics.flush()
+    [row] = tool_stats(since_hours=1)
+    assert row["errors"] == 1
+    with metrics_db() as conn:
+        assert conn.execute("SELECT project FROM tool_metrics").fetchone()["project"] == "-"
+
+
+def test_histogram_percentiles_and_accumulating_flushes(enki_root):
+    metrics = ToolMetrics(flush_interval_s=3600)
+    for wall in [3] * 90 + [400] * 10:
+        metrics.record(_sample(wall_ms=wall))
+    metrics.flush()
+    metrics.record(_sample(wall_ms=3))
+    metrics.flush()
+
+    [row] = tool_stats(since_hours=1)
+    assert row["calls"] == 101
+    assert row["p50_ms"] == 5
+    assert row["p95_ms"] == 500
+    assert row["max_wall_ms"] == 400
+    assert "enki_recall" in format_tool_stats([row], 1)
+
+
+def test_old_rows_roll_off(enki_root):
+    metrics = ToolMetrics(flush_interval_s=3600)
+    with metrics_db() as conn:
+        conn.execute(
+            "INSERT INTO tool_metrics (hour, tool, project, calls) "
+            "VALUES ('2000-01-01T00:00', 'old', 'p', 5)"
+        )
+    metrics.record(_sample())
+    metrics.flush()
+    with metrics_db() as conn:
+        tools = [r["tool"] for r in conn.execute("SELECT tool FROM tool_metrics")]
+    assert tools == ["enki_recall"]
+
+
+def test_telemetry_failure_does_not_fail_the_call(enki_root):
+    metrics = ToolMetrics(flush_interval_s=0)
+    with patch.object(metrics, "flush", side_effect=OSError("disk full")):
+        assert metrics.timed_call("enki_status", {}, lambda: "ok") == "ok"
+
+
+def test_due_flush_runs_off_the_calling_thread(enki_root):
+    import threading
+
+    metrics = ToolMetrics(flush_interval_s=0)
+    flushed = threading.Event()
+    threads = []
+
+    def flush():
+        threads.append(threading.current_thread())
+        flushed.set()
+
+    with patch.object(metrics, "flush", side_effect=flush):
+        metrics.record(_sample())
+        assert flushed.wait(5)
+    assert threads[0] is not threading.current_thread()
+
+
+def test_prometheus_textfile(enki_root, tmp_path):
+    metrics = ToolMetrics(flush_interval_s=3600)
+    metrics.record(_sample(wall_ms=30, project='we"ird'))
+    metrics.record(_sample(wall_ms=2000, error=True, project='we"ird'))
+    metrics.flush()
+
+    text = prometheus_text()
+    assert 'enki_mcp_tool_calls_window{tool="enki_recall",project="we\\"ird"} 2' in text
+    assert 'le="0.05"} 1' in text
+    assert 'le="+Inf"} 2' in text
+    assert "enki_mcp_tool_errors_window" in text
+    # Window sums shrink as hours roll off: never exported as counters.
+    assert "counter" not in text and "histogram" not in text
+
+    path = write_prometheus_textfile(tmp_path / "textfile" / "enki.prom")
+    assert path.read_text() == text